@@ -14,6 +14,9 @@
 #    under the License.
 
 import collections
+import gzip
+import itertools
+import json
 import os
 import re
 import sys
@@ -39,6 +42,8 @@ from rally.deployment import engine as deploy_engine
 from rally import exceptions
 from rally.task import engine
 from rally.task import exporter as texporter
+from rally.task.processing import plot
+from rally.task.processing import utils as putils
 from rally.verification import context as vcontext
 from rally.verification import manager as vmanager
 from rally.verification import reporter as vreporter
@@ -266,7 +271,15 @@ class _Task(APIGroup):
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/list",
                  method="GET")
     def list(self, **filters):
-        return [task.to_dict() for task in objects.Task.list(**filters)]
+        """Get the list of tasks without their results.
+
+        :param filters: "status", "deployment" and "tags" to filter tasks
+                        by, and "limit" and "marker" (UUID of the last task
+                        of the previous page) to get a page of tasks
+        :returns: list of dicts with data of tasks
+        """
+        return [task.to_dict(include_results=False)
+                for task in objects.Task.list(**filters)]
 
     def _get(self, task_id):
         return objects.Task.get(task_id)
@@ -278,21 +291,137 @@ class _Task(APIGroup):
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/get_detailed",
                  method="GET")
-    def get_detailed(self, task_id, extended_results=False):
+    def get_detailed(self, task_id, extended_results=False,
+                     lazy_iterations=False):
         """Get detailed task data.
 
         :param task_id: str task UUID
         :param extended_results: whether to return task data as dict
                                  with extended results
+        :param lazy_iterations: whether iterations of results should be
+                                loaded from the database only while they
+                                are iterated over
         :returns: rally.common.db.sqlalchemy.models.Task
         :returns: dict
         """
-        task = objects.Task.get_detailed(task_id)
+        task = objects.Task.get_detailed(task_id,
+                                         lazy_iterations=lazy_iterations)
         if task and extended_results:
             task = dict(task)
             task["results"] = objects.Task.extend_results(task["results"])
         return task
 
+    @api_wrapper(path=API_REQUEST_PREFIX + "/task/get_workloads_statistics",
+                 method="GET")
+    def get_workloads_statistics(self, tasks_uuids):
+        """Get statistics of workloads of the tasks without their iterations.
+
+        :param tasks_uuids: list of tasks UUIDs
+        :returns: list of dicts with "uuid", "key", "sla" and "info" of
+                  workloads
+        """
+        for task_uuid in tasks_uuids:
+            # check that the task exists
+            self._get(task_uuid)
+        return objects.Task.get_workloads_statistics(tasks_uuids)
+
+    @api_wrapper(path=API_REQUEST_PREFIX + "/task/compact",
+                 method="POST")
+    def compact(self, task_id, sample_size=1000, archive_dir=None):
+        """Downsample stored iterations of a finished task.
+
+        Statistics and reports of workloads are stored before the
+        iterations are downsampled, so reports and trends of the task are
+        made of all its iterations. Iterations of workloads with more than
+        sample_size successful ones are replaced with a uniform random
+        sample of successful iterations and all the failed ones.
+
+        :param task_id: str task UUID
+        :param sample_size: the number of successful iterations to keep
+                            per workload
+        :param archive_dir: path to a directory to write all iterations of
+                            the task to before downsampling them. The file
+                            is named "<task UUID>.json.gz" and can be loaded
+                            by "rally task import"
+        :raises TaskInvalidStatus: if the task is not finished
+        :returns: dict with the number of compacted "workloads" and the
+                  number of "deleted" iterations
+        """
+        task = self._get(task_id)
+        finished = (consts.TaskStatus.FINISHED, consts.TaskStatus.ABORTED,
+                    consts.TaskStatus.CRASHED)
+        if task["status"] not in finished:
+            raise exceptions.TaskInvalidStatus(uuid=task["uuid"],
+                                               require=", ".join(finished),
+                                               actual=task["status"])
+
+        # statistics are calculated for workloads stored without them
+        to_compact = set(
+            w["uuid"] for w in objects.Task.get_workloads_statistics(
+                [task["uuid"]])
+            if w["info"].get("iterations_stored") is None and
+            w["info"]["iterations_count"] - w["info"]["iterations_failed"]
+            > sample_size)
+        compacted = {"workloads": 0, "deleted": 0}
+        if not to_compact:
+            return compacted
+
+        results = [{"uuid": x["uuid"], "key": x["key"],
+                    "result": x["data"]["raw"],
+                    "sla": x["data"]["sla"],
+                    "hooks": x["data"].get("hooks", []),
+                    "load_duration": x["data"]["load_duration"],
+                    "full_duration": x["data"]["full_duration"],
+                    "created_at": x["created_at"],
+                    "statistics": x["data"]["statistics"]}
+                   for x in objects.Task.iterate_results(task["uuid"])]
+        # NOTE: reports built after compaction have charts of the sample
+        # only, so reports of all iterations are stored for every zipper
+        for zipper in putils.ZIPPERS:
+            plot.store_reports(results, zipper=zipper)
+        if archive_dir:
+            self._archive_results(task["uuid"], results, archive_dir)
+
+        for result in results:
+            if result["uuid"] not in to_compact:
+                continue
+            kept = objects.Workload.compact_data(
+                result["uuid"], result["statistics"], sample_size,
+                CONF.raw_result_chunk_size)
+            compacted["workloads"] += 1
+            compacted["deleted"] += (
+                result["statistics"]["iterations_count"] - kept)
+        LOG.info("%(deleted)d iterations of %(workloads)d workloads of task "
+                 "%(uuid)s are deleted.", dict(compacted, uuid=task["uuid"]))
+        return compacted
+
+    def _archive_results(self, task_uuid, results, archive_dir):
+        """Write results of the task in the format of task results file.
+
+        An existing archive of the task is kept as is, because iterations
+        of some workloads could be downsampled after writing it.
+        """
+        path = os.path.join(os.path.expanduser(archive_dir),
+                            "%s.json.gz" % task_uuid)
+        if os.path.exists(path):
+            LOG.info("Archive %s already exists.", path)
+            return
+        with gzip.open(path + ".part", "wb") as f:
+            f.write(b"[")
+            for idx, result in enumerate(results):
+                header = dict((k, v) for k, v in result.items()
+                              if k not in ("uuid", "result", "statistics"))
+                # iterations are written one by one to not load them all
+                f.write(("%s%s, \"result\": [" % (
+                    ", " if idx else "",
+                    json.dumps(header, sort_keys=True)[:-1])).encode("utf-8"))
+                for i, itr in enumerate(result["result"]):
+                    f.write(((", " if i else "") + json.dumps(itr)).encode(
+                        "utf-8"))
+                f.write(b"]}")
+            f.write(b"]")
+        os.rename(path + ".part", path)
+
     # TODO(andreykurilin): move it to some kind of utils
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/render_template",
                  method="GET")
@@ -537,19 +666,33 @@ class _Task(APIGroup):
         """
         if force:
             objects.Task.delete_by_uuid(task_uuid, status=None)
-        elif objects.Task.get_status(task_uuid) in (
-                consts.TaskStatus.ABORTED,
-                consts.TaskStatus.FINISHED,
-                consts.TaskStatus.CRASHED):
-            objects.Task.delete_by_uuid(task_uuid, status=None)
         else:
+            # the status is checked by the same statement which switches
+            # the task to "deleting", so it can not be started meanwhile
             objects.Task.delete_by_uuid(
-                task_uuid, status=consts.TaskStatus.FINISHED)
+                task_uuid, status=[consts.TaskStatus.ABORTED,
+                                   consts.TaskStatus.FINISHED,
+                                   consts.TaskStatus.CRASHED,
+                                   consts.TaskStatus.DELETING])
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/import_results",
                  method="POST")
     def import_results(self, deployment, task_results, tags=None):
-        """Import json results of a test into rally database"""
+        """Import json results of a test into rally database
+
+        Results are processed one by one and iterations of a result are
+        stored by chunks while they are iterated over, so task_results can
+        be a generator reading a large file with iterations of results
+        which are read lazily as well. Generators can be passed to a local
+        Rally only, a call of a remote one needs lists of results and
+        iterations, which can be serialized into JSON.
+
+        :param deployment: UUID or name of the deployment
+        :param task_results: iterable of task results, where "result" of
+                             each one is an iterable of iterations
+        :param tags: optional tags of the task
+        :returns: dict with data of the imported task without its results
+        """
         deployment = objects.Deployment.get(deployment)
         if deployment["status"] != consts.DeployStatus.DEPLOY_FINISHED:
             raise exceptions.DeploymentNotFinishedStatus(
@@ -560,44 +703,85 @@ class _Task(APIGroup):
         task_inst = objects.Task(deployment_uuid=deployment["uuid"],
                                  tags=tags)
         task_inst.update_status(consts.TaskStatus.RUNNING)
-        for result in task_results:
-            subtask_obj = task_inst.add_subtask(title=result["key"]["name"])
-            workload_obj = subtask_obj.add_workload(result["key"])
-            chunk_size = CONF.raw_result_chunk_size
-            workload_data_count = 0
-            while len(result["result"]) > chunk_size:
-                results_chunk = result["result"][:chunk_size]
-                result["result"] = result["result"][chunk_size:]
-                results_chunk.sort(key=lambda x: x["timestamp"])
-                workload_obj.add_workload_data(workload_data_count,
-                                               {"raw": results_chunk})
-                workload_data_count += 1
-            workload_obj.add_workload_data(workload_data_count,
-                                           {"raw": result["result"]})
-            workload_obj.set_results(result)
-            subtask_obj.update_status(consts.SubtaskStatus.FINISHED)
+        try:
+            for result in task_results:
+                self._import_workload(task_inst, result)
+        except Exception as e:
+            # results are read while they are stored, so they can turn
+            # out to be invalid when a part of them is stored already
+            task_inst.set_failed(type(e).__name__, str(e),
+                                 json.dumps(traceback.format_exc()))
+            raise
         task_inst.update_status(consts.SubtaskStatus.FINISHED)
 
         LOG.info("Task results have been successfully imported.")
 
-        return task_inst.to_dict()
+        # imported results are not loaded back
+        return task_inst.to_dict(include_results=False)
+
+    # The number of chunks of iterations which are stored at once while
+    # results are imported
+    IMPORT_CHUNKS_BATCH = 10
+
+    def _import_workload(self, task_inst, result):
+        subtask_obj = task_inst.add_subtask(title=result["key"]["name"])
+        workload_obj = subtask_obj.add_workload(result["key"])
+        chunk_size = CONF.raw_result_chunk_size
+        summary = objects.task.IterationsSummary()
+        chunks = []
+        chunk = []
+        workload_data_count = 0
+        for itr in result["result"]:
+            summary.add(itr)
+            chunk.append(itr)
+            if len(chunk) == chunk_size:
+                chunks.append(objects.Workload.make_data_chunk(
+                    workload_data_count, chunk))
+                workload_data_count += 1
+                chunk = []
+                if len(chunks) == self.IMPORT_CHUNKS_BATCH:
+                    workload_obj.add_workload_data_chunks(chunks)
+                    chunks = []
+        if chunk or not workload_data_count:
+            chunks.append(objects.Workload.make_data_chunk(
+                workload_data_count, chunk))
+        if chunks:
+            workload_obj.add_workload_data_chunks(chunks)
+        # statistics need one more pass over the stored iterations only
+        workload_obj.set_results(result, summary=summary)
+        subtask_obj.update_status(consts.SubtaskStatus.FINISHED)
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/export",
                  method="POST")
-    def export(self, tasks_uuids, output_type, output_dest=None):
+    def export(self, tasks_uuids, output_type, output_dest=None,
+               options=None, stream=False):
         """Generate a report for a task or a few tasks.
 
         :param tasks_uuids: List of tasks UUIDs
         :param output_type: Plugin name of task reporter
         :param output_dest: Destination for task report
+        :param options: Dict with options specific for the task reporter
+        :param stream: Whether reporters which support it should write the
+            report to output_dest piece by piece instead of returning it.
+            The report is written by the process which runs the export, so
+            it makes sense for a local Rally only.
         """
 
-        tasks_results = []
-        for task_uuid in tasks_uuids:
-            tasks_results.extend(self.get_detailed(
-                task_id=task_uuid)["results"])
-
         reporter_cls = texporter.TaskExporter.get(output_type)
+
+        if reporter_cls.LAZY_RESULTS:
+            for task_uuid in tasks_uuids:
+                # check that the task exists before starting the export
+                self._get(task_uuid)
+            tasks_results = itertools.chain.from_iterable(
+                objects.Task.iterate_results(task_uuid)
+                for task_uuid in tasks_uuids)
+        else:
+            tasks_results = []
+            for task_uuid in tasks_uuids:
+                tasks_results.extend(self.get_detailed(
+                    task_id=task_uuid)["results"])
+
         reporter_cls.validate(output_dest)
 
         LOG.info("Building '%s' report for the following task(s): "
@@ -605,7 +789,9 @@ class _Task(APIGroup):
         result = texporter.TaskExporter.make(reporter_cls,
                                              tasks_results,
                                              output_dest,
-                                             api=self.api)
+                                             api=self.api,
+                                             options=options,
+                                             stream=stream)
         LOG.info("The report has been successfully built.")
         return result
 
@@ -1112,16 +1298,15 @@ class _Verification(APIGroup):
             run_args["concurrency"] = concurrency
 
         verification = self._get(verification_uuid)
-        tests = verification.tests
 
         if failed:
-            tests = [t for t, r in tests.items() if r["status"] == "fail"]
+            tests = list(verification.get_tests(status="fail"))
             if not tests:
                 raise exceptions.RallyException(
                     "There are no failed tests from verification (UUID=%s)."
                     % verification_uuid)
         else:
-            tests = tests.keys()
+            tests = verification.tests.keys()
 
         deployment = (deployment_id if deployment_id
                       else verification.deployment_uuid)
@@ -1155,9 +1340,10 @@ class _Verification(APIGroup):
         :param tags: Tags to filter verifications by
         :param status: Status to filter verifications by
         """
-        return [item.to_dict() for item in objects.Verification.list(
-            verifier_id, deployment_id=deployment_id,
-            tags=tags, status=status)]
+        return [item.to_dict(include_tests=False)
+                for item in objects.Verification.list(
+                    verifier_id, deployment_id=deployment_id,
+                    tags=tags, status=status)]
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/verification/delete",
                  method="DELETE")
@@ -1181,6 +1367,8 @@ class _Verification(APIGroup):
         :param output_dest: Destination for verification report
         """
         verifications = [self._get(uuid) for uuid in uuids]
+        # reporters need results of tests of all the verifications
+        objects.Verification.load_tests(verifications)
 
         reporter_cls = vreporter.VerificationReporter.get(output_type)
         reporter_cls.validate(output_dest)
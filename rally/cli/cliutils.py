@@ -16,6 +16,7 @@
 from __future__ import print_function
 
 import argparse
+import datetime as dt
 import inspect
 import json
 import os
@@ -169,6 +170,51 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
         out.write(encodeutils.safe_encode(table_body))
 
 
+def print_list_stream(objs, fields, formatters=None, table_label=None,
+                      min_width=10, out=sys.stdout):
+    """Print an iterable of objects as a table, one row per object.
+
+    Unlike print_list(), rows are written as soon as objects are taken
+    from the iterable, so widths of columns do not depend on values: each
+    column is as wide as its label or min_width, and longer values
+    overflow the column.
+
+    :param objs: iterable of dicts
+    :param fields: keys of dicts that correspond to columns, in order
+    :param formatters: `dict` of callables for field formatting
+    :param table_label: Label to use as header for the whole table.
+    :param min_width: minimal width of columns
+    :param out: stream to write output to.
+    :returns: int number of printed rows
+    """
+    formatters = formatters or {}
+    widths = [max(len(field), min_width) for field in fields]
+    border = "+%s+\n" % "+".join("-" * (width + 2) for width in widths)
+
+    def _write(text):
+        if six.PY3:
+            out.write(encodeutils.safe_encode(text).decode())
+        else:
+            out.write(encodeutils.safe_encode(text))
+
+    def _make_row(values):
+        return "|%s|\n" % "|".join(
+            " %s " % six.text_type(value).ljust(width)
+            for value, width in zip(values, widths))
+
+    if table_label:
+        _write(make_table_header(table_label, len(border) - 1) + "\n")
+    _write(border + _make_row(fields) + border)
+
+    count = 0
+    for o in objs:
+        _write(_make_row([formatters[field](o) if field in formatters
+                          else o.get(field, "") for field in fields]))
+        count += 1
+    _write(border)
+    return count
+
+
 def print_dict(obj, fields=None, formatters=None, mixed_case_fields=False,
                normalize_field_names=False, property_label="Property",
                value_label="Value", table_label=None, print_header=True,
@@ -397,6 +443,29 @@ def pretty_float_formatter(field, ndigits=None):
     return _formatter
 
 
+PERIOD_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days",
+                "w": "weeks"}
+
+
+def parse_period(value):
+    """Parse a period like "30d" to be used as a type of CLI arguments.
+
+    :param value: str number with optional unit: "s", "m", "h", "d" (the
+                  default one) or "w"
+    :returns: datetime.timedelta
+    """
+    number, unit = value, "d"
+    if value and value[-1] in PERIOD_UNITS:
+        number, unit = value[:-1], value[-1]
+    try:
+        number = int(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Invalid period '%s', expected a number with one of units: %s"
+            % (value, ", ".join(sorted(PERIOD_UNITS))))
+    return dt.timedelta(**{PERIOD_UNITS[unit]: number})
+
+
 def args(*args, **kwargs):
     def _decorator(func):
         func.__dict__.setdefault("args", []).insert(0, (args, kwargs))
@@ -17,6 +17,10 @@
 
 from __future__ import print_function
 import collections
+import copy
+import datetime as dt
+import gzip
+import itertools
 import json
 import os
 import sys
@@ -30,6 +34,7 @@ from rally.cli import cliutils
 from rally.cli import envutils
 from rally.common import fileutils
 from rally.common.i18n import _
+from rally.common.io import json_stream
 from rally.common.io import junit
 from rally.common import logging
 from rally.common import utils as rutils
@@ -38,6 +43,7 @@ from rally.common import yamlutils as yaml
 from rally import consts
 from rally import exceptions
 from rally import plugins
+from rally.task.processing import compare
 from rally.task.processing import plot
 from rally.task.processing import utils as putils
 from rally.task import utils as tutils
@@ -299,14 +305,43 @@ class TaskCommands(object):
     @cliutils.args("--iterations-data", dest="iterations_data",
                    action="store_true",
                    help="Print detailed results for each iteration.")
+    @cliutils.args("--filter", dest="filter_by", type=str,
+                   choices=["errors-only"], required=False,
+                   help="Print detailed results only for failed iterations "
+                        "(with --iterations-data).")
+    @cliutils.args("--limit", dest="limit", type=int, required=False,
+                   help="The maximal number of iterations of each workload "
+                        "to print detailed results for (with "
+                        "--iterations-data).")
+    @cliutils.args("--offset", dest="offset", type=int, default=0,
+                   required=False,
+                   help="The number of iterations of each workload to skip "
+                        "before printing detailed results (with "
+                        "--iterations-data).")
     @envutils.with_default_task_id
-    def detailed(self, api, task_id=None, iterations_data=False):
+    def detailed(self, api, task_id=None, iterations_data=False,
+                 filter_by=None, limit=None, offset=0):
         """Print detailed information about given task.
 
+        Statistics of workloads are printed before iterations are read
+        from the database, and detailed results for iterations are
+        printed while they are read.
+
         :param task_id: str, task uuid
         :param iterations_data: bool, include results for each iteration
+        :param filter_by: str, "errors-only" to include results only for
+                          failed iterations
+        :param limit: int, the maximal number of iterations of each
+                      workload to include results for
+        :param offset: int, the number of iterations of each workload to
+                       skip before including results for them
         """
-        task = api.task.get_detailed(task_id=task_id, extended_results=True)
+        if offset < 0 or (limit is not None and limit < 0):
+            print(_("Arguments --limit and --offset can not be negative."))
+            return 1
+
+        task = api.task.get_detailed(task_id=task_id, extended_results=True,
+                                     lazy_iterations=True)
 
         if not task:
             print("The task %s can not be found" % task_id)
@@ -347,57 +382,6 @@ class TaskCommands(object):
             print(json.dumps(key["kw"], indent=2))
             print()
 
-            iterations = []
-            iterations_headers = ["iteration", "duration"]
-            iterations_actions = []
-            output = []
-            task_errors = []
-            if iterations_data:
-                atomic_merger = putils.AtomicMerger(result["info"]["atomic"])
-                atomic_names = atomic_merger.get_merged_names()
-                for i, atomic_name in enumerate(atomic_names, 1):
-                    action = "%i. %s" % (i, atomic_name)
-                    iterations_headers.append(action)
-                    iterations_actions.append((atomic_name, action))
-
-            for idx, itr in enumerate(result["iterations"], 1):
-
-                if iterations_data:
-                    row = {"iteration": idx, "duration": itr["duration"]}
-                    for name, action in iterations_actions:
-                        atomic_actions = (
-                            atomic_merger.merge_atomic_actions(
-                                itr["atomic_actions"]))
-                        row[action] = atomic_actions.get(name, 0)
-                    iterations.append(row)
-
-                if "output" in itr:
-                    iteration_output = itr["output"]
-                else:
-                    iteration_output = {"additive": [], "complete": []}
-
-                    # NOTE(amaretskiy): "scenario_output" is supported
-                    #   for backward compatibility
-                    if ("scenario_output" in itr
-                            and itr["scenario_output"]["data"]):
-                        iteration_output["additive"].append(
-                            {"data": itr["scenario_output"]["data"].items(),
-                             "title": "Scenario output",
-                             "description": "",
-                             "chart_plugin": "StackedArea"})
-
-                for idx, additive in enumerate(iteration_output["additive"]):
-                    if len(output) <= idx + 1:
-                        output_table = plot.charts.OutputStatsTable(
-                            result["info"], title=additive["title"])
-                        output.append(output_table)
-                    output[idx].add_iteration(additive["data"])
-
-                if itr.get("error"):
-                    task_errors.append(TaskCommands._format_task_error(itr))
-
-            self._print_task_errors(task_id, task_errors)
-
             cols = plot.charts.MainStatsTable.columns
             float_cols = result["info"]["stat"]["cols"][1:7]
             formatters = dict(zip(float_cols,
@@ -411,15 +395,21 @@ class TaskCommands(object):
                                 sortby_index=None)
             print()
 
+            output = []
+            task_errors = []
+            iterations = self._process_iterations(result, output, task_errors)
             if iterations_data:
-                formatters = dict(zip(iterations_headers[1:],
-                                      [cliutils.pretty_float_formatter(col, 3)
-                                       for col in iterations_headers[1:]]))
-                cliutils.print_list(iterations,
-                                    fields=iterations_headers,
-                                    table_label="Atomics per iteration",
-                                    formatters=formatters)
+                self._print_iterations_data(result["info"]["atomic"],
+                                            iterations, filter_by=filter_by,
+                                            limit=limit, offset=offset)
                 print()
+            # NOTE: errors and tables of additive output are collected while
+            #   iterations are read, but statistics of workloads have no
+            #   data of them, so the rest of iterations is read (and
+            #   dropped) here even if they are not printed
+            collections.deque(iterations, maxlen=0)
+
+            self._print_task_errors(task_id, task_errors)
 
             if output:
                 cols = plot.charts.OutputStatsTable.columns
@@ -443,6 +433,11 @@ class TaskCommands(object):
                   rutils.format_float_to_str(result["info"]["load_duration"]))
             print(_("Full duration: %s") %
                   rutils.format_float_to_str(result["info"]["full_duration"]))
+            sla_check_latency = result["info"].get("sla_check_latency")
+            if sla_check_latency:
+                print(_("SLA check latency: %(avg)s (max %(max)s)") % dict(
+                    (k, rutils.format_float_to_str(v))
+                    for k, v in sla_check_latency.items()))
 
             print("\nHINTS:")
             print(_("* To plot HTML graphics with this data, run:"))
@@ -502,9 +497,16 @@ class TaskCommands(object):
                    help="Tags to filter tasks by.")
     @cliutils.args("--uuids-only", action="store_true",
                    dest="uuids_only", help="List task UUIDs only.")
+    @cliutils.args("--limit", type=int, dest="limit", required=False,
+                   help="The maximal number of tasks to list, the most "
+                        "recently created tasks are listed first.")
+    @cliutils.args("--marker", type=str, dest="marker", metavar="<uuid>",
+                   required=False,
+                   help="List tasks created before the task with this UUID, "
+                        "the last task of the previous page.")
     @envutils.with_default_deployment(cli_arg_name="deployment")
     def list(self, api, deployment=None, all_deployments=False, status=None,
-             tags=None, uuids_only=False):
+             tags=None, uuids_only=False, limit=None, marker=None):
         """List tasks, started and finished.
 
         Displayed tasks can be filtered by status or deployment.  By
@@ -516,6 +518,9 @@ class TaskCommands(object):
             Available task statuses are in rally.consts.TaskStatus
         :param all_deployments: display tasks from all deployments
         :param uuids_only: list task UUIDs only
+        :param limit: the maximal number of tasks to list, pages start
+            with the most recently created tasks
+        :param marker: UUID of the last task of the previous page
         """
 
         filters = {}
@@ -537,6 +542,15 @@ class TaskCommands(object):
         if tags:
             filters["tags"] = tags
 
+        if limit is not None:
+            if limit < 1:
+                print(_("Error: --limit should be a positive number."),
+                      file=sys.stderr)
+                return 1
+            filters["limit"] = limit
+        if marker:
+            filters["marker"] = marker
+
         task_list = api.task.list(**filters)
 
         if uuids_only:
@@ -555,6 +569,9 @@ class TaskCommands(object):
                 headers,
                 sortby_index=headers.index("created_at"),
                 formatters={"tags": tags_formatter})
+            if limit and len(task_list) == limit:
+                print(_("To list the next tasks, add '--marker %s' to the "
+                        "command.") % task_list[-1]["uuid"])
         else:
             if status:
                 print(_("There are no tasks in '%s' status. "
@@ -564,9 +581,21 @@ class TaskCommands(object):
                 print(_("There are no tasks. To run a new task, use:\n"
                         "\trally task start"))
 
+    @staticmethod
+    def _open_task_results_file(task_id):
+        """Open the file with task results for reading.
+
+        Files with ".gz" extension (like archives of tasks compacted by
+        "rally-manage db compact") are decompressed.
+        """
+        path = os.path.expanduser(task_id)
+        if path.endswith(".gz"):
+            return gzip.open(path, "rt")
+        return open(path, "r")
+
     def _load_task_results_file(self, api, task_id):
-        """Load the json file which is created by `rally task results` """
-        with open(os.path.expanduser(task_id), "r") as inp_js:
+        """Load the json file which is created by `rally task results`"""
+        with self._open_task_results_file(task_id) as inp_js:
             tasks_results = json.load(inp_js)
             for result in tasks_results:
                 try:
@@ -584,6 +613,54 @@ class TaskCommands(object):
 
         return tasks_results
 
+    def _iterate_task_results_file(self, api, task_id, inp_js):
+        """Read the json file which is created by `rally task results`
+
+        Results are yielded one by one and iterations of each result are
+        read lazily while "result" is iterated over, so the file is not
+        loaded in memory. Iterations are validated when they are read and
+        the rest of the result is validated after its iterations.
+
+        :param task_id: path to the file
+        :param inp_js: the opened file
+        """
+        schema = api.task.TASK_RESULT_SCHEMA
+        # the schema is checked once instead of checking it per iteration
+        jsonschema.Draft4Validator.check_schema(schema)
+        validator = jsonschema.Draft4Validator(
+            schema["properties"]["result"]["items"])
+
+        def iterate_iterations(result, iterations):
+            first = []
+            try:
+                for r in iterations:
+                    validator.validate(r)
+                    if not first:
+                        first.append(copy.deepcopy(r))
+                    # TODO(chenhb): back compatible for atomic_actions
+                    r["atomic_actions"] = list(
+                        tutils.WrapperForAtomicActions(
+                            r["atomic_actions"], r["timestamp"]))
+                    yield r
+                # members which follow iterations in the file are read now
+                jsonschema.validate(dict(result, result=first), schema)
+            except (ValueError, jsonschema.ValidationError) as e:
+                raise FailedToLoadResults(source=task_id,
+                                          msg=six.text_type(e))
+
+        try:
+            for result in json_stream.iterate_objects(inp_js, "result",
+                                                      first_keys=("key",)):
+                if "result" not in result:
+                    jsonschema.validate(result, schema)
+                jsonschema.validate(result.get("key"),
+                                    schema["properties"]["key"])
+                result["result"] = iterate_iterations(result,
+                                                      result["result"])
+                yield result
+        except (ValueError, jsonschema.ValidationError) as e:
+            raise FailedToLoadResults(source=task_id, msg=six.text_type(e))
+
     @cliutils.args("--out", metavar="<path>",
                    type=str, dest="out", required=False,
                    help="Path to output file.")
@@ -602,26 +679,25 @@ class TaskCommands(object):
             return 1
 
         results = []
+        tasks_uuids = []
         for task_id in tasks:
             if os.path.exists(os.path.expanduser(task_id)):
-                task_results = self._load_task_results_file(api, task_id)
+                results.extend(self._load_task_results_file(api, task_id))
             elif uuidutils.is_uuid_like(task_id):
-                task_results = map(
-                    lambda x: {"key": x["key"],
-                               "sla": x["data"]["sla"],
-                               "hooks": x["data"].get("hooks", []),
-                               "result": x["data"]["raw"],
-                               "load_duration": x["data"]["load_duration"],
-                               "full_duration": x["data"]["full_duration"]},
-                    api.task.get_detailed(task_id=task_id)["results"])
+                tasks_uuids.append(task_id)
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s")
                       % task_id, file=sys.stderr)
                 return 1
 
-            results.extend(task_results)
+        workloads = []
+        if tasks_uuids:
+            # trends need only statistics of workloads, which are stored in
+            # the database, so iterations are not loaded
+            workloads = api.task.get_workloads_statistics(
+                tasks_uuids=tasks_uuids)
 
-        result = plot.trends(results)
+        result = plot.trends(results, workloads=workloads)
 
         out = kwargs.get("out")
         if out:
@@ -634,6 +710,74 @@ class TaskCommands(object):
         else:
             print(result)
 
+    @cliutils.args("--base", dest="base_task", type=str, metavar="<uuid>",
+                   help="UUID of the task to compare with (baseline).")
+    @cliutils.args("--target", dest="target_task", type=str,
+                   metavar="<uuid>", help="UUID of the task to check.")
+    @cliutils.args("--alpha", dest="alpha", type=float, metavar="<float>",
+                   help="Significance level of the Mann-Whitney U test. "
+                        "Defaults to 0.05.")
+    @cliutils.args("--json", dest="tojson", action="store_true",
+                   help="Output in JSON format.")
+    @cliutils.suppress_warnings
+    def compare(self, api, base_task=None, target_task=None, alpha=0.05,
+                tojson=False):
+        """Compare results of two tasks and detect regressions.
+
+        Workloads are matched by their configuration. For each workload and
+        atomic action the median and 95%ile deltas are reported together
+        with a p-value of the Mann-Whitney U test.
+
+        Tasks can be passed as positional arguments as well:
+        rally task compare <base-uuid> <target-uuid>
+
+        :param base_task: UUID of the baseline task
+        :param target_task: UUID of the task to check
+        :param alpha: significance level of the test
+        :param tojson: print results in JSON format
+        :returns: 1 if statistically significant regressions are found,
+                  0 otherwise
+        """
+        if not base_task or not target_task:
+            print(_("ERROR: Two tasks must be specified"), file=sys.stderr)
+            return 1
+
+        if not 0 < alpha < 1:
+            print(_("ERROR: Significance level should be in (0, 1) "
+                    "range."), file=sys.stderr)
+            return 1
+
+        results = [api.task.get_detailed(task_id=task_id,
+                                         extended_results=True,
+                                         lazy_iterations=True)["results"]
+                   for task_id in (base_task, target_task)]
+        comparison = compare.compare(results[0], results[1], alpha=alpha)
+        regressions = len([r for r in comparison["rows"]
+                           if r["status"] == compare.REGRESSION])
+
+        if tojson:
+            print(json.dumps(comparison, sort_keys=True, indent=4))
+            return 1 if regressions else 0
+
+        headers = ["workload", "pos", "action", "median_a", "median_b",
+                   "median_delta", "95%ile_a", "95%ile_b", "95%ile_delta",
+                   "p_value", "status"]
+        float_cols = headers[3:10]
+        formatters = dict(zip(float_cols,
+                              [cliutils.pretty_float_formatter(col, 3)
+                               for col in float_cols]))
+        cliutils.print_list(comparison["rows"], fields=headers,
+                            formatters=formatters,
+                            table_label="Comparison of task %s with task %s"
+                                        % (target_task, base_task),
+                            sortby_index=None)
+        if comparison["unmatched"]:
+            print(_("Workloads without a pair in other task: %s")
+                  % ", ".join(comparison["unmatched"]))
+        print(_("Statistically significant regressions found: %d")
+              % regressions)
+        return 1 if regressions else 0
+
     @cliutils.deprecated_args("--tasks", dest="task_id", nargs="+",
                               release="0.10.0", alternative="--uuid")
     @cliutils.args("--out", metavar="<path>",
@@ -654,30 +798,95 @@ class TaskCommands(object):
                                            "--type junit-xml"))
     @cliutils.args("--uuid", dest="task_id", nargs="+", type=str,
                    help="UUIDs of tasks")
+    @cliutils.args("--zipper", dest="zipper", type=str,
+                   choices=putils.ZIPPERS, required=False,
+                   help="The way of reducing the number of points on HTML "
+                        "report charts: 'avg' (default) averages neighbour "
+                        "points, 'minmax' keeps minimal and maximal values.")
+    @cliutils.args("--processes", dest="processes", type=int,
+                   required=False,
+                   help="The number of processes to build charts of "
+                        "workloads of HTML report in. It trades memory for "
+                        "speed: iterations of up to two workloads per "
+                        "process are loaded into memory at once, while "
+                        "without it workloads are read chunk by chunk.")
+    @cliutils.args("--uncompressed", dest="uncompressed",
+                   action="store_true", required=False,
+                   help="Embed the data of HTML report as plain JSON, for "
+                        "browsers which can not inflate compressed data.")
+    @cliutils.args("--serve", dest="serve", action="store_true",
+                   required=False,
+                   help="Serve HTML report over HTTP on localhost instead of "
+                        "writing it. Data of a workload is loaded only when "
+                        "the workload is opened in the report.")
+    @cliutils.args("--port", dest="port", type=int, default=8000,
+                   required=False,
+                   help="The port to serve HTML report on (default: 8000).")
     @envutils.with_default_task_id
     @cliutils.suppress_warnings
     def report(self, api, task_id=None, out=None,
-               open_it=False, out_format="html"):
+               open_it=False, out_format="html", zipper=None,
+               processes=None, uncompressed=False, serve=False, port=8000):
         """generate report file or string for specified task."""
 
+        if serve:
+            if [task for task in task_id if not uuidutils.is_uuid_like(task)]:
+                print(_("ERROR: Only UUIDs of tasks can be served, not "
+                        "files with results."), file=sys.stderr)
+                return 1
+            return self._serve_report(api, task_id, port=port, zipper=zipper,
+                                      open_it=open_it)
         if [task for task in task_id if os.path.exists(
                 os.path.expanduser(task))]:
             self._old_report(api, tasks=task_id, out=out,
-                             open_it=open_it, out_format=out_format)
+                             open_it=open_it, out_format=out_format,
+                             zipper=zipper, compress=not uncompressed)
         else:
+            options = {}
+            if zipper:
+                options["zipper"] = zipper
+            if processes:
+                options["processes"] = processes
+            if uncompressed:
+                options["compress"] = False
             self.export(api, task_id=task_id,
                         output_type=out_format,
                         output_dest=out,
-                        open_it=open_it)
+                        open_it=open_it,
+                        options=options or None)
+
+    def _serve_report(self, api, tasks, port=8000, zipper=None,
+                      open_it=False):
+        """Serve HTML report of tasks until the process is interrupted.
+
+        :param tasks: list, UUIDs of tasks
+        :param port: int, port to serve the report on
+        :param zipper: name of graph zipper for HTML report charts
+        :param open_it: bool, whether to open the report in web browser
+        """
+        server = plot.ReportServer(api, tasks, zipper=zipper)
+        httpd = server.make_http_server(port=port)
+        url = "http://%s:%d/" % httpd.server_address[:2]
+        print(_("Serving the report on %s, press Ctrl+C to stop.") % url)
+        if open_it:
+            webbrowser.open_new_tab(url)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
 
     def _old_report(self, api, tasks=None, out=None, open_it=False,
-                    out_format="html"):
+                    out_format="html", zipper=None, compress=True):
         """Generate report file for specified task.
 
         :param tasks: list, UUIDs of tasks or pathes files with tasks results
         :param out: str, output file name
         :param open_it: bool, whether to open output file in web browser
         :param out_format: output format (junit, html or html_static)
+        :param zipper: name of graph zipper for HTML report charts
+        :param compress: whether to compress the data of HTML report
         """
 
         tasks = isinstance(tasks, list) and tasks or [tasks]
@@ -697,7 +906,8 @@ class TaskCommands(object):
                                "result": x["data"]["raw"],
                                "load_duration": x["data"]["load_duration"],
                                "full_duration": x["data"]["full_duration"],
-                               "created_at": x["created_at"]},
+                               "created_at": x["created_at"],
+                               "statistics": x["data"].get("statistics")},
                     api.task.get_detailed(
                         task_id=task_file_or_uuid)["results"])
             else:
@@ -717,7 +927,8 @@ class TaskCommands(object):
 
         if out_format.startswith("html"):
             result = plot.plot(results,
-                               include_libs=(out_format == "html_static"))
+                               include_libs=(out_format == "html_static"),
+                               zipper=zipper, compress=compress)
         elif out_format == "junit-xml":
             test_suite = junit.JUnit("Rally test suite")
             for result in results:
@@ -749,13 +960,48 @@ class TaskCommands(object):
     @cliutils.args("--uuid", type=str, dest="task_id", nargs="*",
                    metavar="<task-id>",
                    help="UUID of task or a list of task UUIDs.")
-    @envutils.with_default_task_id
-    def delete(self, api, task_id=None, force=False):
+    @cliutils.args("--older-than", dest="older_than",
+                   type=cliutils.parse_period,
+                   help="Delete all tasks created earlier than this period "
+                        "ago instead of the given ones, e.g. 30d. Units are "
+                        "s, m, h, d (the default one) and w. Unfinished "
+                        "tasks are skipped unless --force is used, running "
+                        "and aborting ones are skipped always.")
+    def delete(self, api, task_id=None, force=False, older_than=None):
         """Delete task and its results.
 
         :param task_id: Task uuid or a list of task uuids
         :param force: Force delete or not
+        :param older_than: Delete tasks created earlier than this period ago
         """
+        if older_than is not None:
+            if task_id:
+                print("Arguments '--uuid' and '--older-than' cannot be "
+                      "used together.", file=sys.stderr)
+                return 1
+            finished = (consts.TaskStatus.FINISHED,
+                        consts.TaskStatus.ABORTED,
+                        consts.TaskStatus.CRASHED,
+                        consts.TaskStatus.DELETING)
+            # tasks which are in progress are not deleted even by force
+            active = (consts.TaskStatus.VALIDATING,
+                      consts.TaskStatus.RUNNING,
+                      consts.TaskStatus.ABORTING,
+                      consts.TaskStatus.SOFT_ABORTING)
+            task_id = [
+                task["uuid"] for task in api.task.list(
+                    created_before=dt.datetime.utcnow() - older_than)
+                if task["status"] in finished or (
+                    force and task["status"] not in active)]
+            if not task_id:
+                print("There are no tasks to delete.")
+                return
+        elif task_id is None:
+            task_id = envutils.get_global(envutils.ENV_TASK)
+            if not task_id:
+                print(envutils.MSG_MISSING_ARG % {"arg_name": "uuid"})
+                return 1
+
         def _delete_single_task(tid, force):
             try:
                 api.task.delete(task_uuid=tid, force=force)
@@ -832,7 +1078,8 @@ class TaskCommands(object):
     @cliutils.args("--type", dest="output_type", type=str,
                    required=True,
                    help="Report type (Defaults to HTML). Out-of-the-box "
-                        "types: HTML, HTML-Static, JUnit-XML. "
+                        "types: HTML, HTML-Static, JUnit-XML, CSV, NDJSON, "
+                        "InfluxDB-Line, OpenMetrics. "
                         "HINT: You can list all types, executing `rally "
                         "plugin list --plugin-base TaskExporter` "
                         "command.")
@@ -846,29 +1093,111 @@ class TaskCommands(object):
     @envutils.with_default_task_id
     @plugins.ensure_plugins_are_loaded
     def export(self, api, task_id=None, output_type=None, output_dest=None,
-               open_it=False):
+               open_it=False, options=None):
         """Export task results to the custom task's exporting system.
 
         :param task_id: UUID of the task
         :param output_type: str, output type
         :param output_dest: output format (html, html-static, junit-xml,etc)
+        :param options: dict with options specific for the output type
         """
         task_id = isinstance(task_id, list) and task_id or [task_id]
+        # NOTE: reports are streamed to the output destination by a local
+        #   Rally only, a remote one returns files to write them here
         report = api.task.export(tasks_uuids=task_id,
                                  output_type=output_type,
-                                 output_dest=output_dest)
+                                 output_dest=output_dest,
+                                 options=options,
+                                 stream=not api.endpoint_url)
         if "files" in report:
             for path in report["files"]:
                 output_file = os.path.expanduser(path)
                 with open(output_file, "w+") as f:
                     f.write(report["files"][path])
-                if open_it:
-                    if "open" in report:
-                        webbrowser.open_new_tab(report["open"])
+        if open_it and "open" in report:
+            webbrowser.open_new_tab(report["open"])
 
         if "print" in report:
             print(report["print"])
 
+    @staticmethod
+    def _process_iterations(result, output, task_errors):
+        """Yield numbered iterations collecting their errors and output.
+
+        :param result: extended workload result
+        :param output: list to append OutputStatsTable of additive output
+                       to
+        :param task_errors: list to append formatted errors to
+        :returns: generator of (number, iteration) pairs
+        """
+        for idx, itr in enumerate(result["iterations"], 1):
+            if "output" in itr:
+                iteration_output = itr["output"]
+            else:
+                iteration_output = {"additive": [], "complete": []}
+
+                # NOTE(amaretskiy): "scenario_output" is supported
+                #   for backward compatibility
+                if ("scenario_output" in itr
+                        and itr["scenario_output"]["data"]):
+                    iteration_output["additive"].append(
+                        {"data": itr["scenario_output"]["data"].items(),
+                         "title": "Scenario output",
+                         "description": "",
+                         "chart_plugin": "StackedArea"})
+
+            for i, additive in enumerate(iteration_output["additive"]):
+                if len(output) <= i + 1:
+                    output_table = plot.charts.OutputStatsTable(
+                        result["info"], title=additive["title"])
+                    output.append(output_table)
+                output[i].add_iteration(additive["data"])
+
+            if itr.get("error"):
+                task_errors.append(TaskCommands._format_task_error(itr))
+
+            yield idx, itr
+
+    @staticmethod
+    def _print_iterations_data(atomic, iterations, filter_by=None,
+                               limit=None, offset=0):
+        """Print a table with results for iterations as they are read.
+
+        :param atomic: atomic actions data of the workload
+        :param iterations: iterable of (number, iteration) pairs, it is
+                           consumed only up to the last printed iteration
+        :param filter_by: "errors-only" to print only failed iterations
+        :param limit: the maximal number of iterations to print
+        :param offset: the number of iterations to skip
+        """
+        atomic_merger = putils.AtomicMerger(atomic)
+        headers = ["iteration", "duration"]
+        actions = []
+        for i, atomic_name in enumerate(atomic_merger.get_merged_names(), 1):
+            action = "%i. %s" % (i, atomic_name)
+            headers.append(action)
+            actions.append((atomic_name, action))
+
+        def _iterate_rows():
+            for idx, itr in iterations:
+                if filter_by == "errors-only" and not itr.get("error"):
+                    continue
+                atomic_actions = atomic_merger.merge_atomic_actions(
+                    itr["atomic_actions"])
+                row = {"iteration": idx, "duration": itr["duration"]}
+                for name, action in actions:
+                    row[action] = atomic_actions.get(name, 0)
+                yield row
+
+        rows = itertools.islice(_iterate_rows(), offset,
+                                None if limit is None else offset + limit)
+        formatters = dict(zip(headers[1:],
+                              [cliutils.pretty_float_formatter(col, 3)
+                               for col in headers[1:]]))
+        cliutils.print_list_stream(rows, fields=headers,
+                                   table_label="Atomics per iteration",
+                                   formatters=formatters, out=sys.stdout)
+
     @staticmethod
     def _print_task_errors(task_id, task_errors):
         print(cliutils.make_header("Task %s has %d error(s)" %
@@ -911,10 +1240,18 @@ class TaskCommands(object):
         """
 
         if os.path.exists(os.path.expanduser(task_file)):
-            tasks_results = self._load_task_results_file(api, task_file)
-            task = api.task.import_results(deployment=deployment,
-                                           task_results=tasks_results,
-                                           tags=tags)
+            # results are read while they are imported
+            with self._open_task_results_file(task_file) as inp_js:
+                tasks_results = self._iterate_task_results_file(
+                    api, task_file, inp_js)
+                if api.endpoint_url:
+                    # NOTE: results are sent to a remote Rally in a JSON
+                    #   request, so they are read into memory in advance
+                    tasks_results = [dict(r, result=list(r["result"]))
+                                     for r in tasks_results]
+                task = api.task.import_results(deployment=deployment,
+                                               task_results=tasks_results,
+                                               tags=tags)
             print(_("Task UUID: %s.") % task["uuid"])
         else:
             print(_("ERROR: Invalid file name passed: %s") % task_file,
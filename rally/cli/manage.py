@@ -18,11 +18,14 @@
 from __future__ import print_function
 
 import contextlib
+import datetime as dt
+import os
 import sys
 
 from rally.cli import cliutils
 from rally.cli import envutils
 from rally.common import db
+from rally import consts
 
 
 @contextlib.contextmanager
@@ -66,6 +69,86 @@ class DBCommands(object):
         """Print current Rally database revision UUID."""
         print(db.schema_revision())
 
+    @cliutils.args("--batch-size", type=int, dest="batch_size", default=100,
+                   help="The number of chunks of task results converted "
+                        "by a transaction (default: 100).")
+    def migrate_data(self, api, batch_size=100):
+        """Convert task results stored in old formats.
+
+        Results are converted by batches, each batch is committed
+        separately, so the command can be interrupted and run again to
+        continue. Results which are not converted yet are converted
+        while reading them, which slows down reports of old tasks.
+        """
+        if batch_size < 1:
+            print("--batch-size should be a positive number.",
+                  file=sys.stderr)
+            return 1
+        print("Migrate-data started.")
+        try:
+            for converted, total in db.workload_data_migrate(
+                    batch_size=batch_size):
+                print("Converted %d of %d chunks of task results."
+                      % (converted, total))
+        except KeyboardInterrupt:
+            print("Migrate-data interrupted, run it again to continue.",
+                  file=sys.stderr)
+            return 1
+        print("Migrate-data processed.")
+
+    @cliutils.args("--older-than", dest="older_than", required=True,
+                   type=cliutils.parse_period,
+                   help="Compact tasks created earlier than this period "
+                        "ago, e.g. 30d. Units are s, m, h, d (the default "
+                        "one) and w.")
+    @cliutils.args("--sample-size", type=int, dest="sample_size",
+                   default=1000,
+                   help="The number of successful iterations kept per "
+                        "workload (default: 1000). Failed iterations are "
+                        "always kept.")
+    @cliutils.args("--archive-dir", type=str, dest="archive_dir",
+                   help="Directory to write all iterations of compacted "
+                        "tasks to, a file per task which can be loaded by "
+                        "\"rally task import\".")
+    def compact(self, api, older_than, sample_size=1000, archive_dir=None):
+        """Downsample stored iterations of old tasks.
+
+        Statistics and reports of workloads are stored before iterations
+        are downsampled, so reports and trends of compacted tasks are made
+        of all the iterations. Each workload is compacted by its own
+        transaction and compacted workloads are skipped, so the command
+        can be interrupted and run again to continue.
+        """
+        if sample_size < 0:
+            print("--sample-size should not be a negative number.",
+                  file=sys.stderr)
+            return 1
+        if archive_dir and not os.path.isdir(os.path.expanduser(archive_dir)):
+            print("Directory %s does not exist." % archive_dir,
+                  file=sys.stderr)
+            return 1
+
+        print("Compact started.")
+        finished = (consts.TaskStatus.FINISHED, consts.TaskStatus.ABORTED,
+                    consts.TaskStatus.CRASHED)
+        tasks = api.task.list(created_before=dt.datetime.utcnow() - older_than)
+        try:
+            for task in tasks:
+                if task["status"] not in finished:
+                    continue
+                compacted = api.task.compact(task_id=task["uuid"],
+                                             sample_size=sample_size,
+                                             archive_dir=archive_dir)
+                if compacted["workloads"]:
+                    print("Task %s: %d iterations of %d workloads are "
+                          "deleted." % (task["uuid"], compacted["deleted"],
+                                        compacted["workloads"]))
+        except KeyboardInterrupt:
+            print("Compact interrupted, run it again to continue.",
+                  file=sys.stderr)
+            return 1
+        print("Compact processed.")
+
 
 def main():
     categories = {"db": DBCommands}
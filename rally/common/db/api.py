@@ -55,6 +55,17 @@ CONF = cfg.CONF
 
 db_options.set_defaults(CONF, connection="sqlite:////tmp/rally.sqlite")
 
+DB_OPTS = [
+    cfg.BoolOpt("sqlite_wal", default=True,
+                help="Use write-ahead logging journal of SQLite database, "
+                     "so reading the database does not block writing to "
+                     "it. Synchronous mode of SQLite is NORMAL then."),
+    cfg.IntOpt("sqlite_busy_timeout", default=30000, min=0,
+               help="Time in milliseconds to wait for locks of SQLite "
+                    "database held by other processes."),
+]
+CONF.register_opts(DB_OPTS, group="database")
+
 
 IMPL = None
 
@@ -197,33 +208,53 @@ def task_update_status(task_uuid, status, allowed_statuses):
                                          status)
 
 
-def task_list(status=None, deployment=None, tags=None):
+def task_list(status=None, deployment=None, tags=None, limit=None,
+              marker=None, created_before=None):
     """Get a list of tasks.
 
+    Tasks are ordered from the most recently created one, so pages start
+    with the newest tasks.
+
     :param status: Task status to filter the returned list on. If set to
                    None, all the tasks will be returned.
     :param deployment: Deployment UUID to filter the returned list on.
                       If set to None, tasks from all deployments will be
                       returned.
     :param tags: A list of tags to filter tasks by.
+    :param limit: The maximal number of tasks to return.
+    :param marker: UUID of the last task of the previous page, only
+                   tasks created before it are returned.
+    :param created_before: datetime, return only tasks created before it.
+    :raises TaskNotFound: if the marker task does not exist.
     :returns: A list of dicts with data on the tasks.
     """
     return get_impl().task_list(status=status,
                                 deployment=deployment,
-                                tags=tags)
+                                tags=tags,
+                                limit=limit,
+                                marker=marker,
+                                created_before=created_before)
 
 
 def task_delete(uuid, status=None):
     """Delete a task.
 
     This method removes the task by the uuid, but if the status
-    argument is specified, then the task is removed only when these
-    statuses are equal otherwise an exception is raised.
+    argument is specified, then the task is removed only when it is in
+    this status (or in one of them if it is a list of statuses),
+    otherwise an exception is raised.
+
+    The status is checked and the task is switched to "deleting" status
+    atomically first. Then results of workloads are deleted by small
+    batches in separate transactions, so writers are not blocked for long,
+    and the task itself is deleted last. A task in "deleting" status can
+    be deleted again to continue an interrupted deletion.
 
     :param uuid: UUID of the task.
+    :param status: status or list of statuses the task should be in.
     :raises TaskNotFound: if the task does not exist.
     :raises TaskInvalidStatus: if the status of the task does not
-                               equal to the status argument.
+                               match the status argument.
     """
     return get_impl().task_delete(uuid, status=status)
 
@@ -237,6 +268,30 @@ def task_result_get_all_by_uuid(task_uuid):
     return get_impl().task_result_get_all_by_uuid(task_uuid)
 
 
+def task_result_iterate_by_uuid(task_uuid):
+    """Iterate over task results one workload at a time.
+
+    Iterations of each result ("data"/"raw") are not loaded in advance,
+    they are read from the database chunk by chunk on every pass over them.
+
+    :param task_uuid: string with UUID of Task instance.
+    :returns: generator of task results.
+    """
+    return get_impl().task_result_iterate_by_uuid(task_uuid)
+
+
+def task_result_iterate_by_uuids(task_uuids):
+    """Iterate over results of several tasks one workload at a time.
+
+    Workloads of all the tasks are fetched with one query, iterations of
+    results are loaded lazily as in task_result_iterate_by_uuid.
+
+    :param task_uuids: list of strings with UUIDs of Task instances.
+    :returns: generator of task results.
+    """
+    return get_impl().task_result_iterate_by_uuids(task_uuids)
+
+
 def subtask_create(task_uuid, title, description=None, context=None):
     """Create a subtask.
 
@@ -283,16 +338,119 @@ def workload_data_create(task_uuid, workload_uuid, chunk_order, data):
                                            chunk_order, data)
 
 
+def workload_data_bulk_create(task_uuid, workload_uuid, chunks):
+    """Create several workload data chunks by a single transaction.
+
+    Rows are inserted by one executemany statement without creating ORM
+    objects, so it is much cheaper than workload_data_create per chunk.
+
+    :param task_uuid: string with UUID of Task instance.
+    :param workload_uuid: string with UUID of Workload instance.
+    :param chunks: list of dicts with "chunk_order" and "raw" iterations
+                   of chunks. Aggregated data of iterations can be passed
+                   as "iteration_count", "failed_iteration_count",
+                   "started_at" and "finished_at" (timestamps) keys,
+                   otherwise it is calculated.
+    :returns: the number of created chunks.
+    """
+    return get_impl().workload_data_bulk_create(task_uuid, workload_uuid,
+                                                chunks)
+
+
+def workload_data_iterate(workload_uuid):
+    """Get iterations of a workload.
+
+    Iterations are read from the database chunk by chunk on every pass
+    over the returned object.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :returns: iterable object with iterations data.
+    """
+    return get_impl().workload_data_iterate(workload_uuid)
+
+
+def workload_data_migrate(batch_size=100):
+    """Convert data chunks of workloads stored in old formats.
+
+    Chunks are converted by batches and each batch is committed by its
+    own transaction, so the conversion can be interrupted between batches
+    and continued by the next call.
+
+    :param batch_size: the number of chunks converted by a transaction.
+    :returns: generator of numbers of converted chunks and of all chunks to
+              convert, which is yielded after each batch.
+    """
+    return get_impl().workload_data_migrate(batch_size=batch_size)
+
+
+def workload_data_compact(workload_uuid, chunks):
+    """Replace stored iterations of a workload with the given ones.
+
+    All data chunks of the workload are deleted and the given chunks are
+    stored instead by the same transaction. Results of the workload and
+    its statistics are left as is.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :param chunks: list of lists of iterations to store as data chunks.
+    :raises NotFoundException: if the workload does not exist.
+    :returns: the number of deleted chunks.
+    """
+    return get_impl().workload_data_compact(workload_uuid, chunks)
+
+
 def workload_set_results(workload_uuid, data):
     """Set workload results.
 
+    Numbers of iterations are summed up from the counts stored with
+    workload data chunks, iterations themselves are not loaded.
+
     :param workload_uuid: string with UUID of Workload instance.
-    :param data: dict with workload results.
+    :param data: dict with workload results, min and max durations of
+                 iterations are taken from its "statistics".
     :returns: a dict with data on the workload.
     """
     return get_impl().workload_set_results(workload_uuid, data)
 
 
+def workload_set_statistics(workload_uuid, statistics):
+    """Set statistics of workload iterations.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :param statistics: dict with statistics of workload iterations.
+    :returns: whether the workload is found.
+    """
+    return get_impl().workload_set_statistics(workload_uuid, statistics)
+
+
+def workload_report_get(workload_uuid, format_version, options=""):
+    """Get the stored report of a workload.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :param format_version: int version of the report format.
+    :param options: string with options the report was built with.
+    :returns: a dict with the report or None if it is not stored.
+    """
+    return get_impl().workload_report_get(workload_uuid, format_version,
+                                          options)
+
+
+def workload_report_set(workload_uuid, format_version, report, options=""):
+    """Store the report of a workload.
+
+    The report is stored only if results of the workload are set, since
+    it can change until then. Reports of other format versions are removed.
+    Stored reports are removed when results of the workload are set again.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :param format_version: int version of the report format.
+    :param report: dict with the report.
+    :param options: string with options the report was built with.
+    :returns: whether the report is stored.
+    """
+    return get_impl().workload_report_set(workload_uuid, format_version,
+                                          report, options)
+
+
 def deployment_create(values):
     """Create a deployment from the values dictionary.
 
@@ -494,6 +652,33 @@ def verification_update(uuid, **properties):
     return get_impl().verification_update(uuid, properties)
 
 
+def verification_results_create(verification_uuid, tests):
+    """Store results of tests of a verification.
+
+    :param verification_uuid: verification UUID
+    :param tests: a dict with results of tests by their IDs, as returned
+                  by a verifier manager
+    :returns: the number of stored results
+    """
+    return get_impl().verification_results_create(verification_uuid, tests)
+
+
+def verification_results_get(verification_uuids=None, test_id=None,
+                             status=None):
+    """Get results of tests of verifications.
+
+    :param verification_uuids: a list of verifications UUIDs to get results
+                               of, or None to get results of all
+                               verifications
+    :param test_id: test ID to filter results by
+    :param status: status to filter results by
+    :returns: a dict with dicts of results of tests by their IDs by UUIDs of
+              verifications
+    """
+    return get_impl().verification_results_get(verification_uuids, test_id,
+                                               status)
+
+
 def register_worker(values):
     """Register a new worker service at the specified hostname.
 
@@ -16,10 +16,13 @@
 SQLAlchemy implementation for DB.API
 """
 
+import collections
 import copy
 import datetime as dt
+import heapq
 import json
 import os
+import threading
 import time
 
 import alembic
@@ -30,6 +33,8 @@ from oslo_config import cfg
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import session as db_session
 from oslo_utils import timeutils
+import six
+import sqlalchemy as sa
 from sqlalchemy import or_
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm import load_only as sa_loadonly
@@ -47,16 +52,122 @@ _FACADE = None
 
 INITIAL_REVISION_UUID = "ca3626f62937"
 
+# The maximal number of values in "IN" clauses of queries. SQLite limits
+# the number of parameters of a statement to 999 by default.
+IN_CLAUSE_LIMIT = 500
+
+# The number of results of tests inserted by one executemany statement
+VERIFICATION_RESULTS_BATCH = 1000
+
 
 def _create_facade_lazily():
     global _FACADE
 
     if _FACADE is None:
         _FACADE = db_session.EngineFacade.from_config(CONF)
+        _init_sqlite_engine(_FACADE.get_engine())
 
     return _FACADE
 
 
+def _init_sqlite_engine(engine):
+    """Prepare the engine of SQLite database file for concurrent use.
+
+    Readers do not block the writer and the writer does not block readers
+    with write-ahead logging journal. Transactions of the process are
+    serialized by a lock, so threads writing results of workloads do not
+    fail with "database is locked" errors, while reading without a
+    transaction does not take the lock at all. Locks of other processes
+    are waited for up to the busy timeout.
+    """
+    if engine.dialect.name != "sqlite" or engine.url.database in (
+            None, "", ":memory:"):
+        return
+
+    writer_lock = threading.RLock()
+
+    @sa.event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA busy_timeout = %d"
+                       % CONF.database.sqlite_busy_timeout)
+        if CONF.database.sqlite_wal:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            if CONF.database.sqlite_synchronous:
+                # NORMAL is durable enough with WAL and far faster than
+                # the default FULL mode.
+                cursor.execute("PRAGMA synchronous = NORMAL")
+        else:
+            # the journal mode is stored in the database file
+            cursor.execute("PRAGMA journal_mode = DELETE")
+        cursor.close()
+
+    @sa.event.listens_for(engine, "begin")
+    def _begin(conn):
+        writer_lock.acquire()
+        conn.info["rally_writer_lock"] = (
+            conn.info.get("rally_writer_lock", 0) + 1)
+
+    # NOTE: "commit" and "rollback" events are emitted before the database
+    #   ends the transaction, so the lock is held until the connection is
+    #   returned to the pool. Otherwise a transaction of another thread may
+    #   read a snapshot which is outdated by the ending one and fail to
+    #   write.
+    @sa.event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, connection_record):
+        for i in range(connection_record.info.pop("rally_writer_lock", 0)):
+            writer_lock.release()
+
+
+def _split(values, size=IN_CLAUSE_LIMIT):
+    """Split the list of values into lists of the given size."""
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _is_old_chunk(workload_data):
+    """Check whether the chunk may have atomic actions in the old format."""
+    if (workload_data.format_version or 0) >= (
+            models.WORKLOAD_DATA_FORMAT_VERSION):
+        return False
+    raw = workload_data.chunk_data["raw"]
+    return bool(raw) and isinstance(raw[0].get("atomic_actions"), dict)
+
+
+def _convert_old_atomic_actions(raw):
+    """Convert atomic actions of iterations from the old dict format."""
+    for itr in raw:
+        new_atomic_actions = []
+        started_at = itr["timestamp"]
+        for name, d in itr["atomic_actions"].items():
+            finished_at = started_at + d
+            new_atomic_actions.append(
+                {"name": name, "children": [],
+                 "started_at": started_at,
+                 "finished_at": finished_at})
+            started_at = finished_at
+        itr["atomic_actions"] = new_atomic_actions
+
+
+class WorkloadRawData(object):
+    """Iterations of a workload which are loaded from DB on demand.
+
+    Each pass over the object reads the workload data chunk by chunk and
+    yields iterations ordered by timestamp, so only chunks with
+    overlapping iterations are kept in memory at a time.
+    """
+
+    # Iterations are yielded in the order of their timestamps
+    ordered = True
+
+    def __init__(self, connection, workload_uuid):
+        self._connection = connection
+        self.workload_uuid = workload_uuid
+
+    def __iter__(self):
+        return self._connection._task_workload_data_iterate(
+            self.workload_uuid)
+
+
 def get_engine():
     facade = _create_facade_lazily()
     return facade.get_engine()
@@ -187,6 +298,19 @@ class Connection(object):
 
         return list(set(t.tag for t in tags))
 
+    def _tags_get_by_uuids(self, uuids, tag_type):
+        """Get tags of objects by a query per IN_CLAUSE_LIMIT objects.
+
+        :returns: dict with sorted lists of tags by UUIDs of objects
+        """
+        tags = dict((uuid, set()) for uuid in uuids)
+        for uuids_part in _split(list(tags)):
+            for tag in (self.model_query(models.Tag).
+                        filter(models.Tag.type == tag_type,
+                               models.Tag.uuid.in_(uuids_part))):
+                tags[tag.uuid].add(tag.tag)
+        return dict((uuid, sorted(t)) for uuid, t in tags.items())
+
     def _uuids_by_tags_get(self, tag_type, tags):
         tags = (self.model_query(models.Tag).
                 filter(models.Tag.type == tag_type,
@@ -204,8 +328,9 @@ class Connection(object):
             raise exceptions.TaskNotFound(uuid=uuid)
         return task
 
-    def _make_old_task(self, task):
-        tags = sorted(self._tags_get(task.uuid, consts.TagType.TASK))
+    def _make_old_task(self, task, tags=None):
+        if tags is None:
+            tags = sorted(self._tags_get(task.uuid, consts.TagType.TASK))
 
         return {
             "id": task.id,
@@ -218,12 +343,15 @@ class Connection(object):
             "verification_log": json.dumps(task.validation_result)
         }
 
-    def _make_old_task_result(self, workload, workload_data_list):
-        raw_data = [data
-                    for workload_data in workload_data_list
-                    for data in workload_data.chunk_data["raw"]]
+    def _make_old_task_result(self, workload, workload_data_list=None,
+                              raw_data=None):
+        if raw_data is None:
+            raw_data = [data
+                        for workload_data in workload_data_list
+                        for data in workload_data.chunk_data["raw"]]
         return {
             "id": workload.id,
+            "uuid": workload.uuid,
             "task_uuid": workload.task_uuid,
             "created_at": workload.created_at,
             "updated_at": workload.updated_at,
@@ -244,39 +372,110 @@ class Connection(object):
                 "load_duration": workload.load_duration,
                 "full_duration": workload.full_duration,
                 "sla": workload.sla_results.get("sla", []),
-                "hooks": workload.hooks
+                "hooks": workload.hooks,
+                "statistics": workload.statistics
             }
         }
 
     def _task_workload_data_get_all(self, workload_uuid):
+        return self._workloads_data_get_all([workload_uuid])[workload_uuid]
+
+    def _workloads_data_get_all(self, workload_uuids):
+        """Get data chunks of workloads by a query per IN_CLAUSE_LIMIT ones.
+
+        :returns: dict with lists of chunks ordered by chunk_order by UUIDs
+                  of workloads
+        """
+        chunks = dict((uuid, []) for uuid in workload_uuids)
         session = get_session()
         with session.begin():
-            results = (self.model_query(models.WorkloadData, session=session).
-                       filter_by(workload_uuid=workload_uuid).
-                       order_by(models.WorkloadData.chunk_order.asc()))
-            if results.first() and results[0].chunk_data["raw"] and isinstance(
-                    results[0].chunk_data["raw"][0]["atomic_actions"], dict):
-                # NOTE(andreykurilin): It is an old format of atomic actions.
-                #   We do not have migration yet, since it can take too much
-                #   time on the big databases. Let's lazy-migrate results which
-                #   user greps and force a migration after several releases.
-
+            for uuids_part in _split(list(chunks)):
+                for workload_data in (
+                        self.model_query(models.WorkloadData,
+                                         session=session).
+                        filter(models.WorkloadData.workload_uuid.in_(
+                            uuids_part)).
+                        order_by(models.WorkloadData.workload_uuid,
+                                 models.WorkloadData.chunk_order.asc())):
+                    chunks[workload_data.workload_uuid].append(workload_data)
+
+            for results in chunks.values():
                 for workload_data in results:
-                    chunk_data = copy.deepcopy(workload_data.chunk_data)
-                    for chunk in chunk_data["raw"]:
-                        new_atomic_actions = []
-                        started_at = chunk["timestamp"]
-                        for name, d in chunk["atomic_actions"].items():
-                            finished_at = started_at + d
-                            new_atomic_actions.append(
-                                {"name": name, "children": [],
-                                 "started_at": started_at,
-                                 "finished_at": finished_at})
-                            started_at = finished_at
-                        chunk["atomic_actions"] = new_atomic_actions
-                    workload_data.update({"chunk_data": chunk_data})
-
-        return results
+                    # NOTE(andreykurilin): It is an old format of atomic
+                    #   actions. Chunks which are not converted by
+                    #   "rally-manage db migrate-data" yet are converted
+                    #   once the user greps them.
+                    if _is_old_chunk(workload_data):
+                        self._workload_data_convert(workload_data)
+
+        return chunks
+
+    def _workload_data_convert(self, workload_data):
+        """Convert the chunk to the current format."""
+        if _is_old_chunk(workload_data):
+            chunk_data = copy.deepcopy(workload_data.chunk_data)
+            _convert_old_atomic_actions(chunk_data["raw"])
+            workload_data.update({"chunk_data": chunk_data})
+        workload_data.update(
+            {"format_version": models.WORKLOAD_DATA_FORMAT_VERSION})
+
+    def _task_workload_data_iterate(self, workload_uuid):
+        """Yield iterations of the workload ordered by timestamp.
+
+        Iterations of a chunk are sorted once the chunk is loaded and the
+        loaded chunks are merged. Chunks are ordered by the timestamp of
+        their first iteration and a chunk is loaded only when iterations
+        up to that timestamp are yielded. Chunks stored without the
+        timestamp are loaded first.
+        """
+        chunks = []
+        for row in (self.model_query(models.WorkloadData).
+                    with_entities(models.WorkloadData.id,
+                                  models.WorkloadData.chunk_order,
+                                  models.WorkloadData.tstamp_start).
+                    filter_by(workload_uuid=workload_uuid)):
+            # NOTE: started_at column is not used here, since it is stored
+            #   in the local time of the writer
+            if row.tstamp_start is None:
+                started_at = float("-inf")
+            else:
+                started_at = row.tstamp_start
+            chunks.append((started_at, row.chunk_order, row.id))
+        chunks = collections.deque(sorted(chunks))
+
+        heap = []
+        while chunks or heap:
+            if chunks and (not heap or chunks[0][0] <= heap[0][0]):
+                started_at, chunk_order, chunk_id = chunks.popleft()
+                raw = self._task_workload_data_load_chunk(chunk_id)
+                iterations = iter(sorted(raw, key=lambda i: i["timestamp"]))
+                for idx, itr in enumerate(iterations):
+                    heapq.heappush(heap, (itr["timestamp"], chunk_order,
+                                          idx, itr, iterations))
+                    break
+                continue
+
+            timestamp, chunk_order, idx, itr, iterations = heapq.heappop(
+                heap)
+            yield itr
+            for itr in iterations:
+                heapq.heappush(heap, (itr["timestamp"], chunk_order,
+                                      idx + 1, itr, iterations))
+                break
+
+    def _task_workload_data_load_chunk(self, chunk_id):
+        workload_data = (self.model_query(models.WorkloadData).
+                         filter_by(id=chunk_id).first())
+        if workload_data is None:
+            # the chunk has been removed in the meantime
+            return []
+        raw = workload_data.chunk_data["raw"]
+        # NOTE(andreykurilin): see _workloads_data_get_all for details
+        #   about old atomic actions.
+        if _is_old_chunk(workload_data):
+            raw = copy.deepcopy(raw)
+            _convert_old_atomic_actions(raw)
+        return raw
 
     # @db_api.serialize
     def task_get(self, uuid):
@@ -362,10 +561,11 @@ class Connection(object):
         return result
 
     # @db_api.serialize
-    def task_list(self, status=None, deployment=None, tags=None):
+    def task_list(self, status=None, deployment=None, tags=None, limit=None,
+                  marker=None, created_before=None):
         session = get_session()
         with session.begin():
-            query = self.model_query(models.Task)
+            query = self.model_query(models.Task, session=session)
 
             filters = {}
             if status is not None:
@@ -380,59 +580,130 @@ class Connection(object):
                 uuids = self._uuids_by_tags_get(
                     consts.TagType.TASK, tags)
                 query = query.filter(models.Task.uuid.in_(uuids))
-
-        return [self._make_old_task(task) for task in query.all()]
+            if created_before is not None:
+                query = query.filter(models.Task.created_at < created_before)
+
+            # names of deployments are loaded by the same query
+            query = (query.outerjoin(models.Deployment,
+                                     models.Deployment.uuid ==
+                                     models.Task.deployment_uuid).
+                     add_columns(models.Deployment.name).
+                     order_by(models.Task.id.desc()))
+            if marker is not None:
+                marker = self._task_get(marker, load_only="id",
+                                        session=session)
+                query = query.filter(models.Task.id < marker.id)
+            if limit is not None:
+                query = query.limit(limit)
+
+            rows = query.all()
+            tags = self._tags_get_by_uuids([task.uuid for task, name in rows],
+                                           consts.TagType.TASK)
+
+        tasks = []
+        for task, deployment_name in rows:
+            task = self._make_old_task(task, tags=tags[task.uuid])
+            task["deployment_name"] = deployment_name
+            tasks.append(task)
+        return tasks
 
     def task_delete(self, uuid, status=None):
+        # the status is checked and changed by a single statement, so the
+        # task can not change its status while its results are deleted
         session = get_session()
         with session.begin():
-            query = base_query = (self.model_query(models.Task).
-                                  filter_by(uuid=uuid))
+            query = (self.model_query(models.Task, session=session).
+                     filter_by(uuid=uuid))
             if status is not None:
-                query = base_query.filter_by(status=status)
+                statuses = ([status] if isinstance(status, six.string_types)
+                            else list(status))
+                query = query.filter(models.Task.status.in_(statuses))
+            count = query.update({"status": consts.TaskStatus.DELETING},
+                                 synchronize_session=False)
+            if not count:
+                task = (self.model_query(models.Task, session=session).
+                        filter_by(uuid=uuid).first())
+                if not task:
+                    raise exceptions.TaskNotFound(uuid=uuid)
+                raise exceptions.TaskInvalidStatus(
+                    uuid=uuid, require=", ".join(statuses),
+                    actual=task.status)
+
+        # NOTE: chunks of results take almost all the space of a task, so
+        #   they are deleted by small transactions. Writers of other tasks
+        #   wait for one batch at most instead of the whole task, and the
+        #   deletion can be continued if it is interrupted.
+        while True:
+            session = get_session()
+            with session.begin():
+                ids = [row.id for row in (
+                    self.model_query(models.WorkloadData, session=session).
+                    with_entities(models.WorkloadData.id).
+                    filter_by(task_uuid=uuid).
+                    limit(IN_CLAUSE_LIMIT))]
+                if ids:
+                    (self.model_query(models.WorkloadData, session=session).
+                     filter(models.WorkloadData.id.in_(ids)).
+                     delete(synchronize_session=False))
+            if len(ids) < IN_CLAUSE_LIMIT:
+                break
 
-            (self.model_query(models.WorkloadData).filter_by(task_uuid=uuid).
+        session = get_session()
+        with session.begin():
+            (self.model_query(models.WorkloadReport, session=session).
+             filter(models.WorkloadReport.workload_uuid.in_(
+                 self.model_query(models.Workload, session=session).
+                 with_entities(models.Workload.uuid).
+                 filter_by(task_uuid=uuid).subquery())).
              delete(synchronize_session=False))
 
-            (self.model_query(models.Workload).filter_by(task_uuid=uuid).
+            (self.model_query(models.WorkloadData, session=session).
+             filter_by(task_uuid=uuid).
              delete(synchronize_session=False))
 
-            (self.model_query(models.Subtask).filter_by(task_uuid=uuid).
+            (self.model_query(models.Workload, session=session).
+             filter_by(task_uuid=uuid).
              delete(synchronize_session=False))
 
-            (self.model_query(models.Tag).filter_by(
+            (self.model_query(models.Subtask, session=session).
+             filter_by(task_uuid=uuid).
+             delete(synchronize_session=False))
+
+            (self.model_query(models.Tag, session=session).filter_by(
                 uuid=uuid, type=consts.TagType.TASK).
              delete(synchronize_session=False))
 
-            count = query.delete(synchronize_session=False)
+            count = (self.model_query(models.Task, session=session).
+                     filter_by(uuid=uuid).
+                     delete(synchronize_session=False))
             if not count:
-                if status is not None:
-                    task = base_query.first()
-                    if task:
-                        raise exceptions.TaskInvalidStatus(uuid=uuid,
-                                                           require=status,
-                                                           actual=task.status)
+                # the task has been deleted concurrently
                 raise exceptions.TaskNotFound(uuid=uuid)
 
     def _task_result_get_all_by_uuid(self, uuid):
-        results = []
-
         workloads = (self.model_query(models.Workload).
                      filter_by(task_uuid=uuid).all())
+        chunks = self._workloads_data_get_all([w.uuid for w in workloads])
 
-        for workload in workloads:
-            workload_data_list = self._task_workload_data_get_all(
-                workload.uuid)
-
-            results.append(
-                self._make_old_task_result(workload, workload_data_list))
-
-        return results
+        return [self._make_old_task_result(workload, chunks[workload.uuid])
+                for workload in workloads]
 
     # @db_api.serialize
     def task_result_get_all_by_uuid(self, uuid):
         return self._task_result_get_all_by_uuid(uuid)
 
+    def task_result_iterate_by_uuid(self, uuid):
+        return self.task_result_iterate_by_uuids([uuid])
+
+    def task_result_iterate_by_uuids(self, uuids):
+        workloads = (self.model_query(models.Workload).
+                     filter(models.Workload.task_uuid.in_(uuids)).
+                     order_by(models.Workload.id.asc()).all())
+
+        for workload in workloads:
+            yield self._make_old_task_result(
+                workload, raw_data=WorkloadRawData(self, workload.uuid))
+
     @db_api.serialize
     def subtask_create(self, task_uuid, title, description=None, context=None):
         subtask = models.Subtask(task_uuid=task_uuid)
@@ -474,40 +745,63 @@ class Connection(object):
     @db_api.serialize
     def workload_data_create(self, task_uuid, workload_uuid, chunk_order,
                              data):
-        workload_data = models.WorkloadData(task_uuid=task_uuid,
-                                            workload_uuid=workload_uuid)
-
-        raw_data = data.get("raw", [])
-        iter_count = len(raw_data)
-
-        failed_iter_count = 0
-
-        started_at = float("inf")
-        finished_at = 0
-        for d in raw_data:
-            if d.get("error"):
-                failed_iter_count += 1
-
-            timestamp = d["timestamp"]
-            duration = d["duration"]
-            finished = timestamp + duration
+        workload_data = models.WorkloadData()
+        workload_data.update(self._make_workload_data(
+            task_uuid, workload_uuid,
+            {"chunk_order": chunk_order, "raw": data.get("raw", [])}))
+        workload_data.save()
+        return workload_data
 
-            if timestamp < started_at:
-                started_at = timestamp
+    def _make_workload_data(self, task_uuid, workload_uuid, chunk):
+        """Make values of a workload data row.
 
-            if finished > finished_at:
-                finished_at = finished
+        :param chunk: dict with "chunk_order", "raw" iterations and
+                      optionally their aggregated data
+                      (see workload_data_bulk_create)
+        """
+        raw_data = chunk["raw"]
+        if raw_data and isinstance(raw_data[0].get("atomic_actions"), dict):
+            # new chunks are stored in the current format only
+            raw_data = copy.deepcopy(raw_data)
+            _convert_old_atomic_actions(raw_data)
+
+        if "iteration_count" in chunk:
+            iter_count = chunk["iteration_count"]
+            failed_iter_count = chunk["failed_iteration_count"]
+            started_at = chunk["started_at"]
+            finished_at = chunk["finished_at"]
+        else:
+            iter_count = len(raw_data)
+            failed_iter_count = 0
+            started_at = float("inf")
+            finished_at = 0
+            for d in raw_data:
+                if d.get("error"):
+                    failed_iter_count += 1
+
+                timestamp = d["timestamp"]
+                duration = d["duration"]
+                finished = timestamp + duration
+
+                if timestamp < started_at:
+                    started_at = timestamp
+
+                if finished > finished_at:
+                    finished_at = finished
 
         now = time.time()
+        tstamp_start = None
         if started_at == float("inf"):
             started_at = now
+        else:
+            tstamp_start = started_at
         if finished_at == 0:
             finished_at = now
 
-        workload_data.update({
+        return {
             "task_uuid": task_uuid,
             "workload_uuid": workload_uuid,
-            "chunk_order": chunk_order,
+            "chunk_order": chunk["chunk_order"],
             "iteration_count": iter_count,
             "failed_iteration_count": failed_iter_count,
             "chunk_data": {"raw": raw_data},
@@ -515,40 +809,69 @@ class Connection(object):
             "chunk_size": 0,
             "compressed_chunk_size": 0,
             "started_at": dt.datetime.fromtimestamp(started_at),
-            "finished_at": dt.datetime.fromtimestamp(finished_at)
-        })
-        workload_data.save()
-        return workload_data
+            "finished_at": dt.datetime.fromtimestamp(finished_at),
+            "tstamp_start": tstamp_start,
+            "format_version": models.WORKLOAD_DATA_FORMAT_VERSION
+        }
+
+    def _workload_data_insert(self, session, task_uuid, workload_uuid,
+                              chunks):
+        """Insert workload data rows by a single executemany statement."""
+        if chunks:
+            # NOTE: Core insert skips creating and flushing ORM objects,
+            #   python-side defaults of columns are applied per row still
+            session.execute(
+                models.WorkloadData.__table__.insert(),
+                [self._make_workload_data(task_uuid, workload_uuid, chunk)
+                 for chunk in chunks])
+
+    def workload_data_bulk_create(self, task_uuid, workload_uuid, chunks):
+        session = get_session()
+        with session.begin():
+            self._workload_data_insert(session, task_uuid, workload_uuid,
+                                       chunks)
+        return len(chunks)
+
+    def workload_data_compact(self, workload_uuid, chunks):
+        session = get_session()
+        with session.begin():
+            workload = (self.model_query(models.Workload, session=session).
+                        filter_by(uuid=workload_uuid).first())
+            if not workload:
+                raise exceptions.NotFoundException(
+                    message="Workload %s" % workload_uuid)
+            deleted = (self.model_query(models.WorkloadData,
+                                        session=session).
+                       filter_by(workload_uuid=workload_uuid).
+                       delete(synchronize_session=False))
+            self._workload_data_insert(
+                session, workload.task_uuid, workload_uuid,
+                [{"chunk_order": chunk_order, "raw": raw_data}
+                 for chunk_order, raw_data in enumerate(chunks)])
+        return deleted
 
     @db_api.serialize
     def workload_set_results(self, workload_uuid, data):
         workload = self.model_query(models.Workload).filter_by(
             uuid=workload_uuid).first()
 
-        workload_data_list = self._task_workload_data_get_all(workload.uuid)
-
-        raw_data = [raw
-                    for workload_data in workload_data_list
-                    for raw in workload_data.chunk_data["raw"]]
-        iter_count = len(raw_data)
-
-        failed_iter_count = 0
-        max_duration = 0
-        min_duration = 0
-
-        success = True
-
-        for d in raw_data:
-            if d.get("error"):
-                failed_iter_count += 1
-
-            duration = d.get("duration", 0)
-
-            if duration > max_duration:
-                max_duration = duration
-
-            if min_duration and min_duration > duration:
-                min_duration = duration
+        # iterations are counted per chunk while chunks are stored, so
+        # the counts are summed up instead of loading the iterations
+        (chunks_count, iter_count, failed_iter_count, started_at,
+         finished_at) = (
+            self.model_query(models.WorkloadData).
+            with_entities(
+                sa.func.count(models.WorkloadData.id),
+                sa.func.sum(models.WorkloadData.iteration_count),
+                sa.func.sum(models.WorkloadData.failed_iteration_count),
+                sa.func.min(models.WorkloadData.started_at),
+                sa.func.max(models.WorkloadData.finished_at)).
+            filter_by(workload_uuid=workload.uuid).one())
+        load_duration = 0
+        if chunks_count:
+            load_duration = (finished_at - started_at).total_seconds()
+
+        statistics = data.get("statistics", {})
 
         sla = data.get("sla", [])
         # TODO(ikhudoshyn): if no SLA was specified and there are
@@ -568,15 +891,15 @@ class Connection(object):
             "sla_results": {"sla": sla},
             "context_execution": {},
             "hooks": data.get("hooks", []),
-            "load_duration": data.get("load_duration", 0),
+            "load_duration": data.get("load_duration", load_duration),
             "full_duration": data.get("full_duration", 0),
-            "min_duration": min_duration,
-            "max_duration": max_duration,
-            "total_iteration_count": iter_count,
-            "failed_iteration_count": failed_iter_count,
+            "min_duration": statistics.get("min_duration", 0),
+            "max_duration": statistics.get("max_duration", 0),
+            "total_iteration_count": int(iter_count or 0),
+            "failed_iteration_count": int(failed_iter_count or 0),
             # TODO(ikhudoshyn)
             "start_time": start,
-            "statistics": {},
+            "statistics": statistics,
             "pass_sla": success
         })
 
@@ -587,8 +910,84 @@ class Connection(object):
         # and subtask.duration
 
         workload.save()
+
+        (self.model_query(models.WorkloadReport).
+         filter_by(workload_uuid=workload_uuid).
+         delete(synchronize_session=False))
+
         return workload
 
+    def workload_data_iterate(self, workload_uuid):
+        return WorkloadRawData(self, workload_uuid)
+
+    def workload_data_migrate(self, batch_size=100):
+        is_old = or_(models.WorkloadData.format_version.is_(None),
+                     models.WorkloadData.format_version <
+                     models.WORKLOAD_DATA_FORMAT_VERSION)
+        total = self.model_query(models.WorkloadData).filter(is_old).count()
+        converted = 0
+        last_id = 0
+        while True:
+            session = get_session()
+            with session.begin():
+                chunks = (
+                    self.model_query(models.WorkloadData, session=session).
+                    filter(is_old, models.WorkloadData.id > last_id).
+                    order_by(models.WorkloadData.id.asc()).
+                    limit(batch_size).all())
+                for workload_data in chunks:
+                    self._workload_data_convert(workload_data)
+            if not chunks:
+                return
+            last_id = chunks[-1].id
+            converted += len(chunks)
+            yield converted, total
+
+    def workload_set_statistics(self, workload_uuid, statistics):
+        count = (self.model_query(models.Workload).
+                 filter_by(uuid=workload_uuid).
+                 update({"statistics": statistics}))
+        return bool(count)
+
+    def workload_report_get(self, workload_uuid, format_version, options=""):
+        report = (self.model_query(models.WorkloadReport).
+                  filter_by(workload_uuid=workload_uuid,
+                            format_version=format_version,
+                            options=options).first())
+        return report.report if report else None
+
+    def workload_report_set(self, workload_uuid, format_version, report,
+                            options=""):
+        session = get_session()
+        try:
+            with session.begin():
+                workload = (self.model_query(models.Workload,
+                                             session=session).
+                            filter_by(uuid=workload_uuid).first())
+                if workload is None or workload.pass_sla is None:
+                    # results of the workload are not set yet, so the report
+                    # can change later
+                    return False
+
+                # reports of other formats are not needed anymore
+                (self.model_query(models.WorkloadReport, session=session).
+                 filter_by(workload_uuid=workload_uuid).
+                 filter(or_(models.WorkloadReport.format_version !=
+                            format_version,
+                            models.WorkloadReport.options == options)).
+                 delete(synchronize_session=False))
+
+                workload_report = models.WorkloadReport(
+                    workload_uuid=workload_uuid,
+                    format_version=format_version,
+                    options=options, report=report)
+                session.add(workload_report)
+        except db_exc.DBDuplicateEntry:
+            # NOTE: the same report has been stored by a concurrent build
+            #   in the meantime, so it is kept as is
+            pass
+        return True
+
     def _deployment_get(self, deployment, session=None):
         stored_deployment = self.model_query(
             models.Deployment,
@@ -780,9 +1179,11 @@ class Connection(object):
                 query = query.filter_by(**filter_by)
 
             def add_tags_to_verifications(verifications):
+                tags = self._tags_get_by_uuids(
+                    [verification.uuid for verification in verifications],
+                    consts.TagType.VERIFICATION)
                 for verification in verifications:
-                    verification.tags = sorted(self._tags_get(
-                        verification.uuid, consts.TagType.VERIFICATION))
+                    verification.tags = tags[verification.uuid]
                 return verifications
 
             if tags:
@@ -795,6 +1196,10 @@ class Connection(object):
     def verification_delete(self, verification_uuid):
         session = get_session()
         with session.begin():
+            self.model_query(
+                models.VerificationResult, session=session).filter_by(
+                verification_uuid=verification_uuid).delete(
+                synchronize_session=False)
             count = self.model_query(
                 models.Verification, session=session).filter_by(
                 uuid=verification_uuid).delete(synchronize_session=False)
@@ -810,6 +1215,58 @@ class Connection(object):
             verification.save()
         return verification
 
+    def _make_verification_result(self, verification_uuid, test_id,
+                                  result):
+        """Make values of a verification_results row for a test result."""
+        return {"verification_uuid": verification_uuid,
+                "test_id": test_id,
+                "status": result["status"],
+                "duration": float(result.get("duration") or 0.0),
+                "tags": result.get("tags", []),
+                "details": dict((k, v) for k, v in result.items()
+                                if k not in ("status", "duration", "tags"))}
+
+    def verification_results_create(self, verification_uuid, tests):
+        rows = [self._make_verification_result(verification_uuid, test_id,
+                                               result)
+                for test_id, result in tests.items()]
+        session = get_session()
+        with session.begin():
+            for rows_part in _split(rows, VERIFICATION_RESULTS_BATCH):
+                session.execute(
+                    models.VerificationResult.__table__.insert(), rows_part)
+        return len(rows)
+
+    def verification_results_get(self, verification_uuids=None,
+                                 test_id=None, status=None):
+        results = {}
+        session = get_session()
+        with session.begin():
+            query = self.model_query(models.VerificationResult,
+                                     session=session)
+            if test_id is not None:
+                query = query.filter_by(test_id=test_id)
+            if status is not None:
+                query = query.filter_by(status=status)
+            if verification_uuids is None:
+                queries = [query]
+            else:
+                results = dict((uuid, {}) for uuid in verification_uuids)
+                queries = [query.filter(
+                    models.VerificationResult.verification_uuid.in_(
+                        uuids_part))
+                    for uuids_part in _split(list(results))]
+
+            for query in queries:
+                for row in query.order_by(models.VerificationResult.id):
+                    result = dict(row.details)
+                    result.update(status=row.status,
+                                  duration="%.3f" % row.duration,
+                                  tags=list(row.tags or []))
+                    results.setdefault(row.verification_uuid, {})[
+                        row.test_id] = result
+        return results
+
     @db_api.serialize
     def register_worker(self, values):
         try:
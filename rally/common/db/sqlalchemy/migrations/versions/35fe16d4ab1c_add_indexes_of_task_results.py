@@ -0,0 +1,41 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_indexes_of_task_results
+
+Revision ID: 35fe16d4ab1c
+Revises: f86b4ba55cf9
+Create Date: 2017-07-24 11:02:47.482154
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "35fe16d4ab1c"
+down_revision = "f86b4ba55cf9"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+from rally import exceptions
+
+
+def upgrade():
+    op.create_index("workload_task_uuid", "workloads", ["task_uuid"])
+    op.create_index("workload_data_workload_uuid_chunk_order",
+                    "workloaddata", ["workload_uuid", "chunk_order"])
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -0,0 +1,120 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_verification_results
+
+Results of tests of verifications are moved from the JSON column of
+verifications to rows of the verification_results table.
+
+Revision ID: 9a3c1fb5d2e7
+Revises: c5b1a4f3d2e8
+Create Date: 2017-08-09 12:31:47.463051
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "9a3c1fb5d2e7"
+down_revision = "c5b1a4f3d2e8"
+branch_labels = None
+depends_on = None
+
+import datetime as dt
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally.common.db.sqlalchemy import types as sa_types
+from rally import exceptions
+
+
+BATCH_SIZE = 1000
+
+
+verifications_helper = sa.Table(
+    "verifications",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("uuid", sa.String(36), nullable=False),
+    sa.Column("tests", sa_types.MutableJSONEncodedDict, default={})
+)
+
+verification_results_helper = sa.Table(
+    "verification_results",
+    sa.MetaData(),
+    sa.Column("created_at", sa.DateTime()),
+    sa.Column("updated_at", sa.DateTime()),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("verification_uuid", sa.String(36), nullable=False),
+    sa.Column("test_id", sa.String(255), nullable=False),
+    sa.Column("status", sa.String(36), nullable=False),
+    sa.Column("duration", sa.Float),
+    sa.Column("tags", sa_types.MutableJSONEncodedList),
+    sa.Column("details", sa_types.MutableJSONEncodedDict)
+)
+
+
+def upgrade():
+    op.create_table(
+        "verification_results",
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("verification_uuid", sa.String(length=36),
+                  nullable=False),
+        sa.Column("test_id", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=36), nullable=False),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("tags", sa_types.MutableJSONEncodedList(), default=[],
+                  nullable=True),
+        sa.Column("details", sa_types.MutableJSONEncodedDict(), default={},
+                  nullable=True),
+        sa.ForeignKeyConstraint(["verification_uuid"],
+                                ["verifications.uuid"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+
+    op.create_index("verification_result_verification_uuid_status",
+                    "verification_results", ["verification_uuid", "status"])
+    op.create_index("verification_result_test_id_verification_uuid",
+                    "verification_results", ["test_id", "verification_uuid"])
+
+    connection = op.get_bind()
+    ids = [v.id for v in connection.execute(
+        sa.select([verifications_helper.c.id]))]
+    # verifications are loaded one by one, since results of a verification
+    # can take a lot of memory
+    for v_id in ids:
+        v = connection.execute(verifications_helper.select().where(
+            verifications_helper.c.id == v_id)).first()
+        now = dt.datetime.utcnow()
+        rows = [{"created_at": now,
+                 "updated_at": now,
+                 "verification_uuid": v.uuid,
+                 "test_id": test_id,
+                 "status": result["status"],
+                 "duration": float(result.get("duration") or 0.0),
+                 "tags": result.get("tags", []),
+                 "details": dict((k, val) for k, val in result.items()
+                                 if k not in ("status", "duration", "tags"))}
+                for test_id, result in (v.tests or {}).items()]
+        for i in range(0, len(rows), BATCH_SIZE):
+            connection.execute(verification_results_helper.insert(),
+                               rows[i:i + BATCH_SIZE])
+
+    with op.batch_alter_table("verifications") as batch_op:
+        batch_op.drop_column("tests")
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
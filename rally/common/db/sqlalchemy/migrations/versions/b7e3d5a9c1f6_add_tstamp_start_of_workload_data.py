@@ -0,0 +1,44 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_tstamp_start_of_workload_data
+
+Existing chunks are left without the timestamp, so they are loaded before
+other chunks of their workloads while iterations are merged.
+
+Revision ID: b7e3d5a9c1f6
+Revises: e1c9a6b3f420
+Create Date: 2017-08-21 12:03:47.118295
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "b7e3d5a9c1f6"
+down_revision = "e1c9a6b3f420"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally import exceptions
+
+
+def upgrade():
+    op.add_column("workloaddata",
+                  sa.Column("tstamp_start", sa.Float(), nullable=True))
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
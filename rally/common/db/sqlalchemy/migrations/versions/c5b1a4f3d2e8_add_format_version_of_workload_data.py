@@ -0,0 +1,46 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_format_version_of_workload_data
+
+Existing chunks are left without version, which means that they may
+contain atomic actions in the old format. They are not converted here
+since it can take too much time on big databases, see
+"rally-manage db migrate-data".
+
+Revision ID: c5b1a4f3d2e8
+Revises: 35fe16d4ab1c
+Create Date: 2017-07-26 16:43:12.205871
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "c5b1a4f3d2e8"
+down_revision = "35fe16d4ab1c"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally import exceptions
+
+
+def upgrade():
+    op.add_column("workloaddata",
+                  sa.Column("format_version", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -0,0 +1,39 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_task_uuid_index_of_workload_data
+
+Revision ID: e1c9a6b3f420
+Revises: 9a3c1fb5d2e7
+Create Date: 2017-08-14 10:22:31.650294
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "e1c9a6b3f420"
+down_revision = "9a3c1fb5d2e7"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+from rally import exceptions
+
+
+def upgrade():
+    op.create_index("workload_data_task_uuid", "workloaddata", ["task_uuid"])
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -0,0 +1,61 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add_workload_reports
+
+Revision ID: f86b4ba55cf9
+Revises: 92aaaa2a6bb3
+Create Date: 2017-07-10 14:21:05.117839
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "f86b4ba55cf9"
+down_revision = "92aaaa2a6bb3"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally.common.db.sqlalchemy import types as sa_types
+from rally import exceptions
+
+
+def upgrade():
+    op.create_table(
+        "workload_reports",
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("workload_uuid", sa.String(length=36), nullable=False),
+        sa.Column("format_version", sa.Integer(), nullable=False),
+        sa.Column("options", sa.String(length=255), default="",
+                  nullable=False),
+        sa.Column(
+            "report",
+            sa_types.MutableJSONEncodedDict(),
+            default={},
+            nullable=False),
+        sa.ForeignKeyConstraint(["workload_uuid"], ["workloads.uuid"], ),
+        sa.PrimaryKeyConstraint("id")
+    )
+
+    op.create_index("workload_report_key", "workload_reports",
+                    ["workload_uuid", "format_version", "options"],
+                    unique=True)
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -31,6 +31,11 @@ from rally import consts
 
 BASE = declarative_base()
 
+# Version of the format of workload data chunks. Atomic actions of
+# iterations of chunks without version may be in the old dict format, they
+# are converted by "rally-manage db migrate-data".
+WORKLOAD_DATA_FORMAT_VERSION = 1
+
 
 def UUID():
     return str(uuid.uuid4())
@@ -215,6 +220,7 @@ class Workload(BASE, RallyBase):
     __tablename__ = "workloads"
     __table_args__ = (
         sa.Index("workload_uuid", "uuid", unique=True),
+        sa.Index("workload_task_uuid", "task_uuid"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -286,6 +292,9 @@ class WorkloadData(BASE, RallyBase):
     __tablename__ = "workloaddata"
     __table_args__ = (
         sa.Index("workload_data_uuid", "uuid", unique=True),
+        sa.Index("workload_data_workload_uuid_chunk_order", "workload_uuid",
+                 "chunk_order"),
+        sa.Index("workload_data_task_uuid", "task_uuid"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -319,8 +328,34 @@ class WorkloadData(BASE, RallyBase):
                            nullable=False)
     finished_at = sa.Column(sa.DateTime, default=lambda: timeutils.utcnow(),
                             nullable=False)
+    # timestamp of the first iteration of the chunk, unlike started_at it
+    # does not depend on the timezone
+    tstamp_start = sa.Column(sa.Float, nullable=True)
     chunk_data = sa.Column(
         sa_types.MutableJSONEncodedDict, default={}, nullable=False)
+    format_version = sa.Column(sa.Integer,
+                               default=WORKLOAD_DATA_FORMAT_VERSION)
+
+
+class WorkloadReport(BASE, RallyBase):
+    __tablename__ = "workload_reports"
+    __table_args__ = (
+        sa.Index("workload_report_key", "workload_uuid", "format_version",
+                 "options", unique=True),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    workload_uuid = sa.Column(
+        sa.String(36),
+        sa.ForeignKey(Workload.uuid),
+        nullable=False,
+    )
+
+    format_version = sa.Column(sa.Integer, nullable=False)
+    options = sa.Column(sa.String(255), default="", nullable=False)
+    report = sa.Column(
+        sa_types.MutableJSONEncodedDict, default={}, nullable=False)
 
 
 class Tag(BASE, RallyBase):
@@ -395,7 +430,28 @@ class Verification(BASE, RallyBase):
     expected_failures = sa.Column(sa.Integer, default=0)
     tests_duration = sa.Column(sa.Float, default=0.0)
 
-    tests = sa.Column(sa_types.MutableJSONEncodedDict, default={})
+
+class VerificationResult(BASE, RallyBase):
+    """Represents a result of a test of a verification."""
+
+    __tablename__ = "verification_results"
+    __table_args__ = (
+        sa.Index("verification_result_verification_uuid_status",
+                 "verification_uuid", "status"),
+        sa.Index("verification_result_test_id_verification_uuid",
+                 "test_id", "verification_uuid"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    verification_uuid = sa.Column(sa.String(36),
+                                  sa.ForeignKey(Verification.uuid),
+                                  nullable=False)
+    test_id = sa.Column(sa.String(255), nullable=False)
+    status = sa.Column(sa.String(36), nullable=False)
+    duration = sa.Column(sa.Float, default=0.0)
+    tags = sa.Column(sa_types.MutableJSONEncodedList, default=[])
+    # name, reason, traceback and timestamp of a test
+    details = sa.Column(sa_types.MutableJSONEncodedDict, default={})
 
 
 class Worker(BASE, RallyBase):
@@ -0,0 +1,200 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Incremental reading of large JSON documents.
+
+Only a JSON array of objects is supported, and the value of one key of
+every object (an array as well) is read item by item, so the memory usage
+does not depend on the number of its items. It is enough to read files of
+task results, where iterations of workloads take almost all the space.
+"""
+
+import json
+import re
+import tempfile
+
+import six
+
+
+# The size of text which is read from the stream at once
+BUFFER_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _Reader(object):
+    """Reads JSON values and delimiters from a text stream."""
+
+    def __init__(self, stream, buffer_size):
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self):
+        # the size grows with the buffer, so a large value is not decoded
+        # again for every small piece of it
+        data = self._stream.read(max(self._buffer_size,
+                                     len(self._buf) - self._pos))
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespaces and return the next character (None at EOF)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read():
+                return None
+
+    def expect(self, chars):
+        """Read one of the given characters and return it."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Expecting one of '%s' at %s, got %r"
+                             % (chars, self._location(),
+                                self._buf[self._pos:self._pos + 20]))
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Read a JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError as e:
+                # the value could be read partially
+                if not self._read():
+                    raise ValueError("%s at %s" % (e, self._location()))
+                continue
+            # a number at the end of the buffer could be read partially
+            if end < len(self._buf) or not self._read():
+                self._pos = end
+                return value
+
+    def _location(self):
+        return "the end of the stream" if self._eof else "'...%s'" % (
+            self._buf[max(0, self._pos - 20):self._pos])
+
+
+def _read_members(reader, obj, streamed_key=None, first=True):
+    """Read members of a JSON object into the dict.
+
+    :param reader: _Reader positioned after "{" or after a value of member
+    :param obj: dict to store members to
+    :param streamed_key: the key to stop reading at
+    :param first: whether no members of the object are read yet
+    :returns: True if reading is stopped at the value of streamed_key,
+              False if the object is read till its end
+    """
+    if first and reader.peek() == "}":
+        reader.expect("}")
+        return False
+    while True:
+        if not first and reader.expect(",}") == "}":
+            return False
+        first = False
+        key = reader.value()
+        if not isinstance(key, six.string_types):
+            raise ValueError("Expecting a key of object, got %r" % key)
+        reader.expect(":")
+        if key == streamed_key:
+            return True
+        obj[key] = reader.value()
+
+
+def _iterate_items(reader, obj):
+    """Yield items of the streamed array, then read the rest of object."""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+    else:
+        while True:
+            yield reader.value()
+            if reader.expect(",]") == "]":
+                break
+    _read_members(reader, obj, first=False)
+
+
+def _spool_items(reader, obj):
+    """Read the streamed array to a temporary file and the rest of object.
+
+    :returns: generator of items which are read from the file
+    """
+    spool = tempfile.TemporaryFile(mode="w+")
+    for item in _iterate_items(reader, obj):
+        spool.write(json.dumps(item))
+        spool.write("\n")
+    spool.seek(0)
+
+    def items():
+        with spool:
+            for line in spool:
+                yield json.loads(line)
+
+    return items()
+
+
+def iterate_objects(stream, streamed_key, first_keys=(),
+                    buffer_size=BUFFER_SIZE):
+    """Yield objects of a JSON array from the stream one by one.
+
+    The value of streamed_key of an object is an array which is not loaded
+    at once. It is replaced with a generator of its items, and the members
+    of the object which follow the array are added to the dict once the
+    generator is exhausted. The generator has to be used before getting
+    the next object, otherwise its items are skipped.
+
+    If the array comes before some of first_keys, its items are written to
+    a temporary file, and the object is yielded when it is read completely.
+
+    :param stream: file-like object with JSON text
+    :param streamed_key: the key of arrays to read item by item
+    :param first_keys: keys which should be known before reading the items
+    :param buffer_size: the size of text which is read at once
+    :raises ValueError: if the stream is not a valid JSON array of objects
+    """
+    reader = _Reader(stream, buffer_size)
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+    else:
+        while True:
+            reader.expect("{")
+            obj = {}
+            items = None
+            if _read_members(reader, obj, streamed_key):
+                if all(key in obj for key in first_keys):
+                    items = _iterate_items(reader, obj)
+                else:
+                    items = _spool_items(reader, obj)
+                obj[streamed_key] = items
+            yield obj
+            if items is not None:
+                for item in items:
+                    pass
+            if reader.expect(",]") == "]":
+                break
+    if reader.peek() is not None:
+        raise ValueError("Extra data after the array at %s"
+                         % reader._location())
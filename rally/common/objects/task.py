@@ -15,10 +15,15 @@
 
 import collections
 import datetime as dt
+import heapq
 import uuid
 
+import six
+
 from rally.common import db
 from rally.common.i18n import _LE
+from rally.common import streaming_algorithms as streaming
+from rally.common import utils
 from rally import consts
 from rally import exceptions
 from rally.task.processing import charts
@@ -309,6 +314,13 @@ TASK_EXTENDED_RESULT_SCHEMA = {
                 "min_duration": {"type": "number"},
                 "max_duration": {"type": "number"},
                 "tstamp_start": {"type": "number"},
+                "sla_check_latency": {
+                    "type": "object",
+                    "properties": {
+                        "avg": {"type": "number"},
+                        "max": {"type": "number"}
+                    }
+                },
                 "full_duration": {"type": "number"},
                 "load_duration": {"type": "number"}
             }
@@ -319,6 +331,71 @@ TASK_EXTENDED_RESULT_SCHEMA = {
 }
 
 
+class IterationsSummary(object):
+    """Aggregated data of iterations which needs a single pass over them.
+
+    It can be calculated while iterations are received, then statistics
+    of the workload need only one more pass, see Task.get_iterations_info.
+    """
+
+    def __init__(self):
+        self.tstamp_start = 0
+        self.min_duration = 0
+        self.max_duration = 0
+        self.iterations_failed = 0
+        self.iterations_count = 0
+        self.atomic = collections.OrderedDict()
+
+    @staticmethod
+    def _merge_atomic(atomic_actions):
+        merged_atomic = collections.OrderedDict()
+        for action in atomic_actions:
+            name = action["name"]
+            duration = action["finished_at"] - action["started_at"]
+            if name not in merged_atomic:
+                merged_atomic[name] = {"duration": duration, "count": 1}
+            else:
+                merged_atomic[name]["duration"] += duration
+                merged_atomic[name]["count"] += 1
+        return merged_atomic
+
+    def add(self, itr):
+        self.iterations_count += 1
+        merged_atomic = self._merge_atomic(itr["atomic_actions"])
+        for name, value in merged_atomic.items():
+            duration = value["duration"]
+            count = value["count"]
+            if name not in self.atomic or count > self.atomic[name]["count"]:
+                self.atomic[name] = {"min_duration": duration,
+                                     "max_duration": duration,
+                                     "count": count}
+            elif count == self.atomic[name]["count"]:
+                if duration < self.atomic[name]["min_duration"]:
+                    self.atomic[name]["min_duration"] = duration
+                if duration > self.atomic[name]["max_duration"]:
+                    self.atomic[name]["max_duration"] = duration
+
+        if not self.tstamp_start or itr["timestamp"] < self.tstamp_start:
+            self.tstamp_start = itr["timestamp"]
+
+        if itr["error"]:
+            self.iterations_failed += 1
+        else:
+            duration = itr["duration"] or 0
+            if not self.min_duration or duration < self.min_duration:
+                self.min_duration = duration
+            if not self.max_duration or duration > self.max_duration:
+                self.max_duration = duration
+
+    def result(self):
+        return {"atomic": self.atomic,
+                "iterations_count": self.iterations_count,
+                "iterations_failed": self.iterations_failed,
+                "min_duration": self.min_duration,
+                "max_duration": self.max_duration,
+                "tstamp_start": self.tstamp_start}
+
+
 class Task(object):
     """Represents a task object.
 
@@ -341,6 +418,10 @@ class Task(object):
     NOT_IMPLEMENTED_STAGES_FOR_ABORT = [consts.TaskStatus.VALIDATING,
                                         consts.TaskStatus.INIT]
     TIME_FORMAT = consts.TimeFormat.ISO8601
+    # Iterations are stored in order of completion, which differs from
+    # the order of their start, so they are sorted in chunks of this size
+    # and the sorted chunks are merged.
+    ITERATIONS_SORT_CHUNK = 1000
 
     def __init__(self, task=None, temporary=False, **attributes):
         """Task object init
@@ -362,17 +443,24 @@ class Task(object):
     def __getitem__(self, key):
         return self.task[key]
 
-    def to_dict(self):
+    def to_dict(self, include_results=True):
+        """Get task data.
+
+        :param include_results: whether to load results of the task
+        """
         db_task = self.task
-        deployment_name = db.deployment_get(
-            self.task["deployment_uuid"])["name"]
-        db_task["deployment_name"] = deployment_name
+        if "deployment_name" not in db_task:
+            # task_list() loads names of deployments in advance
+            db_task["deployment_name"] = db.deployment_get(
+                self.task["deployment_uuid"])["name"]
         db_task["duration"] = db_task.get(
             "updated_at") - db_task.get("created_at")
         db_task["created_at"] = db_task.get("created_at",
                                             "").strftime(self.TIME_FORMAT)
         db_task["updated_at"] = db_task.get("updated_at",
                                             "").strftime(self.TIME_FORMAT)
+        if not include_results:
+            return db_task
         db_results = self.get_results()
         results = []
         for result in db_results:
@@ -385,7 +473,13 @@ class Task(object):
         return db_task
 
     @staticmethod
-    def get_detailed(task_id):
+    def get_detailed(task_id, lazy_iterations=False):
+        if lazy_iterations:
+            # iterations are read from the database while being iterated
+            # over, see iterate_results()
+            task_detail = db.api.task_get(task_id)
+            task_detail["results"] = list(Task.iterate_results(task_id))
+            return task_detail
         task_detail = db.api.task_get_detailed(task_id)
         results = []
         for result in task_detail["results"]:
@@ -397,6 +491,49 @@ class Task(object):
         task_detail["results"] = results
         return task_detail
 
+    @staticmethod
+    def iterate_results(task_id):
+        """Yield task results one by one.
+
+        Unlike get_detailed(), iterations of results are not loaded in
+        advance, they are read from the database chunk by chunk each time
+        "data"/"raw" of a result is iterated over.
+        """
+        for result in db.task_result_iterate_by_uuid(task_id):
+            for k in "created_at", "updated_at":
+                result[k] = result.get(k, "").strftime(Task.TIME_FORMAT)
+            yield result
+
+    @staticmethod
+    def get_workloads_statistics(tasks_uuids):
+        """Get statistics of workloads of the tasks.
+
+        Statistics are stored on setting results of workloads, so
+        iterations are loaded only for workloads stored without them.
+        Statistics calculated for such workloads are stored as well.
+
+        :param tasks_uuids: list of tasks UUIDs
+        :returns: list of dicts with workloads data:
+                  uuid - str, workload UUID
+                  key - dict, workload input data
+                  sla - list, SLA results
+                  info - dict with the same data as in extend_results()
+        """
+        workloads = []
+        for result in db.task_result_iterate_by_uuids(tasks_uuids):
+            info = result["data"].get("statistics")
+            if not info:
+                info = Task.get_iterations_info(result["data"]["raw"])
+                db.workload_set_statistics(result["uuid"], info)
+            info = dict(info,
+                        full_duration=result["data"]["full_duration"],
+                        load_duration=result["data"]["load_duration"])
+            workloads.append({"uuid": result["uuid"],
+                              "key": result["key"],
+                              "sla": result["data"]["sla"],
+                              "info": info})
+        return workloads
+
     @staticmethod
     def get(uuid):
         return Task(db.task_get(uuid))
@@ -406,9 +543,11 @@ class Task(object):
         return db.task_get_status(uuid)
 
     @staticmethod
-    def list(status=None, deployment=None, tags=None):
+    def list(status=None, deployment=None, tags=None, limit=None,
+             marker=None, created_before=None):
         return [Task(db_task) for db_task in db.task_list(
-            status, deployment=deployment, tags=tags)]
+            status, deployment=deployment, tags=tags, limit=limit,
+            marker=marker, created_before=created_before)]
 
     @staticmethod
     def delete_by_uuid(uuid, status=None):
@@ -451,9 +590,18 @@ class Task(object):
         be taken as-is directly from the database.
 
         Each scenario results have extra `info' with aggregated data,
-        and iterations data is represented by iterator - this simplifies
-        its future implementation as generator and gives ability to process
-        arbitrary number of iterations with low memory usage.
+        and iterations data is represented by iterator, which gives ability
+        to process arbitrary number of iterations with low memory usage.
+
+        `info' is taken from statistics stored with the workload, so
+        iterations are not passed over to build it unless the workload
+        has no statistics (stored by old versions of Rally).
+
+        Iterations of results obtained by iterate_results() are never
+        loaded into memory completely, `iterations' is always an iterator
+        for them. Iterations which are loaded already ordered by timestamp
+        (see `ordered' attribute of db.sqlalchemy.api.WorkloadRawData) are
+        yielded as is, others are sorted by sort_iterations().
 
         :param results: list of db.sqlalchemy.models.TaskResult
         :param serializable: bool, whether to convert json non-serializable
@@ -478,103 +626,125 @@ class Task(object):
                       load_duration - float load scenario duration
         """
 
-        def _merge_atomic(atomic_actions):
-            merged_atomic = collections.OrderedDict()
-            for action in atomic_actions:
-                name = action["name"]
-                duration = action["finished_at"] - action["started_at"]
-                if name not in merged_atomic:
-                    merged_atomic[name] = {"duration": duration, "count": 1}
-                else:
-                    merged_atomic[name]["duration"] += duration
-                    merged_atomic[name]["count"] += 1
-            return merged_atomic
-
         extended = []
         for scenario_result in results:
             scenario = dict(scenario_result)
-            tstamp_start = 0
-            min_duration = 0
-            max_duration = 0
-            iterations_failed = 0
-            atomic = collections.OrderedDict()
-
-            for itr in scenario["data"]["raw"]:
-                merged_atomic = _merge_atomic(itr["atomic_actions"])
-                for name, value in merged_atomic.items():
-                    duration = value["duration"]
-                    count = value["count"]
-                    if name not in atomic or count > atomic[name]["count"]:
-                        atomic[name] = {"min_duration": duration,
-                                        "max_duration": duration,
-                                        "count": count}
-                    elif count == atomic[name]["count"]:
-                        if duration < atomic[name]["min_duration"]:
-                            atomic[name]["min_duration"] = duration
-                        if duration > atomic[name]["max_duration"]:
-                            atomic[name]["max_duration"] = duration
-
-                if not tstamp_start or itr["timestamp"] < tstamp_start:
-                    tstamp_start = itr["timestamp"]
-
-                if "output" not in itr:
-                    itr["output"] = {"additive": [], "complete": []}
-
-                    # NOTE(amaretskiy): Deprecated "scenario_output"
-                    #     is supported for backward compatibility
-                    if ("scenario_output" in itr
-                            and itr["scenario_output"]["data"]):
-                        itr["output"]["additive"].append(
-                            {"items": itr["scenario_output"]["data"].items(),
-                             "title": "Scenario output",
-                             "description": "",
-                             "chart": "OutputStackedAreaChart"})
-                        del itr["scenario_output"]
-
-                if itr["error"]:
-                    iterations_failed += 1
-                else:
-                    duration = itr["duration"] or 0
-                    if not min_duration or duration < min_duration:
-                        min_duration = duration
-                    if not max_duration or duration > max_duration:
-                        max_duration = duration
 
             for k in "created_at", "updated_at":
                 if scenario[k] and isinstance(scenario[k], dt.datetime):
                     scenario[k] = scenario[k].strftime("%Y-%d-%m %H:%M:%S")
 
-            durations_stat = charts.MainStatsTable(
-                {"iterations_count": len(scenario["data"]["raw"]),
-                 "atomic": atomic})
-
-            for itr in scenario["data"]["raw"]:
-                durations_stat.add_iteration(itr)
-
-            scenario["info"] = {
-                "stat": durations_stat.render(),
-                "atomic": atomic,
-                "iterations_count": len(scenario["data"]["raw"]),
-                "iterations_failed": iterations_failed,
-                "min_duration": min_duration,
-                "max_duration": max_duration,
-                "tstamp_start": tstamp_start,
-                "full_duration": scenario["data"]["full_duration"],
-                "load_duration": scenario["data"]["load_duration"]}
-            iterations = sorted(scenario["data"]["raw"],
-                                key=lambda itr: itr["timestamp"])
-            if serializable:
-                scenario["iterations"] = list(iterations)
+            raw = scenario["data"]["raw"]
+            if scenario["data"].get("statistics"):
+                scenario["info"] = dict(scenario["data"]["statistics"])
             else:
-                scenario["iterations"] = iter(iterations)
+                scenario["info"] = cls.get_iterations_info(raw)
+            scenario["info"]["full_duration"] = scenario["data"][
+                "full_duration"]
+            scenario["info"]["load_duration"] = scenario["data"][
+                "load_duration"]
+            if isinstance(raw, list):
+                iterations = sorted(six.moves.map(cls._fill_output, raw),
+                                    key=lambda itr: itr["timestamp"])
+                if serializable:
+                    scenario["iterations"] = list(iterations)
+                else:
+                    scenario["iterations"] = iter(iterations)
+            elif getattr(raw, "ordered", False):
+                scenario["iterations"] = six.moves.map(cls._fill_output, raw)
+            else:
+                scenario["iterations"] = cls.sort_iterations(
+                    six.moves.map(cls._fill_output, raw))
             scenario["sla"] = scenario["data"]["sla"]
             scenario["hooks"] = scenario["data"].get("hooks", [])
             del scenario["data"]
             del scenario["task_uuid"]
             del scenario["id"]
+            scenario.pop("uuid", None)
             extended.append(scenario)
         return extended
 
+    @classmethod
+    def get_iterations_info(cls, iterations, summary=None):
+        """Aggregate data of workload iterations.
+
+        The result does not depend on the order of iterations, so it can
+        be calculated once and stored as statistics of the workload.
+
+        :param iterations: iterations data, it is passed over twice
+        :param summary: IterationsSummary of the iterations if it has been
+                        calculated already, then iterations are passed
+                        over once
+        :returns: dict with the same data as `info' of extend_results()
+                  except full_duration and load_duration
+        """
+        if summary is None:
+            summary = IterationsSummary()
+            for itr in iterations:
+                summary.add(itr)
+        info = summary.result()
+
+        durations_stat = charts.MainStatsTable(
+            {"iterations_count": info["iterations_count"],
+             "atomic": info["atomic"]})
+
+        for itr in iterations:
+            cls._fill_output(itr)
+            durations_stat.add_iteration(itr)
+
+        return dict(info, stat=durations_stat.render())
+
+    @staticmethod
+    def _fill_output(itr):
+        if "output" not in itr:
+            itr["output"] = {"additive": [], "complete": []}
+
+            # NOTE(amaretskiy): Deprecated "scenario_output"
+            #     is supported for backward compatibility
+            if ("scenario_output" in itr
+                    and itr["scenario_output"]["data"]):
+                itr["output"]["additive"].append(
+                    {"items": itr["scenario_output"]["data"].items(),
+                     "title": "Scenario output",
+                     "description": "",
+                     "chart": "OutputStackedAreaChart"})
+                del itr["scenario_output"]
+        return itr
+
+    @classmethod
+    def sort_iterations(cls, iterations):
+        """Sort iterations by timestamp.
+
+        Iterations are sorted in chunks of ITERATIONS_SORT_CHUNK items and
+        the sorted chunks are merged, so the order is exact however far
+        iterations are out of order. Iterations which are known to be
+        ordered already (see `ordered' attribute of
+        db.sqlalchemy.api.WorkloadRawData) are yielded as is.
+
+        :param iterations: iterable with iterations data
+        :returns: generator of iterations
+        """
+        if getattr(iterations, "ordered", False):
+            for itr in iterations:
+                yield itr
+            return
+
+        chunks = []
+        chunk = []
+        for idx, itr in enumerate(iterations):
+            # NOTE: the index keeps the sort stable and prevents comparison
+            #   of iterations with equal timestamps
+            chunk.append((itr["timestamp"], idx, itr))
+            if len(chunk) == cls.ITERATIONS_SORT_CHUNK:
+                chunk.sort()
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunk.sort()
+            chunks.append(chunk)
+        for timestamp, idx, itr in heapq.merge(*chunks):
+            yield itr
+
     def delete(self, status=None):
         db.task_delete(self.task["uuid"], status=status)
 
@@ -599,6 +769,8 @@ class Task(object):
                       if soft else consts.TaskStatus.ABORTING)
         self.update_status(new_status, allowed_statuses=(
             consts.TaskStatus.RUNNING, consts.TaskStatus.SOFT_ABORTING))
+        # the engine running the task on this host checks the status at once
+        utils.AbortChannel(self.task["uuid"]).notify()
 
 
 class Subtask(object):
@@ -635,5 +807,101 @@ class Workload(object):
                                 self.workload["uuid"], chunk_order,
                                 workload_data)
 
-    def set_results(self, data):
+    def add_workload_data_chunks(self, chunks):
+        """Store several chunks of iterations by a single transaction.
+
+        :param chunks: list of dicts with "chunk_order" and "raw"
+                       iterations of chunks, see
+                       rally.common.db.api.workload_data_bulk_create
+        """
+        db.workload_data_bulk_create(self.workload["task_uuid"],
+                                     self.workload["uuid"], chunks)
+
+    @staticmethod
+    def make_data_chunk(chunk_order, iterations):
+        """Make a chunk of iterations for add_workload_data_chunks.
+
+        Iterations are sorted by timestamp in place and their aggregated
+        data is added to the chunk, so it is not calculated once more
+        while the chunk is stored.
+
+        :param chunk_order: order of the chunk in the workload
+        :param iterations: list of iterations of the chunk
+        :returns: dict with the chunk
+        """
+        iterations.sort(key=lambda x: x["timestamp"])
+        chunk = {"chunk_order": chunk_order, "raw": iterations}
+        if iterations:
+            chunk["iteration_count"] = len(iterations)
+            chunk["failed_iteration_count"] = len(
+                [itr for itr in iterations if itr.get("error")])
+            chunk["started_at"] = iterations[0]["timestamp"]
+            chunk["finished_at"] = max(itr["timestamp"] + itr["duration"]
+                                       for itr in iterations)
+        return chunk
+
+    def set_results(self, data, summary=None, sla_check_latency=None):
+        """Store results of the workload.
+
+        :param data: dict with results of the workload
+        :param summary: IterationsSummary of stored iterations, if it is
+                        calculated while they were received
+        :param sla_check_latency: dict with "avg" and "max" time from the
+                                  end of an iteration to the SLA check made
+                                  for it, it is stored with statistics
+        """
+        if "statistics" not in data:
+            # statistics are calculated once all the iterations are
+            # stored, so reports do not need to load iterations again
+            iterations = db.workload_data_iterate(self.workload["uuid"])
+            data = dict(data, statistics=Task.get_iterations_info(
+                iterations, summary=summary))
+        if sla_check_latency:
+            data = dict(data, statistics=dict(
+                data["statistics"], sla_check_latency=sla_check_latency))
         db.workload_set_results(self.workload["uuid"], data)
+
+    @staticmethod
+    def compact_data(workload_uuid, statistics, sample_size, chunk_size,
+                     seed=None):
+        """Replace stored iterations of the workload with their sample.
+
+        A uniform random sample of successful iterations is kept together
+        with all the failed ones. The number of kept iterations is stored
+        as "iterations_stored" in statistics of the workload, so reports
+        know that its iterations are sampled.
+
+        :param workload_uuid: UUID of the workload
+        :param statistics: statistics of all iterations of the workload,
+                           see Task.get_iterations_info
+        :param sample_size: the number of successful iterations to keep
+        :param chunk_size: the number of iterations per stored chunk
+        :param seed: seed of random numbers generator of the sample
+        :returns: the number of kept iterations
+        """
+        sample = streaming.ReservoirSampleComputation(sample_size, seed=seed)
+        failed = []
+        for itr in db.workload_data_iterate(workload_uuid):
+            if itr["error"]:
+                failed.append(itr)
+            else:
+                sample.add(itr)
+
+        iterations = sorted(failed + sample.result(),
+                            key=lambda itr: itr["timestamp"])
+        db.workload_data_compact(
+            workload_uuid, [iterations[i:i + chunk_size]
+                            for i in range(0, len(iterations), chunk_size)])
+        db.workload_set_statistics(
+            workload_uuid,
+            dict(statistics, iterations_stored=len(iterations)))
+        return len(iterations)
+
+    @staticmethod
+    def get_report(workload_uuid, format_version, options=""):
+        return db.workload_report_get(workload_uuid, format_version, options)
+
+    @staticmethod
+    def set_report(workload_uuid, format_version, report, options=""):
+        return db.workload_report_set(workload_uuid, format_version, report,
+                                      options)
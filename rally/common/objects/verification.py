@@ -28,6 +28,7 @@ class Verification(object):
                              in the database
         """
         self._db_entry = verification
+        self._tests = None
 
     def __getattr__(self, attr):
         return self._db_entry[attr]
@@ -35,15 +36,32 @@ class Verification(object):
     def __getitem__(self, item):
         return self._db_entry[item]
 
-    def to_dict(self, item=None):
+    @property
+    def tests(self):
+        """Results of all tests of the verification by IDs of tests."""
+        if self._tests is None:
+            self._tests = self.get_tests()
+        return self._tests
+
+    def get_tests(self, status=None):
+        """Get results of tests of the verification from the database.
+
+        :param status: status to filter tests by
+        """
+        return db.verification_results_get(
+            [self.uuid], status=status)[self.uuid]
+
+    def to_dict(self, item=None, include_tests=True):
         data = {}
         formatters = ["created_at", "updated_at"]
         fields = ["deployment_uuid", "verifier_uuid", "uuid", "id",
-                  "unexpected_success", "status", "tests", "skipped",
+                  "unexpected_success", "status", "skipped",
                   "tags", "tests_duration", "run_args", "success",
                   "expected_failures", "tests_count", "failures"]
         for field in fields:
             data[field] = self._db_entry.get(field, "")
+        if include_tests:
+            data["tests"] = self.tests
         for field in formatters:
             data[field] = self._db_entry.get(field, "").strftime(
                 self.TIME_FORMAT)
@@ -65,6 +83,20 @@ class Verification(object):
                                                  tags, status)
         return [cls(db_entry) for db_entry in verification_list]
 
+    @staticmethod
+    def load_tests(verifications):
+        """Load results of tests of several verifications at once.
+
+        Results are fetched by a single query and cached, so `tests' of
+        the verifications do not query the database one by one.
+
+        :param verifications: list of Verification objects
+        """
+        results = db.verification_results_get(
+            [v.uuid for v in verifications])
+        for v in verifications:
+            v._tests = results[v.uuid]
+
     def delete(self):
         db.verification_delete(self.uuid)
 
@@ -80,7 +112,9 @@ class Verification(object):
             status = consts.VerificationStatus.FINISHED
         else:
             status = consts.VerificationStatus.FAILED
-        self._update(status=status, tests=tests, **totals)
+        db.verification_results_create(self.uuid, tests)
+        self._tests = tests
+        self._update(status=status, **totals)
 
     def set_error(self, error_message):
         # TODO(andreykurilin): Save error message in the database.
@@ -16,6 +16,7 @@ import itertools
 
 from oslo_config import cfg
 
+from rally.common.db import api as db_api
 from rally.common import logging
 from rally import osclients
 from rally.plugins.openstack.cfg import opts as openstack_opts
@@ -33,6 +34,7 @@ def list_opts():
     merged_opts["DEFAULT"] = itertools.chain(logging.DEBUG_OPTS,
                                              osclients.OSCLIENTS_OPTS,
                                              engine.TASK_ENGINE_OPTS)
+    merged_opts["database"] = db_api.DB_OPTS
     return merged_opts.items()
 
 
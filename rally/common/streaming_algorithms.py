@@ -17,12 +17,32 @@ from __future__ import division
 
 import abc
 import math
+import random
 
 import six
 
 from rally.task.processing import utils
 
 
+def percentile(values, percent):
+    """Calculate percentile of sorted list of values.
+
+    The value is linearly interpolated between the closest ranks.
+
+    :param values: sorted list of numbers
+    :param percent: numeric percent (from 0.00..1 to 0.999..)
+    :returns: float percentile value or None for empty list
+    """
+    if not values:
+        return None
+    k = (len(values) - 1) * percent
+    f = math.floor(k)
+    c = math.ceil(k)
+    if f == c:
+        return values[int(k)]
+    return values[int(f)] * (c - k) + values[int(c)] * (k - f)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class StreamingAlgorithm(object):
     """Base class for streaming computations that scale."""
@@ -176,20 +196,144 @@ class PercentileComputation(StreamingAlgorithm):
         raise NotImplementedError()
 
     def result(self):
-        results = list(
+        results = sorted(
             map(lambda x: x[1], self._graph_zipper.get_zipped_graph()))
-        if results:
-            # NOTE(amaretskiy): Calculate percentile of a list of values
-            results.sort()
-            k = (len(results) - 1) * self._percent
-            f = math.floor(k)
-            c = math.ceil(k)
-            if f == c:
-                return results[int(k)]
-            d0 = results[int(f)] * (c - k)
-            d1 = results[int(c)] * (k - f)
-            return (d0 + d1)
-        return None
+        return percentile(results, self._percent)
+
+
+class PercentileSketchComputation(StreamingAlgorithm):
+    """Compute approximate percentile value from a stream of numbers.
+
+    Values are counted in buckets of logarithmically growing size, so
+    the percentile is estimated with the given relative accuracy, memory
+    usage depends only on the range of values (not on their count) and
+    sketches can be merged without losing accuracy.
+    """
+
+    # Values below this one are accounted as zeros, so the number of
+    # buckets stays bounded.
+    MIN_VALUE = 1e-9
+
+    def __init__(self, percent, relative_accuracy=0.01):
+        """Init streaming computation.
+
+        :param percent: numeric percent (from 0.00..1 to 1)
+        :param relative_accuracy: max relative error of the result
+        """
+        if not 0 < percent <= 1:
+            raise ValueError("Unexpected percent: %s" % percent)
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Unexpected relative accuracy: %s"
+                             % relative_accuracy)
+        self._percent = percent
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}
+        self._zeros = 0
+        self.count = 0
+        self._min = MinComputation()
+        self._max = MaxComputation()
+
+    def add(self, value):
+        value = self._cast_to_float(value)
+        if value < 0:
+            raise ValueError("Unexpected value: %s" % value)
+
+        self.count += 1
+        self._min.add(value)
+        self._max.add(value)
+        if value < self.MIN_VALUE:
+            self._zeros += 1
+        else:
+            idx = int(math.ceil(math.log(value) / self._log_gamma))
+            self._buckets[idx] = self._buckets.get(idx, 0) + 1
+
+    def merge(self, other):
+        if self.relative_accuracy != other.relative_accuracy:
+            raise TypeError("Unable to merge sketches with different "
+                            "relative accuracy: %s, %s"
+                            % (self.relative_accuracy,
+                               other.relative_accuracy))
+        self.count += other.count
+        self._zeros += other._zeros
+        self._min.merge(other._min)
+        self._max.merge(other._max)
+        for idx, count in other._buckets.items():
+            self._buckets[idx] = self._buckets.get(idx, 0) + count
+
+    def get_percentile(self, percent):
+        """Return approximate percentile of processed values.
+
+        :param percent: numeric percent (from 0.00..1 to 1)
+        """
+        if not self.count:
+            return None
+        rank = math.ceil(percent * (self.count - 1))
+        if rank < self._zeros:
+            return self._min.result()
+        if rank >= self.count - 1:
+            return self._max.result()
+
+        processed = self._zeros
+        for idx in sorted(self._buckets):
+            processed += self._buckets[idx]
+            if processed > rank:
+                value = 2 * self._gamma ** idx / (self._gamma + 1)
+                return min(max(value, self._min.result()),
+                           self._max.result())
+        return self._max.result()
+
+    def result(self):
+        return self.get_percentile(self._percent)
+
+
+class ReservoirSampleComputation(StreamingAlgorithm):
+    """Pick a uniform random sample of the given size from a stream.
+
+    Each processed value gets into the sample with the same probability,
+    while only the sample is kept in memory.
+    """
+
+    def __init__(self, size, seed=None):
+        """Init streaming computation.
+
+        :param size: the maximal number of values in the sample
+        :param seed: seed of random numbers generator
+        """
+        if size < 0:
+            raise ValueError("Unexpected sample size: %s" % size)
+        self.size = size
+        self.count = 0
+        self._sample = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        self.count += 1
+        if len(self._sample) < self.size:
+            self._sample.append(value)
+        else:
+            idx = self._random.randrange(self.count)
+            if idx < self.size:
+                self._sample[idx] = value
+
+    def merge(self, other):
+        # values of the merged sample are picked from each sample with the
+        # probability proportional to the number of values it stands for
+        samples = [(self.count, list(self._sample)),
+                   (other.count, list(other._sample))]
+        merged = []
+        while len(merged) < self.size and (samples[0][1] or samples[1][1]):
+            weights = [count if sample else 0 for count, sample in samples]
+            pick = int(self._random.uniform(0, sum(weights)) >= weights[0])
+            count, sample = samples[pick]
+            merged.append(sample.pop(self._random.randrange(len(sample))))
+            samples[pick] = (count - 1, sample)
+        self.count += other.count
+        self._sample = merged
+
+    def result(self):
+        return list(self._sample)
 
 
 class IncrementComputation(StreamingAlgorithm):
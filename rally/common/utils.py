@@ -23,7 +23,9 @@ import multiprocessing
 import os
 import random
 import re
+import select
 import shutil
+import socket
 import string
 import sys
 import tempfile
@@ -741,6 +743,106 @@ class Stopwatch(object):
             interruptable_sleep(sec)
 
 
+class AbortChannel(object):
+    """Local channel which wakes up the process running a task.
+
+    The process running a task listens to a UNIX datagram socket named
+    after the task UUID, and processes aborting the task on the same host
+    notify it right after the status of the task is changed. The status in
+    the database stays the durable record of aborting, notifications only
+    make the process check it at once. Without the socket (the task runs
+    on another host, UNIX sockets are not supported) the process notices
+    the status by polling the database.
+    """
+
+    def __init__(self, task_uuid, directory=None):
+        """Create the channel of the task.
+
+        :param task_uuid: UUID of the task
+        :param directory: directory of the socket, the temporary one by
+                          default
+        """
+        self.path = os.path.join(directory or tempfile.gettempdir(),
+                                 "rally-task-%s.sock" % task_uuid)
+        self._socket = None
+
+    def listen(self):
+        """Start listening to notifications.
+
+        :returns: whether the channel is listened to, otherwise wait()
+                  just sleeps
+        """
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        except (AttributeError, socket.error) as e:
+            LOG.debug("Unable to create a socket to listen to: %s" % e)
+            return False
+        try:
+            if os.path.exists(self.path):
+                # the socket of a crashed process
+                os.unlink(self.path)
+            sock.bind(self.path)
+        except (OSError, socket.error) as e:
+            sock.close()
+            LOG.debug("Unable to listen to %s: %s" % (self.path, e))
+            return False
+        self._socket = sock
+        return True
+
+    def wait(self, timeout):
+        """Wait for a notification.
+
+        :param timeout: the maximal time to wait in seconds
+        :returns: True if a notification is received, False on timeout
+        """
+        if self._socket is None:
+            time.sleep(timeout)
+            return False
+        if not select.select([self._socket], [], [], timeout)[0]:
+            return False
+        # several notifications are received at once
+        self._socket.setblocking(False)
+        try:
+            while True:
+                self._socket.recv(64)
+        except socket.error:
+            pass
+        finally:
+            self._socket.setblocking(True)
+        return True
+
+    def notify(self):
+        """Notify the process which listens to the channel, if any.
+
+        :returns: whether the notification is sent
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        except (AttributeError, socket.error) as e:
+            LOG.debug("Unable to create a socket to notify: %s" % e)
+            return False
+        try:
+            sock.sendto(b"wakeup", self.path)
+        except (OSError, socket.error) as e:
+            LOG.debug("Unable to notify %s: %s" % (self.path, e))
+            return False
+        finally:
+            sock.close()
+        return True
+
+    def close(self):
+        """Stop listening to notifications."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
 def generate_random_path(root_dir=None):
     """Generates a vacant name for a file or dir at the specified place.
 
@@ -42,6 +42,7 @@ class _TaskStatus(utils.ImmutableMixin, utils.EnumMixin):
     SOFT_ABORTING = "soft_aborting"
     ABORTED = "aborted"
     PAUSED = "paused"
+    DELETING = "deleting"
 
 
 class _SubtaskStatus(utils.ImmutableMixin, utils.EnumMixin):
@@ -0,0 +1,207 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+import csv
+import gzip
+import json
+import os
+
+import six
+
+from rally.common import objects
+from rally import exceptions
+from rally.task import exporter
+from rally.task.processing import utils
+
+
+FIELDS = ("task_uuid", "workload_uuid", "workload", "timestamp", "duration",
+          "idle_duration", "error_type")
+
+
+class IterationsExporter(exporter.TaskExporter):
+    """Base class for exporters of rows with data of iterations.
+
+    Iterations are read from the database chunk by chunk and, if the
+    report is streamed, written to the output destination as soon as they
+    are read, so the memory usage does not depend on the number of
+    iterations.
+    """
+    LAZY_RESULTS = True
+    STREAMING = True
+
+    # Rows are written to the output by batches of this size
+    BATCH_SIZE = 1000
+
+    @classmethod
+    def validate(cls, output_destination):
+        """Validate destination of report.
+
+        :param output_destination: Destination of report
+        """
+        # nothing to check :)
+        pass
+
+    def _get_atomic(self, result):
+        """Get atomic actions data of workload result."""
+        statistics = result["data"].get("statistics")
+        if not statistics:
+            # workloads stored without statistics are processed twice
+            statistics = objects.Task.get_iterations_info(
+                result["data"]["raw"])
+        return statistics["atomic"]
+
+    def _iterate_workload_rows(self, result, atomic):
+        """Yield data of iterations of the workload ordered by timestamp.
+
+        :param result: workload result
+        :param atomic: atomic actions data of workload result
+        """
+        merger = utils.AtomicMerger(atomic)
+        for itr in objects.Task.sort_iterations(result["data"]["raw"]):
+            row = {"task_uuid": result["task_uuid"],
+                   "workload_uuid": result["uuid"],
+                   "workload": result["key"]["name"],
+                   "timestamp": itr["timestamp"],
+                   "duration": itr["duration"],
+                   "idle_duration": itr["idle_duration"],
+                   "error_type": itr["error"][0] if itr["error"] else None,
+                   "atomic_actions": merger.merge_atomic_actions(
+                       itr["atomic_actions"])}
+            yield row
+
+    def _iterate_rows(self, results):
+        """Yield data of iterations of all workloads.
+
+        :param results: list of (result, atomic) pairs, where atomic is
+                        atomic actions data of workload result
+        """
+        for result, atomic in results:
+            for row in self._iterate_workload_rows(result, atomic):
+                yield row
+
+    @abc.abstractmethod
+    def _dumps(self, results):
+        """Yield lines of the output.
+
+        :param results: list of (result, atomic) pairs
+        """
+
+    def _get_compression(self):
+        compress = self.options.get("compress")
+        if compress is None and self.output_destination.endswith(".gz"):
+            compress = "gzip"
+        if compress and compress != "gzip":
+            raise exceptions.InvalidArgumentsException(
+                "Unknown compression '%s'" % compress)
+        return compress
+
+    def _iterate_lines(self):
+        results = [(result, self._get_atomic(result))
+                   for result in self.tasks_results]
+        return self._dumps(results)
+
+    def generate(self):
+        if self.output_destination and self._get_compression():
+            # files of reports are written as text by the caller
+            raise exceptions.InvalidArgumentsException(
+                "Compressed output can be written only by a local Rally")
+        report = "".join(self._iterate_lines())
+        if self.output_destination:
+            return {"files": {self.output_destination: report},
+                    "open": "file://" + os.path.abspath(
+                        self.output_destination)}
+        else:
+            return {"print": report}
+
+    def _open(self, path):
+        if self._get_compression() == "gzip":
+            return gzip.open(path, "wb")
+        return open(path, "wb")
+
+    def write(self):
+        output_file = os.path.expanduser(self.output_destination)
+        with self._open(output_file) as f:
+            batch = []
+            for line in self._iterate_lines():
+                batch.append(line)
+                if len(batch) == self.BATCH_SIZE:
+                    f.write("".join(batch).encode("utf-8"))
+                    batch = []
+            if batch:
+                f.write("".join(batch).encode("utf-8"))
+        return {"open": "file://" + os.path.abspath(output_file)}
+
+
+@exporter.configure("csv")
+class CSVExporter(IterationsExporter):
+    """Exports data of iterations in CSV format.
+
+    There is a row for each iteration with the task and workload UUIDs,
+    the workload name, the timestamp, duration and idle duration of the
+    iteration, the type of its error (empty if it succeeded) and one
+    column per (merged) atomic action of all exported workloads.
+
+    Supported options:
+
+    - compress: "gzip" to compress the output file. Files with ".gz"
+      extension are compressed by default. Compressed files are written
+      by a local Rally only.
+    """
+
+    def _dumps(self, results):
+        atomic_names = []
+        for result, atomic in results:
+            for name in utils.AtomicMerger(atomic).get_merged_names():
+                if name not in atomic_names:
+                    atomic_names.append(name)
+
+        buf = six.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+
+        def _dump_row(row):
+            writer.writerow(row)
+            line = buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            return line
+
+        yield _dump_row(FIELDS + tuple(atomic_names))
+        for row in self._iterate_rows(results):
+            atomic_actions = row.pop("atomic_actions")
+            yield _dump_row(
+                [row[field] for field in FIELDS] +
+                [atomic_actions.get(name) for name in atomic_names])
+
+
+@exporter.configure("ndjson")
+class NDJSONExporter(IterationsExporter):
+    """Exports data of iterations in newline delimited JSON format.
+
+    Each line is a JSON object with data of one iteration: the task and
+    workload UUIDs, the workload name, the timestamp, duration and idle
+    duration of the iteration, the type of its error (null if it
+    succeeded) and durations of (merged) atomic actions.
+
+    Supported options:
+
+    - compress: "gzip" to compress the output file. Files with ".gz"
+      extension are compressed by default. Compressed files are written
+      by a local Rally only.
+    """
+
+    def _dumps(self, results):
+        for row in self._iterate_rows(results):
+            yield json.dumps(row) + "\n"
@@ -13,6 +13,8 @@
 #    under the License.
 import os
 
+import six
+
 from rally.common.io import junit
 from rally.task import exporter
 from rally.task.processing import plot
@@ -101,20 +103,45 @@ class OldJSONResultsMixin(object):
 
     def _generate_tasks_results(self):
         """Prepare raw report."""
-        results = [{"key": x["key"], "result": x["data"]["raw"],
-                    "sla": x["data"]["sla"],
-                    "hooks": x["data"].get("hooks", []),
-                    "load_duration": x["data"]["load_duration"],
-                    "full_duration": x["data"]["full_duration"],
-                    "created_at": x["created_at"]}
-                   for x in self.tasks_results]
+        results = []
+        for x in self.tasks_results:
+            result = {"key": x["key"], "result": x["data"]["raw"],
+                      "sla": x["data"]["sla"],
+                      "hooks": x["data"].get("hooks", []),
+                      "load_duration": x["data"]["load_duration"],
+                      "full_duration": x["data"]["full_duration"],
+                      "created_at": x["created_at"]}
+            if "uuid" in x:
+                # UUID of workload allows to reuse its stored report
+                result["uuid"] = x["uuid"]
+            if x["data"].get("statistics"):
+                # statistics of all iterations, which are sampled for
+                # compacted workloads
+                result["statistics"] = x["data"]["statistics"]
+            results.append(result)
         return results
 
 
 @exporter.configure("html")
 class HTMLExporter(exporter.TaskExporter, OldJSONResultsMixin):
-    """Generates task report in HTML format."""
+    """Generates task report in HTML format.
+
+    Supported options:
+
+    - zipper: the way of reducing the number of points on charts, "avg"
+      (default) averages neighbour points, "minmax" keeps minimal and
+      maximal values so spikes are not flattened.
+    - processes: the number of processes to build charts of workloads in,
+      charts are built in the current process by default. It trades memory
+      for speed, because iterations of up to two workloads per process are
+      loaded into memory at once to pass them to the pool.
+    - compress: whether to embed the data of workloads into the report
+      compressed (default) or as plain JSON, for browsers which can not
+      inflate it.
+    """
     INCLUDE_LIBS = False
+    LAZY_RESULTS = True
+    STREAMING = True
 
     @classmethod
     def validate(cls, output_destination):
@@ -139,17 +166,30 @@ class HTMLExporter(exporter.TaskExporter, OldJSONResultsMixin):
             results.append(task_result)
         return results
 
-    def generate(self):
-        results = self._generate()
-        report = plot.plot(results,
-                           include_libs=self.INCLUDE_LIBS)
+    def _write(self, output):
+        plot.plot_to_file(self._generate(), output,
+                          include_libs=self.INCLUDE_LIBS,
+                          zipper=self.options.get("zipper"),
+                          processes=self.options.get("processes"),
+                          compress=self.options.get("compress", True))
 
+    def generate(self):
+        report = six.StringIO()
+        self._write(report)
         if self.output_destination:
-            return {"files": {self.output_destination: report},
+            return {"files": {self.output_destination: report.getvalue()},
                     "open": "file://" + os.path.abspath(
                         self.output_destination)}
         else:
-            return {"print": report}
+            return {"print": report.getvalue()}
+
+    def write(self):
+        # the report is written workload by workload, so the whole task is
+        # never kept in memory
+        output_file = os.path.expanduser(self.output_destination)
+        with open(output_file, "w+") as f:
+            self._write(f)
+        return {"open": "file://" + os.path.abspath(output_file)}
 
 
 @exporter.configure("html-static")
@@ -179,6 +219,8 @@ class JUnitXMLExporter(HTMLExporter):
       </testsuite>
     """
 
+    STREAMING = False
+
     def generate(self):
         results = self._generate()
         test_suite = junit.JUnit("Rally test suite")
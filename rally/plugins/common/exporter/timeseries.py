@@ -0,0 +1,252 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import shutil
+import tempfile
+
+import six
+
+from rally.common import streaming_algorithms as streaming
+from rally.plugins.common.exporter import iterations
+from rally.task import exporter
+
+
+class IterationsWindow(object):
+    """Aggregated data of iterations started within a window."""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.min_duration = streaming.MinComputation()
+        self.max_duration = streaming.MaxComputation()
+        self.avg_duration = streaming.MeanComputation()
+
+    def add(self, row):
+        self.count += 1
+        if row["error_type"]:
+            self.failed += 1
+        else:
+            self.min_duration.add(row["duration"])
+            self.max_duration.add(row["duration"])
+            self.avg_duration.add(row["duration"])
+
+    def get_fields(self):
+        fields = collections.OrderedDict([("count", self.count),
+                                          ("failed", self.failed)])
+        if self.count > self.failed:
+            fields["duration_min"] = self.min_duration.result()
+            fields["duration_avg"] = self.avg_duration.result()
+            fields["duration_max"] = self.max_duration.result()
+        return fields
+
+
+class TimeSeriesExporter(iterations.IterationsExporter):
+    """Base class for exporters of iterations as time series points.
+
+    There are three kinds of points (measurements):
+
+    - iteration: duration, idle duration, whether the iteration failed
+      and the type of its error, at the timestamp of the iteration;
+    - atomic_action: duration of a merged atomic action, at the timestamp
+      of the iteration;
+    - iterations_window: the number of iterations started within a window
+      (one second), the number of failed ones and min/avg/max durations of
+      successful ones, at the start of the window.
+
+    Points are tagged with the task UUID, the workload name, the runner
+    type and the name of atomic action.
+    """
+
+    # Length of windows of aggregated points in seconds
+    WINDOW = 1
+
+    def _get_tags(self, result):
+        return collections.OrderedDict([
+            ("task", result["task_uuid"]),
+            ("workload", result["key"]["name"]),
+            ("runner", result["key"]["kw"].get("runner", {}).get("type", ""))
+        ])
+
+    def _iterate_points(self, result, atomic):
+        """Yield points of the workload.
+
+        :param result: workload result
+        :param atomic: atomic actions data of workload result
+        :returns: generator of (measurement, tags, fields, timestamp)
+        """
+        tags = self._get_tags(result)
+        windows = collections.defaultdict(IterationsWindow)
+        for row in self._iterate_workload_rows(result, atomic):
+            fields = collections.OrderedDict([
+                ("duration", row["duration"]),
+                ("idle_duration", row["idle_duration"]),
+                ("failed", bool(row["error_type"]))])
+            if row["error_type"]:
+                fields["error_type"] = row["error_type"]
+            yield "iteration", tags, fields, row["timestamp"]
+
+            for name, duration in row["atomic_actions"].items():
+                action_tags = collections.OrderedDict(tags)
+                action_tags["action"] = name
+                yield ("atomic_action", action_tags, {"duration": duration},
+                       row["timestamp"])
+
+            start = row["timestamp"] // self.WINDOW * self.WINDOW
+            windows[start].add(row)
+
+        # windows take memory per second of the load, not per iteration
+        for start in sorted(windows):
+            yield ("iterations_window", tags, windows[start].get_fields(),
+                   start)
+
+
+@exporter.configure("influxdb-line")
+class InfluxDBLineExporter(TimeSeriesExporter):
+    """Exports data of iterations in InfluxDB line protocol.
+
+    Iterations, atomic actions and per-second aggregates of iterations
+    are written as points of "rally_iteration", "rally_atomic_action"
+    and "rally_iterations_window" measurements with nanosecond timestamps
+    and "task", "workload", "runner" and "action" tags.
+
+    Supported options:
+
+    - compress: "gzip" to compress the output file. Files with ".gz"
+      extension are compressed by default.
+    """
+
+    @staticmethod
+    def _escape(value, chars):
+        value = six.text_type(value).replace("\\", "\\\\")
+        for char in chars:
+            value = value.replace(char, "\\" + char)
+        return value
+
+    @classmethod
+    def _format_field(cls, value):
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        elif isinstance(value, six.integer_types):
+            return "%di" % value
+        elif isinstance(value, float):
+            return repr(value)
+        return "\"%s\"" % cls._escape(value, "\"")
+
+    @classmethod
+    def _format_line(cls, measurement, tags, fields, timestamp):
+        key = ",".join(
+            [cls._escape("rally_" + measurement, ", ")] +
+            ["%s=%s" % (cls._escape(k, ",= "), cls._escape(v, ",= "))
+             for k, v in tags.items() if v != ""])
+        fields = ",".join("%s=%s" % (cls._escape(k, ",= "),
+                                     cls._format_field(v))
+                          for k, v in fields.items())
+        return "%s %s %d\n" % (key, fields, int(round(timestamp * 10 ** 9)))
+
+    def _dumps(self, results):
+        for result, atomic in results:
+            for point in self._iterate_points(result, atomic):
+                yield self._format_line(*point)
+
+
+@exporter.configure("openmetrics")
+class OpenMetricsExporter(TimeSeriesExporter):
+    """Exports data of iterations in OpenMetrics text format.
+
+    Iterations, atomic actions and per-second aggregates of iterations
+    are written as samples of gauges with timestamps of iterations and
+    "task", "workload", "runner" and "action" labels. Samples are grouped
+    by metric families as the format requires, so they are spooled to
+    temporary files while iterations are read once.
+
+    Supported options:
+
+    - compress: "gzip" to compress the output file. Files with ".gz"
+      extension are compressed by default.
+    """
+
+    # (measurement, field, metric family, unit, help)
+    FAMILIES = (
+        ("iteration", "duration", "rally_iteration_duration_seconds",
+         "seconds", "Duration of iterations."),
+        ("iteration", "idle_duration",
+         "rally_iteration_idle_duration_seconds", "seconds",
+         "Idle duration of iterations."),
+        ("iteration", "failed", "rally_iteration_failed", None,
+         "Whether iterations failed."),
+        ("atomic_action", "duration", "rally_atomic_action_duration_seconds",
+         "seconds", "Duration of atomic actions."),
+        ("iterations_window", "count", "rally_window_iterations", None,
+         "Number of iterations started within a second."),
+        ("iterations_window", "failed", "rally_window_failed_iterations",
+         None, "Number of failed iterations started within a second."),
+        ("iterations_window", "duration_min",
+         "rally_window_duration_min_seconds", "seconds",
+         "Minimal duration of successful iterations within a second."),
+        ("iterations_window", "duration_avg",
+         "rally_window_duration_avg_seconds", "seconds",
+         "Average duration of successful iterations within a second."),
+        ("iterations_window", "duration_max",
+         "rally_window_duration_max_seconds", "seconds",
+         "Maximal duration of successful iterations within a second."))
+
+    @staticmethod
+    def _format_sample(family, tags, value, timestamp):
+        labels = ",".join(
+            "%s=\"%s\"" % (k, six.text_type(v).replace("\\", "\\\\")
+                           .replace("\n", "\\n").replace("\"", "\\\""))
+            for k, v in tags.items())
+        return "%s{%s} %r %r\n" % (family, labels, float(value),
+                                   float(timestamp))
+
+    def _dumps(self, results):
+        families = collections.defaultdict(list)
+        for measurement, field, family, unit, help_ in self.FAMILIES:
+            families[measurement].append((field, family))
+
+        spools = dict((f[2], tempfile.TemporaryFile(mode="w+"))
+                      for f in self.FAMILIES)
+        try:
+            for result, atomic in results:
+                # samples of each metric (label set) must be contiguous
+                metrics = collections.OrderedDict()
+                for measurement, tags, fields, timestamp in (
+                        self._iterate_points(result, atomic)):
+                    for field, family in families[measurement]:
+                        if field not in fields:
+                            continue
+                        key = (family, tuple(tags.items()))
+                        if key not in metrics:
+                            metrics[key] = tempfile.TemporaryFile(mode="w+")
+                        metrics[key].write(self._format_sample(
+                            family, tags, fields[field], timestamp))
+                for (family, labels), metric in metrics.items():
+                    metric.seek(0)
+                    shutil.copyfileobj(metric, spools[family])
+                    metric.close()
+
+            for measurement, field, family, unit, help_ in self.FAMILIES:
+                yield "# TYPE %s gauge\n" % family
+                if unit:
+                    yield "# UNIT %s %s\n" % (family, unit)
+                yield "# HELP %s %s\n" % (family, help_)
+                spools[family].seek(0)
+                for line in spools[family]:
+                    yield line
+            yield "# EOF\n"
+        finally:
+            for spool in spools.values():
+                spool.close()
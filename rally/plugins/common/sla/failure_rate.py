@@ -54,6 +54,21 @@ class FailureRate(sla.SLA):
         self.success = self.min_percent <= self.error_rate <= self.max_percent
         return self.success
 
+    def add_iterations(self, iterations):
+        passed = True
+        for iteration in iterations:
+            self.total += 1
+            if iteration["error"]:
+                self.errors += 1
+            if passed and not (self.min_percent <=
+                               self.errors * 100.0 / self.total <=
+                               self.max_percent):
+                passed = False
+        if self.total:
+            self.error_rate = self.errors * 100.0 / self.total
+        self.success = self.min_percent <= self.error_rate <= self.max_percent
+        return passed
+
     def merge(self, other):
         self.total += other.total
         self.errors += other.errors
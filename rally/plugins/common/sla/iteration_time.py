@@ -39,6 +39,16 @@ class IterationTime(sla.SLA):
         self.success = self.max_iteration_time <= self.criterion_value
         return self.success
 
+    def add_iterations(self, iterations):
+        # The maximum can only grow, so the check fails for some
+        # iteration of the batch if and only if it fails for the last one
+        if iterations:
+            self.max_iteration_time = max(
+                self.max_iteration_time,
+                max(iteration["duration"] for iteration in iterations))
+        self.success = self.max_iteration_time <= self.criterion_value
+        return self.success
+
     def merge(self, other):
         if other.max_iteration_time > self.max_iteration_time:
             self.max_iteration_time = other.max_iteration_time
@@ -42,6 +42,18 @@ class MaxAverageDuration(sla.SLA):
         self.success = self.avg <= self.criterion_value
         return self.success
 
+    def add_iterations(self, iterations):
+        passed = True
+        comp = self.avg_comp
+        for iteration in iterations:
+            if not iteration.get("error"):
+                comp.add(iteration["duration"])
+                self.avg = comp.result()
+            if self.avg > self.criterion_value:
+                passed = False
+        self.success = self.avg <= self.criterion_value
+        return passed
+
     def merge(self, other):
         self.avg_comp.merge(other.avg_comp)
         self.avg = self.avg_comp.result() or 0.0
@@ -54,6 +54,21 @@ class MaxAverageDurationPerAtomic(sla.SLA):
                            for atom, val in self.criterion_items)
         return self.success
 
+    def add_iterations(self, iterations):
+        passed = True
+        for iteration in iterations:
+            if not iteration.get("error"):
+                for action, value in iteration["atomic_actions"].items():
+                    comp = self.avg_comp_by_action[action]
+                    comp.add(value)
+                    self.avg_by_action[action] = comp.total / comp.count
+            if passed:
+                passed = all(self.avg_by_action[atom] <= val
+                             for atom, val in self.criterion_items)
+        self.success = all(self.avg_by_action[atom] <= val
+                           for atom, val in self.criterion_items)
+        return passed and self.success
+
     def merge(self, other):
         for atom, comp in self.avg_comp_by_action.items():
             if atom in other.avg_comp_by_action:
@@ -0,0 +1,218 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+from __future__ import division
+
+import collections
+import contextlib
+import math
+
+from rally.common.i18n import _
+from rally import consts
+from rally.task import sla
+
+
+@sla.configure(name="min_throughput")
+class MinThroughput(sla.SLA):
+    """Minimum number of successful iterations completed per second.
+
+    Completed iterations are counted in one-second buckets and the
+    throughput is checked in a window sliding over them, so each iteration
+    is processed in O(1) amortized time. The criterion fails if the
+    throughput of any window after the warm-up period is below the target.
+
+    The target is an absolute number of iterations per second (min_rps)
+    and/or a ratio of the rate requested by the "rps" runner (min_ratio),
+    the criterion fails if min_ratio is used with another runner.
+    A window is checked when iterations completed at least one window length
+    after it are seen, so late results are still taken into account. The
+    remaining complete windows are checked when the result is read.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "min_rps": {"type": "number", "minimum": 0.0,
+                        "exclusiveMinimum": True},
+            "min_ratio": {"type": "number", "minimum": 0.0,
+                          "exclusiveMinimum": True, "maximum": 1.0},
+            "window": {"type": "integer", "minimum": 1},
+            "warmup": {"type": "number", "minimum": 0.0}
+        },
+        "anyOf": [
+            {"description": "Minimum number of iterations per second.",
+             "required": ["min_rps"]},
+            {"description": "Minimum ratio of the rate requested by "
+                            "the rps runner.",
+             "required": ["min_ratio"]}],
+        "additionalProperties": False
+    }
+
+    DEFAULT_WINDOW = 10
+
+    def __init__(self, criterion_value):
+        super(MinThroughput, self).__init__(criterion_value)
+        self.min_rps = self.criterion_value.get("min_rps")
+        self.min_ratio = self.criterion_value.get("min_ratio")
+        self.window = self.criterion_value.get("window", self.DEFAULT_WINDOW)
+        self.warmup = self.criterion_value.get("warmup", self.window)
+        self.requested_rps = None
+        self.config_error = None
+
+        self.counts = collections.defaultdict(int)
+        self.started_at = None
+        self.finished_at = None
+        self._reset_windows()
+
+    def set_workload_config(self, config):
+        runner = config.get("runner", {})
+        if runner.get("type") == "rps":
+            self.requested_rps = runner["rps"]
+        elif self.min_ratio:
+            self.config_error = (
+                _("min_ratio requires the \"rps\" runner, got \"%s\"")
+                % runner.get("type"))
+            self.success = False
+
+    def _reset_windows(self):
+        self.next_window = None
+        self.window_count = 0
+        # (offset of the window start, throughput, target) of the window
+        # with the lowest throughput to target ratio
+        self.worst_window = None
+        self.success = self.config_error is None
+
+    def _get_requested_rps(self, offset):
+        if isinstance(self.requested_rps, dict):
+            cfg = self.requested_rps
+            stage = int(offset // cfg.get("duration", 1))
+            return min(cfg["start"] + cfg["step"] * stage, cfg["end"])
+        return self.requested_rps
+
+    def _get_target(self, offset):
+        targets = []
+        if self.min_rps:
+            targets.append(self.min_rps)
+        if self.min_ratio and self.requested_rps:
+            targets.append(self.min_ratio * self._get_requested_rps(offset))
+        return max(targets) if targets else None
+
+    def _check_window(self):
+        offset = self.next_window - self.started_at
+        target = self._get_target(offset)
+        if target is None:
+            return
+        throughput = self.window_count / self.window
+        if (self.worst_window is None
+                or throughput / target <
+                self.worst_window[1] / self.worst_window[2]):
+            self.worst_window = (offset, throughput, target)
+            self.success = throughput >= target
+
+    def _process_windows(self, final=False):
+        if self.config_error:
+            return False
+        if self.next_window is None:
+            self.next_window = int(math.ceil(self.started_at + self.warmup))
+            self.window_count = sum(
+                self.counts.get(self.next_window + i, 0)
+                for i in range(self.window))
+        # iterations which finish later may still get into the windows
+        # before the last one until the workload is over
+        margin = self.window if final else 2 * self.window
+        while self.next_window + margin <= self.finished_at:
+            self._check_window()
+            self.window_count += (
+                self.counts.get(self.next_window + self.window, 0) -
+                self.counts.get(self.next_window, 0))
+            self.next_window += 1
+        return self.success
+
+    def add_iteration(self, iteration):
+        finished_at = iteration["timestamp"] + iteration["duration"]
+        if self.started_at is None:
+            self.started_at = iteration["timestamp"]
+            self.finished_at = finished_at
+        self.finished_at = max(self.finished_at, finished_at)
+
+        if not iteration.get("error"):
+            bucket = int(finished_at)
+            self.counts[bucket] += 1
+            if (self.next_window is not None and
+                    self.next_window <= bucket < (self.next_window +
+                                                  self.window)):
+                self.window_count += 1
+        return self._process_windows()
+
+    def merge(self, other):
+        if other.started_at is None:
+            return self.success
+        if self.started_at is None:
+            self.started_at = other.started_at
+            self.finished_at = other.finished_at
+        self.started_at = min(self.started_at, other.started_at)
+        self.finished_at = max(self.finished_at, other.finished_at)
+        for bucket, count in other.counts.items():
+            self.counts[bucket] += count
+
+        self._reset_windows()
+        return self._process_windows()
+
+    @contextlib.contextmanager
+    def _final_windows(self):
+        """Check the remaining complete windows till the end of the block.
+
+        The state is restored after the block, so iterations can be added
+        after the result is read.
+        """
+        state = (self.next_window, self.window_count, self.worst_window,
+                 self.success)
+        if self.started_at is not None:
+            self._process_windows(final=True)
+        try:
+            yield
+        finally:
+            (self.next_window, self.window_count, self.worst_window,
+             self.success) = state
+
+    def result(self):
+        with self._final_windows():
+            return super(MinThroughput, self).result()
+
+    def details(self):
+        with self._final_windows():
+            return self._details()
+
+    def _details(self):
+        if self.config_error:
+            return "%s - %s" % (self.config_error, self.status())
+        if self.worst_window is None:
+            return (_("No %(window)ds windows after %(warmup)gs of warm-up "
+                      "to check throughput - %(status)s")
+                    % {"window": self.window, "warmup": self.warmup,
+                       "status": self.status()})
+        offset, throughput, target = self.worst_window
+        return (_("Lowest throughput in %(window)ds window: %(value).2f "
+                  ">= %(target).2f iterations per second (at %(offset).1fs)"
+                  " - %(status)s")
+                % {"window": self.window, "value": throughput,
+                   "target": target, "offset": offset,
+                   "status": self.status()})
@@ -0,0 +1,136 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+from __future__ import division
+
+import collections
+import math
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally import consts
+from rally.task import sla
+
+
+TOTAL = "total"
+
+
+@sla.configure(name="percentile_duration")
+class PercentileDuration(sla.SLA):
+    """Maximum duration of the given percentile of iterations in seconds.
+
+    Durations of successful iterations (and, optionally, of their atomic
+    actions) are accounted by a streaming sketch, so the criterion uses
+    constant memory and the check of each iteration takes constant time.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "percentile": {"type": "number",
+                           "minimum": 0.0, "exclusiveMinimum": True,
+                           "maximum": 100.0},
+            "max": {"type": "number", "minimum": 0.0,
+                    "exclusiveMinimum": True},
+            "max_per_atomic": {
+                "type": "object",
+                "patternProperties": {".*": {
+                    "type": "number",
+                    "minimum": 0.0,
+                    "exclusiveMinimum": True,
+                    "description": "The name of atomic action."}},
+                "minProperties": 1,
+                "additionalProperties": False}
+        },
+        "required": ["percentile"],
+        "anyOf": [
+            {"description": "Limit the duration of iterations.",
+             "required": ["max"]},
+            {"description": "Limit durations of atomic actions.",
+             "required": ["max_per_atomic"]}],
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(PercentileDuration, self).__init__(criterion_value)
+        self.percentile = self.criterion_value["percentile"]
+        self.limits = collections.OrderedDict()
+        if "max" in self.criterion_value:
+            self.limits[TOTAL] = self.criterion_value["max"]
+        self.limits.update(
+            sorted(self.criterion_value.get("max_per_atomic", {}).items()))
+        self.sketches = dict(
+            (name, streaming_algorithms.PercentileSketchComputation(
+                self.percentile / 100.0))
+            for name in self.limits)
+        # The number of values exceeding the limit is enough to check the
+        # criterion exactly, the sketches are used for reporting only.
+        self.exceeded = dict((name, 0) for name in self.limits)
+
+    def _add_value(self, name, value):
+        self.sketches[name].add(value)
+        if value > self.limits[name]:
+            self.exceeded[name] += 1
+
+    def _is_passed(self, name):
+        count = self.sketches[name].count
+        if not count:
+            return True
+        rank = int(math.ceil(self.percentile / 100.0 * (count - 1)))
+        return count - self.exceeded[name] > rank
+
+    def _check(self):
+        self.success = all(self._is_passed(name) for name in self.limits)
+        return self.success
+
+    def add_iteration(self, iteration):
+        if not iteration.get("error"):
+            if TOTAL in self.limits:
+                self._add_value(TOTAL, iteration["duration"])
+            for name, value in iteration["atomic_actions"].items():
+                if name in self.limits and name != TOTAL:
+                    self._add_value(name, value)
+        return self._check()
+
+    def merge(self, other):
+        for name in self.limits:
+            self.sketches[name].merge(other.sketches[name])
+            self.exceeded[name] += other.exceeded[name]
+        return self._check()
+
+    def _format_value(self, name):
+        value = self.sketches[name].result()
+        if value is None:
+            return "n/a"
+        return "%.2fs" % value
+
+    def details(self):
+        strs = []
+        for name, limit in self.limits.items():
+            if name == TOTAL:
+                strs.append(_("Iteration. %s <= %.2fs")
+                            % (self._format_value(name), limit))
+            else:
+                strs.append(_("Action: '%s'. %s <= %.2fs")
+                            % (name, self._format_value(name), limit))
+        head = _("%g%%ile of durations:") % self.percentile
+        end = _("Status: %s") % self.status()
+        return "\n".join([head] + strs + [end])
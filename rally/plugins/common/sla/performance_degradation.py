@@ -63,6 +63,17 @@ class PerformanceDegradation(sla.SLA):
         self.success = self.degradation.result() <= self.max_degradation
         return self.success
 
+    def add_iterations(self, iterations):
+        # The degradation can only grow, so it is enough to process the
+        # extremes of the batch and check the result once
+        durations = [iteration["duration"] for iteration in iterations
+                     if not iteration.get("error")]
+        if durations:
+            self.degradation.add(min(durations))
+            self.degradation.add(max(durations))
+        self.success = self.degradation.result() <= self.max_degradation
+        return self.success
+
     def merge(self, other):
         self.degradation.merge(other.degradation)
         self.success = self.degradation.result() <= self.max_degradation
@@ -26,6 +26,7 @@ from oslo_config import cfg
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import objects
+from rally.common import streaming_algorithms
 from rally.common import utils
 from rally import consts
 from rally import exceptions
@@ -57,8 +58,12 @@ class ResultConsumer(object):
     about started iterations.
     """
 
+    # The maximal time between checks of the task status in the database,
+    # notifications of abort channel make it checked at once
+    ABORT_CHECK_INTERVAL = 2.0
+
     def __init__(self, key, task, subtask, workload, runner,
-                 abort_on_sla_failure):
+                 abort_on_sla_failure, abort_channel=None):
         """ResultConsumer constructor.
 
         :param key: Scenario identifier
@@ -69,6 +74,8 @@ class ResultConsumer(object):
                        consumed
         :param abort_on_sla_failure: True if the execution should be stopped
                                      when some SLA check fails
+        :param abort_channel: rally.common.utils.AbortChannel of the task
+                              which is listened to
         """
 
         self.key = key
@@ -79,10 +86,19 @@ class ResultConsumer(object):
         self.load_started_at = float("inf")
         self.load_finished_at = 0
         self.workload_data_count = 0
+        # Summary of consumed iterations, so statistics of the workload
+        # need one more pass over stored iterations only
+        self.summary = objects.task.IterationsSummary()
+        # Time from the end of an iteration to the SLA check (and abort
+        # decision) made for it
+        self.sla_check_latency = {
+            "max": streaming_algorithms.MaxComputation(),
+            "avg": streaming_algorithms.MeanComputation()}
 
         self.sla_checker = sla.SLAChecker(key["kw"])
         self.hook_executor = hook.HookExecutor(key["kw"], self.task)
         self.abort_on_sla_failure = abort_on_sla_failure
+        self.abort_channel = abort_channel
         self.is_done = threading.Event()
         self.unexpected_failure = {}
         self.results = []
@@ -105,30 +121,50 @@ class ResultConsumer(object):
             if self.runner.result_queue:
                 results = self.runner.result_queue.popleft()
                 self.results.extend(results)
+                first_finished_at = float("inf")
                 for r in results:
+                    self.summary.add(r)
+                    finished_at = r["duration"] + r["timestamp"]
                     self.load_started_at = min(r["timestamp"],
                                                self.load_started_at)
-                    self.load_finished_at = max(r["duration"] + r["timestamp"],
+                    self.load_finished_at = max(finished_at,
                                                 self.load_finished_at)
-                    success = self.sla_checker.add_iteration(r)
-                    if (self.abort_on_sla_failure and
-                            not success and
-                            not task_aborted):
-                        self.sla_checker.set_aborted_on_sla()
-                        self.runner.abort()
-                        self.task.update_status(
-                            consts.TaskStatus.SOFT_ABORTING)
-                        task_aborted = True
-
-                # save results chunks
+                    first_finished_at = min(finished_at, first_finished_at)
+                success = self.sla_checker.add_iterations(results)
+                latency = None
+                if results:
+                    latency = max(time.time() - first_finished_at, 0)
+                    self.sla_check_latency["max"].add(latency)
+                    self.sla_check_latency["avg"].add(latency)
+                if (self.abort_on_sla_failure and
+                        not success and
+                        not task_aborted):
+                    if latency is None:
+                        LOG.info("SLA failure is detected, aborting the "
+                                 "workload.")
+                    else:
+                        LOG.info("SLA failure is detected in %s after the "
+                                 "end of iteration, aborting the workload."
+                                 % utils.format_float_to_str(latency))
+                    self.sla_checker.set_aborted_on_sla()
+                    self.runner.abort()
+                    self.task.update_status(
+                        consts.TaskStatus.SOFT_ABORTING)
+                    task_aborted = True
+
+                # save results chunks, the ones which are filled at once
+                # are stored by a single transaction
                 chunk_size = CONF.raw_result_chunk_size
-                while len(self.results) >= chunk_size:
-                    results_chunk = self.results[:chunk_size]
-                    self.results = self.results[chunk_size:]
-                    results_chunk.sort(key=lambda x: x["timestamp"])
-                    self.workload.add_workload_data(self.workload_data_count,
-                                                    {"raw": results_chunk})
-                    self.workload_data_count += 1
+                stored = len(self.results) // chunk_size * chunk_size
+                if stored:
+                    chunks = []
+                    for idx in range(0, stored, chunk_size):
+                        chunks.append(objects.Workload.make_data_chunk(
+                            self.workload_data_count,
+                            self.results[idx:idx + chunk_size]))
+                        self.workload_data_count += 1
+                    self.results = self.results[stored:]
+                    self.workload.add_workload_data_chunks(chunks)
 
             elif self.is_done.isSet():
                 break
@@ -147,6 +183,9 @@ class ResultConsumer(object):
     def __exit__(self, exc_type, exc_value, exc_traceback):
         self.finish = time.time()
         self.is_done.set()
+        if self.abort_channel:
+            # wake up the aborting checker to not wait for its timeout
+            self.abort_channel.notify()
         self.aborting_checker.join()
         self.thread.join()
 
@@ -165,6 +204,12 @@ class ResultConsumer(object):
                  utils.format_float_to_str(self.runner.run_duration))
         LOG.info("Full duration is: %s" % utils.format_float_to_str(
             self.finish - self.start))
+        if self.sla_check_latency["avg"].result() is not None:
+            LOG.info("SLA check latency is: %s (max %s)" % (
+                utils.format_float_to_str(
+                    self.sla_check_latency["avg"].result()),
+                utils.format_float_to_str(
+                    self.sla_check_latency["max"].result())))
 
         results = {
             "load_duration": load_duration,
@@ -178,11 +223,16 @@ class ResultConsumer(object):
         if self.results:
             # NOTE(boris-42): Sort in order of starting
             #                 instead of order of ending
-            self.results.sort(key=lambda x: x["timestamp"])
-            self.workload.add_workload_data(self.workload_data_count,
-                                            {"raw": self.results})
+            self.workload.add_workload_data_chunks(
+                [objects.Workload.make_data_chunk(self.workload_data_count,
+                                                  self.results)])
 
-        self.workload.set_results(results)
+        sla_check_latency = None
+        if self.sla_check_latency["avg"].result() is not None:
+            sla_check_latency = dict(
+                (k, v.result()) for k, v in self.sla_check_latency.items())
+        self.workload.set_results(results, summary=self.summary,
+                                  sla_check_latency=sla_check_latency)
 
     @staticmethod
     def is_task_in_aborting_status(task_uuid, check_soft=True):
@@ -202,7 +252,8 @@ class ResultConsumer(object):
         """Waits until abort signal is received and aborts runner in this case.
 
         Has to be run from different thread simultaneously with the
-        runner.run method.
+        runner.run method. The status of the task is checked at once when
+        the abort channel is notified, and periodically otherwise.
         """
 
         while not self.is_done.isSet():
@@ -211,7 +262,10 @@ class ResultConsumer(object):
                 self.runner.abort()
                 self.task.update_status(consts.TaskStatus.ABORTED)
                 break
-            time.sleep(2.0)
+            if self.abort_channel:
+                self.abort_channel.wait(self.ABORT_CHECK_INTERVAL)
+            else:
+                time.sleep(self.ABORT_CHECK_INTERVAL)
 
 
 class TaskAborted(Exception):
@@ -262,6 +316,7 @@ class TaskEngine(object):
         self.task = task
         self.deployment = deployment
         self.abort_on_sla_failure = abort_on_sla_failure
+        self.abort_channel = utils.AbortChannel(task["uuid"])
 
     def _validate_workload(self, workload, credentials=None, vtype=None):
         scenario_cls = scenario.Scenario.get(workload.name)
@@ -501,6 +556,8 @@ class TaskEngine(object):
         """
         self.task.update_status(consts.TaskStatus.RUNNING)
 
+        # processes aborting the task on this host notify the engine
+        self.abort_channel.listen()
         try:
             for subtask in self.config.subtasks:
                 self._run_subtask(subtask)
@@ -511,6 +568,8 @@ class TaskEngine(object):
             if objects.Task.get_status(
                     self.task["uuid"]) != consts.TaskStatus.ABORTED:
                 self.task.update_status(consts.TaskStatus.FINISHED)
+        finally:
+            self.abort_channel.close()
 
     def _run_subtask(self, subtask):
         subtask_obj = self.task.add_subtask(**subtask.to_dict())
@@ -547,7 +606,8 @@ class TaskEngine(object):
             workload.context, workload.name, workload_obj["uuid"])
         try:
             with ResultConsumer(key, self.task, subtask_obj, workload_obj,
-                                runner_obj, self.abort_on_sla_failure):
+                                runner_obj, self.abort_on_sla_failure,
+                                abort_channel=self.abort_channel):
                 with context.ContextManager(context_obj):
                     runner_obj.run(workload.name, context_obj,
                                    workload.args)
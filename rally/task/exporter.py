@@ -80,17 +80,31 @@ class Exporter(plugin.Plugin):
 class TaskExporter(plugin.Plugin):
     """Base class for all exporters for Tasks."""
 
-    def __init__(self, tasks_results, output_destination, api=None):
+    # Whether the exporter can handle results, which iterations ("data" /
+    # "raw") are not loaded in advance but read from the database chunk by
+    # chunk on every pass over them. Such results are passed as an iterator.
+    LAZY_RESULTS = False
+
+    # Whether the exporter can write the report to the output destination
+    # piece by piece by itself, see write(). It is done only on demand of
+    # the caller, because files are written by the process which runs the
+    # export, that is by the Rally service if Rally is used remotely.
+    STREAMING = False
+
+    def __init__(self, tasks_results, output_destination, api=None,
+                 options=None):
         """Init reporter
 
         :param tasks_results: list of results to generate report for
         :param output_destination: destination of export
         :param api: an instance of rally.api.API object
+        :param options: a dict with exporter specific options
         """
         super(TaskExporter, self).__init__()
         self.tasks_results = tasks_results
         self.output_destination = output_destination
         self.api = api
+        self.options = options or {}
 
     @classmethod
     @abc.abstractmethod
@@ -113,8 +127,21 @@ class TaskExporter(plugin.Plugin):
               --open flag
         """
 
+    def write(self):
+        """Write report to the output destination piece by piece.
+
+        It is implemented by exporters with STREAMING set and is called
+        instead of generate() if the caller asks to stream the report, so
+        the report is never kept in memory as a whole.
+
+        :returns: a dict with the same elements as generate() returns,
+            except "files" which are written already
+        """
+        raise NotImplementedError()
+
     @staticmethod
-    def make(exporter_cls, task_results, output_destination, api=None):
+    def make(exporter_cls, task_results, output_destination, api=None,
+             options=None, stream=False):
         """Initialize exporter, generate and validate result.
 
         It is a base method which is called from API layer. It cannot be
@@ -124,9 +151,19 @@ class TaskExporter(plugin.Plugin):
         :param task_results: list of results to generate report for
         :param output_destination: destination of export
         :param api: an instance of rally.api.API object
+        :param options: a dict with exporter specific options
+        :param stream: whether to let exporters with STREAMING set write
+            the report to the output destination by themselves
         """
-        report = exporter_cls(task_results, output_destination,
-                              api).generate()
+        # Exporters which are not aware of options can override __init__
+        # without the "options" argument
+        kwargs = {"options": options} if options else {}
+        reporter = exporter_cls(task_results, output_destination,
+                                api, **kwargs)
+        if stream and output_destination and exporter_cls.STREAMING:
+            report = reporter.write()
+        else:
+            report = reporter.generate()
 
         jsonschema.validate(report, REPORT_RESPONSE_SCHEMA)
 
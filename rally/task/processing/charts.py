@@ -38,18 +38,20 @@ class Chart(plugin.Plugin):
     def widget(self):
         """Widget name to display this chart by JavaScript."""
 
-    def __init__(self, workload_info, zipped_size=1000):
+    def __init__(self, workload_info, zipped_size=1000, zipper=None):
         """Setup initial values.
 
         :param workload_info: dict, generalized info about iterations.
                                The most important value is `iterations_count'
                                that should have int value of total data size
         :param zipped_size: int maximum number of points on scale
+        :param zipper: str name of graph zipper (one of utils.ZIPPERS)
         """
         self._data = collections.OrderedDict()  # Container for results
         self._workload_info = workload_info
         self.base_size = workload_info.get("iterations_count", 0)
         self.zipped_size = zipped_size
+        self._zipper_cls = utils.get_zipper(zipper)
 
     def add_iteration(self, iteration):
         """Add iteration data.
@@ -61,8 +63,8 @@ class Chart(plugin.Plugin):
         """
         for name, value in self._map_iteration_values(iteration):
             if name not in self._data:
-                self._data[name] = utils.GraphZipper(self.base_size,
-                                                     self.zipped_size)
+                self._data[name] = self._zipper_cls(self.base_size,
+                                                    self.zipped_size)
             self._data[name].add_point(value)
 
     def render(self):
@@ -407,8 +409,10 @@ class OutputChart(Chart):
     """Base class for charts related to scenario output."""
 
     def __init__(self, workload_info, zipped_size=1000,
-                 title="", description="", label="", axis_label=""):
-        super(OutputChart, self).__init__(workload_info, zipped_size)
+                 title="", description="", label="", axis_label="",
+                 zipper=None):
+        super(OutputChart, self).__init__(workload_info, zipped_size,
+                                          zipper=zipper)
         self.title = title
         self.description = description
         self.label = label
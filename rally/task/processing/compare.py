@@ -0,0 +1,232 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Statistical comparison of workloads results of two tasks."""
+
+from __future__ import division
+
+import collections
+import math
+
+from rally.common import streaming_algorithms as streaming
+from rally.task.processing import plot
+from rally.task.processing import utils
+
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+NO_CHANGE = "no change"
+NOT_AVAILABLE = "n/a"
+
+
+def mann_whitney_u(sample_a, sample_b):
+    """Two-sided Mann-Whitney U test.
+
+    The p-value is calculated with normal approximation, corrected
+    for ties and continuity, so it is accurate enough for samples
+    of at least ~10 values each, which covers the benchmarks use case.
+
+    :param sample_a: list of numbers
+    :param sample_b: list of numbers
+    :returns: tuple (U statistic for sample_a, p-value)
+    """
+    n_a, n_b = len(sample_a), len(sample_b)
+    if not n_a or not n_b:
+        raise ValueError("Both samples should contain values.")
+
+    values = sorted([(v, 0) for v in sample_a] + [(v, 1) for v in sample_b])
+    n = n_a + n_b
+    rank_sum_a = 0.0
+    ties_correction = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        # equal values share the average of their ranks
+        rank = (i + j) / 2.0 + 1
+        ties = j - i + 1
+        ties_correction += ties ** 3 - ties
+        rank_sum_a += rank * sum(1 for v in values[i:j + 1] if v[1] == 0)
+        i = j + 1
+
+    u_a = rank_sum_a - n_a * (n_a + 1) / 2.0
+    mean_u = n_a * n_b / 2.0
+    variance = n_a * n_b / 12.0 * ((n + 1) - ties_correction / (n * (n - 1)))
+    if variance <= 0:
+        return u_a, 1.0
+    z = (abs(u_a - mean_u) - 0.5) / math.sqrt(variance)
+    p_value = math.erfc(max(z, 0) / math.sqrt(2))
+    return u_a, min(p_value, 1.0)
+
+
+def _delta(old, new):
+    if old is None or new is None:
+        return None
+    if not old:
+        return 0.0 if not new else None
+    return (new - old) / old * 100.0
+
+
+def _get_durations(workload):
+    """Collect durations of successful iterations by action name.
+
+    :param workload: extended workload results
+    :returns: OrderedDict with action names as keys and lists
+        of durations as values. Duration of the whole iteration
+        is stored under the "total" key.
+    """
+    atomic_merger = utils.AtomicMerger(workload["info"]["atomic"])
+    durations = collections.OrderedDict(
+        (name, []) for name in atomic_merger.get_merged_names())
+    durations["total"] = []
+    for itr in workload["iterations"]:
+        if itr["error"]:
+            continue
+        atomic_actions = atomic_merger.merge_atomic_actions(
+            itr["atomic_actions"])
+        for name, duration in atomic_actions.items():
+            durations[name].append(duration)
+        durations["total"].append(itr["duration"])
+    return durations
+
+
+def _get_stored_percentiles(workload):
+    """Get medians and 95 percentiles of actions from workload statistics.
+
+    Statistics are calculated of all iterations of the workload, so they
+    are exact even if only a sample of iterations is stored.
+
+    :param workload: extended workload results
+    :returns: dict with action names as keys and (median, 95 percentile)
+        tuples as values, None stands for a value which is not available
+    """
+    stat = workload["info"].get("stat")
+    if not stat:
+        return {}
+    median_idx = stat["cols"].index("Median (sec)")
+    p95_idx = stat["cols"].index("95%ile (sec)")
+    return dict((row[0], tuple(None if row[i] == "n/a" else row[i]
+                               for i in (median_idx, p95_idx)))
+                for row in stat["rows"])
+
+
+def _group_by_config(workloads):
+    trends = plot.Trends()
+    groups = collections.OrderedDict()
+    for workload in workloads:
+        key = trends._make_hash(workload["key"]["kw"])
+        groups.setdefault(key, []).append(workload)
+    return groups
+
+
+def compare_actions(durations_a, durations_b, alpha=0.05,
+                    percentiles_a=None, percentiles_b=None):
+    """Compare two samples of durations of the same action.
+
+    :param durations_a: list of durations of the base run
+    :param durations_b: list of durations of the run to check
+    :param alpha: significance level of the Mann-Whitney U test
+    :param percentiles_a: (median, 95 percentile) tuple of the base run
+        to use instead of calculating them of durations_a
+    :param percentiles_b: the same for the run to check
+    :returns: dict with medians, 95 percentiles, their deltas in percents,
+        p-value and the status of the change
+    """
+    values_a = sorted(durations_a)
+    values_b = sorted(durations_b)
+    if percentiles_a is None:
+        percentiles_a = (streaming.percentile(values_a, 0.5),
+                         streaming.percentile(values_a, 0.95))
+    if percentiles_b is None:
+        percentiles_b = (streaming.percentile(values_b, 0.5),
+                         streaming.percentile(values_b, 0.95))
+    result = {"count_a": len(values_a),
+              "count_b": len(values_b),
+              "median_a": percentiles_a[0],
+              "median_b": percentiles_b[0],
+              "95%ile_a": percentiles_a[1],
+              "95%ile_b": percentiles_b[1],
+              "p_value": None,
+              "status": NOT_AVAILABLE}
+    result["median_delta"] = _delta(result["median_a"], result["median_b"])
+    result["95%ile_delta"] = _delta(result["95%ile_a"], result["95%ile_b"])
+
+    if len(values_a) < 2 or len(values_b) < 2:
+        return result
+
+    u_a, p_value = mann_whitney_u(values_a, values_b)
+    result["p_value"] = p_value
+    if p_value >= alpha:
+        result["status"] = NO_CHANGE
+    elif u_a < len(values_a) * len(values_b) / 2.0:
+        # U of the base sample is small, so the base sample tends to have
+        # smaller durations, i.e. the new run is slower
+        result["status"] = REGRESSION
+    else:
+        result["status"] = IMPROVEMENT
+    return result
+
+
+def compare(results_a, results_b, alpha=0.05):
+    """Compare workloads of two tasks.
+
+    Workloads are matched by the hash of their configuration (the same one
+    that is used for building trends). If a configuration appears several
+    times in a task, workloads are matched in order of their appearance.
+    Iterations of workloads are read once per matched pair, only durations
+    of actions are kept for the test, while medians and 95 percentiles are
+    taken from stored statistics of workloads where they exist.
+
+    :param results_a: list of extended workloads results of the base task
+    :param results_b: list of extended workloads results of the task
+        to check
+    :param alpha: significance level of the Mann-Whitney U test
+    :returns: dict with the following keys:
+        rows - list of dicts with comparison results for each action
+               of each matched workload
+        unmatched - list of names of workloads which have no pair
+    """
+    groups_a = _group_by_config(results_a)
+    groups_b = _group_by_config(results_b)
+
+    rows = []
+    unmatched = []
+    for key, workloads_a in groups_a.items():
+        workloads_b = groups_b.get(key, [])
+        unmatched.extend(w["key"]["name"]
+                         for w in workloads_a[len(workloads_b):])
+        for workload_a, workload_b in zip(workloads_a, workloads_b):
+            durations_a = _get_durations(workload_a)
+            durations_b = _get_durations(workload_b)
+            percentiles_a = _get_stored_percentiles(workload_a)
+            percentiles_b = _get_stored_percentiles(workload_b)
+            for action, values_a in durations_a.items():
+                if action not in durations_b:
+                    continue
+                row = compare_actions(
+                    values_a, durations_b[action], alpha=alpha,
+                    percentiles_a=percentiles_a.get(action),
+                    percentiles_b=percentiles_b.get(action))
+                row.update({"workload": workload_a["key"]["name"],
+                            "pos": workload_a["key"]["pos"],
+                            "action": action})
+                rows.append(row)
+    for key, workloads_b in groups_b.items():
+        workloads_a = groups_a.get(key, [])
+        unmatched.extend(w["key"]["name"]
+                         for w in workloads_b[len(workloads_a):])
+
+    return {"rows": rows, "unmatched": unmatched}
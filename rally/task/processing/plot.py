@@ -13,21 +13,41 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import collections
+import copy
 import datetime as dt
 import hashlib
 import json
+import multiprocessing
+import zlib
 
 import six
 
+from rally.common import logging
 from rally.common import objects
 from rally.common.plugin import plugin
 from rally.common import version
 from rally.task.processing import charts
+from rally.task.processing import utils as putils
 from rally.ui import utils as ui_utils
 
+LOG = logging.getLogger(__name__)
 
-def _process_hooks(hooks):
+# It is substituted by the data of workloads while writing a report
+_DATA_PLACEHOLDER = "__RALLY_REPORT_DATA__"
+
+# Key of objects which replace numeric series in the report data, see
+# _compact_series
+_SERIES_KEY = "_rally_xy"
+
+# Version of the workload data which _process_scenario makes. Reports of
+# workloads are stored in the database, so it should be increased on every
+# change of the data format to get stored reports rebuilt.
+REPORT_FORMAT_VERSION = 1
+
+
+def _process_hooks(hooks, zipper=None):
     """Prepare hooks data for report."""
     hooks_ctx = []
     for hook in hooks:
@@ -72,7 +92,8 @@ def _process_hooks(hooks):
                               title=first["title"],
                               description=descr,
                               label=first.get("label", ""),
-                              axis_label=axis_label)
+                              axis_label=axis_label,
+                              zipper=zipper)
             for data in hook_ctx["additive"][i]:
                 chart.add_iteration(data["data"])
             hook_ctx["additive"][i] = chart.render()
@@ -82,13 +103,26 @@ def _process_hooks(hooks):
     return hooks_ctx
 
 
-def _process_scenario(data, pos):
-    main_area = charts.MainStackedAreaChart(data["info"])
+def _is_sampled(info):
+    """Check whether stored iterations of the workload are its sample.
+
+    Iterations of compacted workloads are sampled, so tables with
+    statistics of them are taken from statistics of all iterations and
+    charts are labeled as built of the sample. Positions of iterations in
+    the sample are not their numbers, so failures are shown without them.
+    """
+    return (info.get("iterations_stored") is not None
+            and info.get("stat") is not None)
+
+
+def _process_scenario(data, pos, zipper=None):
+    sampled = _is_sampled(data["info"])
+    main_area = charts.MainStackedAreaChart(data["info"], zipper=zipper)
     main_hist = charts.MainHistogramChart(data["info"])
     main_stat = charts.MainStatsTable(data["info"])
     load_profile = charts.LoadProfileChart(data["info"])
     atomic_pie = charts.AtomicAvgChart(data["info"])
-    atomic_area = charts.AtomicStackedAreaChart(data["info"])
+    atomic_area = charts.AtomicStackedAreaChart(data["info"], zipper=zipper)
     atomic_hist = charts.AtomicHistogramChart(data["info"])
 
     errors = []
@@ -98,7 +132,7 @@ def _process_scenario(data, pos):
     for idx, itr in enumerate(data["iterations"], 1):
         if itr["error"]:
             typ, msg, trace = itr["error"]
-            errors.append({"iteration": idx,
+            errors.append({"iteration": None if sampled else idx,
                            "type": typ, "message": msg, "traceback": trace})
 
         for i, additive in enumerate(itr["output"]["additive"]):
@@ -111,7 +145,8 @@ def _process_scenario(data, pos):
                     description=additive.get("description", ""),
                     label=additive.get("label", ""),
                     axis_label=additive.get("axis_label",
-                                            "Iteration sequence number"))
+                                            "Iteration sequence number"),
+                    zipper=zipper)
                 chart.add_iteration(additive["data"])
                 additive_output_charts.append(chart)
 
@@ -139,7 +174,7 @@ def _process_scenario(data, pos):
         "name": method + (pos and " [%d]" % (pos + 1) or ""),
         "runner": kw["runner"]["type"],
         "config": json.dumps({data["key"]["name"]: [kw]}, indent=2),
-        "hooks": _process_hooks(data["hooks"]),
+        "hooks": _process_hooks(data["hooks"], zipper=zipper),
         "description": data["key"].get("description", ""),
         "iterations": {
             "iter": main_area.render(),
@@ -151,7 +186,7 @@ def _process_scenario(data, pos):
         "atomic": {"histogram": atomic_hist.render(),
                    "iter": atomic_area.render(),
                    "pie": atomic_pie.render()},
-        "table": main_stat.render(),
+        "table": data["info"]["stat"] if sampled else main_stat.render(),
         "additive_output": additive_output,
         "complete_output": complete_output,
         "has_output": any(additive_output) or any(complete_output),
@@ -163,10 +198,12 @@ def _process_scenario(data, pos):
         "sla": data["sla"],
         "sla_success": all([s["success"] for s in data["sla"]]),
         "iterations_count": iterations_count,
+        "iterations_sampled": (data["info"]["iterations_stored"] if sampled
+                               else None),
     }
 
 
-def _process_tasks(tasks_results):
+def _process_tasks(tasks_results, zipper=None):
     tasks = []
     source_dict = collections.defaultdict(list)
     position = collections.defaultdict(lambda: -1)
@@ -175,7 +212,8 @@ def _process_tasks(tasks_results):
         name = scenario["key"]["name"]
         position[name] += 1
         source_dict[name].append(scenario["key"]["kw"])
-        tasks.append(_process_scenario(scenario, position[name]))
+        tasks.append(_process_scenario(scenario, position[name],
+                                       zipper=zipper))
 
     source = json.dumps(source_dict, indent=2, sort_keys=True)
     return source, sorted(tasks, key=lambda r: (r["cls"], r["met"],
@@ -194,35 +232,482 @@ def _extend_results(results):
     """
     extended_results = []
     for result in results:
-        generic = {"id": None,
-                   "task_uuid": None,
-                   "key": result["key"],
-                   "data": {"sla": result["sla"],
-                            "hooks": result.get("hooks"),
-                            "raw": result["result"],
-                            "full_duration": result["full_duration"],
-                            "load_duration": result["load_duration"]},
-                   "created_at": result.get("created_at"),
-                   "updated_at": result.get("updated_at")}
         extended_results.extend(
-            objects.Task.extend_results([generic], True))
+            objects.Task.extend_results([_make_generic_result(result)],
+                                        True))
     return extended_results
 
 
-def plot(tasks_results, include_libs=False):
+def _make_generic_result(result):
+    return {"id": None,
+            "task_uuid": None,
+            "key": result["key"],
+            "data": {"sla": result["sla"],
+                     "hooks": result.get("hooks"),
+                     "raw": result["result"],
+                     "full_duration": result["full_duration"],
+                     "load_duration": result["load_duration"],
+                     "statistics": result.get("statistics")},
+            "created_at": result.get("created_at"),
+            "updated_at": result.get("updated_at")}
+
+
+def _is_number(value):
+    return (isinstance(value, (six.integer_types, float))
+            and not isinstance(value, bool))
+
+
+def _compact_column(values):
+    """Delta-encode a column of integers, other columns are kept as is."""
+    if all(isinstance(v, six.integer_types) and not isinstance(v, bool)
+           for v in values):
+        return {"d": [values[0]] + [b - a for a, b in zip(values,
+                                                          values[1:])]}
+    return list(values)
+
+
+def _compact_series(data):
+    """Replace numeric series of report data with compact columns.
+
+    Lists of [x, y] pairs and {"x": x, "y": y} points of charts are
+    replaced by {_SERIES_KEY: [xs, ys]} objects, where columns of integers
+    (like iteration numbers) are delta-encoded. The report JavaScript
+    restores the series once the data is loaded.
+    """
+    if isinstance(data, dict):
+        return dict((k, _compact_series(v)) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        if len(data) > 1:
+            if all(isinstance(p, (list, tuple)) and len(p) == 2
+                   and _is_number(p[0]) and _is_number(p[1])
+                   for p in data):
+                xs, ys = zip(*data)
+                return {_SERIES_KEY: [_compact_column(xs),
+                                      _compact_column(ys)]}
+            if all(isinstance(p, dict) and len(p) == 2
+                   and _is_number(p.get("x")) and _is_number(p.get("y"))
+                   for p in data):
+                return {_SERIES_KEY: [_compact_column([p["x"] for p in data]),
+                                      _compact_column([p["y"] for p in data])],
+                        "points": True}
+        return [_compact_series(v) for v in data]
+    return data
+
+
+def _dump_data_element(data, part, element_id=None, compress=True):
+    """Make HTML element which embeds the report data.
+
+    Compressed data is deflated and base64-encoded, it is inflated by the
+    report JavaScript. Otherwise the element contains JSON.
+    """
+    data = json.dumps(_compact_series(data))
+    if compress:
+        encoding = "deflate"
+        data = base64.b64encode(zlib.compress(data.encode("utf-8"), 9))
+        data = data.decode("ascii")
+    else:
+        encoding = "json"
+        # the data should not close the element or start a comment
+        data = data.replace("<", "\\u003c")
+    return ("<script type=\"application/x-rally-data\"%s data-part=\"%s\" "
+            "data-encoding=\"%s\">%s</script>\n"
+            % (element_id and " id=\"%s\"" % element_id or "", part,
+               encoding, data))
+
+
+def _dump_workload_data(idx, report, compress=True):
+    """Make HTML elements with the data of the workload report.
+
+    Complete output of iterations is usually the largest part of the
+    report, so it is embedded separately and it is loaded by the report
+    JavaScript only when the tab with it is opened.
+
+    :param idx: index of the workload in the report
+    :param report: workload data made by _process_scenario
+    :param compress: whether to compress the data
+    """
+    report = dict(report)
+    complete_output = report["complete_output"]
+    report["complete_output"] = []
+    elements = []
+    if complete_output and complete_output[0]:
+        report["complete_output_id"] = "complete-output-%d" % idx
+        elements.append(_dump_data_element(
+            complete_output, "complete_output",
+            element_id=report["complete_output_id"], compress=compress))
+    elements.insert(0, _dump_data_element(report, "workload",
+                                          compress=compress))
+    return "".join(elements)
+
+
+def plot(tasks_results, include_libs=False, zipper=None, compress=True):
+    """Generate HTML report.
+
+    :param tasks_results: tasks results list in old format
+    :param include_libs: whether to embed JS/CSS libraries into report
+    :param zipper: name of graph zipper used to reduce the number of points
+                   on charts, see rally.task.processing.utils.ZIPPERS
+    :param compress: whether to compress the data embedded into report
+    """
     extended_results = _extend_results(tasks_results)
     template = ui_utils.get_template("task/report.html")
-    source, data = _process_tasks(extended_results)
+    source, data = _process_tasks(extended_results, zipper=zipper)
     return template.render(version=version.version_string(),
                            source=json.dumps(source),
-                           data=json.dumps(data),
+                           data="".join(
+                               _dump_workload_data(idx, report,
+                                                   compress=compress)
+                               for idx, report in enumerate(data)),
                            include_libs=include_libs)
 
 
-def trends(tasks_results):
+def plot_to_file(tasks_results, output, include_libs=False, zipper=None,
+                 processes=None, compress=True):
+    """Generate HTML report and write it to the file object.
+
+    Unlike plot(), workloads are extended and processed one at a time and
+    the data of each of them is written to the output as soon as it is
+    ready, so iterations loaded lazily (see Task.iterate_results) are
+    never kept in memory together. The report is the same as plot() makes.
+
+    :param tasks_results: tasks results list in old format
+    :param output: file object to write the report to
+    :param include_libs: whether to embed JS/CSS libraries into report
+    :param zipper: name of graph zipper used to reduce the number of points
+                   on charts, see rally.task.processing.utils.ZIPPERS
+    :param processes: number of processes to process workloads in, they
+                      are processed in the current process by default.
+                      Iterations of workloads processed in the pool are
+                      loaded into memory, see _iterate_workload_reports
+    :param compress: whether to compress the data embedded into report
+    """
+    source, workloads = _sort_workloads(tasks_results)
+    template = ui_utils.get_template("task/report.html")
+    html = template.render(version=version.version_string(),
+                           source=json.dumps(source),
+                           data=_DATA_PLACEHOLDER,
+                           include_libs=include_libs)
+    head, tail = html.split(_DATA_PLACEHOLDER)
+
+    output.write(head)
+    reports = _iterate_workload_reports(workloads, zipper=zipper,
+                                        processes=processes)
+    for idx, report in enumerate(reports):
+        output.write(_dump_workload_data(idx, report, compress=compress))
+    output.write(tail)
+
+
+def _sort_workloads(tasks_results):
+    """Sort workloads in the order of the report.
+
+    :param tasks_results: tasks results list in old format
+    :returns: tuple with JSON of input task of workloads and list of
+              (position, result) pairs
+    """
+    workloads = []
+    source_dict = collections.defaultdict(list)
+    position = collections.defaultdict(lambda: -1)
+    for result in tasks_results:
+        name = result["key"]["name"]
+        position[name] += 1
+        source_dict[name].append(result["key"]["kw"])
+        cls, method = name.split(".")
+        workloads.append(((cls, method, position[name]), result))
+    workloads.sort(key=lambda w: w[0])
+
+    source = json.dumps(source_dict, indent=2, sort_keys=True)
+    return source, [(key[2], result) for key, result in workloads]
+
+
+def _iterate_workload_reports(workloads, zipper=None, processes=None):
+    """Yield data of workload reports in the order of workloads.
+
+    With several processes, charts of workloads are computed in a pool.
+    Iterations of a workload are loaded and stored reports are read and
+    written by the current process, so the pool does not use the database
+    (connections of the current process can not be shared with forked
+    ones). It trades memory for speed: iterations of a workload processed
+    in the pool are loaded into memory as a whole to pass them to a worker,
+    and not more than two workloads per process are loaded at once.
+
+    :param workloads: list of (position, result) pairs
+    :param zipper: name of graph zipper
+    :param processes: number of processes to process workloads in
+    """
+    if not processes or processes < 2:
+        for pos, result in workloads:
+            yield _get_workload_report(result, pos, zipper=zipper)
+        return
+
+    pending = collections.deque()
+
+    def _pop():
+        workload_uuid, report = pending.popleft()
+        if not isinstance(report, dict):
+            report = json.loads(report.get())
+            if workload_uuid:
+                _store_report(workload_uuid, report, zipper=zipper)
+        return report
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for pos, result in workloads:
+            report = _get_stored_report(result, pos, zipper=zipper)
+            if report is None:
+                if not isinstance(result["result"], list):
+                    # extend_results() sorts iterations of a tuple in the
+                    # same way as iterations loaded lazily
+                    result = dict(result, result=tuple(result["result"]))
+                report = pool.apply_async(_dump_workload_report,
+                                          (result, pos, zipper))
+            pending.append((result.get("uuid"), report))
+            if len(pending) > 2 * processes:
+                yield _pop()
+        while pending:
+            yield _pop()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _get_report_options(zipper=None):
+    return json.dumps({"zipper": zipper or putils.ZIPPERS[0]},
+                      sort_keys=True)
+
+
+def _get_stored_report(result, pos, zipper=None):
+    """Get the stored report of workload result if there is one."""
+    workload_uuid = result.get("uuid")
+    if not workload_uuid:
+        return None
+    report = objects.Workload.get_report(
+        workload_uuid, REPORT_FORMAT_VERSION, _get_report_options(zipper))
+    if report is not None:
+        # the position depends on other workloads in the report
+        report["pos"] = str(pos)
+        report["name"] = report["met"] + (pos and " [%d]" % (pos + 1) or "")
+    return report
+
+
+def _store_report(workload_uuid, report, zipper=None):
+    objects.Workload.set_report(workload_uuid, REPORT_FORMAT_VERSION,
+                                report, _get_report_options(zipper))
+
+
+def _build_workload_report(result, pos, zipper=None):
+    extended = objects.Task.extend_results([_make_generic_result(result)])[0]
+    return _process_scenario(extended, pos, zipper=zipper)
+
+
+def _dump_workload_report(result, pos, zipper=None):
+    """Build report of workload result in a pool process."""
+    return json.dumps(_build_workload_report(result, pos, zipper=zipper))
+
+
+def _get_workload_report(result, pos, zipper=None):
+    """Process workload result reusing the stored report if there is one.
+
+    Reports are stored for results of workloads from the database, so
+    charts of finished workloads are not recomputed by later reports.
+    """
+    report = _get_stored_report(result, pos, zipper=zipper)
+    if report is None:
+        report = _build_workload_report(result, pos, zipper=zipper)
+        if result.get("uuid"):
+            _store_report(result["uuid"], report, zipper=zipper)
+    return report
+
+
+def store_reports(tasks_results, zipper=None):
+    """Build and store reports of workloads which have no stored ones.
+
+    :param tasks_results: results of workloads from the database in old
+                          format
+    :param zipper: name of graph zipper
+    """
+    for pos, result in _sort_workloads(tasks_results)[1]:
+        _get_workload_report(result, pos, zipper=zipper)
+
+
+def _make_workload_summary(result, pos, info, zipper=None):
+    """Make the part of workload data which the report overview needs.
+
+    :param result: workload result in old format
+    :param pos: position of the workload in the report
+    :param info: statistics of the workload, see Task.get_iterations_info
+    :param zipper: name of graph zipper
+    """
+    kw = result["key"]["kw"]
+    cls, method = result["key"]["name"].split(".")
+    return {
+        "cls": cls,
+        "met": method,
+        "pos": str(pos),
+        "name": method + (pos and " [%d]" % (pos + 1) or ""),
+        "runner": kw["runner"]["type"],
+        "description": result["key"].get("description", ""),
+        "hooks": _process_hooks(copy.deepcopy(result.get("hooks") or []),
+                                zipper=zipper),
+        "errors_count": info["iterations_failed"],
+        "load_duration": result["load_duration"],
+        "full_duration": result["full_duration"],
+        "created_at": result["created_at"],
+        "sla": result["sla"],
+        "sla_success": all([s["success"] for s in result["sla"]]),
+        "iterations_count": info["iterations_count"],
+    }
+
+
+class ReportServer(object):
+    """Serves HTML report of tasks which loads workloads on demand.
+
+    The page of the report has only the overview of workloads, which is
+    made of their stored statistics. Data of a workload is processed (or
+    taken from its stored report) when the workload is opened in the
+    report, and last processed workloads are cached in memory.
+
+    URLs:
+
+    - /: the page of the report;
+    - /workloads/<index>: JSON data of the workload, without complete
+      output of iterations;
+    - /workloads/<index>/complete_output: JSON complete output of
+      iterations of the workload.
+    """
+
+    # The maximal number of workloads cached in memory
+    CACHE_SIZE = 16
+
+    def __init__(self, api, tasks_uuids, zipper=None, cache_size=None):
+        """Load workloads of the tasks without their iterations.
+
+        :param api: rally.api.API instance
+        :param tasks_uuids: list of tasks UUIDs
+        :param zipper: name of graph zipper
+        :param cache_size: the maximal number of workloads cached in memory
+        """
+        self.zipper = zipper
+        self.cache_size = cache_size or self.CACHE_SIZE
+        self._cache = collections.OrderedDict()
+
+        statistics = dict((w["uuid"], w["info"]) for w in
+                          api.task.get_workloads_statistics(tasks_uuids))
+        results = []
+        for task_uuid in tasks_uuids:
+            task = api.task.get_detailed(task_id=task_uuid,
+                                         lazy_iterations=True)
+            for x in task["results"]:
+                results.append({"uuid": x["uuid"], "key": x["key"],
+                                "result": x["data"]["raw"],
+                                "sla": x["data"]["sla"],
+                                "hooks": x["data"].get("hooks", []),
+                                "load_duration": x["data"]["load_duration"],
+                                "full_duration": x["data"]["full_duration"],
+                                "created_at": x["created_at"],
+                                "statistics": x["data"].get("statistics")})
+        self.source, self.workloads = _sort_workloads(results)
+
+        summaries = []
+        for idx, (pos, result) in enumerate(self.workloads):
+            summary = _make_workload_summary(
+                result, pos, statistics[result["uuid"]], zipper=zipper)
+            summary["src"] = "workloads/%d" % idx
+            summaries.append(_dump_data_element(summary, "workload",
+                                                compress=False))
+        template = ui_utils.get_template("task/report.html")
+        self.index = template.render(version=version.version_string(),
+                                     source=json.dumps(self.source),
+                                     data="".join(summaries),
+                                     include_libs=False)
+
+    def get_workload(self, idx):
+        """Get JSON data of workload report and of its complete output.
+
+        :param idx: index of the workload in the report
+        :returns: tuple of JSON strings
+        """
+        if idx in self._cache:
+            self._cache[idx] = self._cache.pop(idx)
+            return self._cache[idx]
+
+        pos, result = self.workloads[idx]
+        report = dict(_get_workload_report(result, pos, zipper=self.zipper))
+        complete_output = report["complete_output"]
+        report["complete_output"] = []
+        if complete_output and complete_output[0]:
+            report["complete_output_src"] = (
+                "workloads/%d/complete_output" % idx)
+        data = (json.dumps(_compact_series(report)),
+                json.dumps(_compact_series(complete_output)))
+
+        self._cache[idx] = data
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def handle(self, path):
+        """Get response to GET request.
+
+        :param path: path of the request
+        :returns: tuple of HTTP status, content type and body of response
+        """
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if not parts:
+            return 200, "text/html; charset=utf-8", self.index
+        if (parts[0] == "workloads" and len(parts) in (2, 3)
+                and parts[1].isdigit()
+                and int(parts[1]) < len(self.workloads)
+                and parts[2:] in ([], ["complete_output"])):
+            report, complete_output = self.get_workload(int(parts[1]))
+            return (200, "application/json",
+                    complete_output if parts[2:] else report)
+        return 404, "text/plain", "Not found"
+
+    def make_http_server(self, port=0, host="127.0.0.1"):
+        """Make HTTP server which serves the report.
+
+        :param port: port to listen on, a free one is chosen by default
+        :param host: address to listen on
+        :returns: HTTPServer instance
+        """
+        httpd = six.moves.BaseHTTPServer.HTTPServer((host, port),
+                                                    _ReportRequestHandler)
+        httpd.report_server = self
+        return httpd
+
+
+class _ReportRequestHandler(six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        try:
+            status, content_type, body = self.server.report_server.handle(
+                self.path)
+        except Exception as e:
+            LOG.exception("Failed to process request %s" % self.path)
+            status, content_type, body = 500, "text/plain", str(e)
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        LOG.debug(format % args)
+
+
+def trends(tasks_results, workloads=None):
+    """Generate trends HTML report.
+
+    :param tasks_results: tasks results list in old format
+    :param workloads: workloads with calculated statistics, see
+                      Task.get_workloads_statistics
+    """
     trends = Trends()
     for i, scenario in enumerate(_extend_results(tasks_results), 1):
         trends.add_result(scenario)
+    for workload in workloads or []:
+        trends.add_result(workload)
     template = ui_utils.get_template("task/trends.html")
     return template.render(version=version.version_string(),
                            data=json.dumps(trends.get_data()))
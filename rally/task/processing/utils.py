@@ -79,6 +79,92 @@ class GraphZipper(object):
         return self.zipped_graph
 
 
+class MinMaxZipper(object):
+    """Graph zipper which preserves extremes of the graph.
+
+    Points are grouped into buckets of equal size and each bucket is
+    represented by its minimal and maximal values (placed at the first and
+    the last points of the bucket in the order of their appearance). When
+    the number of buckets exceeds the limit, neighbour buckets are merged,
+    so the total amount of points does not have to be known in advance.
+
+    Bucket bounds depend only on the number of added points, so graphs
+    with the same amount of points are zipped with the same X values.
+    """
+
+    def __init__(self, base_size=None, zipped_size=1000):
+        """Init graph zipper.
+
+        :param base_size: Amount of points in raw graph, it is not used and
+                          accepted for compatibility with GraphZipper
+        :param zipped_size: Amount of points that should be in zipped graph
+        """
+        self.zipped_size = zipped_size
+        self.max_buckets = max(zipped_size // 2, 1)
+        self.bucket_size = 1
+        self.point_order = 0
+        # each bucket is [first_order, last_order, size, min_point, max_point]
+        self.buckets = []
+
+    @staticmethod
+    def _merge_buckets(first, second):
+        min_point = first[3] if first[3][1] <= second[3][1] else second[3]
+        max_point = first[4] if first[4][1] >= second[4][1] else second[4]
+        return [first[0], second[1], first[2] + second[2],
+                min_point, max_point]
+
+    def add_point(self, value):
+        self.point_order += 1
+
+        if not isinstance(value, (int, float)):
+            value = 0
+
+        point = (self.point_order, value)
+        bucket = [self.point_order, self.point_order, 1, point, point]
+        if self.buckets and self.buckets[-1][2] < self.bucket_size:
+            self.buckets[-1] = self._merge_buckets(self.buckets[-1], bucket)
+        else:
+            self.buckets.append(bucket)
+
+        if len(self.buckets) > self.max_buckets:
+            self.bucket_size *= 2
+            buckets = self.buckets
+            self.buckets = [self._merge_buckets(*buckets[i:i + 2])
+                            if i + 1 < len(buckets) else buckets[i]
+                            for i in range(0, len(buckets), 2)]
+
+    def get_zipped_graph(self):
+        zipped_graph = []
+        for first_order, last_order, size, min_point, max_point in (
+                self.buckets):
+            if first_order == last_order:
+                zipped_graph.append([first_order, min_point[1]])
+                continue
+            if min_point[0] <= max_point[0]:
+                values = (min_point[1], max_point[1])
+            else:
+                values = (max_point[1], min_point[1])
+            zipped_graph.append([first_order, values[0]])
+            zipped_graph.append([last_order, values[1]])
+        return zipped_graph
+
+
+ZIPPERS = ("avg", "minmax")
+
+
+def get_zipper(name=None):
+    """Return graph zipper class by its name.
+
+    :param name: one of ZIPPERS, "avg" (GraphZipper) is used by default
+    """
+    zippers = {"avg": GraphZipper, "minmax": MinMaxZipper}
+    try:
+        return zippers[name or "avg"]
+    except KeyError:
+        raise ValueError("Unknown graph zipper '%s'. Available zippers: %s"
+                         % (name, ", ".join(ZIPPERS)))
+
+
 class AtomicMerger(object):
 
     def __init__(self, atomic):
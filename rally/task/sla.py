@@ -50,6 +50,17 @@ class SLAChecker(object):
         self.sla_criteria = [SLA.get(name)(criterion_value)
                              for name, criterion_value
                              in config.get("sla", {}).items()]
+        for criterion in self.sla_criteria:
+            criterion.set_workload_config(config)
+
+    @staticmethod
+    def _wrap_atomic_actions(iteration):
+        if isinstance(iteration, dict):
+            atomic_actions = iteration.get("atomic_actions", None)
+            if not isinstance(atomic_actions,
+                              utils.WrapperForAtomicActions):
+                iteration["atomic_actions"] = utils.WrapperForAtomicActions(
+                    atomic_actions)
 
     def add_iteration(self, iteration):
         """Process the result of a single iteration.
@@ -59,12 +70,22 @@ class SLAChecker(object):
 
         :param iteration: iteration result object
         """
-        if isinstance(iteration, dict):
-            atomic_actions = iteration.get("atomic_actions", None)
-            iteration["atomic_actions"] = utils.WrapperForAtomicActions(
-                atomic_actions)
+        self._wrap_atomic_actions(iteration)
         return all([sla.add_iteration(iteration) for sla in self.sla_criteria])
 
+    def add_iterations(self, iterations):
+        """Process the results of a batch of iterations.
+
+        The call to add_iterations() will return True if all the SLA checks
+        passed after each of the iterations, and False otherwise.
+
+        :param iterations: list of iteration result objects
+        """
+        for iteration in iterations:
+            self._wrap_atomic_actions(iteration)
+        return all([sla.add_iterations(iterations)
+                    for sla in self.sla_criteria])
+
     def merge(self, other):
         self._validate_config(other)
         self._validate_sla_types(other)
@@ -141,6 +162,29 @@ class SLA(plugin.Plugin, validation.ValidatablePluginMixin):
         :returns: True if the SLA check passed, False otherwise
         """
 
+    def set_workload_config(self, config):
+        """Process the config of the workload which is checked.
+
+        Criteria which depend on the workload settings (for example, on the
+        runner) can override this method. It is called once, before the
+        first iteration is added.
+
+        :param config: workload config with "runner", "sla", etc. sections
+        """
+
+    def add_iterations(self, iterations):
+        """Process the results of a batch of iterations.
+
+        It is equivalent to calling add_iteration() for each of the
+        iterations. Criteria can override it with a faster implementation.
+
+        :param iterations: list of iteration result objects
+        :returns: True if the SLA check passed after each of the iterations,
+                  False otherwise
+        """
+        return all([self.add_iteration(iteration)
+                    for iteration in iterations])
+
     def result(self):
         """Returns the SLA result dict corresponding to the current state."""
         return _format_result(self.get_name(), self.success, self.details())
@@ -0,0 +1,165 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark of building HTML reports in several processes.
+
+Usage:
+
+    python tests/benchmarks/report.py [--workloads N] [--iterations N]
+                                      [--processes N [N ...]]
+
+Reports of synthetic workloads are built with every given number of
+processes, the time of building them is printed and the reports are
+checked to be the same as the one built in the current process.
+
+Then sizes of the report with compressed and plain JSON data are printed
+together with the time of loading the data which is needed to open the
+report (complete output of iterations is loaded on demand), as the report
+JavaScript does it but in Python.
+"""
+
+from __future__ import print_function
+
+import argparse
+import base64
+import json
+import multiprocessing
+import random
+import re
+import sys
+import time
+import zlib
+
+import six
+
+from rally.common.plugin import discover
+from rally.task.processing import plot
+
+
+def make_tasks_results(workloads, iterations):
+    rnd = random.Random(42)
+    tasks_results = []
+    for idx in range(workloads):
+        raw = []
+        timestamp = ended_at = 1496553301.0
+        for i in range(iterations):
+            duration = rnd.uniform(0.5, 3.0)
+            atomic_actions = []
+            started_at = timestamp
+            for name in ("action_a", "action_b", "action_c"):
+                finished_at = started_at + duration / 3
+                atomic_actions.append({"name": name, "children": [],
+                                       "started_at": started_at,
+                                       "finished_at": finished_at})
+                started_at = finished_at
+            raw.append({
+                "timestamp": timestamp, "duration": duration,
+                "idle_duration": 0.0,
+                "error": ["E", "msg", "tb"] if i % 50 == 49 else [],
+                "output": {
+                    "additive": [{
+                        "title": "Additive", "description": "",
+                        "chart_plugin": "StackedArea",
+                        "data": [["foo", rnd.random()],
+                                 ["bar", rnd.random()]]}],
+                    "complete": [{
+                        "title": "Complete", "description": "",
+                        "chart_plugin": "Lines",
+                        "data": [["foo", [[x, rnd.random()]
+                                          for x in range(1, 21)]]]}]},
+                "atomic_actions": atomic_actions})
+            ended_at = max(ended_at, timestamp + duration)
+            timestamp += rnd.uniform(0.0, 0.1)
+        tasks_results.append(
+            {"key": {"name": "Dummy.dummy_%d" % (idx % 4), "pos": 0,
+                     "description": "",
+                     "kw": {"runner": {"type": "constant",
+                                       "times": iterations},
+                            "args": {"idx": idx}}},
+             "sla": [{"criterion": "failure_rate", "success": True,
+                      "detail": "ok"}],
+             "hooks": [], "result": raw,
+             "load_duration": ended_at - raw[0]["timestamp"],
+             "full_duration": ended_at - raw[0]["timestamp"] + 10,
+             "created_at": "2017-06-04T05:14:44"})
+    return tasks_results
+
+
+def build_report(tasks_results, processes, compress=True):
+    output = six.StringIO()
+    started_at = time.time()
+    plot.plot_to_file(tasks_results, output, processes=processes,
+                      compress=compress)
+    return time.time() - started_at, output.getvalue()
+
+
+def load_report_data(report, parts=("workload",)):
+    """Load the given parts of data embedded into the report."""
+    started_at = time.time()
+    for part, encoding, data in re.findall(
+            r"<script type=\"application/x-rally-data\"[^>]* "
+            r"data-part=\"(\w+)\" data-encoding=\"(\w+)\">([^<]*)<",
+            report):
+        if part not in parts:
+            continue
+        if encoding == "deflate":
+            data = zlib.decompress(base64.b64decode(data)).decode("utf-8")
+        json.loads(data)
+    return time.time() - started_at
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workloads", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument(
+        "--processes", type=int, nargs="+",
+        default=sorted(set([2, 4, multiprocessing.cpu_count()])))
+    args = parser.parse_args(argv)
+
+    discover.import_modules_from_package("rally.plugins.common")
+    tasks_results = make_tasks_results(args.workloads, args.iterations)
+
+    duration, expected = build_report(tasks_results, None)
+    print("CPUs: %d, workloads: %d, iterations per workload: %d"
+          % (multiprocessing.cpu_count(), args.workloads, args.iterations))
+    print("%-10s %10s %8s" % ("processes", "time (s)", "speedup"))
+    print("%-10d %10.2f %8.2f" % (1, duration, 1.0))
+
+    same = True
+    for processes in args.processes:
+        pool_duration, report = build_report(tasks_results, processes)
+        same = same and report == expected
+        print("%-10d %10.2f %8.2f" % (processes, pool_duration,
+                                      duration / pool_duration))
+    if not same:
+        print("Reports built in processes differ from the sequential one",
+              file=sys.stderr)
+        return 1
+
+    print()
+    print("%-12s %10s %15s %20s" % ("data", "size (MB)", "load time (s)",
+                                    "with output (s)"))
+    for name, compress in (("json", False), ("compressed", True)):
+        duration, report = build_report(tasks_results, None,
+                                        compress=compress)
+        print("%-12s %10.2f %15.3f %20.3f" % (
+            name, len(report) / 2.0 ** 20, load_report_data(report),
+            load_report_data(report, ("workload", "complete_output"))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
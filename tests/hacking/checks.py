@@ -592,6 +592,7 @@ def check_opts_import_path(logical_line, physical_line, filename):
      """
     excluded_files = ["./rally/osclients.py",
                       "./rally/task/engine.py",
+                      "./rally/common/db/api.py",
                       "./rally/common/opts.py"]
     forbidden_methods = [".register_opts("]
 
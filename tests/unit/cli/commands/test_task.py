@@ -14,8 +14,11 @@
 #    under the License.
 
 import datetime as dt
+import gzip
 import json
 import os.path
+import shutil
+import tempfile
 
 import ddt
 import mock
@@ -366,6 +369,7 @@ class TaskCommandsTestCase(test.TestCase):
                         "load_duration": 3.2,
                         "full_duration": 3.5,
                         "iterations_count": 4,
+                        "sla_check_latency": {"avg": 0.012, "max": 0.05},
                         "atomic": {"foo": {"count": 1}, "bar": {"count": 2}}},
                     "iterations": [
                         {"duration": 0.9,
@@ -418,10 +422,66 @@ class TaskCommandsTestCase(test.TestCase):
             detailed_value["results"][0]["output"] = {"additive": [],
                                                       "complete": []}
         self.fake_api.task.get_detailed.return_value = detailed_value
-        self.task.detailed(self.fake_api, test_uuid,
-                           iterations_data=iterations_data)
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            self.task.detailed(self.fake_api, test_uuid,
+                               iterations_data=iterations_data)
         self.fake_api.task.get_detailed.assert_called_once_with(
-            task_id=test_uuid, extended_results=True)
+            task_id=test_uuid, extended_results=True, lazy_iterations=True)
+        self.assertIn("SLA check latency: 0.012 (max 0.05)", out.getvalue())
+
+    @ddt.data({"kwargs": {},
+               "expected": [1, 2, 3, 4]},
+              {"kwargs": {"filter_by": "errors-only"},
+               "expected": [2, 4]},
+              {"kwargs": {"limit": 2, "offset": 1},
+               "expected": [2, 3]},
+              {"kwargs": {"filter_by": "errors-only", "offset": 1},
+               "expected": [4]})
+    @ddt.unpack
+    @mock.patch("rally.cli.commands.task.sys.stdout",
+                new_callable=six.StringIO)
+    def test_detailed_iterations_data(self, mock_stdout, kwargs, expected):
+        consumed = []
+
+        def iterate():
+            for i in range(1, 5):
+                consumed.append(i)
+                yield {"duration": i, "idle_duration": 0,
+                       "atomic_actions": [{"name": "foo", "started_at": 0,
+                                           "finished_at": i / 10.0}],
+                       "error": ["type", "msg", "tb"] if i % 2 == 0 else [],
+                       "output": {"additive": [], "complete": []}}
+
+        self.fake_api.task.get_detailed.return_value = {
+            "uuid": "task_uuid", "status": consts.TaskStatus.FINISHED,
+            "results": [{"key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+                         "info": {"stat": {"cols": ["col"] * 9,
+                                           "rows": []},
+                                  "atomic": {"foo": {"count": 1}},
+                                  "load_duration": 3.2,
+                                  "full_duration": 3.5},
+                         "iterations": iterate()}]}
+
+        self.task.detailed(self.fake_api, "task_uuid", iterations_data=True,
+                           **kwargs)
+
+        out = mock_stdout.getvalue()
+        self.assertEqual([1, 2, 3, 4], consumed)
+        self.assertIn("| iteration  | duration   | 1. foo     |", out)
+        self.assertEqual(
+            expected,
+            [int(line.split("|")[1]) for line in out.split("\n")
+             if line.startswith("| ") and line[2].isdigit()])
+        self.assertIn("Task task_uuid has 2 error(s)", out)
+
+    @ddt.data({"limit": -1}, {"offset": -1})
+    @ddt.unpack
+    @mock.patch("rally.cli.commands.task.sys.stdout")
+    def test_detailed_negative_limits(self, mock_stdout, **kwargs):
+        self.assertEqual(1, self.task.detailed(self.fake_api, "task_uuid",
+                                               iterations_data=True,
+                                               **kwargs))
+        self.assertFalse(self.fake_api.task.get_detailed.called)
 
     @mock.patch("rally.cli.commands.task.sys.stdout")
     @mock.patch("rally.cli.commands.task.logging")
@@ -484,7 +544,7 @@ class TaskCommandsTestCase(test.TestCase):
         self.fake_api.task.get_detailed.return_value = None
         self.task.detailed(self.fake_api, test_uuid)
         self.fake_api.task.get_detailed.assert_called_once_with(
-            task_id=test_uuid, extended_results=True)
+            task_id=test_uuid, extended_results=True, lazy_iterations=True)
 
     @mock.patch("json.dumps")
     def test_results(self, mock_json_dumps):
@@ -558,8 +618,6 @@ class TaskCommandsTestCase(test.TestCase):
         mock_fd = mock.mock_open()
         mock_open.side_effect = mock_fd
 
-        self.fake_api.task.get_detailed.return_value = {
-            "results": self._make_result(["bar"])}
         mock_plot.trends.return_value = "rendered_trends_report"
 
         ret = self.task.trends(self.fake_api,
@@ -567,15 +625,14 @@ class TaskCommandsTestCase(test.TestCase):
                                       "cd654321-38d8-4c8f-bbcc-fc8f74b004ae",
                                       "path_to_file"],
                                out="output.html", out_format="html")
-        expected = [
-            {"load_duration": 1.2, "full_duration": 2.3, "sla": "bar_sla",
-             "hooks": "bar_hooks",
-             "key": {"name": "bar", "pos": 0}, "result": "bar_raw"},
-            {"load_duration": 1.2, "full_duration": 2.3, "sla": "bar_sla",
-             "hooks": "bar_hooks",
-             "key": {"name": "bar", "pos": 0}, "result": "bar_raw"},
-            "result_1_from_file", "result_2_from_file"]
-        mock_plot.trends.assert_called_once_with(expected)
+        self.fake_api.task.get_workloads_statistics.assert_called_once_with(
+            tasks_uuids=["ab123456-38d8-4c8f-bbcc-fc8f74b004ae",
+                         "cd654321-38d8-4c8f-bbcc-fc8f74b004ae"])
+        self.assertFalse(self.fake_api.task.get_detailed.called)
+        mock_plot.trends.assert_called_once_with(
+            ["result_1_from_file", "result_2_from_file"],
+            workloads=(self.fake_api.task.get_workloads_statistics
+                       .return_value))
         self.assertEqual([mock.call(self.fake_api, "path_to_file")],
                          self.task._load_task_results_file.mock_calls)
         self.assertEqual([mock.call("output.html_expanded", "w+")],
@@ -610,8 +667,6 @@ class TaskCommandsTestCase(test.TestCase):
     def test_trends_task_id_is_not_uuid_like(self, mock_plot,
                                              mock_open, mock_os_path):
         mock_os_path.exists.return_value = False
-        self.fake_api.task.get_detailed.return_value = {
-            "results": self._make_result(["foo"])}
 
         ret = self.task.trends(self.fake_api,
                                tasks=["ab123456-38d8-4c8f-bbcc-fc8f74b004ae"],
@@ -628,6 +683,55 @@ class TaskCommandsTestCase(test.TestCase):
                                out="output.html", out_format="html")
         self.assertEqual(1, ret)
 
+    @mock.patch("rally.cli.commands.task.compare.compare")
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test_compare(self, mock_print_list, mock_compare):
+        self.fake_api.task.get_detailed.side_effect = [
+            {"results": "base_results"}, {"results": "target_results"}]
+        rows = [{"status": "regression"}, {"status": "no change"},
+                {"status": "regression"}]
+        mock_compare.return_value = {"rows": rows, "unmatched": ["Foo.bar"]}
+
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            ret = self.task.compare(self.fake_api, "base_uuid",
+                                    "target_uuid", alpha=0.01)
+
+        # the exit code does not depend on the number of regressions
+        self.assertEqual(1, ret)
+        self.assertIn("Statistically significant regressions found: 2",
+                      out.getvalue())
+        self.assertEqual(
+            [mock.call(task_id="base_uuid", extended_results=True,
+                       lazy_iterations=True),
+             mock.call(task_id="target_uuid", extended_results=True,
+                       lazy_iterations=True)],
+            self.fake_api.task.get_detailed.call_args_list)
+        mock_compare.assert_called_once_with(
+            "base_results", "target_results", alpha=0.01)
+        self.assertEqual(rows, mock_print_list.call_args[0][0])
+
+    @mock.patch("rally.cli.commands.task.compare.compare")
+    def test_compare_json(self, mock_compare):
+        self.fake_api.task.get_detailed.return_value = {"results": []}
+        mock_compare.return_value = {"rows": [{"status": "no change"}],
+                                     "unmatched": []}
+
+        with mock.patch("rally.cli.commands.task.print",
+                        create=True) as mock_print:
+            ret = self.task.compare(self.fake_api, base_task="base_uuid",
+                                    target_task="target_uuid", tojson=True)
+
+        self.assertEqual(0, ret)
+        mock_print.assert_called_once_with(
+            json.dumps(mock_compare.return_value, sort_keys=True, indent=4))
+
+    @ddt.data({"base_task": None, "target_task": "uuid"},
+              {"base_task": "uuid", "target_task": None},
+              {"base_task": "uuid", "target_task": "uuid", "alpha": 1.5})
+    def test_compare_wrong_args(self, kwargs):
+        self.assertEqual(1, self.task.compare(self.fake_api, **kwargs))
+        self.assertFalse(self.fake_api.task.get_detailed.called)
+
     @mock.patch("rally.cli.commands.task.os.path.realpath",
                 side_effect=lambda p: "realpath_%s" % p)
     @mock.patch("rally.cli.commands.task.open",
@@ -657,7 +761,8 @@ class TaskCommandsTestCase(test.TestCase):
                     "hooks": x["data"]["hooks"],
                     "load_duration": x["data"]["load_duration"],
                     "full_duration": x["data"]["full_duration"],
-                    "created_at": x["created_at"]}
+                    "created_at": x["created_at"],
+                    "statistics": None}
                    for x in data]
         self.fake_api.task.get_detailed.return_value = {"results": data}
         mock_plot.plot.return_value = "html_report"
@@ -669,7 +774,8 @@ class TaskCommandsTestCase(test.TestCase):
         self.task._old_report(self.fake_api, tasks=task_id,
                               out="/tmp/%s.html" % task_id)
         mock_open.assert_called_once_with("/tmp/%s.html" % task_id, "w+")
-        mock_plot.plot.assert_called_once_with(results, include_libs=False)
+        mock_plot.plot.assert_called_once_with(results, include_libs=False,
+                                               zipper=None, compress=True)
 
         mock_open.side_effect().write.assert_called_once_with("html_report")
         self.fake_api.task.get_detailed.assert_called_once_with(
@@ -689,14 +795,16 @@ class TaskCommandsTestCase(test.TestCase):
                               open_it=True, out_format="html")
         mock_webbrowser.open_new_tab.assert_called_once_with(
             "file://realpath_output.html")
-        mock_plot.plot.assert_called_once_with(results, include_libs=False)
+        mock_plot.plot.assert_called_once_with(results, include_libs=False,
+                                               zipper=None, compress=True)
 
         # HTML with embedded JS/CSS
         reset_mocks()
         self.task._old_report(self.fake_api, task_id, open_it=False,
                               out="output.html", out_format="html_static")
         self.assertFalse(mock_webbrowser.open_new_tab.called)
-        mock_plot.plot.assert_called_once_with(results, include_libs=True)
+        mock_plot.plot.assert_called_once_with(results, include_libs=True,
+                                               zipper=None, compress=True)
 
     @mock.patch("rally.cli.commands.task.os.path.realpath",
                 side_effect=lambda p: "realpath_%s" % p)
@@ -731,7 +839,8 @@ class TaskCommandsTestCase(test.TestCase):
                                "hooks": x["data"]["hooks"],
                                "load_duration": x["data"]["load_duration"],
                                "full_duration": x["data"]["full_duration"],
-                               "created_at": x["created_at"]},
+                               "created_at": x["created_at"],
+                               "statistics": None},
                     data))
 
         self.fake_api.task.get_detailed.return_value = {"results": data}
@@ -744,7 +853,8 @@ class TaskCommandsTestCase(test.TestCase):
         self.task._old_report(self.fake_api, tasks=tasks,
                               out="/tmp/1_test.html")
         mock_open.assert_called_once_with("/tmp/1_test.html", "w+")
-        mock_plot.plot.assert_called_once_with(results, include_libs=False)
+        mock_plot.plot.assert_called_once_with(results, include_libs=False,
+                                               zipper=None, compress=True)
 
         mock_open.side_effect().write.assert_called_once_with("html_report")
         expected_get_calls = [mock.call(task_id=task) for task in tasks]
@@ -795,7 +905,8 @@ class TaskCommandsTestCase(test.TestCase):
             self.real_api, task_file)
         expected_open_calls = [mock.call("/tmp/1_test.html", "w+")]
         mock_open.assert_has_calls(expected_open_calls, any_order=True)
-        mock_plot.plot.assert_called_once_with(results, include_libs=False)
+        mock_plot.plot.assert_called_once_with(results, include_libs=False,
+                                               zipper=None, compress=True)
         mock_open.side_effect().write.assert_called_once_with("html_report")
 
     @mock.patch("rally.cli.commands.task.os.path.exists", return_value=False)
@@ -815,7 +926,7 @@ class TaskCommandsTestCase(test.TestCase):
 
         self.task._old_report.assert_called_once_with(
             self.fake_api, tasks="file", out="out", open_it=False,
-            out_format="html"
+            out_format="html", zipper=None, compress=True
         )
 
         self.task._old_report.reset_mock()
@@ -826,9 +937,69 @@ class TaskCommandsTestCase(test.TestCase):
                          out="out", open_it=False, out_format="junit-xml")
         self.task.export.assert_called_once_with(
             self.fake_api, task_id="uuid", output_type="junit-xml",
-            output_dest="out", open_it=False
+            output_dest="out", open_it=False, options=None
+        )
+
+        self.task.export.reset_mock()
+        self.task.report(self.fake_api, task_id="uuid",
+                         out="out", open_it=False, out_format="html",
+                         zipper="minmax")
+        self.task.export.assert_called_once_with(
+            self.fake_api, task_id="uuid", output_type="html",
+            output_dest="out", open_it=False, options={"zipper": "minmax"}
         )
 
+        self.task.export.reset_mock()
+        self.task.report(self.fake_api, task_id="uuid",
+                         out="out", open_it=False, out_format="html",
+                         zipper="minmax", processes=4)
+        self.task.export.assert_called_once_with(
+            self.fake_api, task_id="uuid", output_type="html",
+            output_dest="out", open_it=False,
+            options={"zipper": "minmax", "processes": 4}
+        )
+
+        self.task.export.reset_mock()
+        self.task.report(self.fake_api, task_id="uuid",
+                         out="out", open_it=False, out_format="html",
+                         uncompressed=True)
+        self.task.export.assert_called_once_with(
+            self.fake_api, task_id="uuid", output_type="html",
+            output_dest="out", open_it=False, options={"compress": False}
+        )
+
+    @mock.patch("rally.cli.commands.task.uuidutils.is_uuid_like")
+    def test_report_serve(self, mock_is_uuid_like):
+        self.task._serve_report = mock.MagicMock()
+        self.task.report(self.fake_api, task_id=["uuid"], serve=True,
+                         port=8042, open_it=True, zipper="minmax")
+        self.task._serve_report.assert_called_once_with(
+            self.fake_api, ["uuid"], port=8042, zipper="minmax",
+            open_it=True)
+
+        self.task._serve_report.reset_mock()
+        mock_is_uuid_like.return_value = False
+        self.assertEqual(1, self.task.report(self.fake_api,
+                                             task_id=["file"], serve=True))
+        self.assertFalse(self.task._serve_report.called)
+
+    @mock.patch("rally.cli.commands.task.webbrowser.open_new_tab")
+    @mock.patch("rally.cli.commands.task.plot.ReportServer")
+    def test__serve_report(self, mock_report_server, mock_open_new_tab):
+        server = mock_report_server.return_value
+        httpd = server.make_http_server.return_value
+        httpd.server_address = ("127.0.0.1", 8042)
+        httpd.serve_forever.side_effect = KeyboardInterrupt
+
+        self.task._serve_report(self.fake_api, ["uuid"], port=8042,
+                                zipper="minmax", open_it=True)
+        mock_report_server.assert_called_once_with(
+            self.fake_api, ["uuid"], zipper="minmax")
+        server.make_http_server.assert_called_once_with(port=8042)
+        mock_open_new_tab.assert_called_once_with("http://127.0.0.1:8042/")
+        httpd.serve_forever.assert_called_once_with()
+        httpd.server_close.assert_called_once_with()
+
     @mock.patch("rally.cli.commands.task.cliutils.print_list")
     @mock.patch("rally.cli.commands.task.envutils.get_global",
                 return_value="123456789")
@@ -872,6 +1043,32 @@ class TaskCommandsTestCase(test.TestCase):
             self.fake_api.task.list.return_value, ["uuid"],
             print_header=False, print_border=False)
 
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test_list_page(self, mock_print_list):
+        self.fake_api.task.list.return_value = [
+            fakes.FakeTask(uuid=uuid, created_at=dt.datetime.now(),
+                           updated_at=dt.datetime.now(), status="c",
+                           tags=[], deployment_name="some_name")
+            for uuid in ("a", "b")]
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            self.task.list(self.fake_api, deployment="d", limit=2,
+                           marker="z")
+        self.fake_api.task.list.assert_called_once_with(
+            deployment="d", limit=2, marker="z")
+        self.assertIn("--marker b", out.getvalue())
+
+        self.fake_api.task.list.reset_mock()
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            self.task.list(self.fake_api, deployment="d", limit=3)
+        self.fake_api.task.list.assert_called_once_with(deployment="d",
+                                                        limit=3)
+        self.assertNotIn("--marker", out.getvalue())
+
+    def test_list_wrong_limit(self):
+        self.assertEqual(1, self.task.list(self.fake_api, deployment="fake",
+                                           limit=0))
+        self.assertFalse(self.fake_api.task.list.called)
+
     def test_list_wrong_status(self):
         self.assertEqual(1, self.task.list(self.fake_api, deployment="fake",
                                            status="wrong non existing status"))
@@ -956,6 +1153,58 @@ class TaskCommandsTestCase(test.TestCase):
                                     force=force) for task_uuid in task_uuids]
         self.assertTrue(self.fake_api.task.delete.mock_calls == expected_calls)
 
+    @mock.patch("rally.cli.commands.task.envutils.get_global",
+                return_value="8dcb9c5e-d60b-4022-8975-b5987c7833f7")
+    def test_delete_default_task(self, mock_get_global):
+        self.task.delete(self.fake_api)
+        self.fake_api.task.delete.assert_called_once_with(
+            task_uuid="8dcb9c5e-d60b-4022-8975-b5987c7833f7", force=False)
+
+    @mock.patch("rally.cli.commands.task.envutils.get_global",
+                return_value=None)
+    def test_delete_without_task(self, mock_get_global):
+        self.assertEqual(1, self.task.delete(self.fake_api))
+        self.assertFalse(self.fake_api.task.delete.called)
+
+    @ddt.data(False, True)
+    def test_delete_older_than(self, force):
+        now = dt.datetime(2017, 8, 14)
+        self.fake_api.task.list.return_value = [
+            {"uuid": "uuid-1", "status": consts.TaskStatus.FINISHED},
+            {"uuid": "uuid-2", "status": consts.TaskStatus.RUNNING},
+            {"uuid": "uuid-3", "status": consts.TaskStatus.CRASHED},
+            {"uuid": "uuid-4", "status": consts.TaskStatus.INIT},
+            {"uuid": "uuid-5", "status": consts.TaskStatus.SOFT_ABORTING},
+            {"uuid": "uuid-6", "status": consts.TaskStatus.DELETING}]
+
+        with mock.patch("rally.cli.commands.task.dt.datetime") as mock_dt:
+            mock_dt.utcnow.return_value = now
+            self.task.delete(self.fake_api, force=force,
+                             older_than=dt.timedelta(days=30))
+
+        self.fake_api.task.list.assert_called_once_with(
+            created_before=dt.datetime(2017, 7, 15))
+        uuids = ["uuid-1", "uuid-3", "uuid-6"]
+        if force:
+            # running and aborting tasks are not deleted even by force
+            uuids = ["uuid-1", "uuid-3", "uuid-4", "uuid-6"]
+        self.assertEqual([mock.call(task_uuid=uuid, force=force)
+                          for uuid in uuids],
+                         self.fake_api.task.delete.call_args_list)
+
+    def test_delete_older_than_nothing(self):
+        self.fake_api.task.list.return_value = [
+            {"uuid": "uuid-1", "status": consts.TaskStatus.RUNNING}]
+        self.assertIsNone(self.task.delete(
+            self.fake_api, older_than=dt.timedelta(days=30)))
+        self.assertFalse(self.fake_api.task.delete.called)
+
+    def test_delete_older_than_with_uuid(self):
+        self.assertEqual(1, self.task.delete(
+            self.fake_api, ["uuid-1"], older_than=dt.timedelta(days=30)))
+        self.assertFalse(self.fake_api.task.list.called)
+        self.assertFalse(self.fake_api.task.delete.called)
+
     @mock.patch("rally.cli.commands.task.cliutils.print_list")
     def test_sla_check(self, mock_print_list):
         data = [{"key": {"name": "fake_name",
@@ -1056,17 +1305,40 @@ class TaskCommandsTestCase(test.TestCase):
 
         self.fake_api.task.export.assert_called_once_with(
             tasks_uuids=["uuid"], output_type="json",
-            output_dest="output_dest"
+            output_dest="output_dest", options=None, stream=True
         )
         mock_open.assert_called_once_with("output_file", "w+")
         mock_fd.return_value.write.assert_called_once_with("content")
+        mock_open_new_tab.assert_called_once_with("output_dest")
+
+        # file written by exporter
+        mock_open.reset_mock()
+        mock_open_new_tab.reset_mock()
+        self.fake_api.task.export.return_value = {"open": "output_dest"}
+        self.task.export(self.fake_api, task_id="uuid",
+                         output_type="html", output_dest="output_dest",
+                         open_it=True)
+        self.assertFalse(mock_open.called)
+        mock_open_new_tab.assert_called_once_with("output_dest")
+
+        # remote Rally does not write files
+        self.fake_api.endpoint_url = "http://example.com"
+        self.fake_api.task.export.reset_mock()
+        self.task.export(self.fake_api, task_id="uuid",
+                         output_type="html", output_dest="output_dest")
+        self.fake_api.task.export.assert_called_once_with(
+            tasks_uuids=["uuid"], output_type="html",
+            output_dest="output_dest", options=None, stream=False
+        )
+        self.fake_api.endpoint_url = None
 
         # print
         self.fake_api.task.export.reset_mock()
         self.fake_api.task.export.return_value = {"print": "content"}
         self.task.export(self.fake_api, task_id="uuid", output_type="json")
         self.fake_api.task.export.assert_called_once_with(
-            tasks_uuids=["uuid"], output_type="json", output_dest=None
+            tasks_uuids=["uuid"], output_type="json", output_dest=None,
+            options=None, stream=True
         )
         mock_print.assert_called_once_with("content")
 
@@ -1122,7 +1394,7 @@ class TaskCommandsTestCase(test.TestCase):
         }
         self.task.detailed(self.fake_api, test_uuid)
         self.fake_api.task.get_detailed.assert_called_once_with(
-            task_id=test_uuid, extended_results=True)
+            task_id=test_uuid, extended_results=True, lazy_iterations=True)
         mock_stdout.write.assert_has_calls([
             mock.call(error_traceback or "No traceback available.")
         ], any_order=False)
@@ -1148,6 +1420,22 @@ class TaskCommandsTestCase(test.TestCase):
                                  "atomic_actions": list(bar_wrapper)}]}]
         self.assertEqual(expected, ret)
 
+    def test__load_task_results_file_gzip(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        task_file = os.path.join(tmp_dir, "task.json.gz")
+        results = [{
+            "key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+            "sla": [], "load_duration": 1.0, "full_duration": 2.0,
+            "result": [{"timestamp": 0, "duration": 1.0, "idle_duration": 0,
+                        "error": [], "atomic_actions": []}]}]
+        with gzip.open(task_file, "wb") as f:
+            f.write(json.dumps(results).encode("utf-8"))
+
+        self.assertEqual(
+            results,
+            self.task._load_task_results_file(self.real_api, task_file))
+
     @mock.patch("rally.cli.commands.task.open", create=True)
     @mock.patch("rally.cli.commands.task.json.load")
     def test__load_task_results_file_wrong_format(self,
@@ -1159,11 +1447,62 @@ class TaskCommandsTestCase(test.TestCase):
                           self.task._load_task_results_file,
                           api=self.real_api, task_id=task_id)
 
+    def _make_task_results_file(self, results):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        task_file = os.path.join(tmp_dir, "task.json")
+        with open(task_file, "w") as f:
+            f.write(results if isinstance(results, six.string_types)
+                    else json.dumps(results))
+        return task_file
+
+    def _iterate_task_results_file(self, task_file):
+        with open(task_file) as inp_js:
+            results = []
+            for result in self.task._iterate_task_results_file(
+                    self.real_api, task_file, inp_js):
+                result["result"] = list(result["result"])
+                results.append(result)
+        return results
+
+    def test__iterate_task_results_file(self):
+        results = [{
+            "key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+            "result": [{"timestamp": 0, "duration": 1.0, "idle_duration": 0,
+                        "error": [], "atomic_actions": {"foo": 1.0}},
+                       {"timestamp": 1, "duration": 1.0, "idle_duration": 0,
+                        "error": [], "atomic_actions": []}],
+            "sla": [], "load_duration": 1.0, "full_duration": 2.0}]
+        task_file = self._make_task_results_file(results)
+
+        results[0]["result"][0]["atomic_actions"] = list(
+            tutils.WrapperForAtomicActions({"foo": 1.0}, 0))
+        self.assertEqual(results, self._iterate_task_results_file(task_file))
+
+    def test__iterate_task_results_file_wrong_format(self):
+        header = {"key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+                  "sla": [], "load_duration": 1.0, "full_duration": 2.0}
+        iteration = {"timestamp": 0, "duration": 1.0, "idle_duration": 0,
+                     "error": [], "atomic_actions": []}
+        for results in (
+                "[{\"key\": ",
+                "results",
+                [dict(header, result=[dict(iteration, duration="1")])],
+                [dict(header, result=[])],
+                [dict(header, result=[iteration], sla=None)],
+                [dict(header)],
+                [dict(header, key={"name": "Foo.bar"},
+                      result=[iteration])]):
+            task_file = self._make_task_results_file(results)
+            self.assertRaises(task.FailedToLoadResults,
+                              self._iterate_task_results_file, task_file)
+
     @mock.patch("rally.cli.commands.task.os.path")
     def test_import_results(self, mock_os_path):
         mock_os_path.exists.return_value = True
         mock_os_path.expanduser = lambda path: path
-        self.task._load_task_results_file = mock.MagicMock(
+        self.task._open_task_results_file = mock.MagicMock()
+        self.task._iterate_task_results_file = mock.MagicMock(
             return_value=["results"]
         )
 
@@ -1171,13 +1510,30 @@ class TaskCommandsTestCase(test.TestCase):
                                  "deployment_uuid",
                                  "task_file", tags=["tag"])
 
-        self.task._load_task_results_file.assert_called_once_with(
-            self.fake_api, "task_file"
+        self.task._open_task_results_file.assert_called_once_with(
+            "task_file")
+        inp_js = self.task._open_task_results_file.return_value
+        self.task._iterate_task_results_file.assert_called_once_with(
+            self.fake_api, "task_file", inp_js.__enter__.return_value
         )
         self.fake_api.task.import_results.assert_called_once_with(
             deployment="deployment_uuid", task_results=["results"],
             tags=["tag"])
 
+        # results are read in advance for a remote Rally
+        self.fake_api.endpoint_url = "http://example.com"
+        self.fake_api.task.import_results.reset_mock()
+        self.task._iterate_task_results_file.return_value = iter(
+            [{"key": "key", "result": iter(["itr1", "itr2"])}])
+        self.task.import_results(self.fake_api,
+                                 "deployment_uuid",
+                                 "task_file", tags=["tag"])
+        self.fake_api.task.import_results.assert_called_once_with(
+            deployment="deployment_uuid",
+            task_results=[{"key": "key", "result": ["itr1", "itr2"]}],
+            tags=["tag"])
+        self.fake_api.endpoint_url = None
+
         # not exist
         mock_os_path.exists.return_value = False
         self.assertEqual(
@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import argparse
+import datetime as dt
+
 import ddt
 from keystoneclient import exceptions as keystone_exc
 import mock
@@ -201,6 +204,19 @@ class CliUtilsTestCase(test.TestCase):
         else:
             self.assertEqual(expected, formatter(obj))
 
+    @ddt.data(("30d", dt.timedelta(days=30)), ("7", dt.timedelta(days=7)),
+              ("12h", dt.timedelta(hours=12)), ("2w", dt.timedelta(weeks=2)),
+              ("90m", dt.timedelta(minutes=90)),
+              ("5s", dt.timedelta(seconds=5)))
+    @ddt.unpack
+    def test_parse_period(self, value, expected):
+        self.assertEqual(expected, cliutils.parse_period(value))
+
+    @ddt.data("", "d", "1y", "1.5d", "foo")
+    def test_parse_period_invalid(self, value):
+        self.assertRaises(argparse.ArgumentTypeError,
+                          cliutils.parse_period, value)
+
     def test_process_keyestone_exc(self):
 
         @cliutils.process_keystone_exc
@@ -476,6 +492,29 @@ class CliUtilsTestCase(test.TestCase):
             [self.TestObj()], ["x"],
             field_labels=["x", "y"], sortby_index=None, out=out)
 
+    def test_print_list_stream(self):
+        out = six.moves.StringIO()
+
+        def objs():
+            yield {"x": 1, "long field name": 0.5}
+            # rows are written as soon as they are produced
+            self.assertIn("| 2 ", out.getvalue())
+            yield {"x": 12345678901}
+
+        self.assertEqual(2, cliutils.print_list_stream(
+            objs(), ["x", "long field name"], table_label="Label",
+            formatters={"x": lambda o: o["x"] * 2}, out=out))
+        self.assertEqual(
+            "+------------------------------+\n"
+            "|            Label             |\n"
+            "+------------+-----------------+\n"
+            "| x          | long field name |\n"
+            "+------------+-----------------+\n"
+            "| 2          | 0.5             |\n"
+            "| 24691357802 |                 |\n"
+            "+------------+-----------------+\n",
+            out.getvalue())
+
     def test_help_for_grouped_methods(self):
         class SomeCommand(object):
             @cliutils.help_group("1_manage")
@@ -13,11 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime as dt
 import sys
 
 import mock
+import six
 
 from rally.cli import manage
+from rally import consts
 from tests.unit import fakes
 from tests.unit import test
 
@@ -65,3 +68,71 @@ class DBCommandsTestCase(test.TestCase):
         self.db_commands.revision(self.fake_api)
         calls = [mock.call.schema_revision()]
         mock_db.assert_has_calls(calls)
+
+    @mock.patch("rally.cli.manage.db")
+    def test_migrate_data(self, mock_db):
+        mock_db.workload_data_migrate.return_value = iter([(2, 3), (3, 3)])
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            self.assertIsNone(self.db_commands.migrate_data(self.fake_api,
+                                                            batch_size=2))
+        mock_db.workload_data_migrate.assert_called_once_with(batch_size=2)
+        self.assertEqual("Migrate-data started.\n"
+                         "Converted 2 of 3 chunks of task results.\n"
+                         "Converted 3 of 3 chunks of task results.\n"
+                         "Migrate-data processed.\n", out.getvalue())
+
+    @mock.patch("rally.cli.manage.db")
+    def test_migrate_data_interrupted(self, mock_db):
+        def workload_data_migrate(batch_size):
+            yield 1, 3
+            raise KeyboardInterrupt()
+
+        mock_db.workload_data_migrate.side_effect = workload_data_migrate
+        self.assertEqual(1, self.db_commands.migrate_data(self.fake_api))
+
+    @mock.patch("rally.cli.manage.db")
+    def test_migrate_data_wrong_batch_size(self, mock_db):
+        self.assertEqual(1, self.db_commands.migrate_data(self.fake_api,
+                                                          batch_size=0))
+        self.assertFalse(mock_db.workload_data_migrate.called)
+
+    def test_compact(self):
+        now = dt.datetime(2017, 7, 1)
+        self.fake_api.task.list.return_value = [
+            {"uuid": "t1", "status": consts.TaskStatus.FINISHED},
+            {"uuid": "t2", "status": consts.TaskStatus.RUNNING},
+            {"uuid": "t3", "status": consts.TaskStatus.CRASHED}]
+        self.fake_api.task.compact.side_effect = [
+            {"workloads": 2, "deleted": 42}, {"workloads": 0, "deleted": 0}]
+
+        with mock.patch("sys.stdout", new_callable=six.StringIO) as out:
+            with mock.patch("rally.cli.manage.dt.datetime") as mock_datetime:
+                mock_datetime.utcnow.return_value = now
+                self.assertIsNone(self.db_commands.compact(
+                    self.fake_api, dt.timedelta(days=30), sample_size=10))
+        self.fake_api.task.list.assert_called_once_with(
+            created_before=dt.datetime(2017, 6, 1))
+        self.assertEqual(
+            [mock.call(task_id="t1", sample_size=10, archive_dir=None),
+             mock.call(task_id="t3", sample_size=10, archive_dir=None)],
+            self.fake_api.task.compact.call_args_list)
+        self.assertEqual("Compact started.\n"
+                         "Task t1: 42 iterations of 2 workloads are "
+                         "deleted.\n"
+                         "Compact processed.\n", out.getvalue())
+
+    def test_compact_interrupted(self):
+        self.fake_api.task.list.return_value = [
+            {"uuid": "t1", "status": consts.TaskStatus.FINISHED}]
+        self.fake_api.task.compact.side_effect = KeyboardInterrupt()
+        self.assertEqual(1, self.db_commands.compact(self.fake_api,
+                                                     dt.timedelta(days=1)))
+
+    @mock.patch("rally.cli.manage.os.path.isdir", return_value=False)
+    def test_compact_wrong_args(self, mock_isdir):
+        self.assertEqual(1, self.db_commands.compact(
+            self.fake_api, dt.timedelta(days=1), sample_size=-1))
+        self.assertEqual(1, self.db_commands.compact(
+            self.fake_api, dt.timedelta(days=1), archive_dir="/foo"))
+        mock_isdir.assert_called_once_with("/foo")
+        self.assertFalse(self.fake_api.task.list.called)
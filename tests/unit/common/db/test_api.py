@@ -19,13 +19,22 @@ import collections
 import copy
 import datetime as dt
 import json
+import os
+import shutil
+import tempfile
+import threading
+import types
 
 import ddt
 import mock
+from oslo_config import fixture
 from six import moves
+import sqlalchemy as sa
 
 from rally.common import db
 from rally.common.db import api as db_api
+from rally.common.db.sqlalchemy import api as sa_api
+from rally.common.db.sqlalchemy import models
 from rally import consts
 from rally import exceptions
 from tests.unit import test
@@ -199,6 +208,92 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(task_init, get_uuids(INIT))
         self.assertEqual(sorted(task_finished), get_uuids(FINISHED))
 
+    def test_task_list_pagination(self):
+        deploy = db.deployment_create({"name": "foo"})
+        tasks = [self._create_task({"deployment_uuid": deploy["uuid"],
+                                    "tags": ["t%d" % i, "tag"]})["uuid"]
+                 for i in moves.range(5)]
+
+        # the newest tasks go first
+        page = db.task_list(limit=2)
+        self.assertEqual([tasks[4], tasks[3]], [t["uuid"] for t in page])
+        self.assertEqual([["t4", "tag"], ["t3", "tag"]],
+                         [t["tags"] for t in page])
+        self.assertEqual(["foo", "foo"], [t["deployment_name"] for t in page])
+        self.assertEqual([tasks[2], tasks[1]],
+                         [t["uuid"] for t in db.task_list(
+                             limit=2, marker=tasks[3])])
+        self.assertEqual([tasks[0]], [t["uuid"] for t in db.task_list(
+            limit=2, marker=tasks[1])])
+        self.assertEqual([tasks[1]], [t["uuid"] for t in db.task_list(
+            tags=["t1", "t3"], marker=tasks[3])])
+        self.assertRaises(exceptions.TaskNotFound, db.task_list,
+                          marker="da6f820c-b133-4b9f-8534-4c3bcc40724b")
+
+    def test_task_list_created_before(self):
+        tasks = [self._create_task()["uuid"] for i in moves.range(3)]
+        (sa_api.Connection().model_query(models.Task).
+         filter(models.Task.uuid.in_(tasks[:2])).
+         update({"created_at": dt.datetime(2017, 1, 1)},
+                synchronize_session=False))
+
+        self.assertEqual([tasks[1], tasks[0]],
+                         [t["uuid"] for t in db.task_list(
+                             created_before=dt.datetime(2017, 1, 2))])
+        self.assertEqual([], db.task_list(
+            created_before=dt.datetime(2017, 1, 1)))
+
+    def _count_queries(self, func, *args, **kwargs):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = sa_api.get_engine()
+        sa.event.listen(engine, "before_cursor_execute",
+                        before_cursor_execute)
+        try:
+            func(*args, **kwargs)
+        finally:
+            sa.event.remove(engine, "before_cursor_execute",
+                            before_cursor_execute)
+        return len(statements)
+
+    def _create_task_with_workloads(self, workloads):
+        task_id = self._create_task({"tags": ["foo", "bar"]})["uuid"]
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"args": {}, "context": {}, "sla": {}, "hooks": [],
+                      "runner": {"type": "T"}}}
+        subtask = db.subtask_create(task_id, title="foo")
+        for i in moves.range(workloads):
+            workload = db.workload_create(task_id, subtask["uuid"], key)
+            for chunk_order in moves.range(2):
+                db.workload_data_create(
+                    task_id, workload["uuid"], chunk_order,
+                    {"raw": [{"timestamp": chunk_order, "duration": 1,
+                              "idle_duration": 0, "error": [],
+                              "atomic_actions": []}]})
+            db.workload_set_results(workload["uuid"], {"sla": []})
+        return task_id
+
+    def test_task_list_queries(self):
+        self._create_task_with_workloads(1)
+        queries = self._count_queries(db.task_list)
+        for i in moves.range(4):
+            self._create_task_with_workloads(1)
+        self.assertEqual(queries, self._count_queries(db.task_list))
+
+    def test_task_get_detailed_queries(self):
+        task_id = self._create_task_with_workloads(1)
+        queries = self._count_queries(db.task_get_detailed, task_id)
+        task_id = self._create_task_with_workloads(4)
+        self.assertEqual(queries,
+                         self._count_queries(db.task_get_detailed, task_id))
+        self.assertEqual(
+            [[0, 1]] * 4,
+            [[itr["timestamp"] for itr in r["data"]["raw"]]
+             for r in db.task_get_detailed(task_id)["results"]])
+
     def test_task_delete(self):
         task1, task2 = self._create_task()["uuid"], self._create_task()["uuid"]
         db.task_delete(task1)
@@ -236,12 +331,78 @@ class TasksTestCase(test.DBTestCase):
         workload = db.workload_create(task_id, subtask["uuid"], key)
         db.workload_data_create(task_id, workload["uuid"], 0, {"raw": []})
         db.workload_set_results(workload["uuid"], data)
+        db.workload_report_set(workload["uuid"], 1, {"foo": "bar"})
 
         res = db.task_result_get_all_by_uuid(task_id)
         self.assertEqual(len(res), 1)
         db.task_delete(task_id)
         res = db.task_result_get_all_by_uuid(task_id)
         self.assertEqual(len(res), 0)
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1))
+
+    def test_task_delete_in_batches(self):
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"runner": {"type": "constant"}}}
+        task1, task2 = self._create_task()["uuid"], self._create_task()["uuid"]
+        for task_id in (task1, task2):
+            subtask = db.subtask_create(task_id, title="foo")
+            workload = db.workload_create(task_id, subtask["uuid"], key)
+            db.workload_data_bulk_create(
+                task_id, workload["uuid"],
+                [{"chunk_order": i, "raw": []} for i in range(5)])
+        transactions = []
+        engine = sa_api.get_engine()
+
+        def before_execute(conn, clauseelement, multiparams, params):
+            if (isinstance(clauseelement, sa.sql.expression.Delete) and
+                    clauseelement.table.name == "workloaddata"):
+                transactions.append(conn.in_transaction())
+
+        sa.event.listen(engine, "before_execute", before_execute)
+        self.addCleanup(sa.event.remove, engine, "before_execute",
+                        before_execute)
+
+        with mock.patch.object(sa_api, "IN_CLAUSE_LIMIT", 2):
+            db.task_delete(task1)
+
+        # 3 batches and the final delete of chunks written meanwhile
+        self.assertEqual(4, len(transactions))
+        self.assertRaises(exceptions.TaskNotFound, self._get_task, task1)
+        self.assertEqual(0, sa_api.get_session().query(
+            models.WorkloadData).filter_by(task_uuid=task1).count())
+        self.assertEqual(5, sa_api.get_session().query(
+            models.WorkloadData).filter_by(task_uuid=task2).count())
+
+    def test_task_delete_interrupted(self):
+        task = self._create_task(
+            values={"status": consts.TaskStatus.FINISHED})["uuid"]
+        subtask = db.subtask_create(task, title="foo")
+        workload = db.workload_create(task, subtask["uuid"], {
+            "name": "atata", "description": "tatata", "pos": 0,
+            "kw": {"runner": {"type": "constant"}}})
+        db.workload_data_bulk_create(
+            task, workload["uuid"],
+            [{"chunk_order": i, "raw": []} for i in range(5)])
+        engine = sa_api.get_engine()
+
+        def before_execute(conn, clauseelement, multiparams, params):
+            if (isinstance(clauseelement, sa.sql.expression.Delete) and
+                    clauseelement.table.name == "workloaddata"):
+                raise KeyboardInterrupt()
+
+        sa.event.listen(engine, "before_execute", before_execute)
+        with mock.patch.object(sa_api, "IN_CLAUSE_LIMIT", 2):
+            self.assertRaises(KeyboardInterrupt, db.task_delete, task,
+                              status=consts.TaskStatus.FINISHED)
+        sa.event.remove(engine, "before_execute", before_execute)
+
+        # the status is changed before results are deleted
+        self.assertEqual(consts.TaskStatus.DELETING,
+                         db.task_get_status(task))
+        self.assertRaises(exceptions.TaskInvalidStatus, db.task_delete, task,
+                          status=consts.TaskStatus.FINISHED)
+        db.task_delete(task, status=consts.TaskStatus.DELETING)
+        self.assertRaises(exceptions.TaskNotFound, self._get_task, task)
 
     def test_task_delete_by_uuid_and_status(self):
         values = {
@@ -253,11 +414,33 @@ class TasksTestCase(test.DBTestCase):
         self.assertRaises(exceptions.TaskNotFound, self._get_task, task1)
         self.assertEqual(task2, self._get_task(task2)["uuid"])
 
+    def test_task_delete_by_uuid_and_statuses(self):
+        task1 = self._create_task(
+            values={"status": consts.TaskStatus.ABORTED})["uuid"]
+        task2 = self._create_task(
+            values={"status": consts.TaskStatus.RUNNING})["uuid"]
+        statuses = [consts.TaskStatus.FINISHED, consts.TaskStatus.ABORTED]
+        db.task_delete(task1, status=statuses)
+        self.assertRaises(exceptions.TaskNotFound, self._get_task, task1)
+        e = self.assertRaises(exceptions.TaskInvalidStatus, db.task_delete,
+                              task2, status=statuses)
+        self.assertIn("finished, aborted", "%s" % e)
+        self.assertEqual(consts.TaskStatus.RUNNING,
+                         db.task_get_status(task2))
+
     def test_task_delete_by_uuid_and_status_invalid(self):
         task = self._create_task(
             values={"status": consts.TaskStatus.INIT})["uuid"]
+        subtask = db.subtask_create(task, title="foo")
+        workload = db.workload_create(task, subtask["uuid"], {
+            "name": "atata", "description": "tatata", "pos": 0,
+            "kw": {"runner": {"type": "constant"}}})
+        db.workload_data_create(task, workload["uuid"], 0, {"raw": []})
         self.assertRaises(exceptions.TaskInvalidStatus, db.task_delete, task,
                           status=consts.TaskStatus.FINISHED)
+        # nothing is deleted
+        self.assertEqual(1, sa_api.get_session().query(
+            models.WorkloadData).filter_by(task_uuid=task).count())
 
     def test_task_delete_by_uuid_and_status_not_found(self):
         self.assertRaises(exceptions.TaskNotFound,
@@ -300,6 +483,7 @@ class TasksTestCase(test.DBTestCase):
             key["kw"]["args"]["task_id"] = task_id
             data["sla"][0] = {"success": True}
             data["raw"] = []
+            data["statistics"] = {}
             self.assertEqual(len(res), 1)
             self.assertEqual(res[0]["key"], key)
             self.assertEqual(res[0]["data"], data)
@@ -368,6 +552,63 @@ class TasksTestCase(test.DBTestCase):
                "name": "zzz"}]],
             [w["atomic_actions"] for w in results[0]["data"]["raw"]])
 
+    def test_task_result_iterate_by_uuid(self):
+        task = self._create_task()["uuid"]
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"args": {}, "context": {}, "sla": {},
+                      "runner": {"type": "T"}, "hooks": []}}
+        subtask = db.subtask_create(task, title="foo")
+        workloads = [db.workload_create(task, subtask["uuid"], key)
+                     for i in range(2)]
+        db.workload_set_results(workloads[0]["uuid"],
+                                {"sla": [{"success": True}],
+                                 "load_duration": 13, "full_duration": 42,
+                                 "hooks": []})
+
+        new_atomics = [{"started_at": 1, "finished_at": 2, "children": [],
+                        "name": "foo"}]
+        db.workload_data_create(task, workloads[0]["uuid"], 1, {"raw": [
+            {"duration": 1, "timestamp": 2, "idle_duration": 0,
+             "error": None, "atomic_actions": {"foo": 1}}]})
+        db.workload_data_create(task, workloads[0]["uuid"], 0, {"raw": [
+            {"duration": 1, "timestamp": 1, "idle_duration": 0,
+             "error": None, "atomic_actions": new_atomics}]})
+
+        results = db.task_result_iterate_by_uuid(task)
+        self.assertIsInstance(results, types.GeneratorType)
+        results = list(results)
+        self.assertEqual(2, len(results))
+        self.assertEqual(key, results[0]["key"])
+        self.assertEqual(13, results[0]["data"]["load_duration"])
+        raw = results[0]["data"]["raw"]
+        self.assertNotIsInstance(raw, list)
+        # iterations are loaded from DB on each pass
+        for i in range(2):
+            self.assertEqual(
+                [(1, new_atomics),
+                 (2, [{"started_at": 2, "finished_at": 3, "children": [],
+                       "name": "foo"}])],
+                [(itr["timestamp"], itr["atomic_actions"]) for itr in raw])
+        self.assertEqual([], list(results[1]["data"]["raw"]))
+        self.assertEqual([], list(db.task_result_iterate_by_uuid(
+            self._create_task()["uuid"])))
+
+    def test_task_result_iterate_by_uuids(self):
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"args": {}, "context": {}, "sla": {},
+                      "runner": {"type": "T"}, "hooks": []}}
+        tasks = [self._create_task()["uuid"] for i in range(3)]
+        workloads = []
+        for task in tasks[::-1]:
+            subtask = db.subtask_create(task, title="foo")
+            workloads.append(db.workload_create(task, subtask["uuid"], key))
+
+        results = db.task_result_iterate_by_uuids(tasks[:2])
+        self.assertIsInstance(results, types.GeneratorType)
+        self.assertEqual([w["uuid"] for w in workloads[1:]],
+                         [r["uuid"] for r in results])
+        self.assertEqual([], list(db.task_result_iterate_by_uuids([])))
+
     def test_task_get_detailed(self):
         validation_result = {
             "etype": "FooError",
@@ -422,6 +663,7 @@ class TasksTestCase(test.DBTestCase):
             "load_duration": 13,
             "full_duration": 42,
             "hooks": [],
+            "statistics": {},
         }, results[0]["data"])
 
     def test_task_get_detailed_last(self):
@@ -469,6 +711,7 @@ class TasksTestCase(test.DBTestCase):
             "load_duration": 13,
             "full_duration": 42,
             "hooks": [],
+            "statistics": {},
         }, results[0]["data"])
 
     def test_task_result_create(self):
@@ -612,7 +855,8 @@ class TasksTestCase(test.DBTestCase):
             "sla": [{"success": True}],
             "hooks": [],
             "load_duration": 13,
-            "full_duration": 42
+            "full_duration": 42,
+            "statistics": {}
         })
 
         db.task_delete(task_id)
@@ -700,7 +944,8 @@ class WorkloadTestCase(test.DBTestCase):
                 {"a": "A", "success": True}
             ],
             "load_duration": 13,
-            "full_duration": 42
+            "full_duration": 42,
+            "statistics": {"min_duration": 1, "max_duration": 2}
         }
 
         workload = db.workload_create(self.task_uuid, self.subtask_uuid, key)
@@ -716,16 +961,39 @@ class WorkloadTestCase(test.DBTestCase):
         self.assertEqual("T", workload["runner_type"])
         self.assertEqual(13, workload["load_duration"])
         self.assertEqual(42, workload["full_duration"])
-        self.assertEqual(0, workload["min_duration"])
+        self.assertEqual(1, workload["min_duration"])
         self.assertEqual(2, workload["max_duration"])
         self.assertEqual(3, workload["total_iteration_count"])
         self.assertEqual(1, workload["failed_iteration_count"])
+        self.assertEqual(data["statistics"], workload["statistics"])
         self.assertTrue(workload["pass_sla"])
         self.assertEqual([], workload["hooks"])
         self.assertEqual(data["sla"], workload["sla_results"]["sla"])
         self.assertEqual(self.task_uuid, workload["task_uuid"])
         self.assertEqual(self.subtask_uuid, workload["subtask_uuid"])
 
+    def test_workload_set_results_sums_chunks(self):
+        workload = self._create_workload()
+        db.workload_data_bulk_create(self.task_uuid, workload["uuid"], [
+            {"chunk_order": 0, "raw": [], "iteration_count": 3,
+             "failed_iteration_count": 1, "started_at": 10,
+             "finished_at": 20},
+            {"chunk_order": 1, "raw": [], "iteration_count": 2,
+             "failed_iteration_count": 0, "started_at": 15,
+             "finished_at": 25}])
+
+        with mock.patch.object(
+                sa_api.Connection,
+                "_task_workload_data_load_chunk") as mock_load_chunk:
+            workload = db.workload_set_results(
+                workload["uuid"], {"sla": [{"success": True}],
+                                   "full_duration": 42})
+        self.assertFalse(mock_load_chunk.called)
+        self.assertEqual(5, workload["total_iteration_count"])
+        self.assertEqual(1, workload["failed_iteration_count"])
+        # the load duration is taken from chunks if it is not passed
+        self.assertEqual(15, workload["load_duration"])
+
     def test_workload_set_results_empty_raw_data(self):
         key = {
             "name": "atata",
@@ -770,6 +1038,162 @@ class WorkloadTestCase(test.DBTestCase):
         self.assertEqual(self.task_uuid, workload["task_uuid"])
         self.assertEqual(self.subtask_uuid, workload["subtask_uuid"])
 
+    def _create_workload(self):
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"args": {}, "context": {}, "sla": {},
+                      "runner": {"type": "T"}}}
+        return db.workload_create(self.task_uuid, self.subtask_uuid, key)
+
+    def _set_results(self, workload):
+        db.workload_set_results(workload["uuid"],
+                                {"sla": [{"success": True}],
+                                 "load_duration": 13, "full_duration": 42})
+
+    def test_workload_report_set(self):
+        workload = self._create_workload()
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1))
+        # results are not set yet
+        self.assertFalse(db.workload_report_set(workload["uuid"], 1,
+                                                {"foo": "bar"}))
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1))
+        self.assertFalse(db.workload_report_set("unknown_uuid", 1,
+                                                {"foo": "bar"}))
+
+        self._set_results(workload)
+        self.assertTrue(db.workload_report_set(workload["uuid"], 1,
+                                               {"foo": "bar"}))
+        self.assertTrue(db.workload_report_set(workload["uuid"], 1,
+                                               {"foo": "baz"}, options="o"))
+        self.assertEqual({"foo": "bar"},
+                         db.workload_report_get(workload["uuid"], 1))
+        self.assertEqual({"foo": "baz"},
+                         db.workload_report_get(workload["uuid"], 1,
+                                                options="o"))
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 2))
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1,
+                                                 options="x"))
+
+        # the report is replaced
+        self.assertTrue(db.workload_report_set(workload["uuid"], 1,
+                                               {"foo": "spam"}))
+        self.assertEqual({"foo": "spam"},
+                         db.workload_report_get(workload["uuid"], 1))
+        self.assertEqual({"foo": "baz"},
+                         db.workload_report_get(workload["uuid"], 1,
+                                                options="o"))
+
+    def test_workload_report_set_concurrently(self):
+        workload = self._create_workload()
+        self._set_results(workload)
+        db.workload_report_set(workload["uuid"], 1, {"foo": "bar"})
+
+        # the report of a concurrent build is stored after the old reports
+        # are removed
+        with mock.patch.object(sa.orm.Query, "delete", return_value=0):
+            self.assertTrue(db.workload_report_set(workload["uuid"], 1,
+                                                   {"foo": "baz"}))
+        self.assertEqual({"foo": "bar"},
+                         db.workload_report_get(workload["uuid"], 1))
+
+    def test_workload_report_set_new_format_version(self):
+        workload = self._create_workload()
+        self._set_results(workload)
+        db.workload_report_set(workload["uuid"], 1, {"foo": "bar"})
+        db.workload_report_set(workload["uuid"], 1, {"foo": "baz"},
+                               options="o")
+
+        db.workload_report_set(workload["uuid"], 2, {"foo": "spam"})
+        self.assertEqual({"foo": "spam"},
+                         db.workload_report_get(workload["uuid"], 2))
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1))
+        self.assertIsNone(db.workload_report_get(workload["uuid"], 1,
+                                                 options="o"))
+
+    def test_workload_set_results_removes_reports(self):
+        workloads = [self._create_workload() for i in range(2)]
+        for workload in workloads:
+            self._set_results(workload)
+            db.workload_report_set(workload["uuid"], 1, {"foo": "bar"})
+
+        self._set_results(workloads[0])
+        self.assertIsNone(db.workload_report_get(workloads[0]["uuid"], 1))
+        self.assertEqual({"foo": "bar"},
+                         db.workload_report_get(workloads[1]["uuid"], 1))
+
+    def test_workload_set_results_with_statistics(self):
+        workload = self._create_workload()
+        workload = db.workload_set_results(
+            workload["uuid"], {"sla": [{"success": True}],
+                               "load_duration": 13, "full_duration": 42,
+                               "statistics": {"iterations_count": 0}})
+        self.assertEqual({"iterations_count": 0}, workload["statistics"])
+
+    def test_workload_set_statistics(self):
+        workload = self._create_workload()
+        self._set_results(workload)
+        self.assertTrue(db.workload_set_statistics(
+            workload["uuid"], {"iterations_count": 2}))
+        self.assertFalse(db.workload_set_statistics(
+            "unknown_uuid", {"iterations_count": 2}))
+
+        result = next(db.task_result_iterate_by_uuid(self.task_uuid))
+        self.assertEqual({"iterations_count": 2},
+                         result["data"]["statistics"])
+
+    def test_workload_data_iterate(self):
+        workload = self._create_workload()
+        raw = db.workload_data_iterate(workload["uuid"])
+        self.assertEqual([], list(raw))
+
+        iterations = [{"timestamp": i, "duration": 1, "idle_duration": 0,
+                       "error": None, "atomic_actions": []}
+                      for i in range(2)]
+        db.workload_data_create(self.task_uuid, workload["uuid"], 1,
+                                {"raw": iterations[1:]})
+        db.workload_data_create(self.task_uuid, workload["uuid"], 0,
+                                {"raw": iterations[:1]})
+        # iterations are loaded from DB on each pass
+        for i in range(2):
+            self.assertEqual(iterations, list(raw))
+
+    def test_workload_data_iterate_merges_chunks(self):
+        workload = self._create_workload()
+        chunks = [[1500000000.0, 1500000004.0, 1500000002.0],
+                  [1500000001.0, 1500000003.0, 1500000006.0],
+                  [1500000100.0, 1500000005.0],
+                  [1500000004.0]]
+        for chunk_order, timestamps in enumerate(chunks):
+            db.workload_data_create(
+                self.task_uuid, workload["uuid"], chunk_order,
+                {"raw": [{"timestamp": ts, "duration": 1,
+                          "idle_duration": 0, "error": None,
+                          "atomic_actions": [], "chunk": chunk_order}
+                         for ts in timestamps]})
+
+        raw = db.workload_data_iterate(workload["uuid"])
+        self.assertTrue(raw.ordered)
+        expected = [
+            (1500000000.0, 0), (1500000001.0, 1), (1500000002.0, 0),
+            (1500000003.0, 1), (1500000004.0, 0), (1500000004.0, 3),
+            (1500000005.0, 2), (1500000006.0, 1), (1500000100.0, 2)]
+        self.assertEqual(expected,
+                         [(itr["timestamp"], itr["chunk"]) for itr in raw])
+
+        # started_at is stored in the local time of the writer, so it does
+        # not affect the order
+        query = (sa_api.Connection().model_query(models.WorkloadData).
+                 filter_by(workload_uuid=workload["uuid"]))
+        query.update({"started_at": dt.datetime(2017, 1, 1)},
+                     synchronize_session=False)
+        self.assertEqual(expected,
+                         [(itr["timestamp"], itr["chunk"]) for itr in raw])
+
+        # chunks stored without the timestamp are loaded first
+        query.filter_by(chunk_order=3).update({"tstamp_start": None},
+                                              synchronize_session=False)
+        self.assertEqual(expected,
+                         [(itr["timestamp"], itr["chunk"]) for itr in raw])
+
 
 class WorkloadDataTestCase(test.DBTestCase):
     def setUp(self):
@@ -801,6 +1225,7 @@ class WorkloadDataTestCase(test.DBTestCase):
                          workload_data["started_at"])
         self.assertEqual(dt.datetime.fromtimestamp(4),
                          workload_data["finished_at"])
+        self.assertEqual(1, workload_data["tstamp_start"])
         self.assertEqual(data, workload_data["chunk_data"])
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
@@ -817,10 +1242,180 @@ class WorkloadDataTestCase(test.DBTestCase):
                          workload_data["started_at"])
         self.assertEqual(dt.datetime.fromtimestamp(10),
                          workload_data["finished_at"])
+        self.assertIsNone(workload_data["tstamp_start"])
         self.assertEqual(data, workload_data["chunk_data"])
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
+    def test_workload_data_bulk_create(self):
+        raw = [{"timestamp": 1, "duration": 1, "idle_duration": 0,
+                "error": ["E", "msg", "tb"], "atomic_actions": []},
+               {"timestamp": 2, "duration": 3, "idle_duration": 0,
+                "error": [], "atomic_actions": []}]
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters,
+                                  context, executemany):
+            statements.append((statement.split()[0], executemany))
+
+        engine = sa_api.get_engine()
+        sa.event.listen(engine, "before_cursor_execute",
+                        before_cursor_execute)
+        self.addCleanup(sa.event.remove, engine, "before_cursor_execute",
+                        before_cursor_execute)
+        self.assertEqual(3, db.workload_data_bulk_create(
+            self.task_uuid, self.workload_uuid,
+            [{"chunk_order": 0, "raw": raw[:1]},
+             {"chunk_order": 1, "raw": raw[1:],
+              # aggregated data is not calculated if it is passed
+              "iteration_count": 1, "failed_iteration_count": 0,
+              "started_at": 2, "finished_at": 6},
+             {"chunk_order": 2, "raw": []}]))
+        # all the rows are inserted by a single statement
+        self.assertEqual([("INSERT", True)],
+                         [s for s in statements if s[0] == "INSERT"])
+
+        chunks = (sa_api.Connection().model_query(models.WorkloadData).
+                  order_by(models.WorkloadData.chunk_order).all())
+        self.assertEqual([0, 1, 2], [c.chunk_order for c in chunks])
+        self.assertEqual([1, 1, 0], [c.iteration_count for c in chunks])
+        self.assertEqual([1, 0, 0],
+                         [c.failed_iteration_count for c in chunks])
+        self.assertEqual([dt.datetime.fromtimestamp(ts) for ts in (2, 6)],
+                         [chunks[0].finished_at, chunks[1].finished_at])
+        self.assertEqual(3, len(set(c.uuid for c in chunks)))
+        self.assertEqual(
+            [models.WORKLOAD_DATA_FORMAT_VERSION] * 3,
+            [c.format_version for c in chunks])
+        self.assertEqual([self.task_uuid] * 3, [c.task_uuid for c in chunks])
+        self.assertEqual(raw,
+                         list(db.workload_data_iterate(self.workload_uuid)))
+
+        self.assertEqual(0, db.workload_data_bulk_create(
+            self.task_uuid, self.workload_uuid, []))
+
+    def test_workload_data_bulk_create_converts_old_atomic_actions(self):
+        db.workload_data_bulk_create(
+            self.task_uuid, self.workload_uuid,
+            [{"chunk_order": 0,
+              "raw": [{"timestamp": 1, "duration": 1, "idle_duration": 0,
+                       "error": [], "atomic_actions": {"foo": 1}}]}])
+        self.assertEqual(
+            [[{"name": "foo", "children": [], "started_at": 1,
+               "finished_at": 2}]],
+            [itr["atomic_actions"]
+             for itr in db.workload_data_iterate(self.workload_uuid)])
+
+    def _create_old_chunk(self, chunk_order, timestamps):
+        """Create a chunk which is stored before the format version."""
+        raw = [{"timestamp": ts, "duration": 1, "idle_duration": 0,
+                "error": None, "atomic_actions": {"foo": 1}}
+               for ts in timestamps]
+        workload_data = db.workload_data_create(
+            self.task_uuid, self.workload_uuid, chunk_order, {"raw": raw})
+        (sa_api.Connection().model_query(models.WorkloadData).
+         filter_by(uuid=workload_data["uuid"]).
+         update({"chunk_data": {"raw": raw}, "format_version": None}))
+        return workload_data["uuid"]
+
+    def _get_chunks(self):
+        return [(c.format_version, [itr["atomic_actions"]
+                                    for itr in c.chunk_data["raw"]])
+                for c in sa_api.Connection().model_query(models.WorkloadData).
+                order_by(models.WorkloadData.chunk_order)]
+
+    def test_workload_data_read_old_chunks(self):
+        self._create_old_chunk(0, [1])
+        db.workload_data_create(
+            self.task_uuid, self.workload_uuid, 1,
+            {"raw": [{"timestamp": 2, "duration": 1, "idle_duration": 0,
+                      "error": None, "atomic_actions": []}]})
+        atomic_actions = [[{"name": "foo", "children": [], "started_at": 1,
+                            "finished_at": 2}], []]
+
+        self.assertEqual(
+            atomic_actions,
+            [itr["atomic_actions"]
+             for itr in db.workload_data_iterate(self.workload_uuid)])
+        # iterating does not write to the database
+        self.assertEqual([(None, [{"foo": 1}]), (1, [[]])],
+                         self._get_chunks())
+
+        self.assertEqual(
+            atomic_actions,
+            [itr["atomic_actions"] for itr in db.task_result_get_all_by_uuid(
+                self.task_uuid)[0]["data"]["raw"]])
+        self.assertEqual([(1, atomic_actions[:1]), (1, [[]])],
+                         self._get_chunks())
+
+    @mock.patch("rally.common.db.sqlalchemy.api._convert_old_atomic_actions")
+    def test_workload_data_read_current_chunks(
+            self, mock__convert_old_atomic_actions):
+        db.workload_data_create(
+            self.task_uuid, self.workload_uuid, 0,
+            {"raw": [{"timestamp": 1, "duration": 1, "idle_duration": 0,
+                      "error": None, "atomic_actions": []}]})
+        list(db.workload_data_iterate(self.workload_uuid))
+        db.task_result_get_all_by_uuid(self.task_uuid)
+        self.assertFalse(mock__convert_old_atomic_actions.called)
+
+    def test_workload_data_migrate(self):
+        for chunk_order in range(3):
+            self._create_old_chunk(chunk_order, [chunk_order])
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 3,
+                                {"raw": []})
+
+        self.assertEqual([(2, 3), (3, 3)],
+                         list(db.workload_data_migrate(batch_size=2)))
+        self.assertEqual(
+            [(1, [[{"name": "foo", "children": [], "started_at": i,
+                    "finished_at": i + 1}]]) for i in range(3)] + [(1, [])],
+            self._get_chunks())
+        self.assertEqual([], list(db.workload_data_migrate()))
+
+    def test_workload_data_migrate_interrupted(self):
+        for chunk_order in range(3):
+            self._create_old_chunk(chunk_order, [chunk_order])
+
+        migration = db.workload_data_migrate(batch_size=2)
+        self.assertEqual((2, 3), next(migration))
+        migration.close()
+        self.assertEqual([1, 1, None],
+                         [c[0] for c in self._get_chunks()])
+
+        self.assertEqual([(1, 1)], list(db.workload_data_migrate()))
+        self.assertEqual([1, 1, 1], [c[0] for c in self._get_chunks()])
+
+    def test_workload_data_compact(self):
+        for chunk_order in range(3):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"timestamp": chunk_order, "duration": 1,
+                          "idle_duration": 0, "error": [],
+                          "atomic_actions": []}]})
+        sample = [[{"timestamp": 1, "duration": 1, "idle_duration": 0,
+                    "error": ["E", "msg", "tb"], "atomic_actions": []}],
+                  [{"timestamp": 2, "duration": 2, "idle_duration": 0,
+                    "error": [], "atomic_actions": []}]]
+
+        self.assertEqual(3, db.workload_data_compact(self.workload_uuid,
+                                                     sample))
+        chunks = (sa_api.Connection().model_query(models.WorkloadData).
+                  order_by(models.WorkloadData.chunk_order).all())
+        self.assertEqual([0, 1], [c.chunk_order for c in chunks])
+        self.assertEqual([1, 0], [c.failed_iteration_count for c in chunks])
+        self.assertEqual([self.task_uuid] * 2, [c.task_uuid for c in chunks])
+        self.assertEqual(sample[0] + sample[1],
+                         list(db.workload_data_iterate(self.workload_uuid)))
+
+        self.assertEqual(2, db.workload_data_compact(self.workload_uuid, []))
+        self.assertEqual([],
+                         list(db.workload_data_iterate(self.workload_uuid)))
+
+    def test_workload_data_compact_not_found(self):
+        self.assertRaises(exceptions.NotFoundException,
+                          db.workload_data_compact, "non-existing", [])
+
 
 class DeploymentTestCase(test.DBTestCase):
     def test_deployment_create(self):
@@ -1128,11 +1723,90 @@ class VerificationTestCase(test.DBTestCase):
         self.assertEqual(len(vs), 1)
         self.assertEqual(v2["uuid"], vs[0]["uuid"])
 
+    def test_verification_list_with_tags(self):
+        v1 = db.verification_create(
+            self.verifier["uuid"], self.deploy["uuid"], ["foo", "bar"], {})
+        v2 = self._create_verification()
+
+        vs = dict((v["uuid"], v) for v in db.verification_list())
+        self.assertEqual(["bar", "foo"], vs[v1["uuid"]]["tags"])
+        self.assertEqual([], vs[v2["uuid"]]["tags"])
+
     def test_verification_delete(self):
         v = self._create_verification()
+        db.verification_results_create(
+            v["uuid"], {"foo": {"status": "success", "duration": "1.000"}})
         db.verification_delete(v["uuid"])
         self.assertRaises(exceptions.ResourceNotFound, db.verification_delete,
                           v["uuid"])
+        self.assertEqual({}, db.verification_results_get())
+
+    def test_verification_results_create(self):
+        v = self._create_verification()
+        tests = {
+            "foo[id-1,smoke]": {"name": "foo", "status": "success",
+                                "duration": "1.250", "tags": ["id-1", "smoke"],
+                                "timestamp": "2017-08-09T12:00:01"},
+            "bar": {"name": "bar", "status": "skip", "duration": "0.000",
+                    "tags": [], "reason": "Some reason"}}
+
+        self.assertEqual(2, db.verification_results_create(v["uuid"], tests))
+        self.assertEqual({v["uuid"]: tests},
+                         db.verification_results_get([v["uuid"]]))
+
+    def test_verification_results_create_in_batches(self):
+        v = self._create_verification()
+        tests = dict(("test_%d" % i, {"name": "test_%d" % i,
+                                      "status": "success",
+                                      "duration": "%.3f" % i, "tags": []})
+                     for i in range(5))
+        executions = []
+
+        def before_execute(conn, clauseelement, multiparams, params):
+            if (isinstance(clauseelement, sa.sql.expression.Insert) and
+                    clauseelement.table.name == "verification_results"):
+                executions.append(len(multiparams[0]))
+
+        engine = sa_api.get_engine()
+        sa.event.listen(engine, "before_execute", before_execute)
+        self.addCleanup(sa.event.remove, engine, "before_execute",
+                        before_execute)
+
+        with mock.patch.object(sa_api, "VERIFICATION_RESULTS_BATCH", 2):
+            self.assertEqual(
+                5, db.verification_results_create(v["uuid"], tests))
+        self.assertEqual([2, 2, 1], executions)
+        self.assertEqual(tests, db.verification_results_get(
+            [v["uuid"]])[v["uuid"]])
+
+    def test_verification_results_get(self):
+        v1 = self._create_verification()
+        v2 = self._create_verification()
+        v3 = self._create_verification()
+        db.verification_results_create(v1["uuid"], {
+            "foo": {"status": "success", "duration": "1.0"},
+            "bar": {"status": "fail", "duration": "2.0",
+                    "traceback": "Some traceback"}})
+        db.verification_results_create(v2["uuid"], {
+            "foo": {"status": "fail", "duration": "3.0"}})
+
+        self.assertEqual(
+            {v1["uuid"]: {"bar": {"status": "fail", "duration": "2.000",
+                                  "tags": [],
+                                  "traceback": "Some traceback"}},
+             v2["uuid"]: {"foo": {"status": "fail", "duration": "3.000",
+                                  "tags": []}},
+             v3["uuid"]: {}},
+            db.verification_results_get(
+                [v1["uuid"], v2["uuid"], v3["uuid"]], status="fail"))
+
+        # history of a test
+        self.assertEqual(
+            {v1["uuid"]: {"foo": {"status": "success", "duration": "1.000",
+                                  "tags": []}},
+             v2["uuid"]: {"foo": {"status": "fail", "duration": "3.000",
+                                  "tags": []}}},
+            db.verification_results_get(test_id="foo"))
 
     def test_verification_update(self):
         v = self._create_verification()
@@ -1173,3 +1847,88 @@ class WorkerTestCase(test.DBTestCase):
 
     def test_update_worker_not_found(self):
         self.assertRaises(exceptions.WorkerNotFound, db.update_worker, "fake")
+
+
+class SQLiteConcurrencyTestCase(test.TestCase):
+    def setUp(self):
+        super(SQLiteConcurrencyTestCase, self).setUp()
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.conf = self.useFixture(fixture.Config()).conf
+        self.conf.set_override(
+            "connection",
+            "sqlite:///%s" % os.path.join(tmp_dir, "rally.sqlite"),
+            group="database")
+        db.engine_reset()
+        self.addCleanup(db.engine_reset)
+        db.schema_create()
+
+    def _get_pragma(self, name):
+        with sa_api.get_engine().connect() as conn:
+            return conn.execute("PRAGMA %s" % name).scalar()
+
+    def test_pragmas(self):
+        self.assertEqual("wal", self._get_pragma("journal_mode"))
+        self.assertEqual(30000, self._get_pragma("busy_timeout"))
+        # NORMAL
+        self.assertEqual(1, self._get_pragma("synchronous"))
+
+    def test_pragmas_without_wal(self):
+        self.conf.set_override("sqlite_wal", False, group="database")
+        self.conf.set_override("sqlite_busy_timeout", 100, group="database")
+        db.engine_reset()
+        self.assertEqual("delete", self._get_pragma("journal_mode"))
+        self.assertEqual(100, self._get_pragma("busy_timeout"))
+
+    def test_concurrent_writers_and_readers(self):
+        deployment = db.deployment_create({})
+        task = db.task_create({"deployment_uuid": deployment["uuid"]})
+        subtask = db.subtask_create(task["uuid"], title="foo")
+        key = {"name": "atata", "description": "tatata", "pos": 0,
+               "kw": {"runner": {"type": "constant"}}}
+        workloads = [db.workload_create(task["uuid"], subtask["uuid"], key)
+                     for i in range(2)]
+        chunks = 30
+        errors = []
+        writing = threading.Event()
+        writing.set()
+
+        def write(workload):
+            try:
+                for i in range(chunks):
+                    db.workload_data_create(
+                        task["uuid"], workload["uuid"], i,
+                        {"raw": [{"timestamp": i, "duration": 1,
+                                  "idle_duration": 0, "error": [],
+                                  "output": {}, "atomic_actions": []}]})
+                    db.task_update(task["uuid"], {"title": "chunk %d" % i})
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                while writing.is_set():
+                    db.task_get_status(task["uuid"])
+                    for workload in workloads:
+                        list(db.workload_data_iterate(workload["uuid"]))
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=write, args=(w,))
+                   for w in workloads]
+        readers = [threading.Thread(target=read) for i in range(4)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writing.clear()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(
+            [], [e for e in errors if "database is locked" in str(e)])
+        self.assertEqual([], errors)
+        # all the rows are written
+        for workload in workloads:
+            self.assertEqual(
+                chunks, len(list(db.workload_data_iterate(workload["uuid"]))))
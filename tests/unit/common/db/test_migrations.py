@@ -1417,3 +1417,123 @@ class MigrationWalkTestCase(rtest.DBTestCase,
                 conn.execute(
                     deployment_table.delete().where(
                         deployment_table.c.uuid == deployment))
+
+    def _check_f86b4ba55cf9(self, engine, data):
+        self.assertColumnsExists(
+            engine, "workload_reports",
+            ["created_at", "updated_at", "id", "workload_uuid",
+             "format_version", "options", "report"])
+        self.assertIndexMembers(engine, "workload_reports",
+                                "workload_report_key",
+                                ["workload_uuid", "format_version",
+                                 "options"])
+
+    def _check_35fe16d4ab1c(self, engine, data):
+        self.assertIndexMembers(engine, "workloads", "workload_task_uuid",
+                                ["task_uuid"])
+        self.assertIndexMembers(engine, "workloaddata",
+                                "workload_data_workload_uuid_chunk_order",
+                                ["workload_uuid", "chunk_order"])
+
+    def _check_c5b1a4f3d2e8(self, engine, data):
+        self.assertColumnsExists(engine, "workloaddata", ["format_version"])
+
+    def _pre_upgrade_9a3c1fb5d2e7(self, engine):
+        self._9a3c1fb5d2e7_deployment_uuid = "9a3c1fb5d2e7-deployment"
+        self._9a3c1fb5d2e7_verifier_uuid = "9a3c1fb5d2e7-verifier"
+        self._9a3c1fb5d2e7_verifications_tests = {
+            "9a3c1fb5d2e7-verification-1": {
+                "test_1[smoke, negative]": {
+                    "name": "test_1",
+                    "duration": "2.320",
+                    "status": "skip",
+                    "reason": "Some reason",
+                    "tags": ["smoke", "negative"]
+                },
+                "test_2[smoke, negative]": {
+                    "name": "test_2",
+                    "duration": "4.320",
+                    "status": "fail",
+                    "traceback": "Some traceback",
+                    "tags": ["smoke", "negative"]
+                }
+            },
+            "9a3c1fb5d2e7-verification-2": {}
+        }
+
+        deployment_table = db_utils.get_table(engine, "deployments")
+        verifiers_table = db_utils.get_table(engine, "verifiers")
+        verifications_table = db_utils.get_table(engine, "verifications")
+
+        with engine.connect() as conn:
+            conn.execute(
+                deployment_table.insert(),
+                [{"uuid": self._9a3c1fb5d2e7_deployment_uuid,
+                  "name": self._9a3c1fb5d2e7_deployment_uuid,
+                  "config": json.dumps({}),
+                  "enum_deployments_status":
+                      consts.DeployStatus.DEPLOY_FINISHED,
+                  "credentials": json.dumps({})
+                  }])
+            conn.execute(
+                verifiers_table.insert(),
+                [{"uuid": self._9a3c1fb5d2e7_verifier_uuid,
+                  "name": self._9a3c1fb5d2e7_verifier_uuid,
+                  "type": "some-type",
+                  "status": consts.VerifierStatus.INSTALLED
+                  }])
+            for v_uuid, tests in (
+                    self._9a3c1fb5d2e7_verifications_tests.items()):
+                conn.execute(
+                    verifications_table.insert(),
+                    [{"uuid": v_uuid,
+                      "deployment_uuid": self._9a3c1fb5d2e7_deployment_uuid,
+                      "verifier_uuid": self._9a3c1fb5d2e7_verifier_uuid,
+                      "status": consts.VerificationStatus.FINISHED,
+                      "tests": json.dumps(tests)
+                      }])
+
+    def _check_9a3c1fb5d2e7(self, engine, data):
+        self.assertColumnNotExists(engine, "verifications", "tests")
+        self.assertIndexMembers(
+            engine, "verification_results",
+            "verification_result_verification_uuid_status",
+            ["verification_uuid", "status"])
+        self.assertIndexMembers(
+            engine, "verification_results",
+            "verification_result_test_id_verification_uuid",
+            ["test_id", "verification_uuid"])
+
+        verifications_table = db_utils.get_table(engine, "verifications")
+        results_table = db_utils.get_table(engine, "verification_results")
+        with engine.connect() as conn:
+            results = conn.execute(results_table.select()).fetchall()
+            self.assertEqual(
+                [("9a3c1fb5d2e7-verification-1", "test_1[smoke, negative]",
+                  "skip", 2.32, ["smoke", "negative"],
+                  {"name": "test_1", "reason": "Some reason"}),
+                 ("9a3c1fb5d2e7-verification-1", "test_2[smoke, negative]",
+                  "fail", 4.32, ["smoke", "negative"],
+                  {"name": "test_2", "traceback": "Some traceback"})],
+                sorted((r.verification_uuid, r.test_id, r.status, r.duration,
+                        json.loads(r.tags), json.loads(r.details))
+                       for r in results))
+
+            conn.execute(results_table.delete())
+            for v_uuid in self._9a3c1fb5d2e7_verifications_tests:
+                conn.execute(verifications_table.delete().where(
+                    verifications_table.c.uuid == v_uuid))
+            verifiers_table = db_utils.get_table(engine, "verifiers")
+            conn.execute(verifiers_table.delete().where(
+                verifiers_table.c.uuid == self._9a3c1fb5d2e7_verifier_uuid))
+            deployment_table = db_utils.get_table(engine, "deployments")
+            conn.execute(deployment_table.delete().where(
+                deployment_table.c.uuid ==
+                self._9a3c1fb5d2e7_deployment_uuid))
+
+    def _check_e1c9a6b3f420(self, engine, data):
+        self.assertIndexMembers(engine, "workloaddata",
+                                "workload_data_task_uuid", ["task_uuid"])
+
+    def _check_b7e3d5a9c1f6(self, engine, data):
+        self.assertColumnsExists(engine, "workloaddata", ["tstamp_start"])
@@ -0,0 +1,122 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import ddt
+import six
+
+from rally.common.io import json_stream
+from tests.unit import test
+
+
+class Stream(six.StringIO):
+    """Text stream which counts reads."""
+
+    def __init__(self, text):
+        super(Stream, self).__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super(Stream, self).read(size)
+
+
+@ddt.ddt
+class IterateObjectsTestCase(test.TestCase):
+
+    def _read(self, text, buffer_size=3, **kwargs):
+        results = []
+        for obj in json_stream.iterate_objects(
+                Stream(text), "result", buffer_size=buffer_size, **kwargs):
+            if "result" in obj:
+                obj["result"] = list(obj["result"])
+            results.append(obj)
+        return results
+
+    @ddt.data(1, 3, 7, 1024)
+    def test_iterate_objects(self, buffer_size):
+        results = [
+            {"key": {"name": "Foo.bar", "kw": {"x": [1, 2.5e3, None]}},
+             "result": [{"timestamp": 1.5, "error": []},
+                        {"timestamp": 12345, "error": ["E", "ф \"]\""]}],
+             "sla": [{"success": True}], "load_duration": 10},
+            {"key": {}, "result": [], "sla": []},
+            {"result": [1, "a", [], {}, True, False, None]},
+            {},
+            {"key": 1}]
+        text = json.dumps(results, indent=2)
+
+        self.assertEqual(results, self._read(text, buffer_size))
+        self.assertEqual(
+            results, self._read(json.dumps(results), buffer_size))
+
+    def test_iterate_objects_empty(self):
+        self.assertEqual([], self._read(" [ ] \n"))
+
+    def test_iterate_objects_lazily(self):
+        iterations = [{"timestamp": i, "duration": 1.0} for i in range(100)]
+        stream = Stream(json.dumps([{"key": "foo", "result": iterations,
+                                     "sla": "bar"}]))
+        objects = json_stream.iterate_objects(stream, "result",
+                                              buffer_size=64)
+
+        obj = next(objects)
+        self.assertEqual("foo", obj["key"])
+        self.assertNotIn("sla", obj)
+        self.assertEqual(iterations[0], next(obj["result"]))
+        self.assertLess(stream.reads, 5)
+
+        self.assertEqual(iterations[1:], list(obj["result"]))
+        # members after the array are read with it
+        self.assertEqual("bar", obj["sla"])
+        self.assertEqual([], list(objects))
+
+    def test_iterate_objects_skips_unused_items(self):
+        text = json.dumps([{"key": 1, "result": [1, 2, 3], "sla": 2},
+                           {"key": 2, "result": [4], "sla": 3}])
+        objects = list(json_stream.iterate_objects(six.StringIO(text),
+                                                   "result"))
+
+        self.assertEqual([1, 2], [obj["key"] for obj in objects])
+        self.assertEqual([2, 3], [obj["sla"] for obj in objects])
+        self.assertEqual([], list(objects[0]["result"]))
+
+    def test_iterate_objects_spools_items_before_first_keys(self):
+        results = [{"result": [{"timestamp": i} for i in range(10)],
+                    "key": {"name": "Foo.bar"}, "sla": []},
+                   {"key": {"name": "Foo.baz"}, "result": [], "sla": []}]
+        objects = json_stream.iterate_objects(
+            six.StringIO(json.dumps(results)), "result",
+            first_keys=("key",), buffer_size=16)
+
+        obj = next(objects)
+        # the object is read completely
+        self.assertEqual({"name": "Foo.bar"}, obj["key"])
+        self.assertEqual([], obj["sla"])
+        self.assertEqual(results[0]["result"], list(obj["result"]))
+
+        obj = next(objects)
+        self.assertEqual({"name": "Foo.baz"}, obj["key"])
+        self.assertNotIn("sla", obj)
+        self.assertEqual([], list(obj["result"]))
+        self.assertEqual([], obj["sla"])
+
+    @ddt.data("", "{}", "[", "[{", "[{}", "[1]", "[{1: 2}]",
+              "[{\"a\" 1}]", "[{\"a\": 1,}]", "[{\"result\": 1}]",
+              "[{\"result\": [1 2]}]", "[{\"result\": [1]]", "[{\"a\": tru}]",
+              "[{\"a\": \"b}]", "[{}] {}", "[{},]")
+    def test_iterate_objects_invalid(self, text):
+        self.assertRaises(ValueError, self._read, text)
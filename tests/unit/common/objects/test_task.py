@@ -15,7 +15,9 @@
 
 """Tests for db.task layer."""
 
+import copy
 import datetime as dt
+import types
 
 import ddt
 import jsonschema
@@ -27,6 +29,19 @@ from rally import exceptions
 from tests.unit import test
 
 
+class LazyRawData(object):
+    """Iterations which are loaded from DB on every pass over them."""
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        for itr in self.iterations:
+            yield copy.deepcopy(itr)
+
+
 @ddt.ddt
 class TaskTestCase(test.TestCase):
     def setUp(self):
@@ -232,13 +247,164 @@ class TaskTestCase(test.TestCase):
         results[0]["iterations"] = "foo_iterations"
         self.assertEqual(results, expected)
 
+    def test_extend_results_lazy_iterations(self):
+
+        iterations = [
+            {"timestamp": ts, "duration": 1, "idle_duration": 0,
+             "error": [], "atomic_actions": [], "scenario_output": {
+                 "errors": "", "data": {"foo": ts}}}
+            for ts in (1, 3, 2, 5, 4)]
+        raw = LazyRawData(iterations)
+        results = objects.Task.extend_results(
+            [{"task_uuid": "foo_uuid", "created_at": None,
+              "updated_at": None, "id": 11,
+              "key": {"kw": {}, "name": "Foo.bar", "pos": 0},
+              "data": {"raw": raw, "sla": [], "hooks": [],
+                       "full_duration": 40, "load_duration": 32}}],
+            serializable=True)
+
+        self.assertEqual(5, results[0]["info"]["iterations_count"])
+        self.assertEqual(1, results[0]["info"]["tstamp_start"])
+        self.assertEqual(2, raw.passes)
+        self.assertIsInstance(results[0]["iterations"], types.GeneratorType)
+        loaded = list(results[0]["iterations"])
+        self.assertEqual(3, raw.passes)
+        self.assertEqual([1, 2, 3, 4, 5], [i["timestamp"] for i in loaded])
+        self.assertEqual([[{"items": [("foo", ts)],
+                            "title": "Scenario output", "description": "",
+                            "chart": "OutputStackedAreaChart"}]
+                          for ts in (1, 2, 3, 4, 5)],
+                         [[dict(a, items=list(a["items"]))
+                           for a in i["output"]["additive"]]
+                          for i in loaded])
+
+    @mock.patch("rally.common.objects.task.Task.sort_iterations")
+    def test_extend_results_stored_statistics(self, mock_sort_iterations):
+        iterations = [
+            {"timestamp": ts, "duration": 1, "idle_duration": 0,
+             "error": [], "atomic_actions": []}
+            for ts in (1, 2, 3)]
+        raw = LazyRawData(iterations)
+        raw.ordered = True
+        statistics = {"stat": "durations_stat", "atomic": {},
+                      "iterations_count": 3, "iterations_failed": 0,
+                      "min_duration": 1, "max_duration": 1,
+                      "tstamp_start": 1}
+        results = objects.Task.extend_results(
+            [{"task_uuid": "foo_uuid", "created_at": None,
+              "updated_at": None, "id": 11,
+              "key": {"kw": {}, "name": "Foo.bar", "pos": 0},
+              "data": {"raw": raw, "sla": [], "hooks": [],
+                       "statistics": statistics,
+                       "full_duration": 40, "load_duration": 32}}])
+
+        self.assertEqual(dict(statistics, full_duration=40, load_duration=32),
+                         results[0]["info"])
+        self.assertNotIn("full_duration", statistics)
+        self.assertEqual(0, raw.passes)
+        loaded = list(results[0]["iterations"])
+        self.assertEqual(1, raw.passes)
+        self.assertEqual([1, 2, 3], [i["timestamp"] for i in loaded])
+        self.assertEqual([{"additive": [], "complete": []}] * 3,
+                         [i["output"] for i in loaded])
+        self.assertFalse(mock_sort_iterations.called)
+
+    def test_sort_iterations(self):
+        iterations = [{"timestamp": ts, "n": n}
+                      for n, ts in enumerate([2, 1, 1, 4, 3, 7, 5, 6])]
+        with mock.patch.object(objects.Task, "ITERATIONS_SORT_CHUNK", 2):
+            self.assertEqual(
+                [(1, 1), (1, 2), (2, 0), (3, 4), (4, 3), (5, 6), (6, 7),
+                 (7, 5)],
+                [(i["timestamp"], i["n"])
+                 for i in objects.Task.sort_iterations(iter(iterations))])
+        self.assertEqual([], list(objects.Task.sort_iterations([])))
+
+    def test_sort_iterations_far_out_of_order(self):
+        timestamps = [9, 1, 2, 3, 4, 5, 6, 7, 0]
+        iterations = [{"timestamp": ts} for ts in timestamps]
+        with mock.patch.object(objects.Task, "ITERATIONS_SORT_CHUNK", 2):
+            self.assertEqual(
+                sorted(timestamps),
+                [i["timestamp"]
+                 for i in objects.Task.sort_iterations(iter(iterations))])
+
+    def test_sort_iterations_ordered(self):
+        iterations = [{"timestamp": 2}, {"timestamp": 1}]
+        raw = mock.MagicMock(ordered=True)
+        raw.__iter__.return_value = iter(iterations)
+        self.assertEqual(iterations,
+                         list(objects.Task.sort_iterations(raw)))
+
+    def test_get_iterations_info(self):
+        iterations = [
+            {"timestamp": ts, "duration": ts, "idle_duration": 0,
+             "error": ["E", "m", "t"] if ts == 5 else [],
+             "atomic_actions": [{"name": "a", "started_at": 0,
+                                 "finished_at": ts, "children": []}]}
+            for ts in (3, 2, 5, 4)]
+        info = objects.Task.get_iterations_info(iterations)
+        self.assertEqual(4, info["iterations_count"])
+        self.assertEqual(1, info["iterations_failed"])
+        self.assertEqual(2, info["min_duration"])
+        self.assertEqual(4, info["max_duration"])
+        self.assertEqual(2, info["tstamp_start"])
+        self.assertEqual({"a": {"min_duration": 2, "max_duration": 5,
+                                "count": 1}}, info["atomic"])
+        self.assertEqual(["a", "total"],
+                         [row[0] for row in info["stat"]["rows"]])
+        # the order of iterations does not matter
+        self.assertEqual(info, objects.Task.get_iterations_info(
+            sorted(iterations, key=lambda i: i["timestamp"])))
+
+        # iterations are passed over once if their summary is known
+        summary = objects.task.IterationsSummary()
+        for itr in iterations:
+            summary.add(itr)
+        raw = LazyRawData(iterations)
+        self.assertEqual(info, objects.Task.get_iterations_info(
+            raw, summary=summary))
+        self.assertEqual(1, raw.passes)
+
+    @mock.patch("rally.common.objects.task.db.workload_set_statistics")
+    @mock.patch("rally.common.objects.task.db.task_result_iterate_by_uuids")
+    def test_get_workloads_statistics(self,
+                                      mock_task_result_iterate_by_uuids,
+                                      mock_workload_set_statistics):
+        iterations = [{"timestamp": 1, "duration": 1, "idle_duration": 0,
+                       "error": [], "atomic_actions": []}]
+        raw = LazyRawData(iterations)
+        mock_task_result_iterate_by_uuids.return_value = iter([
+            {"uuid": "w1", "key": "key1",
+             "data": {"raw": LazyRawData(iterations), "sla": "sla1",
+                      "full_duration": 4, "load_duration": 3,
+                      "statistics": {"iterations_count": 42}}},
+            {"uuid": "w2", "key": "key2",
+             "data": {"raw": raw, "sla": "sla2", "full_duration": 2,
+                      "load_duration": 1, "statistics": {}}}])
+
+        workloads = objects.Task.get_workloads_statistics(["t1", "t2"])
+
+        mock_task_result_iterate_by_uuids.assert_called_once_with(
+            ["t1", "t2"])
+        info = objects.Task.get_iterations_info(iterations)
+        self.assertEqual(
+            [{"uuid": "w1", "key": "key1", "sla": "sla1",
+              "info": {"iterations_count": 42, "full_duration": 4,
+                       "load_duration": 3}},
+             {"uuid": "w2", "key": "key2", "sla": "sla2",
+              "info": dict(info, full_duration=2, load_duration=1)}],
+            workloads)
+        self.assertEqual(2, raw.passes)
+        # statistics of old workloads are stored once calculated
+        mock_workload_set_statistics.assert_called_once_with("w2", info)
+
     @mock.patch("rally.common.objects.task.db.deployment_get")
     @mock.patch("rally.common.objects.task.Task.get_results")
     def test_to_dict(self, mock_get_results, mock_deployment_get):
         results = [{"created_at": dt.datetime.now(),
                     "updated_at": dt.datetime.now()}]
         self.task.update({"deployment_uuid": "deployment_uuid",
-                          "deployment_name": "deployment_name",
                           "created_at": dt.datetime.now(),
                           "updated_at": dt.datetime.now(),
                           "results": results})
@@ -252,8 +418,30 @@ class TaskTestCase(test.TestCase):
         mock_get_results.assert_called_once_with()
         mock_deployment_get.assert_called_once_with(
             self.task["deployment_uuid"])
+        self.assertEqual("deployment_name", serialized_task["deployment_name"])
         self.assertEqual(self.task, serialized_task)
 
+    @mock.patch("rally.common.objects.task.db.deployment_get")
+    @mock.patch("rally.common.objects.task.Task.get_results")
+    def test_to_dict_without_results(self, mock_get_results,
+                                     mock_deployment_get):
+        created_at = dt.datetime(2017, 7, 24, 11, 2, 47)
+        self.task.update({"deployment_uuid": "deployment_uuid",
+                          "deployment_name": "deployment_name",
+                          "created_at": created_at,
+                          "updated_at": created_at + dt.timedelta(
+                              seconds=42)})
+
+        serialized_task = objects.Task(task=self.task).to_dict(
+            include_results=False)
+
+        self.assertFalse(mock_get_results.called)
+        self.assertFalse(mock_deployment_get.called)
+        self.assertNotIn("results", serialized_task)
+        self.assertEqual("deployment_name", serialized_task["deployment_name"])
+        self.assertEqual(dt.timedelta(seconds=42), serialized_task["duration"])
+        self.assertEqual("2017-07-24T11:02:47", serialized_task["created_at"])
+
     @mock.patch("rally.common.db.api.task_get_detailed")
     def test_get_detailed(self, mock_task_get_detailed):
         task = objects.Task(task=self.task)
@@ -265,6 +453,36 @@ class TaskTestCase(test.TestCase):
         mock_task_get_detailed.assert_called_once_with("task_id")
         self.assertEqual(mock_task_get_detailed.return_value, task_detailed)
 
+    @mock.patch("rally.common.objects.task.Task.iterate_results")
+    @mock.patch("rally.common.db.api.task_get_detailed")
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_detailed_lazy_iterations(self, mock_task_get,
+                                          mock_task_get_detailed,
+                                          mock_task_iterate_results):
+        mock_task_get.return_value = {"uuid": "task_id"}
+        mock_task_iterate_results.return_value = iter(["foo", "bar"])
+
+        self.assertEqual(
+            {"uuid": "task_id", "results": ["foo", "bar"]},
+            objects.Task.get_detailed("task_id", lazy_iterations=True))
+        mock_task_get.assert_called_once_with("task_id")
+        mock_task_iterate_results.assert_called_once_with("task_id")
+        self.assertFalse(mock_task_get_detailed.called)
+
+    @mock.patch("rally.common.objects.task.db.task_result_iterate_by_uuid")
+    def test_iterate_results(self, mock_task_result_iterate_by_uuid):
+        now = dt.datetime(2017, 6, 4, 5, 14, 44)
+        mock_task_result_iterate_by_uuid.return_value = iter(
+            [{"created_at": now, "updated_at": now, "data": "foo"}])
+
+        results = objects.Task.iterate_results("task_id")
+        self.assertFalse(mock_task_result_iterate_by_uuid.called)
+        self.assertEqual(
+            [{"created_at": "2017-06-04T05:14:44",
+              "updated_at": "2017-06-04T05:14:44", "data": "foo"}],
+            list(results))
+        mock_task_result_iterate_by_uuid.assert_called_once_with("task_id")
+
     @mock.patch("rally.common.objects.task.db.task_result_get_all_by_uuid",
                 return_value="foo_results")
     def test_get_results(self, mock_task_result_get_all_by_uuid):
@@ -331,7 +549,8 @@ class TaskTestCase(test.TestCase):
         self.assertFalse(task.update_status.called)
 
     @ddt.data(True, False)
-    def test_abort_with_running_state(self, soft):
+    @mock.patch("rally.common.objects.task.utils.AbortChannel")
+    def test_abort_with_running_state(self, soft, mock_abort_channel):
         task = objects.Task(mock.MagicMock(), fake=True)
         task.get_status = mock.MagicMock(return_value="running")
         task.update_status = mock.MagicMock()
@@ -347,6 +566,8 @@ class TaskTestCase(test.TestCase):
             allowed_statuses=(consts.TaskStatus.RUNNING,
                               consts.TaskStatus.SOFT_ABORTING)
         )
+        mock_abort_channel.assert_called_once_with(task.task["uuid"])
+        mock_abort_channel.return_value.notify.assert_called_once_with()
 
 
 class SubtaskTestCase(test.TestCase):
@@ -417,13 +638,124 @@ class WorkloadTestCase(test.TestCase):
             self.workload["task_uuid"], self.workload["uuid"],
             0, {"data": "foo"})
 
+    @mock.patch("rally.common.objects.task.db.workload_data_bulk_create")
+    @mock.patch("rally.common.objects.task.db.workload_create")
+    def test_add_workload_data_chunks(self, mock_workload_create,
+                                      mock_workload_data_bulk_create):
+        mock_workload_create.return_value = self.workload
+        workload = objects.Workload("uuid1", "uuid2", {"bar": "baz"})
+        chunks = [{"chunk_order": 0, "raw": []}]
+
+        workload.add_workload_data_chunks(chunks)
+        mock_workload_data_bulk_create.assert_called_once_with(
+            self.workload["task_uuid"], self.workload["uuid"], chunks)
+
+    def test_make_data_chunk(self):
+        iterations = [{"timestamp": 3, "duration": 1, "error": []},
+                      {"timestamp": 1, "duration": 5, "error": ["e"]},
+                      {"timestamp": 2, "duration": 1, "error": []}]
+        self.assertEqual(
+            {"chunk_order": 4,
+             "raw": [iterations[1], iterations[2], iterations[0]],
+             "iteration_count": 3, "failed_iteration_count": 1,
+             "started_at": 1, "finished_at": 6},
+            objects.Workload.make_data_chunk(4, list(iterations)))
+        self.assertEqual({"chunk_order": 0, "raw": []},
+                         objects.Workload.make_data_chunk(0, []))
+
+    @mock.patch("rally.common.objects.task.Task.get_iterations_info")
+    @mock.patch("rally.common.objects.task.db.workload_data_iterate")
     @mock.patch("rally.common.objects.task.db.workload_set_results")
     @mock.patch("rally.common.objects.task.db.workload_create")
     def test_set_results(self, mock_workload_create,
-                         mock_workload_set_results):
+                         mock_workload_set_results,
+                         mock_workload_data_iterate,
+                         mock_task_get_iterations_info):
         mock_workload_create.return_value = self.workload
         workload = objects.Workload("uuid1", "uuid2", {"bar": "baz"})
 
         workload = workload.set_results({"data": "foo"})
+        mock_workload_data_iterate.assert_called_once_with(
+            self.workload["uuid"])
+        mock_task_get_iterations_info.assert_called_once_with(
+            mock_workload_data_iterate.return_value, summary=None)
+        mock_workload_set_results.assert_called_once_with(
+            self.workload["uuid"],
+            {"data": "foo",
+             "statistics": mock_task_get_iterations_info.return_value})
+
+        mock_task_get_iterations_info.reset_mock()
+        summary = objects.task.IterationsSummary()
+        workload = objects.Workload("uuid1", "uuid2", {"bar": "baz"})
+        workload.set_results({"data": "foo"}, summary=summary)
+        mock_task_get_iterations_info.assert_called_once_with(
+            mock_workload_data_iterate.return_value, summary=summary)
+
+    @mock.patch("rally.common.objects.task.db.workload_data_iterate")
+    @mock.patch("rally.common.objects.task.db.workload_set_results")
+    @mock.patch("rally.common.objects.task.db.workload_create")
+    def test_set_results_with_statistics(self, mock_workload_create,
+                                         mock_workload_set_results,
+                                         mock_workload_data_iterate):
+        mock_workload_create.return_value = self.workload
+        workload = objects.Workload("uuid1", "uuid2", {"bar": "baz"})
+
+        workload.set_results({"data": "foo", "statistics": {"a": 1}})
+        self.assertFalse(mock_workload_data_iterate.called)
+        mock_workload_set_results.assert_called_once_with(
+            self.workload["uuid"], {"data": "foo", "statistics": {"a": 1}})
+
+    @mock.patch("rally.common.objects.task.db.workload_set_results")
+    @mock.patch("rally.common.objects.task.db.workload_create")
+    def test_set_results_with_sla_check_latency(self, mock_workload_create,
+                                                mock_workload_set_results):
+        mock_workload_create.return_value = self.workload
+        workload = objects.Workload("uuid1", "uuid2", {"bar": "baz"})
+
+        workload.set_results({"data": "foo", "statistics": {"a": 1}},
+                             sla_check_latency={"avg": 0.1, "max": 0.2})
         mock_workload_set_results.assert_called_once_with(
-            self.workload["uuid"], {"data": "foo"})
+            self.workload["uuid"],
+            {"data": "foo",
+             "statistics": {"a": 1,
+                            "sla_check_latency": {"avg": 0.1, "max": 0.2}}})
+
+    @mock.patch("rally.common.objects.task.db.workload_set_statistics")
+    @mock.patch("rally.common.objects.task.db.workload_data_compact")
+    @mock.patch("rally.common.objects.task.db.workload_data_iterate")
+    def test_compact_data(self, mock_workload_data_iterate,
+                          mock_workload_data_compact,
+                          mock_workload_set_statistics):
+        iterations = [{"timestamp": i, "error": ["E"] if i % 4 else []}
+                      for i in range(12)]
+        mock_workload_data_iterate.return_value = iter(iterations)
+
+        self.assertEqual(
+            11, objects.Workload.compact_data("uuid", {"foo": "bar"},
+                                              sample_size=2, chunk_size=5))
+
+        mock_workload_data_iterate.assert_called_once_with("uuid")
+        chunks = mock_workload_data_compact.call_args[0][1]
+        self.assertEqual([5, 5, 1], [len(chunk) for chunk in chunks])
+        kept = [itr for chunk in chunks for itr in chunk]
+        self.assertEqual(sorted(itr["timestamp"] for itr in kept),
+                         [itr["timestamp"] for itr in kept])
+        self.assertEqual(9, len([itr for itr in kept if itr["error"]]))
+        mock_workload_data_compact.assert_called_once_with("uuid", chunks)
+        mock_workload_set_statistics.assert_called_once_with(
+            "uuid", {"foo": "bar", "iterations_stored": 11})
+
+    @mock.patch("rally.common.objects.task.db.workload_report_get")
+    def test_get_report(self, mock_workload_report_get):
+        self.assertEqual(
+            mock_workload_report_get.return_value,
+            objects.Workload.get_report("uuid", 1, options="opts"))
+        mock_workload_report_get.assert_called_once_with("uuid", 1, "opts")
+
+    @mock.patch("rally.common.objects.task.db.workload_report_set")
+    def test_set_report(self, mock_workload_report_set):
+        self.assertEqual(
+            mock_workload_report_set.return_value,
+            objects.Workload.set_report("uuid", 1, {"foo": "bar"}))
+        mock_workload_report_set.assert_called_once_with(
+            "uuid", 1, {"foo": "bar"}, "")
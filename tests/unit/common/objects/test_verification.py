@@ -36,7 +36,9 @@ class VerificationTestCase(test.TestCase):
         self.assertEqual(self.db_obj["uuid"], v.uuid)
         self.assertEqual(self.db_obj["uuid"], v["uuid"])
 
-    def test_to_dict(self):
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_to_dict(self, mock_verification_results_get):
         TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
         data = {"created_at": dt.date(2017, 2, 3),
                 "updated_at": dt.date(2017, 3, 3),
@@ -56,12 +58,65 @@ class VerificationTestCase(test.TestCase):
                 "expected_failures": 2,
                 "tests_count": 3,
                 "failures": 2}
+        mock_verification_results_get.return_value = {
+            "v_uuid": data.pop("tests")}
         verification = objects.Verification("verification_id")
         verification._db_entry = data
+        result = objects.Verification.to_dict(verification,
+                                              include_tests=False)
+        expected = dict(data)
+        expected["created_at"] = data["created_at"].strftime(TIME_FORMAT)
+        expected["updated_at"] = data["updated_at"].strftime(TIME_FORMAT)
+        self.assertEqual(expected, result)
+        self.assertFalse(mock_verification_results_get.called)
+
         result = objects.Verification.to_dict(verification)
-        data["created_at"] = data["created_at"].strftime(TIME_FORMAT)
-        data["updated_at"] = data["updated_at"].strftime(TIME_FORMAT)
-        self.assertEqual(data, result)
+        expected["tests"] = {"test1": "tdata1", "test2": "tdata2"}
+        self.assertEqual(expected, result)
+        mock_verification_results_get.assert_called_once_with(
+            ["v_uuid"], status=None)
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_tests(self, mock_verification_results_get):
+        tests = {"foo_test": {"status": "success"}}
+        mock_verification_results_get.return_value = {"uuid-1": tests}
+        v = objects.Verification(self.db_obj)
+
+        self.assertEqual(tests, v.tests)
+        # results of tests are loaded once
+        self.assertEqual(tests, v.tests)
+        mock_verification_results_get.assert_called_once_with(
+            ["uuid-1"], status=None)
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_load_tests(self, mock_verification_results_get):
+        mock_verification_results_get.return_value = {
+            "uuid-1": {"foo_test": {"status": "success"}},
+            "uuid-2": {}}
+        verifications = [
+            objects.Verification(dict(self.db_obj, uuid=uuid))
+            for uuid in ("uuid-1", "uuid-2")]
+
+        objects.Verification.load_tests(verifications)
+        self.assertEqual({"foo_test": {"status": "success"}},
+                         verifications[0].tests)
+        self.assertEqual({}, verifications[1].tests)
+        # results of all the verifications are loaded by a single call
+        mock_verification_results_get.assert_called_once_with(
+            ["uuid-1", "uuid-2"])
+
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_get")
+    def test_get_tests(self, mock_verification_results_get):
+        tests = {"foo_test": {"status": "fail"}}
+        mock_verification_results_get.return_value = {"uuid-1": tests}
+        v = objects.Verification(self.db_obj)
+
+        self.assertEqual(tests, v.get_tests(status="fail"))
+        mock_verification_results_get.assert_called_once_with(
+            ["uuid-1"], status="fail")
 
     @mock.patch("rally.common.objects.verification.db.verification_create")
     def test_create(self, mock_verification_create):
@@ -95,8 +150,11 @@ class VerificationTestCase(test.TestCase):
         mock_verification_update.assert_called_once_with(self.db_obj["uuid"],
                                                          status="some-status")
 
+    @mock.patch("rally.common.objects.verification.db."
+                "verification_results_create")
     @mock.patch("rally.common.objects.verification.db.verification_update")
-    def test_finish(self, mock_verification_update):
+    def test_finish(self, mock_verification_update,
+                    mock_verification_results_create):
         v = objects.Verification(self.db_obj)
         totals = {
             "tests_count": 2,
@@ -122,9 +180,12 @@ class VerificationTestCase(test.TestCase):
             }
         }
         v.finish(totals, tests)
+        mock_verification_results_create.assert_called_once_with(
+            self.db_obj["uuid"], tests)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FINISHED,
-            tests=tests, **totals)
+            **totals)
+        self.assertEqual(tests, v.tests)
 
         v = objects.Verification(self.db_obj)
         totals.update(failures=1)
@@ -132,7 +193,7 @@ class VerificationTestCase(test.TestCase):
         v.finish(totals, tests)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FAILED,
-            tests=tests, **totals)
+            **totals)
 
         v = objects.Verification(self.db_obj)
         totals.update(failures=0, unexpected_success=1)
@@ -140,7 +201,7 @@ class VerificationTestCase(test.TestCase):
         v.finish(totals, tests)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FAILED,
-            tests=tests, **totals)
+            **totals)
 
     @mock.patch("rally.common.objects.verification.db.verification_update")
     def test_set_error(self, mock_verification_update):
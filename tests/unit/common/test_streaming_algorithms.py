@@ -22,6 +22,19 @@ from rally.common import streaming_algorithms as algo
 from tests.unit import test
 
 
+@ddt.ddt
+class PercentileTestCase(test.TestCase):
+
+    @ddt.data(
+        {"values": [], "percent": 0.5, "expected": None},
+        {"values": [5], "percent": 0.95, "expected": 5},
+        {"values": [1, 2, 3, 4], "percent": 0.5, "expected": 2.5},
+        {"values": list(range(1, 101)), "percent": 0.95, "expected": 95.05})
+    @ddt.unpack
+    def test_percentile(self, values, percent, expected):
+        self.assertEqual(expected, algo.percentile(values, percent))
+
+
 class MeanComputationTestCase(test.TestCase):
 
     def test_empty_stream(self):
@@ -246,6 +259,142 @@ class PercentileComputationTestCase(test.TestCase):
         self.assertIsNone(comp.result())
 
 
+@ddt.ddt
+class PercentileSketchComputationTestCase(test.TestCase):
+
+    stream = [51.63, 82.2, 52.52, .05, 66, 94.03, 78.6, 80.9, 51.89, 79, 1.4,
+              65.06, 12.46, 51.89, 41, 45.39, 124, 62.2, 32.72, 56.98, 31.19,
+              26.27, 97.3, 56.6, 19.75, 69, 25.03, 10.76, 17.71, 29.4, 15.75,
+              19.88, 90.16, 82.0, 63.4, 14.84, 49.07, 72.06, 41, 1.48, 82.19,
+              48.45, 53, 88.33, 52.31, 62, 15.96, 21.17, 25.33, 53.27]
+
+    @staticmethod
+    def _exact(values, percent):
+        values = sorted(values)
+        return values[int(math.ceil(percent * (len(values) - 1)))]
+
+    @ddt.data(0.01, 0.25, 0.5, 0.9, 0.95, 0.99)
+    def test_add_and_result(self, percent):
+        comp = algo.PercentileSketchComputation(percent)
+        for value in self.stream * 100:
+            comp.add(value)
+        expected = self._exact(self.stream * 100, percent)
+        self.assertLessEqual(abs(comp.result() - expected),
+                             expected * comp.relative_accuracy)
+        self.assertEqual(5000, comp.count)
+
+    @ddt.data(0.001, 0.5, 0.999)
+    def test_result_range(self, percent):
+        comp = algo.PercentileSketchComputation(percent,
+                                                relative_accuracy=0.001)
+        for value in range(10000):
+            comp.add(value)
+        expected = self._exact(range(10000), percent)
+        self.assertLessEqual(abs(comp.result() - expected),
+                             expected * comp.relative_accuracy)
+
+    def test_result_zeros_and_extremes(self):
+        comp = algo.PercentileSketchComputation(0.5)
+        for value in [0, 0, 0, 7, 9]:
+            comp.add(value)
+        self.assertEqual(0.0, comp.result())
+        self.assertEqual(9.0, comp.get_percentile(0.999))
+        self.assertAlmostEqual(7.0, comp.get_percentile(0.75), delta=0.07)
+        self.assertEqual(0.0, comp.get_percentile(0.001))
+        self.assertEqual(9.0, comp.get_percentile(1))
+
+    def test_result_empty(self):
+        comp = algo.PercentileSketchComputation(0.5)
+        self.assertIsNone(comp.result())
+
+    @ddt.data({"percent": 0}, {"percent": 1.5},
+              {"percent": 0.5, "relative_accuracy": 0},
+              {"percent": 0.5, "relative_accuracy": 1})
+    def test_init_raises(self, kwargs):
+        self.assertRaises(ValueError, algo.PercentileSketchComputation,
+                          **kwargs)
+
+    def test_add_raises(self):
+        comp = algo.PercentileSketchComputation(0.5)
+        self.assertRaises(TypeError, comp.add, "foo")
+        self.assertRaises(ValueError, comp.add, -1)
+
+    def test_merge(self):
+        single = algo.PercentileSketchComputation(0.9)
+        comps = [algo.PercentileSketchComputation(0.9) for _ in range(3)]
+        for idx, value in enumerate(self.stream):
+            single.add(value)
+            comps[idx % 3].add(value)
+        merged = comps[0]
+        merged.merge(comps[1])
+        merged.merge(comps[2])
+        merged.merge(algo.PercentileSketchComputation(0.9))
+        self.assertEqual(single.count, merged.count)
+        self.assertEqual(single.result(), merged.result())
+
+    def test_merge_raises(self):
+        comp = algo.PercentileSketchComputation(0.5)
+        self.assertRaises(
+            TypeError, comp.merge,
+            algo.PercentileSketchComputation(0.5, relative_accuracy=0.05))
+
+
+class ReservoirSampleComputationTestCase(test.TestCase):
+
+    def test_add_and_result(self):
+        comp = algo.ReservoirSampleComputation(10, seed=42)
+        for value in range(5):
+            comp.add(value)
+        self.assertEqual([0, 1, 2, 3, 4], comp.result())
+
+        for value in range(5, 1000):
+            comp.add(value)
+        sample = comp.result()
+        self.assertEqual(10, len(sample))
+        self.assertEqual(10, len(set(sample)))
+        self.assertTrue(set(sample).issubset(range(1000)))
+        self.assertEqual(1000, comp.count)
+
+    def test_add_uniform(self):
+        hits = [0] * 10
+        for seed in range(1000):
+            comp = algo.ReservoirSampleComputation(2, seed=seed)
+            for value in range(10):
+                comp.add(value)
+            for value in comp.result():
+                hits[value] += 1
+        # each value gets into the sample with probability 0.2
+        for count in hits:
+            self.assertLess(abs(count - 200), 60)
+
+    def test_add_zero_size(self):
+        comp = algo.ReservoirSampleComputation(0)
+        for value in range(10):
+            comp.add(value)
+        self.assertEqual([], comp.result())
+        self.assertEqual(10, comp.count)
+
+    def test_init_raises(self):
+        self.assertRaises(ValueError, algo.ReservoirSampleComputation, -1)
+
+    def test_merge(self):
+        comps = [algo.ReservoirSampleComputation(10, seed=i)
+                 for i in range(2)]
+        for value in range(1000):
+            comps[0].add(value)
+        for value in range(1000, 1003):
+            comps[1].add(value)
+        comps[0].merge(comps[1])
+        sample = comps[0].result()
+        self.assertEqual(10, len(set(sample)))
+        self.assertEqual(1003, comps[0].count)
+
+        comp = algo.ReservoirSampleComputation(10)
+        comp.merge(comps[1])
+        self.assertEqual([1000, 1001, 1002], sorted(comp.result()))
+        self.assertEqual(3, comp.count)
+
+
 class IncrementComputationTestCase(test.TestCase):
 
     def test_add_and_result(self):
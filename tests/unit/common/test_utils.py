@@ -14,8 +14,11 @@
 
 from __future__ import print_function
 import collections
+import os
+import shutil
 import string
 import sys
+import tempfile
 import threading
 import time
 
@@ -672,6 +675,78 @@ class StopwatchTestCase(test.TestCase):
         ])
 
 
+class AbortChannelTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AbortChannelTestCase, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.channel = utils.AbortChannel("task-uuid", self.tmp_dir)
+        self.addCleanup(self.channel.close)
+
+    def test___init__(self):
+        self.assertEqual(
+            os.path.join(self.tmp_dir, "rally-task-task-uuid.sock"),
+            self.channel.path)
+
+    def test_notify_and_wait(self):
+        self.assertTrue(self.channel.listen())
+        self.assertFalse(self.channel.wait(0.01))
+
+        notifier = utils.AbortChannel("task-uuid", self.tmp_dir)
+        self.assertTrue(notifier.notify())
+        self.assertTrue(notifier.notify())
+        self.assertTrue(self.channel.wait(1))
+        # both notifications are received at once
+        self.assertFalse(self.channel.wait(0.01))
+
+    def test_wait_is_interrupted_by_notification(self):
+        self.assertTrue(self.channel.listen())
+        notifier = utils.AbortChannel("task-uuid", self.tmp_dir)
+        thread = threading.Timer(0.05, notifier.notify)
+        thread.start()
+        self.addCleanup(thread.join)
+
+        started_at = time.time()
+        self.assertTrue(self.channel.wait(10))
+        self.assertLess(time.time() - started_at, 1)
+
+    def test_listen_removes_stale_socket(self):
+        open(self.channel.path, "w").close()
+
+        self.assertTrue(self.channel.listen())
+        self.assertTrue(
+            utils.AbortChannel("task-uuid", self.tmp_dir).notify())
+
+    @mock.patch("rally.common.utils.socket.socket")
+    def test_listen_fails(self, mock_socket):
+        mock_socket.return_value.bind.side_effect = OSError
+
+        self.assertFalse(self.channel.listen())
+        mock_socket.return_value.close.assert_called_once_with()
+
+    @mock.patch("rally.common.utils.time.sleep")
+    def test_wait_without_listening(self, mock_sleep):
+        self.assertFalse(self.channel.wait(2.0))
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_notify_without_listener(self):
+        self.assertFalse(self.channel.notify())
+
+        # the socket of a crashed process
+        open(self.channel.path, "w").close()
+        self.assertFalse(self.channel.notify())
+
+    def test_close(self):
+        self.assertTrue(self.channel.listen())
+        self.assertTrue(os.path.exists(self.channel.path))
+
+        self.channel.close()
+        self.assertFalse(os.path.exists(self.channel.path))
+        self.assertFalse(self.channel.notify())
+        self.channel.close()
+
+
 class BackupTestCase(test.TestCase):
     def setUp(self):
         super(BackupTestCase, self).setUp()
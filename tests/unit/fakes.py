@@ -1881,6 +1881,7 @@ class FakeAPI(object):
         self._task = mock.create_autospec(api._Task)
         self._verifier = mock.create_autospec(api._Verifier)
         self._verification = mock.create_autospec(api._Verification)
+        self.endpoint_url = None
 
     @property
     def deployment(self):
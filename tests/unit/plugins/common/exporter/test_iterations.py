@@ -0,0 +1,155 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+
+import ddt
+import mock
+
+from rally import exceptions
+from rally.plugins.common.exporter import iterations
+from tests.unit import test
+
+PATH = "rally.plugins.common.exporter.iterations"
+
+
+class LazyRawData(object):
+    """Iterations which are loaded from DB on every pass over them."""
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return iter(self.iterations)
+
+
+def make_iteration(timestamp, error=None, **atomics):
+    atomic_actions = []
+    for name, durations in sorted(atomics.items()):
+        for duration in durations:
+            atomic_actions.append({"name": name, "children": [],
+                                   "started_at": timestamp,
+                                   "finished_at": timestamp + duration})
+    return {"timestamp": timestamp, "duration": 2.0, "idle_duration": 0.5,
+            "error": error or [], "output": {"additive": [], "complete": []},
+            "atomic_actions": atomic_actions}
+
+
+def get_tasks_results():
+    return [
+        {"uuid": "w1", "task_uuid": "t1",
+         "key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+         "data": {"raw": LazyRawData([
+             make_iteration(1.0, a=[1.0]),
+             make_iteration(2.0, error=["KeyError", "msg", "tb"])]),
+             "statistics": {"atomic": {"a": {"count": 1}}}}},
+        {"uuid": "w2", "task_uuid": "t2",
+         "key": {"name": "Foo.baz", "pos": 0, "kw": {}},
+         "data": {"raw": LazyRawData([
+             make_iteration(3.0, b=[0.5, 1.0], c=[1.5])]),
+             "statistics": {}}}]
+
+
+@ddt.ddt
+class IterationsExporterTestCase(test.TestCase):
+
+    def test_csv(self):
+        tasks_results = get_tasks_results()
+        reporter = iterations.CSVExporter(iter(tasks_results), None)
+        self.assertEqual(
+            {"print": "task_uuid,workload_uuid,workload,timestamp,duration,"
+                      "idle_duration,error_type,a,b (x2),c\n"
+                      "t1,w1,Foo.bar,1.0,2.0,0.5,,1.0,,\n"
+                      "t1,w1,Foo.bar,2.0,2.0,0.5,KeyError,,,\n"
+                      "t2,w2,Foo.baz,3.0,2.0,0.5,,,1.5,1.5\n"},
+            reporter.generate())
+        # the workload without statistics is processed twice
+        self.assertEqual([1, 3],
+                         [r["data"]["raw"].passes for r in tasks_results])
+
+    def test_ndjson(self):
+        tasks_results = get_tasks_results()
+        reporter = iterations.NDJSONExporter(iter(tasks_results), None)
+        lines = reporter.generate()["print"].split("\n")
+        self.assertEqual("", lines.pop())
+        self.assertEqual(
+            [{"task_uuid": "t1", "workload_uuid": "w1",
+              "workload": "Foo.bar", "timestamp": 1.0, "duration": 2.0,
+              "idle_duration": 0.5, "error_type": None,
+              "atomic_actions": {"a": 1.0}},
+             {"task_uuid": "t1", "workload_uuid": "w1",
+              "workload": "Foo.bar", "timestamp": 2.0, "duration": 2.0,
+              "idle_duration": 0.5, "error_type": "KeyError",
+              "atomic_actions": {}},
+             {"task_uuid": "t2", "workload_uuid": "w2",
+              "workload": "Foo.baz", "timestamp": 3.0, "duration": 2.0,
+              "idle_duration": 0.5, "error_type": None,
+              "atomic_actions": {"b (x2)": 1.5, "c": 1.5}}],
+            [json.loads(line) for line in lines])
+
+    @ddt.data({"path": "~/report.csv", "options": None, "compress": False},
+              {"path": "~/report.csv.gz", "options": None, "compress": True},
+              {"path": "~/report", "options": {"compress": "gzip"},
+               "compress": True})
+    @ddt.unpack
+    @mock.patch("%s.gzip.open" % PATH)
+    def test_write(self, mock_gzip_open, path, options, compress):
+        mock_open = mock.mock_open()
+        reporter = iterations.CSVExporter(get_tasks_results(), path,
+                                          options=options)
+        reporter.BATCH_SIZE = 2
+        with mock.patch("%s.open" % PATH, mock_open, create=True):
+            self.assertEqual(
+                {"open": "file://" + os.path.abspath(
+                    os.path.expanduser(path))},
+                reporter.write())
+
+        expected_open = mock_gzip_open if compress else mock_open
+        not_expected_open = mock_open if compress else mock_gzip_open
+        self.assertFalse(not_expected_open.called)
+        expected_open.assert_called_once_with(os.path.expanduser(path), "wb")
+        f = expected_open.return_value.__enter__.return_value
+        self.assertEqual(2, len(f.write.mock_calls))
+        self.assertEqual(
+            "task_uuid,workload_uuid,workload,timestamp,duration,"
+            "idle_duration,error_type,a,b (x2),c\n"
+            "t1,w1,Foo.bar,1.0,2.0,0.5,,1.0,,\n"
+            "t1,w1,Foo.bar,2.0,2.0,0.5,KeyError,,,\n"
+            "t2,w2,Foo.baz,3.0,2.0,0.5,,,1.5,1.5\n",
+            b"".join(c[1][0] for c in f.write.mock_calls).decode("utf-8"))
+
+    def test_generate_to_file(self):
+        reporter = iterations.NDJSONExporter(get_tasks_results(), "path")
+        report = reporter.generate()
+        self.assertEqual("file://" + os.path.abspath("path"), report["open"])
+        self.assertEqual(3, report["files"]["path"].count("\n"))
+
+    @ddt.data({"path": "path.gz", "options": None},
+              {"path": "path", "options": {"compress": "gzip"}},
+              {"path": "path", "options": {"compress": "xz"}})
+    @ddt.unpack
+    def test_generate_compressed(self, path, options):
+        reporter = iterations.NDJSONExporter(get_tasks_results(), path,
+                                             options=options)
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          reporter.generate)
+
+    def test_write_unknown_compression(self):
+        reporter = iterations.NDJSONExporter(get_tasks_results(), "path",
+                                             options={"compress": "xz"})
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          reporter.write)
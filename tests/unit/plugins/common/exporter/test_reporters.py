@@ -117,26 +117,76 @@ class HTMLExporterTestCase(test.TestCase):
                     "sla": []
                 }], results)
 
+    def test__generate_with_workload_uuid(self):
+        tasks_results = get_tasks_results()
+        tasks_results[0]["uuid"] = "workload_uuid"
+        reporter = reporters.HTMLExporter(iter(tasks_results), None)
+        results = reporter._generate()
+        self.assertEqual("workload_uuid", results[0]["uuid"])
+
+    def test__generate_with_statistics(self):
+        tasks_results = get_tasks_results()
+        tasks_results[0]["data"]["statistics"] = {"iterations_count": 10}
+        reporter = reporters.HTMLExporter(iter(tasks_results), None)
+        results = reporter._generate()
+        self.assertEqual({"iterations_count": 10}, results[0]["statistics"])
+
     @mock.patch("%s.HTMLExporter._generate" % PATH,
                 return_value="task_results")
-    @mock.patch("%s.plot.plot" % PATH, return_value="html")
-    def test_generate(self, mock_plot, mock__generate):
+    @mock.patch("%s.plot.plot_to_file" % PATH)
+    def test_generate(self, mock_plot_to_file, mock__generate):
+        mock_plot_to_file.side_effect = (
+            lambda results, f, **kwargs: f.write("html"))
         reporter = reporters.HTMLExporter([], output_destination=None)
         self.assertEqual({"print": "html"}, reporter.generate())
         mock__generate.assert_called_once_with()
-        mock_plot.assert_called_once_with("task_results",
-                                          include_libs=False)
+        mock_plot_to_file.assert_called_once_with(
+            "task_results", mock.ANY, include_libs=False, zipper=None,
+            processes=None, compress=True)
+
+        mock_plot_to_file.reset_mock()
+        reporter = reporters.HTMLExporter(
+            [], output_destination=None,
+            options={"zipper": "minmax", "processes": 4, "compress": False})
+        reporter.generate()
+        mock_plot_to_file.assert_called_once_with(
+            "task_results", mock.ANY, include_libs=False, zipper="minmax",
+            processes=4, compress=False)
 
-        mock__generate.reset_mock()
-        mock_plot.reset_mock()
+    @mock.patch("%s.HTMLExporter._generate" % PATH,
+                return_value="task_results")
+    @mock.patch("%s.plot.plot_to_file" % PATH)
+    def test_generate_to_file(self, mock_plot_to_file, mock__generate):
+        mock_plot_to_file.side_effect = (
+            lambda results, f, **kwargs: f.write("html"))
         reporter = reporters.HTMLExporter([], output_destination="path")
+        self.assertEqual(
+            {"files": {"path": "html"},
+             "open": "file://" + os.path.abspath("path")},
+            reporter.generate())
+
+    @mock.patch("%s.HTMLExporter._generate" % PATH,
+                return_value="task_results")
+    @mock.patch("%s.plot.plot_to_file" % PATH)
+    def test_write(self, mock_plot_to_file, mock__generate):
+        mock_plot_to_file.side_effect = (
+            lambda results, f, **kwargs: f.write("html"))
+        reporter = reporters.HTMLExporter([], output_destination="~/path",
+                                          options={"zipper": "minmax"})
         reporter.INCLUDE_LIBS = True
-        self.assertEqual({"files": {"path": "html"},
-                          "open": "file://" + os.path.abspath("path")},
-                         reporter.generate())
+        mock_open = mock.mock_open()
+        with mock.patch("%s.open" % PATH, mock_open, create=True):
+            self.assertEqual(
+                {"open": "file://" + os.path.abspath(
+                    os.path.expanduser("~/path"))},
+                reporter.write())
+
+        mock_open.assert_called_once_with(os.path.expanduser("~/path"), "w+")
+        mock_open.return_value.write.assert_called_once_with("html")
         mock__generate.assert_called_once_with()
-        mock_plot.assert_called_once_with("task_results",
-                                          include_libs=True)
+        mock_plot_to_file.assert_called_once_with(
+            "task_results", mock_open.return_value, include_libs=True,
+            zipper="minmax", processes=None, compress=True)
 
 
 class JUnitXMLExporterTestCase(test.TestCase):
@@ -0,0 +1,139 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally.plugins.common.exporter import timeseries
+from tests.unit import test
+
+
+def make_iteration(timestamp, duration, error=None, atomic=None):
+    atomic_actions = []
+    if atomic:
+        atomic_actions.append({"name": "a b", "children": [],
+                               "started_at": timestamp,
+                               "finished_at": timestamp + atomic})
+    return {"timestamp": timestamp, "duration": duration,
+            "idle_duration": 0.0, "error": error or [],
+            "output": {"additive": [], "complete": []},
+            "atomic_actions": atomic_actions}
+
+
+def get_tasks_results():
+    return [
+        {"uuid": "w1", "task_uuid": "t1",
+         "key": {"name": "Foo.bar", "pos": 0,
+                 "kw": {"runner": {"type": "constant"}}},
+         "data": {"raw": [
+             make_iteration(10.5, 2.0, atomic=0.5),
+             make_iteration(10.25, 1.0, atomic=0.5),
+             make_iteration(11.0, 4.0, error=["Key Error", "msg", "tb"])],
+             "statistics": {"atomic": {"a b": {"count": 1}}}}},
+        {"uuid": "w2", "task_uuid": "t1",
+         "key": {"name": "Foo.baz", "pos": 0, "kw": {}},
+         "data": {"raw": [make_iteration(20.0, 1.5)],
+                  "statistics": {"atomic": {}}}}]
+
+
+class TimeSeriesExporterTestCase(test.TestCase):
+
+    def test__iterate_points(self):
+        reporter = timeseries.InfluxDBLineExporter([], None)
+        result = get_tasks_results()[0]
+        tags = {"task": "t1", "workload": "Foo.bar", "runner": "constant"}
+        action_tags = dict(tags, action="a b")
+        self.assertEqual(
+            [("iteration", tags, {"duration": 1.0, "idle_duration": 0.0,
+                                  "failed": False}, 10.25),
+             ("atomic_action", action_tags, {"duration": 0.5}, 10.25),
+             ("iteration", tags, {"duration": 2.0, "idle_duration": 0.0,
+                                  "failed": False}, 10.5),
+             ("atomic_action", action_tags, {"duration": 0.5}, 10.5),
+             ("iteration", tags, {"duration": 4.0, "idle_duration": 0.0,
+                                  "failed": True,
+                                  "error_type": "Key Error"}, 11.0),
+             ("iterations_window", tags,
+              {"count": 2, "failed": 0, "duration_min": 1.0,
+               "duration_avg": 1.5, "duration_max": 2.0}, 10.0),
+             ("iterations_window", tags, {"count": 1, "failed": 1}, 11.0)],
+            [(m, dict(t), dict(f), ts) for m, t, f, ts in
+             reporter._iterate_points(result, {"a b": {"count": 1}})])
+
+
+class InfluxDBLineExporterTestCase(test.TestCase):
+
+    def test_generate(self):
+        reporter = timeseries.InfluxDBLineExporter(get_tasks_results(), None)
+        tags = "task=t1,workload=Foo.bar,runner=constant"
+        self.assertEqual(
+            {"print": (
+                "rally_iteration,{tags} duration=1.0,idle_duration=0.0,"
+                "failed=false 10250000000\n"
+                "rally_atomic_action,{tags},action=a\\ b duration=0.5 "
+                "10250000000\n"
+                "rally_iteration,{tags} duration=2.0,idle_duration=0.0,"
+                "failed=false 10500000000\n"
+                "rally_atomic_action,{tags},action=a\\ b duration=0.5 "
+                "10500000000\n"
+                "rally_iteration,{tags} duration=4.0,idle_duration=0.0,"
+                "failed=true,error_type=\"Key Error\" 11000000000\n"
+                "rally_iterations_window,{tags} count=2i,failed=0i,"
+                "duration_min=1.0,duration_avg=1.5,duration_max=2.0 "
+                "10000000000\n"
+                "rally_iterations_window,{tags} count=1i,failed=1i "
+                "11000000000\n"
+                "rally_iteration,task=t1,workload=Foo.baz duration=1.5,"
+                "idle_duration=0.0,failed=false 20000000000\n"
+                "rally_iterations_window,task=t1,workload=Foo.baz count=1i,"
+                "failed=0i,duration_min=1.5,duration_avg=1.5,"
+                "duration_max=1.5 20000000000\n").format(tags=tags)},
+            reporter.generate())
+
+
+class OpenMetricsExporterTestCase(test.TestCase):
+
+    def test_generate(self):
+        reporter = timeseries.OpenMetricsExporter(get_tasks_results(), None)
+        lines = reporter.generate()["print"].split("\n")
+        self.assertEqual(["# EOF", ""], lines[-2:])
+
+        labels = "task=\"t1\",workload=\"Foo.bar\",runner=\"constant\""
+        labels2 = "task=\"t1\",workload=\"Foo.baz\",runner=\"\""
+        self.assertEqual(
+            ["# TYPE rally_iteration_duration_seconds gauge",
+             "# UNIT rally_iteration_duration_seconds seconds",
+             "# HELP rally_iteration_duration_seconds "
+             "Duration of iterations.",
+             "rally_iteration_duration_seconds{%s} 1.0 10.25" % labels,
+             "rally_iteration_duration_seconds{%s} 2.0 10.5" % labels,
+             "rally_iteration_duration_seconds{%s} 4.0 11.0" % labels,
+             "rally_iteration_duration_seconds{%s} 1.5 20.0" % labels2],
+            lines[:7])
+
+        idx = lines.index("# TYPE rally_atomic_action_duration_seconds gauge")
+        self.assertEqual(
+            ["rally_atomic_action_duration_seconds{%s,action=\"a b\"} "
+             "0.5 10.25" % labels,
+             "rally_atomic_action_duration_seconds{%s,action=\"a b\"} "
+             "0.5 10.5" % labels,
+             "# TYPE rally_window_iterations gauge",
+             "# HELP rally_window_iterations "
+             "Number of iterations started within a second.",
+             "rally_window_iterations{%s} 2.0 10.0" % labels,
+             "rally_window_iterations{%s} 1.0 11.0" % labels,
+             "rally_window_iterations{%s} 1.0 20.0" % labels2],
+            lines[idx + 3:idx + 10])
+        self.assertEqual(
+            ["rally_window_duration_min_seconds{%s} 1.0 10.0" % labels,
+             "rally_window_duration_min_seconds{%s} 1.5 20.0" % labels2],
+            [line for line in lines
+             if line.startswith("rally_window_duration_min_seconds")])
@@ -122,3 +122,20 @@ class FailureRateTestCase(test.TestCase):
         self.assertEqual(single_sla.success, merged_sla.success)
         self.assertEqual(single_sla.errors, merged_sla.errors)
         self.assertEqual(single_sla.total, merged_sla.total)
+
+    @ddt.data(({"max": 40}, [True, False, False, False, False], False),
+              ({"max": 40}, [False, False, True, False, False], True),
+              ({"min": 20}, [True, False, False, False, False], True),
+              ({"min": 20, "max": 50}, [False, True, False, True], False),
+              ({"max": 10}, [], True))
+    @ddt.unpack
+    def test_add_iterations(self, config, errors, result):
+        iterations = [{"error": ["error"] if e else []} for e in errors]
+        batch_sla = failure_rate.FailureRate(config)
+        single_sla = failure_rate.FailureRate(config)
+
+        self.assertEqual(result, batch_sla.add_iterations(iterations))
+        self.assertEqual(
+            result, all([single_sla.add_iteration(i) for i in iterations]))
+        self.assertEqual(single_sla.success, batch_sla.success)
+        self.assertEqual(single_sla.details(), batch_sla.details())
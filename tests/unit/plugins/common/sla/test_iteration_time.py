@@ -81,3 +81,16 @@ class IterationTimeTestCase(test.TestCase):
         self.assertEqual(single_sla.success, merged_sla.success)
         self.assertEqual(single_sla.max_iteration_time,
                          merged_sla.max_iteration_time)
+
+    @ddt.data(([1.0, 2.0, 3.0], True), ([1.0, 5.1, 3.0], False), ([], True))
+    @ddt.unpack
+    def test_add_iterations(self, durations, result):
+        iterations = [{"duration": d} for d in durations]
+        batch_sla = iteration_time.IterationTime(5.0)
+        single_sla = iteration_time.IterationTime(5.0)
+
+        self.assertEqual(result, batch_sla.add_iterations(iterations))
+        self.assertEqual(
+            result, all([single_sla.add_iteration(i) for i in iterations]))
+        self.assertEqual(single_sla.success, batch_sla.success)
+        self.assertEqual(single_sla.details(), batch_sla.details())
@@ -83,3 +83,24 @@ class MaxAverageDurationTestCase(test.TestCase):
 
         self.assertEqual(single_sla.success, merged_sla.success)
         self.assertEqual(single_sla.avg, merged_sla.avg)
+
+    @ddt.data(([1.0, 2.0, 3.0], [], True),
+              ([6.0, 1.0, 1.0], [], False),
+              ([6.0, 1.0, 1.0], [0], True),
+              ([1.0, 9.0, 2.0, 1.0], [3], False),
+              ([], [], True))
+    @ddt.unpack
+    def test_add_iterations(self, durations, failed, result):
+        iterations = [{"duration": d,
+                       "error": ["error"] if i in failed else []}
+                      for i, d in enumerate(durations)]
+        batch_sla = max_average_duration.MaxAverageDuration(4.0)
+        single_sla = max_average_duration.MaxAverageDuration(4.0)
+
+        self.assertEqual(result, batch_sla.add_iterations(iterations))
+        self.assertEqual(
+            result, all([single_sla.add_iteration(i) for i in iterations]))
+        self.assertEqual(single_sla.success, batch_sla.success)
+        self.assertEqual(single_sla.avg, batch_sla.avg)
+        self.assertEqual(single_sla.avg_comp.result(),
+                         batch_sla.avg_comp.result())
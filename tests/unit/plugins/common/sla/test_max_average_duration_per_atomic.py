@@ -92,3 +92,20 @@ class MaxAverageDurationPerAtomicTestCase(test.TestCase):
 
         self.assertEqual(single_sla.success, merged_sla.success)
         self.assertEqual(single_sla.avg_by_action, merged_sla.avg_by_action)
+
+    @ddt.data(([{"a1": 1.0, "a2": 2.0}, {"a1": 3.0, "a2": 4.0}], True),
+              ([{"a1": 9.0, "a2": 2.0}, {"a1": 1.0, "a2": 1.0},
+                {"a1": 1.0, "a2": 1.0}], False),
+              ([{"a1": 1.0}, {"a2": 20.0}], False))
+    @ddt.unpack
+    def test_add_iterations(self, atomics, result):
+        iterations = [{"atomic_actions": a} for a in atomics]
+        init = {"a1": 5, "a2": 10}
+        batch_sla = madpa.MaxAverageDurationPerAtomic(init)
+        single_sla = madpa.MaxAverageDurationPerAtomic(init)
+
+        self.assertEqual(result, batch_sla.add_iterations(iterations))
+        self.assertEqual(
+            result, all([single_sla.add_iteration(i) for i in iterations]))
+        self.assertEqual(single_sla.success, batch_sla.success)
+        self.assertEqual(single_sla.avg_by_action, batch_sla.avg_by_action)
@@ -0,0 +1,186 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+
+from rally.plugins.common.sla import min_throughput
+from rally.task import sla
+from tests.unit import test
+
+
+def make_iterations(rps, seconds, start=1000.0, duration=0.5, error=None):
+    """Generate iterations completed with the given rate."""
+    iterations = []
+    for i in range(int(rps * seconds)):
+        iterations.append({"timestamp": start + i / float(rps),
+                           "duration": duration,
+                           "error": error or []})
+    return iterations
+
+
+@ddt.ddt
+class MinThroughputTestCase(test.TestCase):
+
+    @ddt.data(({"min_rps": 5}, True),
+              ({"min_ratio": 0.9, "window": 5, "warmup": 0}, True),
+              ({"min_rps": 5, "min_ratio": 1}, True),
+              ({"window": 5}, False),
+              ({"min_rps": 0}, False),
+              ({"min_ratio": 1.5}, False),
+              ({"min_rps": 5, "window": 0.5}, False),
+              ({"min_rps": 5, "warmup": -1}, False),
+              ({"min_rps": 5, "foo": 1}, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = sla.SLA.validate("min_throughput", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertEqual(1, len(results))
+
+    def _add(self, sla_inst, iterations):
+        success = True
+        for iteration in iterations:
+            success = sla_inst.add_iteration(iteration)
+        return success
+
+    def test_add_iteration(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 8, "window": 5, "warmup": 5})
+        self.assertTrue(self._add(sla_inst, make_iterations(10, 30)))
+        self.assertIsNotNone(sla_inst.worst_window)
+        self.assertTrue(sla_inst.result()["success"])
+
+        # 20 seconds with 4 rps
+        self.assertFalse(self._add(
+            sla_inst, make_iterations(4, 20, start=1030.0)))
+        self.assertFalse(self._add(
+            sla_inst, make_iterations(10, 20, start=1050.0)))
+        self.assertEqual("Failed", sla_inst.status())
+        self.assertEqual(4.0, sla_inst.worst_window[1])
+
+    def test_add_iteration_warmup(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 8, "window": 5, "warmup": 10})
+        # a slow start is not taken into account
+        self._add(sla_inst, make_iterations(2, 10))
+        self.assertTrue(self._add(
+            sla_inst, make_iterations(10, 30, start=1010.0)))
+
+    def test_add_iteration_failed_iterations(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 8, "window": 5, "warmup": 0})
+        iterations = make_iterations(10, 30)
+        for iteration in iterations[::2]:
+            iteration["error"] = ["E", "msg", "tb"]
+        self.assertFalse(self._add(sla_inst, iterations))
+
+    def test_add_iteration_not_checked_windows(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 100, "window": 10})
+        self.assertTrue(self._add(sla_inst, make_iterations(1, 15)))
+        self.assertIsNone(sla_inst.worst_window)
+        self.assertEqual("No 10s windows after 10s of warm-up to check "
+                         "throughput - Passed", sla_inst.details())
+
+    @ddt.data({"rps": 10, "achieved": 9, "success": True},
+              {"rps": 10, "achieved": 7, "success": False},
+              {"rps": {"start": 2, "end": 10, "step": 2, "duration": 5},
+               "achieved": 9, "success": True},
+              {"rps": {"start": 2, "end": 10, "step": 2, "duration": 5},
+               "achieved": 8, "success": False})
+    @ddt.unpack
+    def test_add_iteration_min_ratio(self, rps, achieved, success):
+        checker = sla.SLAChecker(
+            {"runner": {"type": "rps", "times": 1000, "rps": rps},
+             "sla": {"min_throughput": {"min_ratio": 0.85, "window": 5}}})
+        sla_inst = checker.sla_criteria[0]
+        self.assertEqual(rps, sla_inst.requested_rps)
+        self.assertEqual(success,
+                         self._add(sla_inst, make_iterations(achieved, 60)))
+
+    def test_min_ratio_without_rps_runner(self):
+        checker = sla.SLAChecker(
+            {"runner": {"type": "constant", "times": 1000},
+             "sla": {"min_throughput": {"min_ratio": 0.85, "window": 5}}})
+        sla_inst = checker.sla_criteria[0]
+        self.assertIsNone(sla_inst.requested_rps)
+        self.assertFalse(self._add(sla_inst, make_iterations(1, 60)))
+        self.assertIsNone(sla_inst.worst_window)
+        self.assertEqual(
+            {"criterion": "min_throughput", "success": False,
+             "detail": "min_ratio requires the \"rps\" runner, got "
+                       "\"constant\" - Failed"},
+            sla_inst.result())
+
+    def test_result_checks_last_windows(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 7, "window": 10, "warmup": 0})
+        # the throughput collapses in the last 6 seconds
+        iterations = (make_iterations(10, 30) +
+                      make_iterations(1, 6, start=1030.0))
+        self.assertTrue(self._add(sla_inst, iterations))
+        worst_window = sla_inst.worst_window
+
+        self.assertFalse(sla_inst.result()["success"])
+        self.assertIn("- Failed", sla_inst.details())
+        # the state is not changed by reading the result
+        self.assertTrue(sla_inst.success)
+        self.assertEqual(worst_window, sla_inst.worst_window)
+
+    def test_add_iteration_out_of_order(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 9, "window": 5, "warmup": 0})
+        iterations = make_iterations(10, 30)
+        # results of neighbour iterations come in reverse order
+        for i in range(0, len(iterations) - 1, 2):
+            iterations[i], iterations[i + 1] = (iterations[i + 1],
+                                                iterations[i])
+        self.assertTrue(self._add(sla_inst, iterations))
+
+    @ddt.data([30], [10, 20], [5, 10, 15])
+    def test_merge(self, parts):
+        config = {"min_rps": 6, "window": 5, "warmup": 5}
+        iterations = (make_iterations(10, 20) +
+                      make_iterations(5, 10, start=1020.0))
+
+        single_sla = min_throughput.MinThroughput(config)
+        self._add(single_sla, iterations)
+
+        slas = []
+        start = 0
+        for part in parts:
+            sla_inst = min_throughput.MinThroughput(config)
+            end = start + part * len(iterations) // sum(parts)
+            self._add(sla_inst, iterations[start:end])
+            slas.append(sla_inst)
+            start = end
+        slas.append(min_throughput.MinThroughput(config))
+
+        merged_sla = slas[0]
+        for sla_inst in slas[1:]:
+            merged_sla.merge(sla_inst)
+
+        self.assertFalse(merged_sla.success)
+        self.assertEqual(single_sla.success, merged_sla.success)
+        self.assertEqual(single_sla.details(), merged_sla.details())
+
+    def test_details(self):
+        sla_inst = min_throughput.MinThroughput(
+            {"min_rps": 5, "window": 5, "warmup": 0})
+        self._add(sla_inst, make_iterations(10, 12, start=999.5))
+        self.assertEqual("Lowest throughput in 5s window: 10.00 >= 5.00 "
+                         "iterations per second (at 0.5s) - Passed",
+                         sla_inst.details())
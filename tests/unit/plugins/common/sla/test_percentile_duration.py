@@ -0,0 +1,131 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+
+from rally.plugins.common.sla import percentile_duration
+from rally.task import sla
+from tests.unit import test
+
+
+def make_iteration(duration, error=None, **atomics):
+    return {"duration": duration, "error": error or [],
+            "atomic_actions": atomics}
+
+
+@ddt.ddt
+class PercentileDurationTestCase(test.TestCase):
+
+    @ddt.data(({"percentile": 95, "max": 1.5}, True),
+              ({"percentile": 99.9, "max_per_atomic": {"a": 1}}, True),
+              ({"percentile": 50, "max": 1, "max_per_atomic": {"a": 1}},
+               True),
+              ({"percentile": 95}, False),
+              ({"max": 1.5}, False),
+              ({"percentile": 0, "max": 1.5}, False),
+              ({"percentile": 100, "max": 1.5}, True),
+              ({"percentile": 100.5, "max": 1.5}, False),
+              ({"percentile": 95, "max": 0}, False),
+              ({"percentile": 95, "max_per_atomic": {}}, False),
+              ({"percentile": 95, "max_per_atomic": {"a": "foo"}}, False),
+              ({"percentile": 95, "max": 1, "foo": 1}, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = sla.SLA.validate("percentile_duration", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertEqual(1, len(results))
+
+    def test_result(self):
+        sla1 = percentile_duration.PercentileDuration(
+            {"percentile": 90, "max": 10.0})
+        sla2 = percentile_duration.PercentileDuration(
+            {"percentile": 90, "max": 8.5})
+        for sla_inst in [sla1, sla2]:
+            for i in range(1, 11):
+                sla_inst.add_iteration(make_iteration(float(i)))
+        self.assertTrue(sla1.result()["success"])
+        self.assertFalse(sla2.result()["success"])
+        self.assertEqual("Passed", sla1.status())
+        self.assertEqual("Failed", sla2.status())
+
+    def test_result_no_iterations(self):
+        sla_inst = percentile_duration.PercentileDuration(
+            {"percentile": 95, "max": 1.0, "max_per_atomic": {"a": 1.0}})
+        self.assertTrue(sla_inst.result()["success"])
+
+    def test_add_iteration(self):
+        sla_inst = percentile_duration.PercentileDuration(
+            {"percentile": 50, "max": 5.0})
+        add = sla_inst.add_iteration
+        self.assertTrue(add(make_iteration(1.0)))
+        # median of [1, 7] is above the limit
+        self.assertFalse(add(make_iteration(7.0)))
+        self.assertTrue(add(make_iteration(2.0)))
+        self.assertFalse(add(make_iteration(8.0)))
+        # failed iterations are not taken into account
+        self.assertFalse(add(make_iteration(0.1, error=["E", "msg", "tb"])))
+        self.assertTrue(add(make_iteration(0.1)))
+
+    def test_add_iteration_per_atomic(self):
+        sla_inst = percentile_duration.PercentileDuration(
+            {"percentile": 50, "max_per_atomic": {"a1": 2.0, "a2": 5.0}})
+        add = sla_inst.add_iteration
+        self.assertTrue(add(make_iteration(100.0, a1=1.0, a2=4.0, a3=10.0)))
+        self.assertFalse(add(make_iteration(100.0, a1=3.0, a2=4.0)))
+        self.assertTrue(add(make_iteration(100.0, a1=1.0, a2=1.0)))
+        self.assertTrue(add(make_iteration(100.0, a1=1.0, a2=10.0)))
+        self.assertTrue(add(make_iteration(100.0, a1=1.0, a2=10.0)))
+        # a2 values are [1, 4, 4, 10, 10, 10] now
+        self.assertFalse(add(make_iteration(100.0, a1=1.0, a2=10.0)))
+
+    @ddt.data([[1.0, 2.0, 1.5, 4.3],
+               [2.1, 3.4, 1.2, 6.3, 7.2, 7.0, 1.],
+               [1.1, 1.1, 2.2, 2.2, 3.3, 4.3]])
+    def test_merge(self, durations):
+        config = {"percentile": 75, "max": 4.0,
+                  "max_per_atomic": {"a1": 3.0}}
+        single_sla = percentile_duration.PercentileDuration(config)
+        for dd in durations:
+            for d in dd:
+                single_sla.add_iteration(make_iteration(d, a1=d / 2.0))
+
+        slas = [percentile_duration.PercentileDuration(config)
+                for _ in durations]
+        for idx, sla_inst in enumerate(slas):
+            for d in durations[idx]:
+                sla_inst.add_iteration(make_iteration(d, a1=d / 2.0))
+
+        merged_sla = slas[0]
+        for sla_inst in slas[1:]:
+            merged_sla.merge(sla_inst)
+
+        self.assertEqual(single_sla.success, merged_sla.success)
+        self.assertEqual(single_sla.details(), merged_sla.details())
+
+    def test_details(self):
+        sla_inst = percentile_duration.PercentileDuration(
+            {"percentile": 95, "max": 2.0, "max_per_atomic": {"a1": 1.0}})
+        self.assertEqual("95%ile of durations:\n"
+                         "Iteration. n/a <= 2.00s\n"
+                         "Action: 'a1'. n/a <= 1.00s\n"
+                         "Status: Passed", sla_inst.details())
+
+        sla_inst.add_iteration(make_iteration(1.5, a1=0.5))
+        self.assertEqual("95%ile of durations:\n"
+                         "Iteration. 1.50s <= 2.00s\n"
+                         "Action: 'a1'. 0.50s <= 1.00s\n"
+                         "Status: Passed", sla_inst.details())
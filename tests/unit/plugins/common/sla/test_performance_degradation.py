@@ -86,3 +86,21 @@ class PerformanceDegradationTestCase(test.TestCase):
 
         self.assertEqual("Current degradation: 150.0% - Failed",
                          self.sla.details())
+
+    @ddt.data(([39.0, 30.0, 32.0], [], True),
+              ([39.0, 30.0, 62.0], [], False),
+              ([39.0, 30.0, 62.0], [2], True),
+              ([], [], True))
+    @ddt.unpack
+    def test_add_iterations(self, durations, failed, result):
+        iterations = [{"duration": d,
+                       "error": ["error"] if i in failed else []}
+                      for i, d in enumerate(durations)]
+        batch_sla = perfdegr.PerformanceDegradation({"max_degradation": 50})
+        single_sla = perfdegr.PerformanceDegradation({"max_degradation": 50})
+
+        self.assertEqual(result, batch_sla.add_iterations(iterations))
+        self.assertEqual(
+            result, all([single_sla.add_iteration(i) for i in iterations]))
+        self.assertEqual(single_sla.success, batch_sla.success)
+        self.assertEqual(single_sla.details(), batch_sla.details())
@@ -70,6 +70,15 @@ class ChartTestCase(test.TestCase):
         self.assertEqual([("foo_a", "a_points"), ("foo_b", "b_points")],
                          chart.render())
 
+    @mock.patch(CHARTS + "utils.MinMaxZipper")
+    def test_add_iteration_with_zipper(self, mock_min_max_zipper):
+        chart = self.Chart(self.wload_info, 24, zipper="minmax")
+        chart.add_iteration({"a": 1, "b": 2})
+        self.assertEqual([mock.call(42, 24), mock.call(42, 24)],
+                         mock_min_max_zipper.call_args_list)
+        self.assertRaises(ValueError, self.Chart, self.wload_info,
+                          zipper="foo")
+
     def test__fix_atomic_actions(self):
         chart = self.Chart(self.wload_info)
         self.assertEqual(
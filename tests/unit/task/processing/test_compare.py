@@ -0,0 +1,154 @@
+# Copyright 2017: Mirantis Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+
+from rally.common import streaming_algorithms as streaming
+from rally.task.processing import compare
+from tests.unit import test
+
+
+def make_workload(durations, kw=None, name="Foo.bar", pos=0, errors=0):
+    iterations = []
+    for i, duration in enumerate(durations):
+        iterations.append(
+            {"duration": duration, "error": [],
+             "atomic_actions": [{"name": "foo", "started_at": i,
+                                 "finished_at": i + duration / 2.0,
+                                 "children": []}]})
+    for i in range(errors):
+        iterations.append({"duration": 1, "error": ["E", "msg", "trace"],
+                           "atomic_actions": []})
+    return {"key": {"name": name, "pos": pos,
+                    "kw": kw or {"runner": {"type": "constant"}}},
+            "info": {"atomic": {"foo": {"count": 1}}},
+            "iterations": iterations}
+
+
+@ddt.ddt
+class CompareTestCase(test.TestCase):
+
+    def test_mann_whitney_u(self):
+        # reference values are calculated by scipy.stats.mannwhitneyu(
+        #     a, b, alternative="two-sided", method="asymptotic")
+        sample_a = [1.1, 2.3, 1.5, 0.9, 2.0, 1.7, 1.3, 1.8]
+        sample_b = [2.4, 3.1, 2.2, 1.9, 2.8, 3.3, 2.5, 2.9]
+        u, p_value = compare.mann_whitney_u(sample_a, sample_b)
+        self.assertEqual(3.0, u)
+        self.assertAlmostEqual(0.00276, p_value, places=4)
+
+        u, p_value = compare.mann_whitney_u(sample_b, sample_a)
+        self.assertEqual(61.0, u)
+        self.assertAlmostEqual(0.00276, p_value, places=4)
+
+    def test_mann_whitney_u_with_ties(self):
+        u, p_value = compare.mann_whitney_u([1, 1, 1, 1], [1, 1, 1, 1])
+        self.assertEqual(8.0, u)
+        self.assertEqual(1.0, p_value)
+
+        u, p_value = compare.mann_whitney_u([1, 2, 2, 3], [2, 3, 3, 4])
+        self.assertEqual(3.0, u)
+        self.assertAlmostEqual(0.1720, p_value, places=4)
+
+    def test_mann_whitney_u_empty_sample(self):
+        self.assertRaises(ValueError, compare.mann_whitney_u, [], [1, 2])
+
+    @ddt.data(
+        {"a": [1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 1.02, 0.98],
+         "b": [2.0, 2.1, 1.9, 2.0, 2.05, 1.95, 2.02, 1.98],
+         "status": compare.REGRESSION},
+        {"a": [2.0, 2.1, 1.9, 2.0, 2.05, 1.95, 2.02, 1.98],
+         "b": [1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 1.02, 0.98],
+         "status": compare.IMPROVEMENT},
+        {"a": [1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 1.02, 0.98],
+         "b": [0.98, 1.02, 0.95, 1.05, 1.0, 0.9, 1.1, 1.0],
+         "status": compare.NO_CHANGE},
+        {"a": [1.0], "b": [2.0, 3.0],
+         "status": compare.NOT_AVAILABLE})
+    @ddt.unpack
+    def test_compare_actions(self, a, b, status):
+        result = compare.compare_actions(a, b)
+        self.assertEqual(status, result["status"])
+        self.assertEqual(len(a), result["count_a"])
+        self.assertEqual(len(b), result["count_b"])
+        self.assertEqual(streaming.percentile(sorted(a), 0.5),
+                         result["median_a"])
+        self.assertEqual(streaming.percentile(sorted(b), 0.95),
+                         result["95%ile_b"])
+
+    def test_compare_actions_deltas(self):
+        result = compare.compare_actions([1, 1, 1], [1.5, 1.5, 1.5])
+        self.assertEqual(50.0, result["median_delta"])
+        self.assertEqual(50.0, result["95%ile_delta"])
+
+        result = compare.compare_actions([0, 0], [0, 0])
+        self.assertEqual(0.0, result["median_delta"])
+
+        result = compare.compare_actions([0, 0], [1, 1])
+        self.assertIsNone(result["median_delta"])
+
+    def test_compare(self):
+        base = [make_workload([1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 1.02, 0.98]),
+                make_workload([1, 2], kw={"runner": {"type": "serial"}},
+                              name="Foo.unmatched")]
+        target = [make_workload([2.0, 2.1, 1.9, 2.0, 2.05, 1.95, 2.02, 1.98],
+                                errors=3)]
+
+        result = compare.compare(base, target)
+
+        self.assertEqual(["Foo.unmatched"], result["unmatched"])
+        self.assertEqual(["foo", "total"],
+                         [r["action"] for r in result["rows"]])
+        for row in result["rows"]:
+            self.assertEqual("Foo.bar", row["workload"])
+            self.assertEqual(0, row["pos"])
+            self.assertEqual(8, row["count_b"])
+            self.assertEqual(compare.REGRESSION, row["status"])
+
+    def test_compare_uses_stored_percentiles(self):
+        base = make_workload([1.0, 1.1, 0.9, 1.0])
+        base["info"]["stat"] = {
+            "cols": ["Action", "Min (sec)", "Median (sec)", "90%ile (sec)",
+                     "95%ile (sec)", "Max (sec)", "Avg (sec)", "Success",
+                     "Count"],
+            "rows": [["foo", 0.4, 0.5, 0.6, 0.7, 0.8, 0.5, "100.0%", 10],
+                     ["total", "n/a", "n/a", "n/a", "n/a", "n/a", "n/a",
+                      "n/a", 0]]}
+        target = make_workload([2.0, 2.2, 1.8, 2.0])
+
+        rows = compare.compare([base], [target])["rows"]
+
+        self.assertEqual(["foo", "total"], [r["action"] for r in rows])
+        self.assertEqual((0.5, 0.7), (rows[0]["median_a"],
+                                      rows[0]["95%ile_a"]))
+        self.assertEqual(100.0, rows[0]["median_delta"])
+        self.assertEqual((None, None), (rows[1]["median_a"],
+                                        rows[1]["95%ile_a"]))
+        # samples of durations are still used by the test
+        self.assertEqual(4, rows[0]["count_a"])
+        self.assertEqual(streaming.percentile([1.8, 2.0, 2.0, 2.2], 0.5),
+                         rows[1]["median_b"])
+
+    def test_compare_matches_repeated_configs_in_order(self):
+        base = [make_workload([1, 1.1, 1.2], pos=0),
+                make_workload([5, 5.1, 5.2], pos=1)]
+        target = [make_workload([1, 1.1, 1.2], pos=0)]
+
+        result = compare.compare(base, target)
+
+        self.assertEqual(["Foo.bar"], result["unmatched"])
+        self.assertEqual({0}, set(r["pos"] for r in result["rows"]))
+        self.assertEqual({compare.NO_CHANGE},
+                         set(r["status"] for r in result["rows"]))
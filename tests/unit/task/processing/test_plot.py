@@ -13,10 +13,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import copy
 import json
+import re
+import threading
+import zlib
 
 import ddt
 import mock
+import six
 
 from rally.task.processing import plot
 from tests.unit import test
@@ -24,6 +30,16 @@ from tests.unit import test
 PLOT = "rally.task.processing.plot."
 
 
+class LazyRawData(object):
+    """Iterations which are loaded from DB on every pass over them."""
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+
+    def __iter__(self):
+        return (copy.deepcopy(itr) for itr in self.iterations)
+
+
 @ddt.ddt
 class PlotTestCase(test.TestCase):
 
@@ -78,9 +94,44 @@ class PlotTestCase(test.TestCase):
              "complete_output": [[], [], [], [], [], [], [], [], [], []],
              "has_output": False,
              "output_errors": [],
-             "sla": [], "sla_success": True, "table": "main_stats"},
+             "sla": [], "sla_success": True, "table": "main_stats",
+             "iterations_sampled": None},
             result)
 
+    @mock.patch(PLOT + "charts")
+    def test__process_scenario_sampled(self, mock_charts):
+        iterations = [
+            {"timestamp": i + 2, "error": ["E", "msg", "tb"] if i else [],
+             "duration": i + 5, "idle_duration": i,
+             "output": {"additive": [], "complete": []},
+             "atomic_actions": []} for i in range(2)]
+        data = {"iterations": iterations, "sla": [], "hooks": [],
+                "key": {"kw": {"runner": {"type": "constant"}}, "pos": 0,
+                        "name": "Foo.bar"},
+                "info": {"iterations_count": 100, "iterations_stored": 2,
+                         "stat": "stored_stat", "full_duration": 40,
+                         "load_duration": 32},
+                "created_at": "xxx_time"}
+
+        result = plot._process_scenario(data, 0)
+        self.assertEqual("stored_stat", result["table"])
+        self.assertEqual([("success", 99), ("errors", 1)],
+                         result["iterations"]["pie"])
+        self.assertEqual(100, result["iterations_count"])
+        self.assertEqual(2, result["iterations_sampled"])
+        self.assertEqual([None], [e["iteration"] for e in result["errors"]])
+
+    @mock.patch(PLOT + "_get_workload_report")
+    def test_store_reports(self, mock__get_workload_report):
+        results = [{"key": {"name": name, "kw": {}}}
+                   for name in ("Foo.b", "Foo.a", "Foo.b")]
+        plot.store_reports(results, zipper="z")
+        self.assertEqual(
+            [mock.call(results[1], 0, zipper="z"),
+             mock.call(results[0], 0, zipper="z"),
+             mock.call(results[2], 1, zipper="z")],
+            mock__get_workload_report.call_args_list)
+
     @ddt.data(
         {"hooks": [], "expected": []},
         {"hooks": [
@@ -163,7 +214,7 @@ class PlotTestCase(test.TestCase):
     def test__process_tasks(self, mock_json_dumps, mock__process_scenario):
         tasks_results = [{"key": {"name": i, "kw": "kw_" + i}}
                          for i in ("a", "b", "c", "b")]
-        mock__process_scenario.side_effect = lambda a, b: (
+        mock__process_scenario.side_effect = lambda a, b, zipper: (
             {"cls": "%s_cls" % a["key"]["name"],
              "name": str(b),
              "met": "dummy",
@@ -182,31 +233,93 @@ class PlotTestCase(test.TestCase):
 
     @ddt.data({},
               {"include_libs": True},
-              {"include_libs": False})
+              {"include_libs": False},
+              {"zipper": "minmax"},
+              {"compress": False})
     @ddt.unpack
+    @mock.patch(PLOT + "_dump_workload_data",
+                side_effect=lambda i, r, compress: "<%d %s %s>" % (
+                    i, r, compress))
     @mock.patch(PLOT + "_process_tasks")
     @mock.patch(PLOT + "_extend_results")
     @mock.patch(PLOT + "ui_utils.get_template")
     @mock.patch(PLOT + "json.dumps", side_effect=lambda s: "json_" + s)
     @mock.patch("rally.common.version.version_string", return_value="42.0")
     def test_plot(self, mock_version_string, mock_dumps, mock_get_template,
-                  mock__extend_results, mock__process_tasks, **ddt_kwargs):
-        mock__process_tasks.return_value = "source", "scenarios"
+                  mock__extend_results, mock__process_tasks,
+                  mock__dump_workload_data, **ddt_kwargs):
+        mock__process_tasks.return_value = "source", ["foo", "bar"]
         mock_get_template.return_value.render.return_value = "tasks_html"
         mock__extend_results.return_value = ["extended_result"]
         html = plot.plot("tasks_results", **ddt_kwargs)
         self.assertEqual(html, "tasks_html")
         mock__extend_results.assert_called_once_with("tasks_results")
         mock_get_template.assert_called_once_with("task/report.html")
-        mock__process_tasks.assert_called_once_with(["extended_result"])
-        if "include_libs" in ddt_kwargs:
-            mock_get_template.return_value.render.assert_called_once_with(
-                version="42.0", data="json_scenarios", source="json_source",
-                include_libs=ddt_kwargs["include_libs"])
-        else:
-            mock_get_template.return_value.render.assert_called_once_with(
-                version="42.0", data="json_scenarios", source="json_source",
-                include_libs=False)
+        mock__process_tasks.assert_called_once_with(
+            ["extended_result"], zipper=ddt_kwargs.get("zipper"))
+        compress = ddt_kwargs.get("compress", True)
+        mock_get_template.return_value.render.assert_called_once_with(
+            version="42.0", source="json_source",
+            data="<0 foo %s><1 bar %s>" % (compress, compress),
+            include_libs=ddt_kwargs.get("include_libs", False))
+
+    def test__compact_series(self):
+        data = {"iter": [("duration", [[1, 0.5], [2, 0.25], [4, 1]]),
+                         ("idle_duration", [[1, 0], [2, 0], [4, 3]])],
+                "histogram": [{"x": 0.5, "y": 2}, {"x": 1.0, "y": 1}],
+                "pie": [["success", 2], ["errors", 0]],
+                "single": [[1, 2]],
+                "bools": [[True, False], [False, True]],
+                "text": "foo"}
+        self.assertEqual(
+            {"iter": [["duration", {"_rally_xy": [{"d": [1, 1, 2]},
+                                                  [0.5, 0.25, 1]]}],
+                      ["idle_duration", {"_rally_xy": [{"d": [1, 1, 2]},
+                                                       {"d": [0, 0, 3]}]}]],
+             "histogram": {"_rally_xy": [[0.5, 1.0], {"d": [2, -1]}],
+                           "points": True},
+             "pie": [["success", 2], ["errors", 0]],
+             "single": [[1, 2]],
+             "bools": [[True, False], [False, True]],
+             "text": "foo"},
+            plot._compact_series(data))
+
+    def _load_data_elements(self, html):
+        elements = []
+        for attrs, text in re.findall(
+                r"<script type=\"application/x-rally-data\"([^>]*)>"
+                r"([^<]*)</script>", html):
+            attrs = dict(re.findall(r"([\w-]+)=\"([^\"]*)\"", attrs))
+            if attrs["data-encoding"] == "deflate":
+                text = zlib.decompress(base64.b64decode(text)).decode("utf-8")
+            elements.append((attrs, json.loads(text)))
+        return elements
+
+    @ddt.data(True, False)
+    def test__dump_workload_data(self, compress):
+        report = {"cls": "Foo", "additive_output": [],
+                  "complete_output": [[{"title": "</script>"}], []]}
+        html = plot._dump_workload_data(3, report, compress=compress)
+        encoding = "deflate" if compress else "json"
+        self.assertNotIn("</script>", html.replace("</script>\n", ""))
+        self.assertEqual(
+            [({"data-part": "workload", "data-encoding": encoding},
+              {"cls": "Foo", "additive_output": [], "complete_output": [],
+               "complete_output_id": "complete-output-3"}),
+             ({"id": "complete-output-3", "data-part": "complete_output",
+               "data-encoding": encoding},
+              [[{"title": "</script>"}], []])],
+            self._load_data_elements(html))
+        # the report is not changed
+        self.assertEqual([[{"title": "</script>"}], []],
+                         report["complete_output"])
+
+        report["complete_output"] = [[], []]
+        self.assertEqual(
+            [({"data-part": "workload", "data-encoding": encoding},
+              {"cls": "Foo", "additive_output": [], "complete_output": []})],
+            self._load_data_elements(plot._dump_workload_data(
+                0, report, compress=compress)))
 
     @mock.patch(PLOT + "objects.Task.extend_results")
     def test__extend_results(self, mock_task_extend_results):
@@ -218,6 +331,7 @@ class PlotTestCase(test.TestCase):
              "full_duration": "%s_full_duration" % k,
              "load_duration": "%s_load_duration" % k,
              "created_at": "%s_time" % k,
+             "statistics": "%s_statistics" % k,
              "result": "%s_result" % k} for k in ("foo", "bar", "spam")]
         generic_results = [
             {"id": None, "created_at": None, "updated_at": None,
@@ -226,7 +340,8 @@ class PlotTestCase(test.TestCase):
                       "full_duration": "%s_full_duration" % k,
                       "load_duration": "%s_load_duration" % k,
                       "hooks": "%s_hooks" % k,
-                      "sla": "%s_sla" % k},
+                      "sla": "%s_sla" % k,
+                      "statistics": "%s_statistics" % k},
              "created_at": "%s_time" % k} for k in ("foo", "bar", "spam")]
         results = plot._extend_results(tasks_results)
         self.assertEqual([mock.call([r], True) for r in generic_results],
@@ -237,6 +352,257 @@ class PlotTestCase(test.TestCase):
     def test__extend_results_empty(self):
         self.assertEqual([], plot._extend_results([]))
 
+    def _make_tasks_results(self):
+        tasks_results = []
+        for name, count in (("Foo.bar", 5), ("Foo.bar", 3), ("Bar.foo", 0),
+                            ("Foo.baz", 8)):
+            iterations = [
+                {"timestamp": 1000 + i, "duration": 1.5 + i % 3,
+                 "idle_duration": 0,
+                 "error": ["E", "msg", "tb"] if i % 4 == 3 else [],
+                 "output": {"additive": [], "complete": []},
+                 "atomic_actions": [{"name": "a", "children": [],
+                                     "started_at": 1000 + i,
+                                     "finished_at": 1000.5 + i}]}
+                for i in range(count)]
+            tasks_results.append(
+                {"key": {"name": name, "pos": 0, "description": "",
+                         "kw": {"runner": {"type": "constant",
+                                           "times": count},
+                                "args": {"n": len(tasks_results)}}},
+                 "sla": [{"criterion": "failure_rate", "success": True,
+                          "detail": "ok"}],
+                 "hooks": [], "result": iterations,
+                 "full_duration": count + 6.0, "load_duration": count + 4.0,
+                 "created_at": "2017-06-04T05:14:44"})
+        return tasks_results
+
+    @ddt.data({}, {"include_libs": True, "zipper": "minmax"},
+              {"compress": False})
+    def test_plot_to_file(self, kwargs):
+        output = six.StringIO()
+        plot.plot_to_file(self._make_tasks_results(), output, **kwargs)
+        self.assertEqual(plot.plot(self._make_tasks_results(), **kwargs),
+                         output.getvalue())
+
+    def test_plot_to_file_lazy_results(self):
+
+        tasks_results = self._make_tasks_results()
+        for result in tasks_results:
+            result["result"] = LazyRawData(result["result"])
+        output = six.StringIO()
+        plot.plot_to_file(iter(tasks_results), output)
+        self.assertEqual(plot.plot(self._make_tasks_results()),
+                         output.getvalue())
+
+    @ddt.data({}, {"include_libs": True, "zipper": "minmax"})
+    def test_plot_to_file_in_processes(self, kwargs):
+        tasks_results = self._make_tasks_results()
+        for result in tasks_results[::2]:
+            result["result"] = LazyRawData(result["result"])
+        output = six.StringIO()
+        plot.plot_to_file(tasks_results, output, processes=2, **kwargs)
+        self.assertEqual(plot.plot(self._make_tasks_results(), **kwargs),
+                         output.getvalue())
+
+    @mock.patch(PLOT + "objects.Workload")
+    def test__iterate_workload_reports_in_processes(self, mock_workload):
+        tasks_results = self._make_tasks_results()
+        reports = [plot._get_workload_report(result, pos)
+                   for pos, result in enumerate(tasks_results)]
+        for pos, result in enumerate(tasks_results):
+            result["uuid"] = "uuid-%d" % pos
+        stored = {"uuid-1": dict(reports[1], pos="42", name="foo")}
+        mock_workload.get_report.side_effect = (
+            lambda uuid, version, options: stored.get(uuid))
+
+        self.assertEqual(
+            [json.dumps(r) for r in reports],
+            [json.dumps(r) for r in plot._iterate_workload_reports(
+                list(enumerate(tasks_results)), processes=3)])
+        self.assertEqual(
+            [mock.call("uuid-%d" % pos, plot.REPORT_FORMAT_VERSION,
+                       json.loads(json.dumps(reports[pos])),
+                       "{\"zipper\": \"avg\"}")
+             for pos in (0, 2, 3)],
+            mock_workload.set_report.mock_calls)
+
+    @mock.patch(PLOT + "_process_scenario")
+    @mock.patch(PLOT + "objects.Task.extend_results")
+    @mock.patch(PLOT + "objects.Workload")
+    def test__get_workload_report_stored(self, mock_workload,
+                                         mock_task_extend_results,
+                                         mock__process_scenario):
+        mock_workload.get_report.return_value = {
+            "cls": "Foo", "met": "bar", "pos": "0", "name": "bar"}
+        result = self._make_tasks_results()[0]
+        result["uuid"] = "workload_uuid"
+
+        self.assertEqual(
+            {"cls": "Foo", "met": "bar", "pos": "2", "name": "bar [3]"},
+            plot._get_workload_report(result, 2, zipper="minmax"))
+        mock_workload.get_report.assert_called_once_with(
+            "workload_uuid", plot.REPORT_FORMAT_VERSION,
+            "{\"zipper\": \"minmax\"}")
+        self.assertFalse(mock_task_extend_results.called)
+        self.assertFalse(mock__process_scenario.called)
+        self.assertFalse(mock_workload.set_report.called)
+
+    @mock.patch(PLOT + "_process_scenario")
+    @mock.patch(PLOT + "objects.Task.extend_results")
+    @mock.patch(PLOT + "objects.Workload")
+    def test__get_workload_report_not_stored(self, mock_workload,
+                                             mock_task_extend_results,
+                                             mock__process_scenario):
+        mock_workload.get_report.return_value = None
+        mock_task_extend_results.return_value = ["extended"]
+        result = self._make_tasks_results()[0]
+        result["uuid"] = "workload_uuid"
+
+        self.assertEqual(mock__process_scenario.return_value,
+                         plot._get_workload_report(result, 0))
+        mock_task_extend_results.assert_called_once_with(
+            [plot._make_generic_result(result)])
+        mock__process_scenario.assert_called_once_with("extended", 0,
+                                                       zipper=None)
+        mock_workload.set_report.assert_called_once_with(
+            "workload_uuid", plot.REPORT_FORMAT_VERSION,
+            mock__process_scenario.return_value, "{\"zipper\": \"avg\"}")
+
+    @mock.patch(PLOT + "_process_scenario")
+    @mock.patch(PLOT + "objects.Task.extend_results")
+    @mock.patch(PLOT + "objects.Workload")
+    def test__get_workload_report_without_uuid(self, mock_workload,
+                                               mock_task_extend_results,
+                                               mock__process_scenario):
+        mock_task_extend_results.return_value = ["extended"]
+        self.assertEqual(
+            mock__process_scenario.return_value,
+            plot._get_workload_report(self._make_tasks_results()[0], 0))
+        self.assertFalse(mock_workload.get_report.called)
+        self.assertFalse(mock_workload.set_report.called)
+
+    def test__make_workload_summary(self):
+        result = self._make_tasks_results()[1]
+        result["hooks"] = [{"config": {"name": "foo"}, "results": [],
+                            "summary": {}}]
+        hooks = copy.deepcopy(result["hooks"])
+        info = {"iterations_count": 3, "iterations_failed": 1}
+
+        self.assertEqual(
+            {"cls": "Foo", "met": "bar", "pos": "1", "name": "bar [2]",
+             "runner": "constant", "description": "",
+             "hooks": plot._process_hooks(hooks), "errors_count": 1,
+             "load_duration": 7.0, "full_duration": 9.0,
+             "created_at": "2017-06-04T05:14:44",
+             "sla": result["sla"], "sla_success": True,
+             "iterations_count": 3},
+            plot._make_workload_summary(result, 1, info))
+        self.assertEqual(hooks, result["hooks"])
+
+    def _make_report_server(self, **kwargs):
+        tasks_results = self._make_tasks_results()
+        tasks_results[0]["result"][0]["output"]["complete"].append(
+            {"title": "Foo", "description": "", "chart_plugin": "Table",
+             "data": {"cols": ["a"], "rows": [[1]]}})
+        api = mock.Mock()
+        api.task.get_detailed.return_value = {"results": [
+            {"uuid": "uuid-%d" % i, "key": r["key"],
+             "data": {"raw": r["result"], "sla": r["sla"],
+                      "hooks": r["hooks"],
+                      "load_duration": r["load_duration"],
+                      "full_duration": r["full_duration"]},
+             "created_at": r["created_at"]}
+            for i, r in enumerate(tasks_results)]}
+        api.task.get_workloads_statistics.return_value = [
+            {"uuid": "uuid-%d" % i,
+             "info": {"iterations_count": len(r["result"]),
+                      "iterations_failed": 0}}
+            for i, r in enumerate(tasks_results)]
+        server = plot.ReportServer(api, ["task_uuid"], **kwargs)
+        api.task.get_detailed.assert_called_once_with(
+            task_id="task_uuid", lazy_iterations=True)
+        api.task.get_workloads_statistics.assert_called_once_with(
+            ["task_uuid"])
+        return server, tasks_results
+
+    @mock.patch(PLOT + "objects.Workload.set_report")
+    @mock.patch(PLOT + "objects.Workload.get_report", return_value=None)
+    def test_report_server(self, mock_workload_get_report,
+                           mock_workload_set_report):
+        server, tasks_results = self._make_report_server()
+
+        status, content_type, index = server.handle("/")
+        self.assertEqual((200, "text/html; charset=utf-8"),
+                         (status, content_type))
+        summaries = [json.loads(data) for data in re.findall(
+            r"data-part=\"workload\" data-encoding=\"json\">([^<]*)<",
+            index)]
+        self.assertEqual(
+            [("Bar", "foo", "workloads/0"), ("Foo", "bar", "workloads/1"),
+             ("Foo", "bar", "workloads/2"), ("Foo", "baz", "workloads/3")],
+            [(s["cls"], s["met"], s["src"]) for s in summaries])
+        self.assertNotIn("iterations", summaries[1])
+
+        status, content_type, data = server.handle("/workloads/1")
+        self.assertEqual((200, "application/json"), (status, content_type))
+        report = plot._get_workload_report(tasks_results[0], 0)
+        complete_output = report["complete_output"]
+        report["complete_output"] = []
+        report["complete_output_src"] = "workloads/1/complete_output"
+        self.assertEqual(plot._compact_series(report), json.loads(data))
+        self.assertEqual(
+            (200, "application/json",
+             json.dumps(plot._compact_series(complete_output))),
+            server.handle("/workloads/1/complete_output?foo"))
+        data = json.loads(server.handle("/workloads/2")[2])
+        self.assertNotIn("complete_output_src", data)
+
+        for path in ("/foo", "/workloads", "/workloads/4",
+                     "/workloads/1/foo", "/workloads/-1"):
+            self.assertEqual((404, "text/plain", "Not found"),
+                             server.handle(path))
+
+    @mock.patch(PLOT + "_get_workload_report")
+    def test_report_server_cache(self, mock__get_workload_report):
+        mock__get_workload_report.side_effect = (
+            lambda result, pos, zipper: {"pos": str(pos),
+                                         "complete_output": []})
+        server = self._make_report_server(cache_size=2)[0]
+        for idx in (0, 1, 0, 2, 0, 1):
+            server.get_workload(idx)
+        # the workload 1 is evicted by the workload 2
+        self.assertEqual(
+            [("uuid-2", 0), ("uuid-0", 0), ("uuid-1", 1), ("uuid-0", 0)],
+            [(c[1][0]["uuid"], c[1][1])
+             for c in mock__get_workload_report.mock_calls])
+
+    def test_report_server_http(self):
+        server = mock.Mock()
+        server.handle.side_effect = [
+            (200, "application/json", "{\"foo\": 42}"),
+            (404, "text/plain", "Not found")]
+        httpd = plot.ReportServer.make_http_server(server)
+        self.addCleanup(httpd.server_close)
+        url = "http://%s:%d/workloads/0" % httpd.server_address[:2]
+        thread = threading.Thread(target=httpd.handle_request)
+        thread.start()
+        response = six.moves.urllib.request.urlopen(url)
+        self.assertEqual("application/json",
+                         response.headers["Content-Type"])
+        self.assertEqual(b"{\"foo\": 42}", response.read())
+        thread.join()
+
+        thread = threading.Thread(target=httpd.handle_request)
+        thread.start()
+        e = self.assertRaises(six.moves.urllib.error.HTTPError,
+                              six.moves.urllib.request.urlopen, url + "/foo")
+        self.assertEqual(404, e.code)
+        thread.join()
+        self.assertEqual([mock.call("/workloads/0"),
+                          mock.call("/workloads/0/foo")],
+                         server.handle.mock_calls)
+
     @mock.patch(PLOT + "Trends")
     @mock.patch(PLOT + "ui_utils.get_template")
     @mock.patch(PLOT + "_extend_results")
@@ -254,9 +620,16 @@ class PlotTestCase(test.TestCase):
         self.assertEqual("trends html", plot.trends("tasks_results"))
         self.assertEqual([mock.call("foo"), mock.call("bar")],
                          trends.add_result.mock_calls)
-        mock_get_template.assert_called_once_with("task/trends.html")
-        template.render.assert_called_once_with(version="42.0",
-                                                data="[\"foo\", \"bar\"]")
+
+        trends.add_result.reset_mock()
+        self.assertEqual("trends html",
+                         plot.trends("tasks_results", workloads=["spam"]))
+        self.assertEqual([mock.call("foo"), mock.call("bar"),
+                          mock.call("spam")],
+                         trends.add_result.mock_calls)
+        mock_get_template.assert_called_with("task/trends.html")
+        template.render.assert_called_with(version="42.0",
+                                           data="[\"foo\", \"bar\"]")
 
 
 @ddt.ddt
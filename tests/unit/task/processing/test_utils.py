@@ -50,6 +50,58 @@ class GraphZipperTestCase(test.TestCase):
         self.assertRaises(RuntimeError, merger.add_point, 1)
 
 
+@ddt.ddt
+class MinMaxZipperTestCase(test.TestCase):
+
+    @ddt.data({"data_stream": list(range(1, 11)), "zipped_size": 8,
+               "expected": [[1, 1], [4, 4], [5, 5], [8, 8], [9, 9],
+                            [10, 10]]},
+              {"data_stream": [3, 9, 1, 5, 2, 7], "zipped_size": 4,
+               "expected": [[1, 9], [4, 1], [5, 2], [6, 7]]},
+              {"data_stream": list(range(1, 100)), "zipped_size": 1000,
+               "expected": [[i, i] for i in range(1, 100)]},
+              {"data_stream": [1, 4, 11, None, 42], "zipped_size": 1000,
+               "expected": [[1, 1], [2, 4], [3, 11], [4, 0], [5, 42]]})
+    @ddt.unpack
+    def test_add_point_and_get_zipped_graph(self, data_stream=None,
+                                            zipped_size=None, expected=None):
+        merger = utils.MinMaxZipper(zipped_size=zipped_size)
+        [merger.add_point(value) for value in data_stream]
+        self.assertEqual(expected, merger.get_zipped_graph())
+
+    @ddt.data(10, 999, 1000, 1001, 12345)
+    def test_extremes_are_preserved(self, size):
+        data_stream = [(i * 7919) % 101 / 10.0 for i in range(size)]
+        data_stream[size // 3] = 1000.0
+        data_stream[size // 2] = -1000.0
+        merger = utils.MinMaxZipper(zipped_size=100)
+        [merger.add_point(value) for value in data_stream]
+        graph = merger.get_zipped_graph()
+
+        self.assertLessEqual(len(graph), 100)
+        values = [point[1] for point in graph]
+        self.assertEqual(1000.0, max(values))
+        self.assertEqual(-1000.0, min(values))
+        orders = [point[0] for point in graph]
+        self.assertEqual(sorted(set(orders)), orders)
+        self.assertEqual([1, size], [orders[0], orders[-1]])
+
+    def test_graphs_with_same_size_have_same_orders(self):
+        merger_a = utils.MinMaxZipper(zipped_size=10)
+        merger_b = utils.MinMaxZipper(zipped_size=10)
+        for i in range(1, 58):
+            merger_a.add_point(i % 7)
+            merger_b.add_point(i % 5 * 3)
+        self.assertEqual([p[0] for p in merger_a.get_zipped_graph()],
+                         [p[0] for p in merger_b.get_zipped_graph()])
+
+    def test_get_zipper(self):
+        self.assertEqual(utils.GraphZipper, utils.get_zipper())
+        self.assertEqual(utils.GraphZipper, utils.get_zipper("avg"))
+        self.assertEqual(utils.MinMaxZipper, utils.get_zipper("minmax"))
+        self.assertRaises(ValueError, utils.get_zipper, "foo")
+
+
 class AtomicMergerTestCase(test.TestCase):
     def setUp(self):
         super(AtomicMergerTestCase, self).setUp()
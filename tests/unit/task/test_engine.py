@@ -455,6 +455,26 @@ class TaskEngineTestCase(test.TestCase):
             mock.call(consts.TaskStatus.FINISHED)
         ])
 
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.TaskConfig")
+    @mock.patch("rally.task.engine.utils.AbortChannel")
+    def test_run__listens_to_abort_channel(
+            self, mock_abort_channel, mock_task_config,
+            mock_task_get_status):
+        task = mock.MagicMock()
+        mock_task_config.return_value.subtasks = []
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        eng = engine.TaskEngine(mock.MagicMock(), task, mock.Mock())
+        eng._run_subtask = mock.Mock(side_effect=KeyboardInterrupt)
+        mock_task_config.return_value.subtasks = [mock.Mock()]
+
+        self.assertRaises(KeyboardInterrupt, eng.run)
+
+        mock_abort_channel.assert_called_once_with(task["uuid"])
+        abort_channel = mock_abort_channel.return_value
+        abort_channel.listen.assert_called_once_with()
+        abort_channel.close.assert_called_once_with()
+
     @mock.patch("rally.task.engine.objects.task.Task.get_status")
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.LOG")
@@ -676,24 +696,34 @@ class ResultConsumerTestCase(test.TestCase):
         workload = mock.Mock(spec=objects.Workload)
         runner = mock.MagicMock()
 
-        results = [
-            [{"duration": 1, "timestamp": 3}],
-            [{"duration": 2, "timestamp": 2}]
+        iterations = [
+            {"duration": 1, "timestamp": 3, "error": [],
+             "atomic_actions": []},
+            {"duration": 2, "timestamp": 2, "error": ["e"],
+             "atomic_actions": []}
         ]
 
-        runner.result_queue = collections.deque(results)
+        runner.result_queue = collections.deque([[itr] for itr in iterations])
         runner.event_queue = collections.deque()
         with engine.ResultConsumer(
                 key, task, subtask, workload, runner, False) as consumer_obj:
             pass
 
-        mock_sla_instance.add_iteration.assert_has_calls([
-            mock.call({"duration": 1, "timestamp": 3}),
-            mock.call({"duration": 2, "timestamp": 2})])
+        mock_sla_instance.add_iterations.assert_has_calls([
+            mock.call([iterations[0]]), mock.call([iterations[1]])])
+        self.assertEqual(
+            2, consumer_obj.sla_check_latency["avg"].count)
 
-        self.assertEqual([{"duration": 2, "timestamp": 2},
-                          {"duration": 1, "timestamp": 3}],
+        self.assertEqual([iterations[1], iterations[0]],
                          consumer_obj.results)
+        self.assertEqual(2, consumer_obj.summary.iterations_count)
+        self.assertEqual(1, consumer_obj.summary.iterations_failed)
+        self.assertEqual(2, consumer_obj.summary.tstamp_start)
+        workload.set_results.assert_called_once_with(
+            mock.ANY, summary=consumer_obj.summary,
+            sla_check_latency={
+                "avg": consumer_obj.sla_check_latency["avg"].result(),
+                "max": consumer_obj.sla_check_latency["max"].result()})
 
     @mock.patch("rally.task.hook.HookExecutor")
     @mock.patch("rally.task.engine.LOG")
@@ -720,26 +750,28 @@ class ResultConsumerTestCase(test.TestCase):
         runner.result_queue = collections.deque(results)
         runner.event_queue = collections.deque()
         with engine.ResultConsumer(
-                key, task, subtask, workload, runner, False):
+                key, task, subtask, workload, runner, False) as consumer_obj:
             pass
 
-        self.assertFalse(workload.add_workload_data.called)
+        self.assertFalse(workload.add_workload_data_chunks.called)
         workload.set_results.assert_called_once_with({
             "full_duration": 1,
             "sla": mock_sla_results,
             "load_duration": 0
-        })
+        }, summary=consumer_obj.summary, sla_check_latency=None)
+        self.assertEqual(0, consumer_obj.summary.iterations_count)
 
+    @mock.patch("rally.common.objects.task.IterationsSummary")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
     @mock.patch("rally.task.sla.SLAChecker")
     def test_consume_results_sla_failure_abort(
             self, mock_sla_checker, mock_result_consumer_wait_and_abort,
-            mock_task_get_status):
+            mock_task_get_status, mock_iterations_summary):
         mock_sla_instance = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
-        mock_sla_instance.add_iteration.side_effect = [True, True, False,
-                                                       False]
+        mock_sla_instance.add_iterations.side_effect = [True, False, False,
+                                                        False]
         key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
         task = mock.MagicMock()
         subtask = mock.Mock(spec=objects.Subtask)
@@ -757,6 +789,33 @@ class ResultConsumerTestCase(test.TestCase):
         task.update_status.assert_called_once_with(
             consts.TaskStatus.SOFT_ABORTING)
 
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_sla_failure_abort_empty_batch(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_log):
+        mock_sla_instance = mock.MagicMock()
+        mock_sla_checker.return_value = mock_sla_instance
+        mock_sla_instance.add_iterations.return_value = False
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        subtask = mock.Mock(spec=objects.Subtask)
+        workload = mock.Mock(spec=objects.Workload)
+        runner = mock.MagicMock()
+
+        runner.result_queue = collections.deque([[]])
+
+        with engine.ResultConsumer(
+                key, task, subtask, workload, runner, True) as consumer_obj:
+            pass
+
+        self.assertTrue(runner.abort.called)
+        mock_log.info.assert_any_call(
+            "SLA failure is detected, aborting the workload.")
+        self.assertEqual(0, consumer_obj.sla_check_latency["avg"].count)
+
     @mock.patch("rally.task.hook.HookExecutor")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.threading.Thread")
@@ -796,8 +855,8 @@ class ResultConsumerTestCase(test.TestCase):
         mock_sla_instance = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
         mock_task_get_status.return_value = consts.TaskStatus.CRASHED
-        mock_sla_instance.add_iteration.side_effect = [True, True, False,
-                                                       False]
+        mock_sla_instance.add_iterations.side_effect = [True, True, False,
+                                                        False]
         key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
         task = mock.MagicMock()
         subtask = mock.Mock(spec=objects.Subtask)
@@ -840,13 +899,14 @@ class ResultConsumerTestCase(test.TestCase):
         mock_sla_instance.set_unexpected_failure.assert_has_calls(
             [mock.call(exc)])
 
+    @mock.patch("rally.common.objects.task.IterationsSummary")
     @mock.patch("rally.task.engine.CONF")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
     @mock.patch("rally.task.sla.SLAChecker")
     def test_consume_results_chunked(
             self, mock_sla_checker, mock_result_consumer_wait_and_abort,
-            mock_task_get_status, mock_conf):
+            mock_task_get_status, mock_conf, mock_iterations_summary):
         mock_conf.raw_result_chunk_size = 2
         mock_sla_instance = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
@@ -873,26 +933,72 @@ class ResultConsumerTestCase(test.TestCase):
                 key, task, subtask, workload, runner, False) as consumer_obj:
             pass
 
-        mock_sla_instance.add_iteration.assert_has_calls([
-            mock.call({"duration": 1, "timestamp": 3}),
-            mock.call({"duration": 2, "timestamp": 2}),
-            mock.call({"duration": 3, "timestamp": 3}),
-            mock.call({"duration": 4, "timestamp": 2}),
-            mock.call({"duration": 5, "timestamp": 3}),
-            mock.call({"duration": 6, "timestamp": 2}),
-            mock.call({"duration": 7, "timestamp": 1})])
+        mock_sla_instance.add_iterations.assert_has_calls([
+            mock.call([{"duration": 1, "timestamp": 3},
+                       {"duration": 2, "timestamp": 2},
+                       {"duration": 3, "timestamp": 3}]),
+            mock.call([{"duration": 4, "timestamp": 2},
+                       {"duration": 5, "timestamp": 3}]),
+            mock.call([{"duration": 6, "timestamp": 2}]),
+            mock.call([{"duration": 7, "timestamp": 1}])])
 
         self.assertEqual([{"duration": 7, "timestamp": 1}],
                          consumer_obj.results)
 
-        workload.add_workload_data.assert_has_calls([
-            mock.call(0, {"raw": [{"duration": 2, "timestamp": 2},
-                                  {"duration": 1, "timestamp": 3}]}),
-            mock.call(1, {"raw": [{"duration": 4, "timestamp": 2},
-                                  {"duration": 3, "timestamp": 3}]}),
-            mock.call(2, {"raw": [{"duration": 6, "timestamp": 2},
-                                  {"duration": 5, "timestamp": 3}]}),
-            mock.call(3, {"raw": [{"duration": 7, "timestamp": 1}]})])
+        workload.add_workload_data_chunks.assert_has_calls([
+            mock.call([{"chunk_order": 0,
+                        "raw": [{"duration": 2, "timestamp": 2},
+                                {"duration": 1, "timestamp": 3}],
+                        "iteration_count": 2, "failed_iteration_count": 0,
+                        "started_at": 2, "finished_at": 4}]),
+            mock.call([{"chunk_order": 1,
+                        "raw": [{"duration": 4, "timestamp": 2},
+                                {"duration": 3, "timestamp": 3}],
+                        "iteration_count": 2, "failed_iteration_count": 0,
+                        "started_at": 2, "finished_at": 6}]),
+            mock.call([{"chunk_order": 2,
+                        "raw": [{"duration": 6, "timestamp": 2},
+                                {"duration": 5, "timestamp": 3}],
+                        "iteration_count": 2, "failed_iteration_count": 0,
+                        "started_at": 2, "finished_at": 8}]),
+            mock.call([{"chunk_order": 3,
+                        "raw": [{"duration": 7, "timestamp": 1}],
+                        "iteration_count": 1, "failed_iteration_count": 0,
+                        "started_at": 1, "finished_at": 8}])])
+
+    @mock.patch("rally.common.objects.task.IterationsSummary")
+    @mock.patch("rally.task.engine.CONF")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_several_chunks_at_once(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_conf, mock_iterations_summary):
+        mock_conf.raw_result_chunk_size = 2
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        workload = mock.Mock(spec=objects.Workload)
+        runner = mock.MagicMock()
+        results = [{"duration": 1, "timestamp": ts} for ts in (5, 4, 3, 2, 1)]
+        runner.result_queue = collections.deque([results])
+        runner.event_queue = collections.deque()
+
+        with engine.ResultConsumer(key, mock.MagicMock(spec=objects.Task),
+                                   mock.Mock(spec=objects.Subtask),
+                                   workload, runner, False):
+            pass
+
+        self.assertEqual(
+            [mock.call([{"chunk_order": 0, "raw": [results[1], results[0]],
+                         "iteration_count": 2, "failed_iteration_count": 0,
+                         "started_at": 4, "finished_at": 6},
+                        {"chunk_order": 1, "raw": [results[3], results[2]],
+                         "iteration_count": 2, "failed_iteration_count": 0,
+                         "started_at": 2, "finished_at": 4}]),
+             mock.call([{"chunk_order": 2, "raw": [results[4]],
+                         "iteration_count": 1, "failed_iteration_count": 0,
+                         "started_at": 1, "finished_at": 2}])],
+            workload.add_workload_data_chunks.call_args_list)
 
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.hook.HookExecutor")
@@ -942,13 +1048,13 @@ class ResultConsumerTestCase(test.TestCase):
             mock.call(event_type="iteration", value=3)
         ])
 
-        self.assertFalse(workload.add_workload_data.called)
+        self.assertFalse(workload.add_workload_data_chunks.called)
         workload.set_results.assert_called_once_with({
             "full_duration": 1,
             "sla": mock_sla_results,
             "hooks": mock_hook_results,
             "load_duration": 0
-        })
+        }, summary=consumer_obj.summary, sla_check_latency=None)
 
     @mock.patch("rally.task.engine.threading.Thread")
     @mock.patch("rally.task.engine.threading.Event")
@@ -1008,6 +1114,53 @@ class ResultConsumerTestCase(test.TestCase):
         # test task.get_status is checked until is_done is not set
         self.assertEqual(4, mock_task_get_status.call_count)
 
+    @mock.patch("rally.task.engine.threading.Thread")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.time.sleep")
+    def test_wait_and_abort_with_abort_channel(
+            self, mock_sleep, mock_task_get_status, mock_thread):
+        runner = mock.MagicMock()
+        task = mock.MagicMock()
+        abort_channel = mock.Mock()
+        mock_task_get_status.side_effect = (consts.TaskStatus.RUNNING,
+                                            consts.TaskStatus.ABORTING)
+
+        res = engine.ResultConsumer(mock.MagicMock(), task,
+                                    mock.Mock(spec=objects.Subtask),
+                                    mock.Mock(spec=objects.Workload),
+                                    runner, True,
+                                    abort_channel=abort_channel)
+        res.wait_and_abort()
+
+        runner.abort.assert_called_once_with()
+        task.update_status.assert_called_once_with(consts.TaskStatus.ABORTED)
+        abort_channel.wait.assert_called_once_with(
+            engine.ResultConsumer.ABORT_CHECK_INTERVAL)
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_notifies_abort_channel(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque()
+        runner.event_queue = collections.deque()
+        abort_channel = mock.Mock()
+
+        with engine.ResultConsumer(
+                key, mock.MagicMock(), mock.Mock(spec=objects.Subtask),
+                mock.Mock(spec=objects.Workload), runner, False,
+                abort_channel=abort_channel) as consumer:
+            self.assertFalse(abort_channel.notify.called)
+
+        # the aborting checker is woken up to not wait for its timeout
+        self.assertTrue(consumer.is_done.isSet())
+        abort_channel.notify.assert_called_once_with()
+
 
 class TaskTestCase(test.TestCase):
     @mock.patch("jsonschema.validate")
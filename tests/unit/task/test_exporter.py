@@ -40,6 +40,36 @@ class ExporterTestCase(test.TestCase):
 
 class TaskExporterTestCase(test.TestCase):
 
+    def test_make_with_options(self):
+        reporter_cls = mock.Mock()
+        reporter_cls.return_value.generate.return_value = {"print": "foo"}
+
+        exporter.TaskExporter.make(reporter_cls, "results", "dest", "api")
+        reporter_cls.assert_called_once_with("results", "dest", "api")
+
+        reporter_cls.reset_mock()
+        exporter.TaskExporter.make(reporter_cls, "results", "dest", "api",
+                                   options={"foo": "bar"})
+        reporter_cls.assert_called_once_with("results", "dest", "api",
+                                             options={"foo": "bar"})
+
+    def test_make_stream(self):
+        reporter_cls = mock.Mock(STREAMING=True)
+        reporter_cls.return_value.write.return_value = {"open": "/path"}
+        self.assertEqual({"open": "/path"},
+                         exporter.TaskExporter.make(reporter_cls, None,
+                                                    "/path", stream=True))
+        self.assertFalse(reporter_cls.return_value.generate.called)
+
+        # exporters which do not support streaming generate reports
+        reporter_cls.return_value.write.reset_mock()
+        reporter_cls.STREAMING = False
+        reporter_cls.return_value.generate.return_value = {"print": "foo"}
+        self.assertEqual({"print": "foo"},
+                         exporter.TaskExporter.make(reporter_cls, None,
+                                                    "/path", stream=True))
+        self.assertFalse(reporter_cls.return_value.write.called)
+
     def test_make(self):
         reporter_cls = mock.Mock()
 
@@ -18,6 +18,7 @@ import mock
 
 from rally.common.plugin import plugin
 from rally.task import sla
+from rally.task import utils
 from tests.unit import test
 
 
@@ -56,6 +57,39 @@ class SLACheckerTestCase(test.TestCase):
                             "success": False}]
         self.assertEqual(expected_result, sla_checker.results())
 
+    @mock.patch.object(TestCriterion, "set_workload_config")
+    def test_init_sets_workload_config(
+            self, mock_test_criterion_set_workload_config):
+        config = {"runner": {"type": "constant"},
+                  "sla": {"test_criterion": 42}}
+        sla.SLAChecker(config)
+        mock_test_criterion_set_workload_config.assert_called_once_with(
+            config)
+
+    @ddt.data(([42, 42], True), ([42, 43, 42], False), ([], True))
+    @ddt.unpack
+    def test_add_iterations(self, iterations, result):
+        sla_checker = sla.SLAChecker({"sla": {"test_criterion": 42}})
+        self.assertEqual(result, sla_checker.add_iterations(iterations))
+
+    def test_add_iterations_wraps_atomic_actions_once(self):
+        sla_checker = sla.SLAChecker({"sla": {}})
+        iterations = [{"atomic_actions": {"foo": 1}},
+                      {"atomic_actions": [{"name": "foo", "started_at": 1,
+                                           "finished_at": 3,
+                                           "children": []}]}]
+        sla_checker.add_iterations(iterations)
+        wrappers = [i["atomic_actions"] for i in iterations]
+        for wrapper in wrappers:
+            self.assertIsInstance(wrapper, utils.WrapperForAtomicActions)
+        self.assertEqual([("foo", 1)], list(wrappers[0].items()))
+        self.assertEqual([("foo", 2)], list(wrappers[1].items()))
+
+        sla_checker.add_iterations(iterations)
+        self.assertEqual(wrappers, [i["atomic_actions"] for i in iterations])
+        for wrapper, iteration in zip(wrappers, iterations):
+            self.assertIs(wrapper, iteration["atomic_actions"])
+
     def test_set_unexpected_failure(self):
         exc = "error;("
         sla_checker = sla.SLAChecker({"sla": {}})
@@ -169,6 +203,14 @@ class SLATestCase(test.TestCase):
         sla2 = AnotherTestCriterion(0)
         self.assertRaises(TypeError, sla1.validate_type, sla2)
 
+    @ddt.data(([42, 42], True, True), ([42, 43, 42], False, True),
+              ([42, 43], False, False), ([], True, True))
+    @ddt.unpack
+    def test_add_iterations(self, iterations, result, success):
+        sla_inst = TestCriterion(42)
+        self.assertEqual(result, sla_inst.add_iterations(iterations))
+        self.assertEqual(success, sla_inst.success)
+
     @ddt.data((10, True),
               ({}, False))
     @ddt.unpack
@@ -16,7 +16,11 @@
 """Test for api."""
 
 import copy
+import gzip
+import json
 import os
+import shutil
+import tempfile
 
 import ddt
 import jsonschema
@@ -368,53 +372,20 @@ class TaskAPITestCase(test.TestCase):
         self.assertFalse(mock_task.get_status.called)
         self.assertFalse(mock_time.sleep.called)
 
-    @ddt.data({"task_status": "strange value",
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.INIT,
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.VALIDATING,
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.ABORTING,
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.SOFT_ABORTING,
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.RUNNING,
-               "expected_status": consts.TaskStatus.FINISHED},
-              {"task_status": consts.TaskStatus.ABORTED,
-               "expected_status": None},
-              {"task_status": consts.TaskStatus.FINISHED,
-               "expected_status": None},
-              {"task_status": consts.TaskStatus.CRASHED,
-               "expected_status": None},
-              {"task_status": "strange value",
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.INIT,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.VALIDATING,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.RUNNING,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.ABORTING,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.SOFT_ABORTING,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.ABORTED,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.FINISHED,
-               "force": True, "expected_status": None},
-              {"task_status": consts.TaskStatus.CRASHED,
-               "force": True, "expected_status": None})
+    @ddt.data({"force": False,
+               "expected_status": [consts.TaskStatus.ABORTED,
+                                   consts.TaskStatus.FINISHED,
+                                   consts.TaskStatus.CRASHED,
+                                   consts.TaskStatus.DELETING]},
+              {"force": True, "expected_status": None})
     @ddt.unpack
     @mock.patch("rally.api.objects.Task.get_status")
     @mock.patch("rally.api.objects.Task.delete_by_uuid")
     def test_delete(self, mock_task_delete_by_uuid, mock_task_get_status,
-                    task_status, expected_status, force=False, raises=None):
-        mock_task_get_status.return_value = task_status
+                    force, expected_status):
         self.task_inst.delete(task_uuid=self.task_uuid, force=force)
-        if force:
-            self.assertFalse(mock_task_get_status.called)
-        else:
-            mock_task_get_status.assert_called_once_with(self.task_uuid)
+        # the status is checked by the database layer
+        self.assertFalse(mock_task_get_status.called)
         mock_task_delete_by_uuid.assert_called_once_with(
             self.task_uuid,
             status=expected_status)
@@ -428,6 +399,7 @@ class TaskAPITestCase(test.TestCase):
         output_dest = mock.Mock()
 
         reporter = mock_task_exporter.get.return_value
+        reporter.LAZY_RESULTS = False
 
         self.assertEqual(mock_task_exporter.make.return_value,
                          self.task_inst.export(
@@ -440,24 +412,178 @@ class TaskAPITestCase(test.TestCase):
 
         mock_task_exporter.make.assert_called_once_with(
             reporter, ["detail", "detail"], output_dest,
-            api=self.task_inst.api)
-        self.assertEqual([mock.call(u) for u in task_id],
+            api=self.task_inst.api, options=None, stream=False)
+        self.assertEqual([mock.call(u, lazy_iterations=False)
+                          for u in task_id],
                          mock_task_get_detailed.call_args_list)
 
+    @mock.patch("rally.api.texporter.TaskExporter")
+    @mock.patch("rally.api.objects.Task.get_detailed")
+    @mock.patch("rally.api.objects.Task.iterate_results")
+    @mock.patch("rally.api.objects.Task.get")
+    def test_export_lazy_results(self, mock_task_get,
+                                 mock_task_iterate_results,
+                                 mock_task_get_detailed, mock_task_exporter):
+        task_id = ["uuid-1", "uuid-2"]
+        reporter = mock_task_exporter.get.return_value
+        reporter.LAZY_RESULTS = True
+        mock_task_iterate_results.side_effect = lambda u: iter(
+            ["%s-result-%s" % (u, i) for i in range(2)])
+
+        self.task_inst.export(tasks_uuids=task_id, output_type="html",
+                              output_dest="/path", stream=True)
+
+        self.assertEqual([mock.call(u) for u in task_id],
+                         mock_task_get.call_args_list)
+        self.assertFalse(mock_task_get_detailed.called)
+        reporter.validate.assert_called_once_with("/path")
+        self.assertEqual(1, mock_task_exporter.make.call_count)
+        args, kwargs = mock_task_exporter.make.call_args
+        self.assertEqual(reporter, args[0])
+        self.assertEqual("/path", args[2])
+        self.assertTrue(kwargs["stream"])
+        # results are loaded by the exporter
+        self.assertFalse(mock_task_iterate_results.called)
+        self.assertEqual(["uuid-1-result-0", "uuid-1-result-1",
+                          "uuid-2-result-0", "uuid-2-result-1"],
+                         list(args[1]))
+
+    @mock.patch("rally.api.objects.Task.get",
+                side_effect=exceptions.TaskNotFound(uuid="uuid-2"))
+    @mock.patch("rally.api.texporter.TaskExporter")
+    def test_export_lazy_results_not_found(self, mock_task_exporter,
+                                           mock_task_get):
+        mock_task_exporter.get.return_value.LAZY_RESULTS = True
+        self.assertRaises(exceptions.TaskNotFound, self.task_inst.export,
+                          tasks_uuids=["uuid-2"], output_type="html")
+        self.assertFalse(mock_task_exporter.make.called)
+
     @mock.patch("rally.api.objects.Task")
     def test_get_detailed(self, mock_task):
         mock_task.get_detailed.return_value = "detailed_task_data"
         self.assertEqual("detailed_task_data",
                          self.task_inst.get_detailed(task_id="task_uuid"))
-        mock_task.get_detailed.assert_called_once_with("task_uuid")
+        mock_task.get_detailed.assert_called_once_with(
+            "task_uuid", lazy_iterations=False)
+
+    @mock.patch("rally.api.objects.Task")
+    def test_get_workloads_statistics(self, mock_task):
+        self.assertEqual(
+            mock_task.get_workloads_statistics.return_value,
+            self.task_inst.get_workloads_statistics(
+                tasks_uuids=["uuid-1", "uuid-2"]))
+        self.assertEqual([mock.call("uuid-1"), mock.call("uuid-2")],
+                         mock_task.get.mock_calls)
+        mock_task.get_workloads_statistics.assert_called_once_with(
+            ["uuid-1", "uuid-2"])
+
+    @mock.patch("rally.api.objects.Task.get",
+                side_effect=exceptions.TaskNotFound(uuid="uuid-2"))
+    @mock.patch("rally.api.objects.Task.get_workloads_statistics")
+    def test_get_workloads_statistics_not_found(
+            self, mock_task_get_workloads_statistics, mock_task_get):
+        self.assertRaises(exceptions.TaskNotFound,
+                          self.task_inst.get_workloads_statistics,
+                          tasks_uuids=["uuid-2"])
+        self.assertFalse(mock_task_get_workloads_statistics.called)
+
+    def _make_compact_result(self, uuid, iterations):
+        return {"uuid": uuid, "created_at": "2017-06-04T05:14:44",
+                "key": {"name": "Foo.bar", "pos": 0, "kw": {}},
+                "data": {"raw": [{"timestamp": i, "duration": 1.0,
+                                  "idle_duration": 0.0, "error": [],
+                                  "atomic_actions": []}
+                                 for i in range(iterations)],
+                         "sla": [], "hooks": [], "load_duration": 1.0,
+                         "full_duration": 2.0,
+                         "statistics": {"iterations_count": iterations}}}
+
+    @mock.patch("rally.api.plot.store_reports")
+    @mock.patch("rally.api.objects.Workload.compact_data", return_value=2)
+    @mock.patch("rally.api.objects.Task")
+    def test_compact(self, mock_task, mock_workload_compact_data,
+                     mock_store_reports):
+        mock_task.get.return_value = {"uuid": "uuid",
+                                      "status": consts.TaskStatus.FINISHED}
+        mock_task.get_workloads_statistics.return_value = [
+            {"uuid": "w1", "info": {"iterations_count": 10,
+                                    "iterations_failed": 1}},
+            {"uuid": "w2", "info": {"iterations_count": 10,
+                                    "iterations_failed": 9}},
+            {"uuid": "w3", "info": {"iterations_count": 10,
+                                    "iterations_failed": 0,
+                                    "iterations_stored": 2}}]
+        mock_task.iterate_results.return_value = [
+            self._make_compact_result(uuid, 10)
+            for uuid in ("w1", "w2", "w3")]
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        self.assertEqual(
+            {"workloads": 1, "deleted": 8},
+            self.task_inst.compact(task_id="uuid", sample_size=5,
+                                   archive_dir=tmp_dir))
+
+        mock_task.get_workloads_statistics.assert_called_once_with(["uuid"])
+        results = mock_store_reports.call_args[0][0]
+        self.assertEqual(["w1", "w2", "w3"], [r["uuid"] for r in results])
+        self.assertEqual([mock.call(results, zipper="avg"),
+                          mock.call(results, zipper="minmax")],
+                         mock_store_reports.call_args_list)
+        mock_workload_compact_data.assert_called_once_with(
+            "w1", {"iterations_count": 10}, 5, 1000)
+
+        with gzip.open(os.path.join(tmp_dir, "uuid.json.gz"), "rt") as f:
+            archive = json.load(f)
+        self.assertEqual(3, len(archive))
+        for result in archive:
+            jsonschema.validate(result, api._Task.TASK_RESULT_SCHEMA)
+        self.assertEqual(self._make_compact_result("w1", 10)["data"]["raw"],
+                         archive[0]["result"])
+        self.assertEqual(["uuid.json.gz"], os.listdir(tmp_dir))
+
+        # the existing archive is kept
+        mock_task.iterate_results.return_value = [
+            self._make_compact_result("w1", 10)]
+        self.task_inst.compact(task_id="uuid", sample_size=5,
+                               archive_dir=tmp_dir)
+        with gzip.open(os.path.join(tmp_dir, "uuid.json.gz"), "rt") as f:
+            self.assertEqual(3, len(json.load(f)))
+
+    @mock.patch("rally.api.plot.store_reports")
+    @mock.patch("rally.api.objects.Workload.compact_data")
+    @mock.patch("rally.api.objects.Task")
+    def test_compact_nothing(self, mock_task, mock_workload_compact_data,
+                             mock_store_reports):
+        mock_task.get.return_value = {"uuid": "uuid",
+                                      "status": consts.TaskStatus.ABORTED}
+        mock_task.get_workloads_statistics.return_value = [
+            {"uuid": "w1", "info": {"iterations_count": 10,
+                                    "iterations_failed": 1}}]
+
+        self.assertEqual({"workloads": 0, "deleted": 0},
+                         self.task_inst.compact(task_id="uuid"))
+        self.assertFalse(mock_task.iterate_results.called)
+        self.assertFalse(mock_store_reports.called)
+        self.assertFalse(mock_workload_compact_data.called)
+
+    @mock.patch("rally.api.objects.Task")
+    def test_compact_not_finished(self, mock_task):
+        mock_task.get.return_value = {"uuid": "uuid",
+                                      "status": consts.TaskStatus.RUNNING}
+        self.assertRaises(exceptions.TaskInvalidStatus,
+                          self.task_inst.compact, task_id="uuid")
+        self.assertFalse(mock_task.get_workloads_statistics.called)
 
     @mock.patch("rally.api.objects.Task")
     def test_list(self, mock_task):
         task = mock.Mock()
         task.to_dict.return_value = self.task
         mock_task.list.return_value = [task]
-        tasks = self.task_inst.list()
+        tasks = self.task_inst.list(limit=42, marker="uuid")
         self.assertEqual([self.task], tasks)
+        mock_task.list.assert_called_once_with(limit=42, marker="uuid")
+        task.to_dict.assert_called_once_with(include_results=False)
 
     @mock.patch("rally.api.objects.Task")
     def test_get_detailed_with_extended_results(self, mock_task):
@@ -468,9 +594,24 @@ class TaskAPITestCase(test.TestCase):
         self.assertEqual({"uuid": "foo_uuid", "results": "extended_results"},
                          self.task_inst.get_detailed(task_id="foo_uuid",
                                                      extended_results=True))
-        mock_task.get_detailed.assert_called_once_with("foo_uuid")
+        mock_task.get_detailed.assert_called_once_with(
+            "foo_uuid", lazy_iterations=False)
         mock_task.extend_results.assert_called_once_with("raw_results")
 
+    @mock.patch("rally.api.objects.Task")
+    def test_get_detailed_with_lazy_iterations(self, mock_task):
+        mock_task.get_detailed.return_value = (("uuid", "foo_uuid"),
+                                               ("results", "lazy_results"))
+        mock_task.extend_results.return_value = "extended_results"
+
+        self.assertEqual({"uuid": "foo_uuid", "results": "extended_results"},
+                         self.task_inst.get_detailed(task_id="foo_uuid",
+                                                     extended_results=True,
+                                                     lazy_iterations=True))
+        mock_task.get_detailed.assert_called_once_with(
+            "foo_uuid", lazy_iterations=True)
+        mock_task.extend_results.assert_called_once_with("lazy_results")
+
     @mock.patch("rally.api.objects.Task")
     @mock.patch("rally.api.objects.Deployment.get")
     def test_import_results(self, mock_deployment_get, mock_task):
@@ -490,6 +631,8 @@ class TaskAPITestCase(test.TestCase):
 
         mock_task.assert_called_once_with(deployment_uuid="deployment_uuid",
                                           tags=None)
+        mock_task.return_value.to_dict.assert_called_with(
+            include_results=False)
         mock_task.return_value.update_status.assert_has_calls(
             [mock.call(consts.TaskStatus.RUNNING),
              mock.call(consts.SubtaskStatus.FINISHED)]
@@ -505,11 +648,10 @@ class TaskAPITestCase(test.TestCase):
             [mock.call(consts.SubtaskStatus.FINISHED)]
         )
         work_load = sub_task.add_workload.return_value
-        work_load.add_workload_data.assert_has_calls(
-            [mock.call(0, {"raw": task_results[0]["result"]})]
-        )
+        work_load.add_workload_data_chunks.assert_called_once_with(
+            [{"chunk_order": 0, "raw": task_results[0]["result"]}])
         work_load.set_results.assert_has_calls(
-            [mock.call(task_results[0])]
+            [mock.call(task_results[0], summary=mock.ANY)]
         )
 
     @mock.patch("rally.api.objects.Task")
@@ -522,10 +664,10 @@ class TaskAPITestCase(test.TestCase):
             uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
             status=consts.DeployStatus.DEPLOY_FINISHED)
 
+        iterations = [{"timestamp": ts, "duration": 1.0, "error": [],
+                       "atomic_actions": []} for ts in (2, 1, 3)]
         task_results = [{"key": {"name": "test_scenario"},
-                         "result": [{"timestamp": 1},
-                                    {"timestamp": 2},
-                                    {"timestamp": 3}]}]
+                         "result": iter(iterations)}]
         mock_conf.raw_result_chunk_size = 2
 
         self.assertEqual(
@@ -552,15 +694,75 @@ class TaskAPITestCase(test.TestCase):
             [mock.call(consts.SubtaskStatus.FINISHED)]
         )
         work_load = sub_task.add_workload.return_value
-        work_load.add_workload_data.assert_has_calls(
-            [mock.call(0, {"raw": [{"timestamp": 1},
-                                   {"timestamp": 2}]}),
-             mock.call(1, {"raw": [{"timestamp": 3}]})
-             ]
-        )
-        work_load.set_results.assert_has_calls(
-            [mock.call(task_results[0])]
-        )
+        work_load.add_workload_data_chunks.assert_called_once_with(
+            [{"chunk_order": 0, "raw": [iterations[1], iterations[0]],
+              "iteration_count": 2, "failed_iteration_count": 0,
+              "started_at": 1, "finished_at": 3.0},
+             {"chunk_order": 1, "raw": [iterations[2]],
+              "iteration_count": 1, "failed_iteration_count": 0,
+              "started_at": 3, "finished_at": 4.0}])
+        work_load.set_results.assert_called_once_with(
+            task_results[0], summary=mock.ANY)
+        # aggregated data is calculated while iterations are stored
+        summary = work_load.set_results.call_args[1]["summary"]
+        self.assertEqual(3, summary.iterations_count)
+        self.assertEqual(1, summary.tstamp_start)
+
+    @mock.patch("rally.api.objects.Task")
+    @mock.patch("rally.api.objects.Deployment.get")
+    @mock.patch("rally.api.CONF")
+    def test_import_results_chunks_batch(self, mock_conf,
+                                         mock_deployment_get, mock_task):
+        mock_deployment_get.return_value = fakes.FakeDeployment(
+            uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
+            status=consts.DeployStatus.DEPLOY_FINISHED)
+        iterations = [{"timestamp": ts, "duration": 1.0, "error": [],
+                       "atomic_actions": []} for ts in range(5)]
+        mock_conf.raw_result_chunk_size = 1
+        self.task_inst.IMPORT_CHUNKS_BATCH = 2
+
+        self.task_inst.import_results(
+            deployment="deployment_uuid",
+            task_results=[{"key": {"name": "test_scenario"},
+                           "result": iterations}])
+
+        sub_task = mock_task.return_value.add_subtask.return_value
+        work_load = sub_task.add_workload.return_value
+        chunks = [{"chunk_order": ts, "raw": [iterations[ts]],
+                   "iteration_count": 1, "failed_iteration_count": 0,
+                   "started_at": ts, "finished_at": ts + 1.0}
+                  for ts in range(5)]
+        self.assertEqual(
+            [mock.call(chunks[:2]), mock.call(chunks[2:4]),
+             mock.call(chunks[4:])],
+            work_load.add_workload_data_chunks.call_args_list)
+
+    @mock.patch("rally.api.objects.Task")
+    @mock.patch("rally.api.objects.Deployment.get")
+    def test_import_results_invalid_results(self, mock_deployment_get,
+                                            mock_task):
+        mock_deployment_get.return_value = fakes.FakeDeployment(
+            uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
+            status=consts.DeployStatus.DEPLOY_FINISHED)
+
+        def iterations():
+            yield {"timestamp": 1, "duration": 1.0, "error": [],
+                   "atomic_actions": []}
+            raise exceptions.RallyException("Invalid iteration")
+
+        task_results = [{"key": {"name": "test_scenario"},
+                         "result": iterations()}]
+
+        self.assertRaises(exceptions.RallyException,
+                          self.task_inst.import_results,
+                          deployment="deployment_uuid",
+                          task_results=task_results)
+
+        task_inst = mock_task.return_value
+        task_inst.update_status.assert_called_once_with(
+            consts.TaskStatus.RUNNING)
+        task_inst.set_failed.assert_called_once_with(
+            "RallyException", "Invalid iteration", mock.ANY)
 
     @mock.patch("rally.api.objects.Deployment.get")
     def test_import_results_with_inconsistent_deployment(
@@ -1662,10 +1864,14 @@ class VerificationAPITestCase(test.TestCase):
         mock_verification_list.assert_called_once_with(
             verifier_id, deployment_id=deployment_id, tags=tags,
             status=status)
+        mock_verification_list.return_value[0].to_dict.assert_called_with(
+            include_tests=False)
 
+    @mock.patch("rally.api.objects.Verification.load_tests")
     @mock.patch("rally.api.vreporter.VerificationReporter")
     @mock.patch("rally.api.objects.Verification.get")
-    def test_report(self, mock_verification_get, mock_verification_reporter):
+    def test_report(self, mock_verification_get, mock_verification_reporter,
+                    mock_verification_load_tests):
         verifications = ["uuid-1", "uuid-2"]
         output_type = mock.Mock()
         output_dest = mock.Mock()
@@ -1687,6 +1893,9 @@ class VerificationAPITestCase(test.TestCase):
             output_dest)
         self.assertEqual([mock.call(u) for u in verifications],
                          mock_verification_get.call_args_list)
+        mock_verification_load_tests.assert_called_once_with(
+            [mock_verification_get.return_value,
+             mock_verification_get.return_value])
 
     @mock.patch("rally.api.objects.Verification.create")
     @mock.patch("rally.api._Verifier._get")
@@ -1931,8 +2140,10 @@ class VerificationAPITestCase(test.TestCase):
                  "test_2": {"status": "fail"},
                  "test_3": {"status": "fail"}}
         mock_verification_get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid")
+        verification = mock_verification_get.return_value
+        verification.get_tests.return_value = dict(
+            (t, r) for t, r in tests.items() if r["status"] == "fail")
         self.verification_inst.return_value = mock.Mock()
         self.verification_inst.api.deployment.get.return_value = {
             "name": "deployment_name",
@@ -1940,19 +2151,19 @@ class VerificationAPITestCase(test.TestCase):
         }
         expected_tests = [t for t, r in tests.items() if r["status"] == "fail"]
         self.verification_inst.rerun(verification_uuid="uuid", failed=True)
+        verification.get_tests.assert_called_once_with(status="fail")
         mock_start.assert_called_once_with(
             verifier_id="v_uuid", deployment_id="deployment_uuid",
-            load_list=expected_tests, tags=None)
+            load_list=mock.ANY, tags=None)
+        self.assertEqual(sorted(expected_tests),
+                         sorted(mock_start.call_args[1]["load_list"]))
 
     @mock.patch("rally.api._Verification._get")
     def test_rerun_failed_tests_raise_exc(
             self, mock___verification__get):
-        tests = {"test_1": {"status": "success"},
-                 "test_2": {"status": "success"},
-                 "test_3": {"status": "skip"}}
         mock___verification__get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid")
+        mock___verification__get.return_value.get_tests.return_value = {}
 
         e = self.assertRaises(exceptions.RallyException,
                               self.verification_inst.rerun,